@@ -0,0 +1,730 @@
+#!/usr/bin/env python3
+"""Micro-benchmarks for pipeline hot paths."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import pickle
+import tempfile
+import time
+
+
+def _report(name: str, count: int, elapsed_s: float, unit: str = "frames") -> None:
+    rate = count / elapsed_s if elapsed_s > 0 else 0.0
+    print(f"{name}: {count} {unit} in {elapsed_s:.3f}s ({rate:.1f} {unit}/s)")
+
+
+def bench_decode(args: argparse.Namespace) -> None:
+    """Decode throughput of the native video vs its model-resolution proxy."""
+    import cv2
+
+    for name, path in (("native", args.video), ("proxy", args.proxy)):
+        if not path:
+            continue
+        cap = cv2.VideoCapture(path)
+        count = 0
+        start = time.perf_counter()
+        while count < args.frames:
+            ret, _ = cap.read()
+            if not ret:
+                break
+            count += 1
+        elapsed = time.perf_counter() - start
+        cap.release()
+        _report(name, count, elapsed)
+
+
+def _ray_roundtrip(obj):
+    """Serialize like Ray does (pickle 5, out-of-band buffers) and restore."""
+    buffers = []
+    payload = pickle.dumps(obj, protocol=5, buffer_callback=buffers.append)
+    return pickle.loads(payload, buffers=buffers)
+
+
+def bench_results(args: argparse.Namespace) -> None:
+    """Operator-to-disk latency per clip: list-of-dicts vs Arrow record batch."""
+    import numpy as np
+
+    from egoworld.io.frames import MaskFrameBuilder
+    from egoworld.io.writers import write_parquet_table
+    from egoworld.manifests.schema import mask_schema
+    from egoworld.utils.mask import encode_mask_rle
+
+    rng = np.random.default_rng(0)
+    masks = []
+    for _ in range(min(args.frames, 32)):
+        mask = np.zeros((args.height, args.width), dtype=np.uint8)
+        y, x = rng.integers(0, args.height // 2), rng.integers(0, args.width // 2)
+        mask[y : y + args.height // 3, x : x + args.width // 3] = 1
+        masks.append(encode_mask_rle(mask))
+    rles = [masks[i % len(masks)] for i in range(args.frames)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in ("dicts", "arrow"):
+            path = os.path.join(tmp, f"{name}.parquet")
+            start = time.perf_counter()
+            for _ in range(args.clips):
+                if name == "dicts":
+                    frames = [
+                        {"frame_index": i, "timestamp_s": i / 30.0, "mask_rle": rle}
+                        for i, rle in enumerate(rles)
+                    ]
+                else:
+                    builder = MaskFrameBuilder()
+                    for i, rle in enumerate(rles):
+                        builder.append(i, i / 30.0, rle)
+                    frames = builder.to_batch()
+                write_parquet_table(path, _ray_roundtrip(frames), schema=mask_schema())
+            elapsed = time.perf_counter() - start
+            _report(name, args.clips, elapsed, unit="clips")
+
+
+def _synthetic_run(root: str, videos: int, clips: int, frames: int, width: int, height: int) -> None:
+    import numpy as np
+
+    from egoworld.pipeline.driver import ClipWriter
+    from egoworld.utils.mask import encode_mask_rle
+
+    config = {
+        "run_id": "bench",
+        "paths": {"output_root": root, "state_db_path": os.path.join(root, "state", "pipeline.db")},
+        "coordinates": {"mask_encoding": "rle", "time_base": "seconds"},
+        "writer": {"stream_threads": 4},
+    }
+    writer = ClipWriter(config)
+    mask = np.zeros((height, width), dtype=np.uint8)
+    mask[height // 4 : height // 2, width // 4 : width // 2] = 1
+    rle = encode_mask_rle(mask)
+    for v in range(videos):
+        for c in range(clips):
+            rows = [
+                {"frame_index": c * frames + i, "timestamp_s": (c * frames + i) / 30.0, "mask_rle": rle}
+                for i in range(frames)
+            ]
+            clip = {"clip_id": f"v{v}-c{c}", "video_id": f"v{v}"}
+            writer.write({"clip": clip, "masks": {"frames": rows}})
+
+
+def bench_reader(args: argparse.Namespace) -> None:
+    """Random-access decoded mask frames per second through io.reader."""
+    import random
+
+    from egoworld.io.reader import open_run
+
+    with tempfile.TemporaryDirectory() as tmp:
+        output_root, run_id = args.output_root, args.run_id
+        if not run_id:
+            output_root, run_id = tmp, "bench"
+            _synthetic_run(tmp, args.videos, args.clips, args.frames, args.width, args.height)
+        reader = open_run(output_root, run_id)
+        keys = reader.read(columns=["video_id", "clip_id", "frame_index"]).to_pylist()
+        rng = random.Random(0)
+        sample = [rng.choice(keys) for _ in range(args.samples)]
+        start = time.perf_counter()
+        for key in sample:
+            reader.mask(key["video_id"], key["clip_id"], key["frame_index"])
+        _report("random_access", len(sample), time.perf_counter() - start)
+        start = time.perf_counter()
+        stack = reader.masks(video_ids=[keys[0]["video_id"]]).stack()
+        _report("sequential_stack", stack.shape[0], time.perf_counter() - start)
+
+
+def bench_rle(args: argparse.Namespace) -> None:
+    """Mask area/bbox and IoU per frame: decode-then-numpy vs per-pair vs batched run-length algebra."""
+    import numpy as np
+
+    from egoworld.utils import rle as rle_ops
+    from egoworld.utils.mask import decode_mask_rle, encode_mask_rle
+
+    rng = np.random.default_rng(0)
+    masks = []
+    for _ in range(args.frames):
+        mask = np.zeros((args.height, args.width), dtype=np.uint8)
+        y, x = rng.integers(0, args.height // 2), rng.integers(0, args.width // 2)
+        mask[y : y + args.height // 3, x : x + args.width // 3] = 1
+        masks.append(encode_mask_rle(mask))
+
+    start = time.perf_counter()
+    for rle in masks:
+        dense = decode_mask_rle(rle)
+        ys, xs = np.nonzero(dense)
+        _ = (int(dense.sum()), xs.min(), ys.min(), xs.max(), ys.max())
+    _report("decode_stats", len(masks), time.perf_counter() - start)
+    start = time.perf_counter()
+    rle_ops.mask_stats(masks)
+    _report("rle_stats", len(masks), time.perf_counter() - start)
+    start = time.perf_counter()
+    for a, b in zip(masks, masks[1:]):
+        rle_ops.iou(a, b)
+    _report("rle_iou_pairwise", len(masks) - 1, time.perf_counter() - start)
+    start = time.perf_counter()
+    rle_ops.ious(masks[:-1], masks[1:])
+    _report("rle_iou_batched", len(masks) - 1, time.perf_counter() - start)
+
+
+def _tracked_masks(frames: int, width: int, height: int, motion: float = 1.0):
+    """Encoded masks of a blob drifting ~``motion`` x a few pixels per frame, like a tracked object."""
+    import numpy as np
+
+    from egoworld.utils.mask import encode_mask_rle
+
+    yy, xx = np.mgrid[0:height, 0:width]
+    out = []
+    for step in range(frames):
+        i = step * motion
+        cx = width * (0.3 + 0.4 * np.sin(i / 90.0) ** 2)
+        cy = height * (0.4 + 0.2 * np.cos(i / 60.0))
+        radius = min(width, height) * (0.15 + 0.02 * np.sin(i / 15.0))
+        out.append(encode_mask_rle(((xx - cx) ** 2 + (yy - cy) ** 2 < radius**2).astype(np.uint8)))
+    return out
+
+
+def bench_delta(args: argparse.Namespace) -> None:
+    """masks.parquet size and decode speed: plain RLE vs keyframe + XOR-delta RLE."""
+    import random
+
+    import pyarrow.parquet as pq
+
+    from egoworld.io.frames import encode_mask_frames
+    from egoworld.io.reader import MaskSequence
+    from egoworld.io.writers import write_parquet_table
+    from egoworld.manifests.schema import mask_output_schema
+
+    if args.masks:
+        source = pq.read_table(args.masks, columns=["frame_index", "timestamp_s", "mask_rle"]).slice(0, args.frames)
+        frames = source.to_pylist()
+    else:
+        masks = _tracked_masks(args.frames, args.width, args.height, args.motion)
+        frames = [{"frame_index": i, "timestamp_s": i / 30.0, "mask_rle": m} for i, m in enumerate(masks)]
+    rng = random.Random(0)
+    sample = [rng.randrange(len(frames)) for _ in range(args.samples)]
+    with tempfile.TemporaryDirectory() as tmp:
+        for encoding in ("rle", "rle_delta"):
+            path = os.path.join(tmp, f"{encoding}.parquet")
+            table = encode_mask_frames(frames, encoding, args.keyframe_interval)
+            info = write_parquet_table(path, table, schema=mask_output_schema(encoding))
+            print(f"{encoding}: {info['bytes']} bytes")
+            seq = MaskSequence(pq.read_table(path))
+            start = time.perf_counter()
+            for mask in seq:
+                pass
+            _report(f"{encoding} sequential", len(seq), time.perf_counter() - start)
+            start = time.perf_counter()
+            for i in sample:
+                seq._last = None
+                seq[i]
+            _report(f"{encoding} random", len(sample), time.perf_counter() - start)
+
+
+def bench_objects(args: argparse.Namespace) -> None:
+    """Bytes per frame and encode time: full-frame union RLE vs per-object bbox crops."""
+    import numpy as np
+
+    from egoworld.io.frames import MaskFrameBuilder, ObjectFrameBuilder, with_mask_stats
+    from egoworld.io.writers import write_parquet_table
+    from egoworld.manifests.schema import mask_output_schema, object_mask_schema
+    from egoworld.operators.sam2_op import _union_masks
+    from egoworld.utils.mask import encode_mask_rle
+
+    h, w = args.height, args.width
+    yy, xx = np.mgrid[0:h, 0:w]
+    # Objects sized so that together they cover ~coverage of the frame.
+    radius = np.sqrt(args.coverage * h * w / (np.pi * args.objects))
+    rng = np.random.default_rng(0)
+    centers = rng.uniform([radius, radius], [w - radius, h - radius], size=(args.objects, 2))
+    origins = {i: ("hand", 0.9) for i in range(args.objects)}
+    union, objects = MaskFrameBuilder(), ObjectFrameBuilder()
+    union_s = objects_s = 0.0
+    for frame in range(args.frames):
+        drift = 3.0 * np.sin(frame / 20.0 + np.arange(args.objects))[:, None]
+        masks = np.stack([(xx - cx - d) ** 2 + (yy - cy) ** 2 < radius**2 for (cx, cy), d in zip(centers, drift)])
+        start = time.perf_counter()
+        union.append(frame, frame / 30.0, encode_mask_rle(_union_masks(masks)))
+        union_s += time.perf_counter() - start
+        start = time.perf_counter()
+        objects.append(frame, frame / 30.0, list(range(args.objects)), masks, origins)
+        objects_s += time.perf_counter() - start
+    with tempfile.TemporaryDirectory() as tmp:
+        union_info = write_parquet_table(
+            os.path.join(tmp, "masks.parquet"), with_mask_stats(union.to_batch()), schema=mask_output_schema()
+        )
+        objects_info = write_parquet_table(
+            os.path.join(tmp, "objects.parquet"), objects.to_batch(), schema=object_mask_schema()
+        )
+    for name, info, encode_s in (("union", union_info, union_s), ("objects", objects_info, objects_s)):
+        print(f"{name}: {info['bytes'] / args.frames:.1f} bytes/frame, encode {1000 * encode_s / args.frames:.2f} ms/frame")
+
+
+def bench_checksum(args: argparse.Namespace) -> None:
+    """Manifest checksum time per mode on one large file (page cache not dropped)."""
+    from egoworld.utils.hashing import CHECKSUM_MODES, checksum_file
+
+    path = args.file
+    tmp = None
+    if not path:
+        tmp = tempfile.NamedTemporaryFile(suffix=".bin", delete=False)
+        chunk = os.urandom(1024 * 1024)
+        for _ in range(args.size_mb):
+            tmp.write(chunk)
+        tmp.close()
+        path = tmp.name
+    size_mb = os.path.getsize(path) / (1024 * 1024)
+    try:
+        for mode in CHECKSUM_MODES:
+            start = time.perf_counter()
+            try:
+                checksum_file(path, mode, args.blocks, args.block_size)
+            except RuntimeError as exc:
+                print(f"{mode}: skipped ({exc})")
+                continue
+            _report(mode, int(size_mb), time.perf_counter() - start, unit="MiB")
+    finally:
+        if tmp is not None:
+            os.unlink(tmp.name)
+
+
+def bench_scenes(args: argparse.Namespace) -> None:
+    """Scene detection: native every-frame scores vs downscaled frame-skipping scores."""
+    import numpy as np
+
+    from egoworld.manifests.scenes import boundary_agreement, content_scores, scenes_from_scores
+
+    path = args.video
+    tmp = None
+    if not path:
+        import cv2
+
+        tmp = tempfile.NamedTemporaryFile(suffix=".avi", delete=False)
+        tmp.close()
+        path = tmp.name
+        rng = np.random.default_rng(0)
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 30.0, (args.width, args.height))
+        base = rng.integers(0, 255, (args.height // 8, args.width // 8, 3), dtype=np.uint8)
+        for i in range(args.frames):
+            if i and i % args.scene_frames == 0:
+                base = rng.integers(0, 255, base.shape, dtype=np.uint8)
+            frame = cv2.resize(np.roll(base, i % args.scene_frames, axis=1), (args.width, args.height))
+            writer.write(frame)
+        writer.release()
+    try:
+        start = time.perf_counter()
+        ref_frames, ref_scores, fps = content_scores(path, width=0, frame_skip=0)
+        native_s = time.perf_counter() - start
+        _report("native", len(ref_frames), native_s)
+        start = time.perf_counter()
+        frames, scores, _ = content_scores(path, width=args.fast_width, frame_skip=args.frame_skip)
+        fast_s = time.perf_counter() - start
+        _report(f"fast(w={args.fast_width},skip={args.frame_skip})", len(frames), fast_s)
+        duration_s = (int(ref_frames[-1]) + 1) / fps if len(ref_frames) else 0.0
+        reference = scenes_from_scores(ref_frames, ref_scores, fps, duration_s, args.threshold, args.min_scene_len_s)
+        fast = scenes_from_scores(frames, scores, fps, duration_s, args.threshold, args.min_scene_len_s)
+        tolerance_s = (args.frame_skip + 1) / fps
+        print(f"speedup: {native_s / fast_s:.1f}x")
+        print(f"agreement (tolerance {tolerance_s:.3f}s): {boundary_agreement(reference, fast, tolerance_s)}")
+        start = time.perf_counter()
+        for threshold in np.linspace(10.0, 50.0, 20):
+            scenes_from_scores(frames, scores, fps, duration_s, float(threshold), args.min_scene_len_s)
+        _report("recompute_from_scores", 20, time.perf_counter() - start, unit="thresholds")
+    finally:
+        if tmp is not None:
+            os.unlink(tmp.name)
+
+
+def bench_sidecar(args: argparse.Namespace) -> None:
+    """Manifest decode with/without the sidecar, and per-clip prompt frames: clip decode vs sidecar."""
+    import cv2
+    import numpy as np
+
+    from egoworld.io.sidecar import SidecarStore
+    from egoworld.manifests.scenes import content_scores
+    from egoworld.utils.video import iter_frames
+
+    root = tempfile.mkdtemp(prefix="egoworld_bench_sidecar_")
+    path = os.path.join(root, "synthetic.avi")
+    rng = np.random.default_rng(0)
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 30.0, (args.width, args.height))
+    base = rng.integers(0, 255, (args.height // 8, args.width // 8, 3), dtype=np.uint8)
+    for i in range(args.frames):
+        writer.write(cv2.resize(np.roll(base, i, axis=1), (args.width, args.height)))
+    writer.release()
+    try:
+        start = time.perf_counter()
+        content_scores(path, width=args.fast_width, frame_skip=args.frame_skip)
+        plain_s = time.perf_counter() - start
+        _report("decode", args.frames, plain_s)
+        store = SidecarStore(os.path.join(root, "sidecars"))
+        start = time.perf_counter()
+        content_scores(
+            path,
+            width=args.fast_width,
+            frame_skip=args.frame_skip,
+            sidecar=store.writer("bench", args.prompt_interval_s, args.thumb_width),
+        )
+        sidecar_s = time.perf_counter() - start
+        _report("decode+sidecar", args.frames, sidecar_s)
+        print(f"sidecar overhead: {100.0 * (sidecar_s / plain_s - 1.0):.1f}%")
+
+        stride = max(1, int(round(args.prompt_interval_s * 30.0)))
+        # Clip starts are shifted off the prompt grid, as scene cuts usually are.
+        starts = range(args.clip_offset, args.frames, args.clip_frames)
+        clips = [(f, min(f + args.clip_frames, args.frames) - 1) for f in starts]
+        start = time.perf_counter()
+        decoded = 0
+        for first, last in clips:
+            decoded += len(list(iter_frames(path, first / 30.0, last / 30.0, stride)))
+        _report("prompt_frames_decode", decoded, time.perf_counter() - start)
+        sidecar = store.open("bench", args.prompt_interval_s)
+        start = time.perf_counter()
+        sidecar.add_clip_starts(path, [first for first, _ in clips])
+        _report("clip_starts", len(clips), time.perf_counter() - start)
+        start = time.perf_counter()
+        served = 0
+        for first, last in clips:
+            frames = sidecar.prompt_frames(first, last + 1, 1 << 30)
+            if not frames or frames[0][0] > first:
+                served += sidecar.clip_start(first) is not None
+            served += len(frames)
+        _report("prompt_frames_sidecar", served, time.perf_counter() - start)
+        size = sum(os.path.getsize(os.path.join(sidecar_dir, name))
+                   for sidecar_dir, _, names in os.walk(os.path.join(root, "sidecars")) for name in names)
+        print(f"sidecar size: {size / 2**20:.1f} MiB for {args.frames} frames")
+    finally:
+        import shutil
+
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def bench_triage(args: argparse.Namespace) -> None:
+    """Per-clip CPU triage cost: a few decoded frames vs the manifest sidecar."""
+    import cv2
+    import numpy as np
+
+    from egoworld.config import TriageConfig
+    from egoworld.io.sidecar import SidecarStore
+    from egoworld.manifests.scenes import content_scores
+    from egoworld.pipeline.driver import ClipTask
+    from egoworld.pipeline.triage import triage_clip
+
+    root = tempfile.mkdtemp(prefix="egoworld_bench_triage_")
+    path = os.path.join(root, "synthetic.avi")
+    rng = np.random.default_rng(0)
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 30.0, (args.width, args.height))
+    base = rng.integers(0, 255, (args.height // 8, args.width // 8, 3), dtype=np.uint8)
+    kinds = ["dark", "static", "moving"]
+    for i in range(args.clips * args.clip_frames):
+        kind = kinds[(i // args.clip_frames) % 3]
+        if kind == "dark":
+            frame = np.full((args.height, args.width, 3), 4, dtype=np.uint8)
+        else:
+            shift = i if kind == "moving" else 0
+            frame = cv2.resize(np.roll(base, shift, axis=1), (args.width, args.height))
+        writer.write(frame)
+    writer.release()
+    tasks = [
+        ClipTask(
+            clip_id=f"c{k}", video_id="v", video_path=path, start_s=k * args.clip_frames / 30.0,
+            end_s=((k + 1) * args.clip_frames - 1) / 30.0, frame_start=k * args.clip_frames,
+            frame_end=(k + 1) * args.clip_frames - 1, scenedetect_failed=False, checksum="bench",
+        )
+        for k in range(args.clips)
+    ]
+    config = TriageConfig(enabled=True, samples=args.samples, min_brightness=10.0, min_motion=1.0)
+    try:
+        start = time.perf_counter()
+        decoded = [triage_clip(task, config) for task in tasks]
+        _report("triage_decode", len(tasks), time.perf_counter() - start, unit="clips")
+        sidecar_dir = os.path.join(root, "sidecars")
+        content_scores(path, width=256, frame_skip=1, sidecar=SidecarStore(sidecar_dir).writer("bench", 2.0, 512))
+        start = time.perf_counter()
+        served = [triage_clip(task, config, sidecar_dir, 2.0) for task in tasks]
+        _report("triage_sidecar", len(tasks), time.perf_counter() - start, unit="clips")
+        expected = [kinds[k % 3] != "moving" for k in range(args.clips)]
+        for name, results in (("decode", decoded), ("sidecar", served)):
+            flagged = [bool(r.reason) for r in results]
+            print(f"{name}: flagged {sum(flagged)}/{len(flagged)}, matches layout: {flagged == expected}")
+    finally:
+        import shutil
+
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def _synthetic_manifest(videos: int, fps: float = 30.0):
+    """Video/clip rows with log-normal scene lengths and some full-video fallback clips."""
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    video_rows, clip_rows = [], []
+    for v in range(videos):
+        duration = float(np.clip(rng.lognormal(np.log(300.0), 0.8), 20.0, 3600.0))
+        video_rows.append({"video_id": f"v{v}", "fps": fps, "duration_s": duration})
+        if rng.random() < 0.1:
+            bounds = [0.0, duration]  # scene detection failed: one clip for the whole video
+        else:
+            bounds = [0.0]
+            while bounds[-1] < duration:
+                bounds.append(min(duration, bounds[-1] + float(rng.lognormal(np.log(20.0), 1.0))))
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            clip_rows.append({"video_id": f"v{v}", "start_s": start, "end_s": end})
+    return video_rows, clip_rows
+
+
+def bench_makespan(args: argparse.Namespace) -> None:
+    """Simulated GPU makespan of a clip manifest with and without length-capped splitting."""
+    import heapq
+
+    import numpy as np
+
+    from egoworld.manifests.build_manifest import split_scene
+    from egoworld.pipeline.driver import load_manifest
+
+    if args.clip_manifest:
+        video_rows, clip_rows = load_manifest(args.video_manifest), load_manifest(args.clip_manifest)
+    else:
+        video_rows, clip_rows = _synthetic_manifest(args.videos)
+    fps = {row["video_id"]: float(row["fps"]) for row in video_rows}
+
+    def clip_seconds(max_len_s: float):
+        # Per-clip GPU seconds: fixed state init plus per-frame cost; new inner cuts add overlap.
+        # The cap includes overlap on both sides, as in build_manifest.
+        padding = 2 * args.overlap_s
+        core_len_s = max_len_s - padding if max_len_s > 0 else 0.0
+        target_len_s = max(args.target_clip_len_s - padding, 0.0)
+        costs = []
+        for clip in clip_rows:
+            rate = fps[clip["video_id"]]
+            chunks = split_scene(clip["start_s"], clip["end_s"], rate, core_len_s, target_len_s)
+            for i, (start, end) in enumerate(chunks):
+                pad = args.overlap_s * ((i > 0) + (i < len(chunks) - 1))
+                costs.append(args.clip_overhead_s + (end - start + pad) * rate * args.frame_cost_s)
+        return costs
+
+    def simulate(costs):
+        free = [0.0] * args.gpus
+        for cost in costs:  # manifest order, each clip to the first GPU that frees up
+            heapq.heappush(free, heapq.heappop(free) + cost)
+        return max(free), min(free)
+
+    for label, max_len_s in (("uncapped", 0.0), (f"max_clip_len_s={args.max_clip_len_s:g}", args.max_clip_len_s)):
+        costs = clip_seconds(max_len_s)
+        makespan, first_idle = simulate(costs)
+        bound = sum(costs) / args.gpus
+        p50, p99 = np.percentile(costs, [50, 99])
+        print(
+            f"{label}: clips={len(costs)} clip_s p50={p50:.1f} p99={p99:.1f} max={max(costs):.1f} "
+            f"makespan={makespan / 3600:.2f}h bound={bound / 3600:.2f}h ratio={makespan / bound:.3f} "
+            f"tail={(makespan - first_idle) / 3600:.2f}h"
+        )
+
+
+def _load_manifest_child(kind: str, path: str, video_path: str, queue) -> None:
+    import json
+
+    from egoworld.manifests.table import read_clip_manifest, read_video_manifest
+    from egoworld.observability.summary import peak_rss_bytes
+    from egoworld.pipeline.driver import ClipTasks
+
+    base = peak_rss_bytes()
+    start = time.perf_counter()
+    if kind == "json.loads":
+        with open(path, encoding="utf-8") as handle:
+            rows = [json.loads(line) for line in handle if line.strip()]
+        count = len(rows)
+    else:
+        clips = read_clip_manifest(path)
+        tasks = ClipTasks.from_manifests(clips, read_video_manifest(video_path)).sort_by_duration()
+        count = len(tasks)
+    queue.put((count, time.perf_counter() - start, peak_rss_bytes() - base))
+
+
+def bench_manifest(args: argparse.Namespace) -> None:
+    """Clip manifest load time and RSS: json.loads per line vs Arrow JSON reader vs Parquet."""
+    import multiprocessing
+
+    import numpy as np
+
+    from egoworld.io.writers import ParquetRowsWriter
+    from egoworld.manifests.build_manifest import write_manifest_parquet
+    from egoworld.manifests.schema import clip_manifest_schema, video_manifest_schema
+
+    root = tempfile.mkdtemp(prefix="manifest_bench_")
+    clip_jsonl = os.path.join(root, "clips.jsonl")
+    video_jsonl = os.path.join(root, "videos.jsonl")
+    clip_parquet = os.path.join(root, "clips.parquet")
+    video_parquet = os.path.join(root, "videos.parquet")
+    rng = np.random.default_rng(0)
+    videos = max(1, args.rows // 100)
+    video_rows = [
+        {"video_id": f"{v:016x}", "path": f"/data/videos/{v:08d}.mp4", "duration_s": 600.0, "fps": 30.0,
+         "width": 1920, "height": 1080, "audio": True, "checksum": f"{v:064x}", "split": "train"}
+        for v in range(videos)
+    ]
+    with open(video_jsonl, "w", encoding="utf-8") as handle:
+        handle.writelines(json.dumps(row) + "\n" for row in video_rows)
+    write_manifest_parquet(video_parquet, video_rows, video_manifest_schema())
+    start = time.perf_counter()
+    with open(clip_jsonl, "w", encoding="utf-8") as handle, ParquetRowsWriter(
+        clip_parquet, clip_manifest_schema()
+    ) as parquet:
+        for begin in range(0, args.rows, 100_000):
+            n = min(100_000, args.rows - begin)
+            starts = rng.integers(0, 17000, n)
+            lengths = rng.integers(30, 900, n)
+            for i in range(n):
+                v = (begin + i) % videos
+                fs, fe = int(starts[i]), int(starts[i] + lengths[i])
+                row = {
+                    "clip_id": f"{v:016x}-{fs:09d}-{fe:09d}-{begin + i:08x}", "video_id": f"{v:016x}",
+                    "start_s": fs / 30.0, "end_s": fe / 30.0, "frame_start": fs, "frame_end": fe,
+                    "overlap_s": 1.0, "scenedetect_failed": False, "status": "Pending", "last_error": "",
+                    "retry_count": 0,
+                }
+                handle.write(json.dumps(row) + "\n")
+                parquet.write(row)
+    print(f"generated {args.rows} clips in {time.perf_counter() - start:.1f}s: "
+          f"jsonl {os.path.getsize(clip_jsonl) / 2**20:.0f} MiB, parquet {os.path.getsize(clip_parquet) / 2**20:.0f} MiB")
+
+    variants = [("arrow_jsonl", clip_jsonl, video_jsonl), ("parquet", clip_parquet, video_parquet)]
+    if not args.skip_dicts:
+        variants.insert(0, ("json.loads", clip_jsonl, video_jsonl))
+    ctx = multiprocessing.get_context("spawn")
+    try:
+        for kind, path, video_path in variants:
+            queue = ctx.Queue()
+            proc = ctx.Process(target=_load_manifest_child, args=(kind, path, video_path, queue))
+            proc.start()
+            proc.join()
+            if proc.exitcode != 0:
+                print(f"{kind}: failed (exit code {proc.exitcode}, likely out of memory)")
+                continue
+            count, elapsed, rss = queue.get()
+            print(f"{kind}: {count} rows in {elapsed:.2f}s ({count / elapsed:,.0f} rows/s), +{rss / 2**20:.0f} MiB RSS")
+    finally:
+        for name in os.listdir(root):
+            os.unlink(os.path.join(root, name))
+        os.rmdir(root)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="egoworld benchmarks")
+    sub = parser.add_subparsers(dest="command")
+
+    decode = sub.add_parser("decode", help="Native vs proxy decode throughput")
+    decode.add_argument("--video", required=True)
+    decode.add_argument("--proxy", default="")
+    decode.add_argument("--frames", type=int, default=900)
+    decode.set_defaults(func=bench_decode)
+
+    results = sub.add_parser("results", help="Operator-to-disk latency: dict rows vs Arrow batches")
+    results.add_argument("--clips", type=int, default=20)
+    results.add_argument("--frames", type=int, default=900)
+    results.add_argument("--width", type=int, default=1024)
+    results.add_argument("--height", type=int, default=576)
+    results.set_defaults(func=bench_results)
+
+    reader = sub.add_parser("reader", help="Random-access mask reads via io.reader")
+    reader.add_argument("--output-root", default="")
+    reader.add_argument("--run-id", default="", help="Existing run; default builds a synthetic one")
+    reader.add_argument("--samples", type=int, default=200)
+    reader.add_argument("--videos", type=int, default=4)
+    reader.add_argument("--clips", type=int, default=8)
+    reader.add_argument("--frames", type=int, default=300)
+    reader.add_argument("--width", type=int, default=1024)
+    reader.add_argument("--height", type=int, default=576)
+    reader.set_defaults(func=bench_reader)
+
+    rle = sub.add_parser("rle", help="Mask area/bbox/IoU: decoded masks vs RLE algebra")
+    rle.add_argument("--frames", type=int, default=900)
+    rle.add_argument("--width", type=int, default=1024)
+    rle.add_argument("--height", type=int, default=576)
+    rle.set_defaults(func=bench_rle)
+
+    delta = sub.add_parser("delta", help="Plain vs keyframe/XOR-delta mask encoding: size and decode speed")
+    delta.add_argument("--masks", default="", help="masks.parquet of a real clip; default synthetic track")
+    delta.add_argument("--keyframe-interval", type=int, default=30)
+    delta.add_argument("--motion", type=float, default=1.0, help="Synthetic track speed; 0 = static object")
+    delta.add_argument("--samples", type=int, default=200)
+    delta.add_argument("--frames", type=int, default=900)
+    delta.add_argument("--width", type=int, default=1024)
+    delta.add_argument("--height", type=int, default=576)
+    delta.set_defaults(func=bench_delta)
+
+    objects = sub.add_parser("objects", help="Bytes per frame: full-frame union masks vs per-object crops")
+    objects.add_argument("--objects", type=int, default=4)
+    objects.add_argument("--coverage", type=float, default=0.02, help="Fraction of the frame covered by all objects")
+    objects.add_argument("--frames", type=int, default=300)
+    objects.add_argument("--width", type=int, default=1024)
+    objects.add_argument("--height", type=int, default=576)
+    objects.set_defaults(func=bench_objects)
+
+    checksum = sub.add_parser("checksum", help="Video checksum time: full sha256 vs xxh3 vs sampled fingerprint")
+    checksum.add_argument("--file", default="", help="File to hash; default a random temp file")
+    checksum.add_argument("--size-mb", type=int, default=1024)
+    checksum.add_argument("--blocks", type=int, default=16)
+    checksum.add_argument("--block-size", type=int, default=4 * 1024 * 1024)
+    checksum.set_defaults(func=bench_checksum)
+
+    scenes = sub.add_parser("scenes", help="Scene scores: native every frame vs downscaled with frame skip")
+    scenes.add_argument("--video", default="", help="Video to score; default a synthetic clip with hard cuts")
+    scenes.add_argument("--fast-width", type=int, default=256)
+    scenes.add_argument("--frame-skip", type=int, default=1)
+    scenes.add_argument("--threshold", type=float, default=27.0)
+    scenes.add_argument("--min-scene-len-s", type=float, default=1.0)
+    scenes.add_argument("--frames", type=int, default=900)
+    scenes.add_argument("--scene-frames", type=int, default=90)
+    scenes.add_argument("--width", type=int, default=1280)
+    scenes.add_argument("--height", type=int, default=720)
+    scenes.set_defaults(func=bench_scenes)
+
+    sidecar = sub.add_parser("sidecar", help="Manifest sidecar: decode overhead and per-clip prompt frame reads")
+    sidecar.add_argument("--frames", type=int, default=1800)
+    sidecar.add_argument("--clip-frames", type=int, default=300)
+    sidecar.add_argument("--clip-offset", type=int, default=7)
+    sidecar.add_argument("--fast-width", type=int, default=256)
+    sidecar.add_argument("--frame-skip", type=int, default=1)
+    sidecar.add_argument("--prompt-interval-s", type=float, default=2.0)
+    sidecar.add_argument("--thumb-width", type=int, default=512)
+    sidecar.add_argument("--width", type=int, default=1280)
+    sidecar.add_argument("--height", type=int, default=720)
+    sidecar.set_defaults(func=bench_sidecar)
+
+    triage = sub.add_parser("triage", help="CPU triage per clip: sampled decode vs manifest sidecar")
+    triage.add_argument("--clips", type=int, default=30)
+    triage.add_argument("--clip-frames", type=int, default=150)
+    triage.add_argument("--samples", type=int, default=4)
+    triage.add_argument("--width", type=int, default=1280)
+    triage.add_argument("--height", type=int, default=720)
+    triage.set_defaults(func=bench_triage)
+
+    makespan = sub.add_parser("makespan", help="Simulated GPU makespan/tail with and without clip length caps")
+    makespan.add_argument("--clip-manifest", default="", help="Real clip manifest; default synthetic")
+    makespan.add_argument("--video-manifest", default="", help="Video manifest (fps) for --clip-manifest")
+    makespan.add_argument("--videos", type=int, default=500, help="Synthetic manifest size")
+    makespan.add_argument("--gpus", type=int, default=8)
+    makespan.add_argument("--max-clip-len-s", type=float, default=120.0)
+    makespan.add_argument("--target-clip-len-s", type=float, default=60.0)
+    makespan.add_argument("--overlap-s", type=float, default=1.0)
+    makespan.add_argument("--clip-overhead-s", type=float, default=5.0, help="Per-clip model state init")
+    makespan.add_argument("--frame-cost-s", type=float, default=0.05, help="GPU seconds per frame")
+    makespan.set_defaults(func=bench_makespan)
+
+    manifest = sub.add_parser("manifest", help="Clip manifest load time/RSS: json.loads vs Arrow JSON vs Parquet")
+    manifest.add_argument("--rows", type=int, default=1_000_000)
+    manifest.add_argument("--skip-dicts", action="store_true", help="Skip the json.loads baseline (needs ~1 KiB/row)")
+    manifest.set_defaults(func=bench_manifest)
+
+    return parser
+
+
+def main() -> None:
+    parser = build_parser()
+    args = parser.parse_args()
+    if not hasattr(args, "func"):
+        parser.print_help()
+        return
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,27 +3,115 @@
 from __future__ import annotations
 
 import argparse
+import json
+from dataclasses import asdict
 from pathlib import Path
 
 from egoworld.config import load_config
-from egoworld.manifests.build_manifest import build_manifests, write_manifest_json
-from egoworld.pipeline.driver import run_pipeline
+from egoworld.io.fs import configure_storage, filesystem_for, join_path
+from egoworld.io.paths import run_dir
+from egoworld.io.writers import JsonLinesWriter, ParquetRowsWriter
+from egoworld.manifests.build_manifest import dataset_hash, index_previous, iter_video_results
+from egoworld.manifests.schema import clip_manifest_schema, video_manifest_schema
+from egoworld.pipeline.compact import compact_run
+from egoworld.pipeline.driver import load_manifest, run_pipeline
+from egoworld.pipeline.reconcile import reconcile, run_catalog
 
 
 def make_manifest(args: argparse.Namespace) -> None:
     config = load_config(args.config)
+    configure_storage(**asdict(config.storage))
     video_paths = [str(p) for p in Path(args.input_dir).glob(args.glob)]
-    video_rows, clip_rows = build_manifests(video_paths, split=args.split, scenedetect=config.scenedetect)
-    output_dir = Path(args.output_dir)
-    output_dir.mkdir(parents=True, exist_ok=True)
-    write_manifest_json(str(output_dir / "video_manifest.jsonl"), video_rows)
-    write_manifest_json(str(output_dir / "clip_manifest.jsonl"), clip_rows)
+    if args.proxy:
+        config.proxy.enabled = True
+    output_dir = args.output_dir
+    filesystem_for(output_dir).makedirs(output_dir)
+    video_path = join_path(output_dir, f"video_manifest.{args.format}")
+    clip_path = join_path(output_dir, f"clip_manifest.{args.format}")
+    previous = {}
+    if args.incremental and filesystem_for(video_path).size(video_path) is not None:
+        clip_rows = load_manifest(clip_path) if filesystem_for(clip_path).size(clip_path) is not None else []
+        previous = index_previous(load_manifest(video_path), clip_rows)
+    results = iter_video_results(
+        video_paths,
+        split=args.split,
+        scenedetect=config.scenedetect,
+        proxy=config.proxy,
+        workers=args.workers,
+        previous=previous,
+        checksum=config.checksum,
+    )
+    # Rows stream to disk as videos finish; each file is renamed into place at
+    # the end, so an incremental run replaces both manifests atomically.
+    if args.format == "parquet":
+        videos = ParquetRowsWriter(video_path, video_manifest_schema(), parquet=config.parquet)
+        clips = ParquetRowsWriter(clip_path, clip_manifest_schema(), parquet=config.parquet)
+    else:
+        videos = JsonLinesWriter(video_path)
+        clips = JsonLinesWriter(clip_path)
+    errors = JsonLinesWriter(join_path(output_dir, "video_errors.jsonl"))
+    reused = 0
+    duplicates = 0
+    video_rows = []
+    with videos, clips, errors:
+        for result in results:
+            if result.error is not None:
+                errors.write(result.error)
+                continue
+            reused += int(previous.get(result.path) is result)
+            duplicates += int(result.video["canonical_video_id"] != result.video["video_id"])
+            videos.write(result.video)
+            video_rows.append(result.video)
+            for clip in result.clips:
+                clips.write(clip)
+    report = {
+        "videos": videos.rows,
+        "clips": clips.rows,
+        "errors": errors.rows,
+        "duplicates": duplicates,
+        "checksum_mode": config.checksum.spec(),
+        "dataset_hash": dataset_hash(video_rows),
+    }
+    if args.incremental:
+        matched = set(map(str, video_paths))
+        report.update(reused=reused, removed=sum(1 for path in previous if path not in matched))
+    print(json.dumps(report))
 
 
 def run(args: argparse.Namespace) -> None:
     run_pipeline(args.config, args.video_manifest, args.clip_manifest)
 
 
+def reconcile_cmd(args: argparse.Namespace) -> None:
+    config = load_config(args.config)
+    configure_storage(**asdict(config.storage))
+    run_id = args.run_id or config.run_id
+    if not run_id:
+        raise SystemExit("reconcile needs --run-id or run_id in the config")
+    result = reconcile(
+        config.paths.state_db_path, config.paths.output_root, run_id, dry_run=args.dry_run, verify=args.verify
+    )
+    summary = {key: len(value) for key, value in result.items()}
+    print(json.dumps(summary if not args.verbose else result, ensure_ascii=True, indent=2))
+
+
+def compact_cmd(args: argparse.Namespace) -> None:
+    config = load_config(args.config)
+    configure_storage(**asdict(config.storage))
+    catalog = run_catalog(config.paths.state_db_path, config.paths.output_root, args.run_id)
+    if catalog.started_at() is None:
+        raise SystemExit(f"no catalog for run {args.run_id}: {catalog.shared_dir}")
+    report = compact_run(
+        run_dir(config.paths.output_root, args.run_id),
+        catalog,
+        workers=args.workers,
+        row_group_bytes=args.row_group_mb * 1024 * 1024,
+        parquet=config.parquet,
+        measure_scan=not args.no_scan,
+    )
+    print(json.dumps(report, ensure_ascii=True, indent=2))
+
+
 def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="egoworld pipeline")
     sub = parser.add_subparsers(dest="command")
@@ -34,6 +122,19 @@ def build_parser() -> argparse.ArgumentParser:
     manifest.add_argument("--glob", default="**/*.mp4")
     manifest.add_argument("--output-dir", required=True)
     manifest.add_argument("--split", default="train")
+    manifest.add_argument("--proxy", action="store_true", help="Transcode model-resolution proxies")
+    manifest.add_argument(
+        "--format",
+        choices=["jsonl", "parquet"],
+        default="jsonl",
+        help="Manifest file format (parquet uses the typed manifest schemas)",
+    )
+    manifest.add_argument("--workers", type=int, default=1, help="Processes for per-video work (1 = in-process)")
+    manifest.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Reuse rows of videos whose size/mtime/inode match the existing video manifest",
+    )
     manifest.set_defaults(func=make_manifest)
 
     run_cmd = sub.add_parser("run", help="Run pipeline")
@@ -42,6 +143,24 @@ def build_parser() -> argparse.ArgumentParser:
     run_cmd.add_argument("--clip-manifest", required=True)
     run_cmd.set_defaults(func=run)
 
+    reconcile_parser = sub.add_parser("reconcile", help="Diff clip status against the output catalog")
+    reconcile_parser.add_argument("--config", required=True)
+    reconcile_parser.add_argument("--run-id", default=None, help="Run to reconcile (default: run_id in the config)")
+    reconcile_parser.add_argument(
+        "--verify", action="store_true", help="Read outputs back and compare size, sha256 and rows with the catalog"
+    )
+    reconcile_parser.add_argument("--dry-run", action="store_true", help="Report without updating state")
+    reconcile_parser.add_argument("--verbose", action="store_true", help="List clip ids")
+    reconcile_parser.set_defaults(func=reconcile_cmd)
+
+    compact_parser = sub.add_parser("compact", help="Merge per-clip outputs of a run into per-video files")
+    compact_parser.add_argument("--config", required=True)
+    compact_parser.add_argument("--run-id", required=True)
+    compact_parser.add_argument("--workers", type=int, default=None, help="Processes (default: CPU count)")
+    compact_parser.add_argument("--row-group-mb", type=int, default=128)
+    compact_parser.add_argument("--no-scan", action="store_true", help="Skip before/after scan timing")
+    compact_parser.set_defaults(func=compact_cmd)
+
     return parser
 
 
@@ -22,15 +22,42 @@ class BackpressureConfig:
     max_in_flight_gpu: Optional[int] = None
     max_in_flight_write: Optional[int] = None
 
-    def resolve(self, num_gpus: int) -> "BackpressureConfig":
+    def resolve(self, num_gpus: int, num_writers: int = 1) -> "BackpressureConfig":
         multiplier = 2
+        # Writes are bounded by the writer pool: never fewer in flight than
+        # writers, so a larger pool is not starved by an old fixed cap.
+        max_in_flight_write = max(num_writers, self.max_in_flight_write or (multiplier * num_writers))
         return BackpressureConfig(
             max_in_flight_cpu=self.max_in_flight_cpu or (multiplier * num_gpus),
             max_in_flight_gpu=self.max_in_flight_gpu or (multiplier * num_gpus),
-            max_in_flight_write=self.max_in_flight_write or (multiplier * num_gpus),
+            max_in_flight_write=max_in_flight_write,
         )
 
 
+@dataclass
+class WriterConfig:
+    mode: str = "pool"
+    num_writers: Optional[int] = None
+    stream_threads: int = 4
+    num_cpus_per_writer: float = 1.0
+
+    def resolve(self, num_gpus: int) -> "WriterConfig":
+        return WriterConfig(
+            mode=self.mode,
+            num_writers=self.num_writers or max(1, num_gpus),
+            stream_threads=max(1, self.stream_threads),
+            num_cpus_per_writer=self.num_cpus_per_writer,
+        )
+
+
+@dataclass
+class StorageConfig:
+    part_size: int = 8 * 1024 * 1024
+    max_concurrency: int = 8
+    endpoint_url: str = ""
+    region: str = ""
+
+
 @dataclass
 class RetryPolicy:
     max_retries: int = 3
@@ -43,17 +70,86 @@ class RetryPolicy:
 
 @dataclass
 class SceneDetectConfig:
-    method: str = "scenedetect"
+    method: str = "scenedetect"  # scenedetect | fast
     min_scene_len_s: float = 1.0
     fallback_full_clip: bool = True
     overlap_s: float = 1.0
+    max_clip_len_s: float = 0.0  # 0 = no cap
+    target_clip_len_s: float = 0.0  # 0 = max_clip_len_s
+    threshold: float = 27.0
+    fast_width: int = 256
+    fast_frame_skip: int = 1
+    score_cache_dir: str = ""
+    sidecar_dir: str = ""  # "" = no prompt-thumbnail/statistics sidecar
+    prompt_interval_s: float = 2.0
+    thumb_width: int = 512
+
+    def __post_init__(self) -> None:
+        # max_clip_len_s includes overlap_s on both sides of every clip.
+        if 0 < self.max_clip_len_s <= 2 * self.overlap_s:
+            raise ValueError(
+                f"scenedetect.max_clip_len_s ({self.max_clip_len_s}) must exceed 2 * overlap_s ({self.overlap_s})"
+            )
+        # The sidecar is filled from the fast decode; PySceneDetect's decode is not shared.
+        if self.sidecar_dir and self.method != "fast":
+            raise ValueError(f"scenedetect.sidecar_dir needs method 'fast', got {self.method!r}")
+
+
+@dataclass
+class ChecksumConfig:
+    mode: str = "sha256"  # sha256 | xxh3 | sampled
+    sample_blocks: int = 16
+    block_size: int = 4 * 1024 * 1024
+    cache_path: str = ""
+
+    def spec(self) -> str:
+        """Mode plus sampling parameters, as recorded in ``checksum_mode``."""
+        if self.mode == "sampled":
+            return f"sampled:{self.sample_blocks}x{self.block_size}"
+        return self.mode
+
+
+@dataclass
+class TriageConfig:
+    enabled: bool = False
+    action: str = "skip"  # skip | deprioritize
+    samples: int = 4
+    width: int = 160
+    min_brightness: float = 0.0  # 0 = off; mean V (0-255) of the brightest sample
+    min_sharpness: float = 0.0  # 0 = off; Laplacian variance of the sharpest sample
+    min_motion: float = 0.0  # 0 = off; mean |dV| between neighbouring frames, largest sample
+    workers: int = 1
+
+
+@dataclass
+class CacheConfig:
+    enabled: bool = False
+    root: str = "./cache/results"
+    max_bytes: int = 64 * 1024 * 1024 * 1024
+
+
+@dataclass
+class ExecutionConfig:
+    mode: str = "clip"
+
+
+@dataclass
+class ProxyConfig:
+    enabled: bool = False
+    max_side: int = 1024
+    gop: int = 1
+    codec: str = "libx264"
+    crf: int = 18
+    preset: str = "veryfast"
+    output_dir: str = "./proxies"
 
 
 @dataclass
 class CoordinateSpec:
     spec_version: str = "v1"
     time_base: str = "seconds"
-    mask_encoding: str = "rle"
+    mask_encoding: str = "rle"  # rle | rle_delta
+    mask_keyframe_interval: int = 30
     length_unit: str = "meters"
     handedness: str = "right"
     quat_order: str = "wxyz"
@@ -61,6 +157,15 @@ class CoordinateSpec:
     axis_order: str = "x,y,z"
     coord_frame: str = "camera"
 
+    def __post_init__(self) -> None:
+        from egoworld.manifests.schema import MASK_ENCODINGS
+
+        # Fail at config load, not on the first clip write.
+        if self.mask_encoding not in MASK_ENCODINGS:
+            raise ValueError(f"unknown coordinates.mask_encoding {self.mask_encoding!r}; expected one of {MASK_ENCODINGS}")
+        if int(self.mask_keyframe_interval) < 1:
+            raise ValueError(f"coordinates.mask_keyframe_interval must be >= 1, got {self.mask_keyframe_interval}")
+
 
 @dataclass
 class MetricsThresholds:
@@ -99,8 +204,15 @@ class PipelineConfig:
     num_gpus: int = 1
     parquet: ParquetConfig = field(default_factory=ParquetConfig)
     backpressure: BackpressureConfig = field(default_factory=BackpressureConfig)
+    writer: WriterConfig = field(default_factory=WriterConfig)
+    storage: StorageConfig = field(default_factory=StorageConfig)
     retry: RetryPolicy = field(default_factory=RetryPolicy)
     scenedetect: SceneDetectConfig = field(default_factory=SceneDetectConfig)
+    checksum: ChecksumConfig = field(default_factory=ChecksumConfig)
+    proxy: ProxyConfig = field(default_factory=ProxyConfig)
+    triage: TriageConfig = field(default_factory=TriageConfig)
+    execution: ExecutionConfig = field(default_factory=ExecutionConfig)
+    cache: CacheConfig = field(default_factory=CacheConfig)
     coordinates: CoordinateSpec = field(default_factory=CoordinateSpec)
     metrics: MetricsThresholds = field(default_factory=MetricsThresholds)
     paths: PathsConfig = field(default_factory=PathsConfig)
@@ -112,12 +224,20 @@ class PipelineConfig:
     extra: Dict[str, Any] = field(default_factory=dict)
 
     def resolved(self) -> "PipelineConfig":
+        writer = self.writer.resolve(self.num_gpus)
         resolved = PipelineConfig(
             num_gpus=self.num_gpus,
             parquet=self.parquet,
-            backpressure=self.backpressure.resolve(self.num_gpus),
+            backpressure=self.backpressure.resolve(self.num_gpus, writer.num_writers or 1),
+            writer=writer,
+            storage=self.storage,
             retry=self.retry,
             scenedetect=self.scenedetect,
+            checksum=self.checksum,
+            proxy=self.proxy,
+            triage=self.triage,
+            execution=self.execution,
+            cache=self.cache,
             coordinates=self.coordinates,
             metrics=self.metrics,
             paths=self.paths,
@@ -141,6 +261,7 @@ class PipelineConfig:
             "parquet_params": json.dumps(asdict(self.parquet), ensure_ascii=True),
             "coordinate_spec_version": self.coordinates.spec_version,
             "mask_encoding": self.coordinates.mask_encoding,
+            "mask_keyframe_interval": self.coordinates.mask_keyframe_interval,
             "time_base": self.coordinates.time_base,
         }
 
@@ -172,8 +293,15 @@ def load_config(path: str) -> PipelineConfig:
         num_gpus=data.get("num_gpus", 1),
         parquet=ParquetConfig(**data.get("parquet", {})),
         backpressure=BackpressureConfig(**data.get("backpressure", {})),
+        writer=WriterConfig(**data.get("writer", {})),
+        storage=StorageConfig(**data.get("storage", {})),
         retry=RetryPolicy(**data.get("retry", {})),
         scenedetect=SceneDetectConfig(**data.get("scenedetect", {})),
+        checksum=ChecksumConfig(**data.get("checksum", {})),
+        proxy=ProxyConfig(**data.get("proxy", {})),
+        triage=TriageConfig(**data.get("triage", {})),
+        execution=ExecutionConfig(**data.get("execution", {})),
+        cache=CacheConfig(**data.get("cache", {})),
         coordinates=CoordinateSpec(**data.get("coordinates", {})),
         metrics=MetricsThresholds(**data.get("metrics", {})),
         paths=PathsConfig(**data.get("paths", {})),
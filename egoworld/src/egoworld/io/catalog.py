@@ -0,0 +1,190 @@
+"""Append-only per-run catalog of written clip outputs."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+import json
+import os
+import posixpath
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+
+from egoworld.io.fs import filesystem_for, join_path
+from egoworld.io.writers import write_json_lines
+
+
+_COLUMNS = ("clip_id", "video_id", "file", "path", "rows", "bytes", "sha256", "written_at")
+
+
+class OutputCatalog:
+    """SQLite table of every file written for a run.
+
+    One row per file per write: clip_id, file name, path, row count, bytes,
+    sha256 and write time. All files of one clip write are appended in a single
+    transaction after they were atomically renamed into place, so a clip with
+    catalog rows has a complete set of outputs. Lookups are indexed by clip_id
+    and never touch the output filesystem.
+
+    The SQLite file is a node-local index. With ``shared_dir`` (the run's
+    ``_catalog`` directory under the output root) rows are also published as
+    JSON-lines segments, one series per process, every ``flush_every`` clip
+    writes and on ``flush``; ``sync`` imports the segments of every node.
+    """
+
+    def __init__(self, path: str, shared_dir: str = "", flush_every: int = 64):
+        self.path = path
+        self.shared_dir = shared_dir
+        self.flush_every = max(1, int(flush_every))
+        self._pending: List[Dict[str, Any]] = []
+        self._pending_clips = 0
+        self._prefix = f"part-{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._segments = 0
+        self._lock = threading.Lock()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS catalog (
+                    clip_id TEXT,
+                    video_id TEXT,
+                    file TEXT,
+                    path TEXT,
+                    rows INTEGER,
+                    bytes INTEGER,
+                    sha256 TEXT,
+                    written_at REAL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS catalog_clip ON catalog (clip_id)")
+            # Rows come back from shared segments too; the same write is kept once.
+            conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS catalog_write ON catalog (clip_id, file, written_at)")
+            conn.execute("CREATE TABLE IF NOT EXISTS segments (name TEXT PRIMARY KEY)")
+            conn.commit()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def _insert(self, conn: sqlite3.Connection, rows: Iterable[Dict[str, Any]]) -> None:
+        conn.executemany(
+            f"INSERT OR IGNORE INTO catalog ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})",
+            [tuple(row[key] for key in _COLUMNS) for row in rows],
+        )
+
+    def append(self, clip_id: str, video_id: str, files: Iterable[Dict[str, Any]]) -> None:
+        now = time.time()
+        rows = [
+            {
+                "clip_id": clip_id,
+                "video_id": video_id,
+                "file": Path(info["path"]).name,
+                "path": info["path"],
+                "rows": int(info.get("rows", 0)),
+                "bytes": int(info.get("bytes", 0)),
+                "sha256": info.get("sha256", ""),
+                "written_at": now,
+            }
+            for info in files
+        ]
+        with self._connect() as conn:
+            self._insert(conn, rows)
+            conn.commit()
+        if not self.shared_dir:
+            return
+        with self._lock:
+            self._pending += rows
+            self._pending_clips += 1
+            if self._pending_clips >= self.flush_every:
+                self._flush_locked()
+
+    def flush(self) -> None:
+        """Publish buffered rows to the shared catalog."""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        if not self._pending:
+            return
+        name = f"{self._prefix}-{self._segments:06d}.jsonl"
+        write_json_lines(join_path(self.shared_dir, name), self._pending)
+        with self._connect() as conn:
+            conn.execute("INSERT OR IGNORE INTO segments (name) VALUES (?)", (name,))
+            conn.commit()
+        self._segments += 1
+        self._pending = []
+        self._pending_clips = 0
+
+    def sync(self) -> "OutputCatalog":
+        """Import shared segments not seen yet (other processes and nodes) into the local index."""
+        if not self.shared_dir:
+            return self
+        fs = filesystem_for(self.shared_dir)
+        with self._connect() as conn:
+            seen = {row[0] for row in conn.execute("SELECT name FROM segments")}
+            for path in fs.list_dir(self.shared_dir):
+                name = posixpath.basename(str(path).replace(os.sep, "/"))
+                if name in seen or not name.endswith(".jsonl"):
+                    continue
+                lines = fs.read_bytes(path).decode("utf-8").splitlines()
+                self._insert(conn, (json.loads(line) for line in lines if line))
+                conn.execute("INSERT OR IGNORE INTO segments (name) VALUES (?)", (name,))
+            conn.commit()
+        return self
+
+    def lookup(self, clip_id: str) -> Dict[str, Dict[str, Any]]:
+        """Latest entry per file for one clip, keyed by file name."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                """
+                SELECT file, path, rows, bytes, sha256, written_at FROM catalog
+                WHERE clip_id=? ORDER BY written_at
+                """,
+                (clip_id,),
+            ).fetchall()
+        return {
+            row[0]: {"path": row[1], "rows": row[2], "bytes": row[3], "sha256": row[4], "written_at": row[5]}
+            for row in rows
+        }
+
+    def latest(self) -> List[Dict[str, Any]]:
+        """Latest entry per (clip_id, file) across the run."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                """
+                SELECT clip_id, video_id, file, path, rows, bytes, sha256, MAX(written_at)
+                FROM catalog GROUP BY clip_id, file
+                """
+            ).fetchall()
+        return [dict(zip(_COLUMNS, row)) for row in rows]
+
+    def latest_writes(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Files of the most recent write of each clip, keyed by clip_id."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                """
+                SELECT c.clip_id, c.video_id, c.file, c.path, c.rows, c.bytes, c.sha256, c.written_at
+                FROM catalog c JOIN (
+                    SELECT clip_id, MAX(written_at) AS written_at FROM catalog GROUP BY clip_id
+                ) m ON c.clip_id = m.clip_id AND c.written_at = m.written_at
+                """
+            ).fetchall()
+        writes: Dict[str, List[Dict[str, Any]]] = {}
+        for row in rows:
+            writes.setdefault(row[0], []).append(dict(zip(_COLUMNS, row)))
+        return writes
+
+    def started_at(self) -> Optional[float]:
+        """Time of the first cataloged write, or None for an empty catalog."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT MIN(written_at) FROM catalog").fetchone()
+        return row[0] if row else None
+
+    def clip_ids(self) -> List[str]:
+        with self._connect() as conn:
+            rows = conn.execute("SELECT DISTINCT clip_id FROM catalog").fetchall()
+        return [row[0] for row in rows]
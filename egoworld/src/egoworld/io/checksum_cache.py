@@ -0,0 +1,63 @@
+"""SQLite-backed cache of video checksums keyed by file identity."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Optional
+import os
+import sqlite3
+
+
+class ChecksumCache:
+    """Checksums keyed by (device, inode, size, mtime_ns, checksum spec).
+
+    A file that is renamed keeps its entry; one that is rewritten in place
+    gets a new mtime and is hashed again. Each call opens its own connection,
+    so the cache can be shared by manifest worker processes.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with sqlite3.connect(path, timeout=30) as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS checksums (
+                    device INTEGER,
+                    inode INTEGER,
+                    size INTEGER,
+                    mtime_ns INTEGER,
+                    spec TEXT,
+                    checksum TEXT,
+                    path TEXT,
+                    PRIMARY KEY (device, inode, size, mtime_ns, spec)
+                )
+                """
+            )
+            conn.commit()
+
+    @staticmethod
+    def _key(st: os.stat_result, spec: str):
+        return (int(st.st_dev), int(st.st_ino), int(st.st_size), int(st.st_mtime_ns), spec)
+
+    def get(self, st: os.stat_result, spec: str) -> Optional[str]:
+        with sqlite3.connect(self.path, timeout=30) as conn:
+            row = conn.execute(
+                """
+                SELECT checksum FROM checksums
+                WHERE device=? AND inode=? AND size=? AND mtime_ns=? AND spec=?
+                """,
+                self._key(st, spec),
+            ).fetchone()
+        return row[0] if row else None
+
+    def put(self, st: os.stat_result, spec: str, checksum: str, path: str = "") -> None:
+        with sqlite3.connect(self.path, timeout=30) as conn:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO checksums (device, inode, size, mtime_ns, spec, checksum, path)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                self._key(st, spec) + (checksum, path),
+            )
+            conn.commit()
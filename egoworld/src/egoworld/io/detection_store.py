@@ -0,0 +1,121 @@
+"""SQLite-backed store of raw GroundingDINO detections for prompt frames."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import List, Optional, Tuple
+import json
+import sqlite3
+
+
+RawDetections = Tuple[List[List[float]], List[float], List[str]]
+
+
+class DetectionStore:
+    """Raw (pre-threshold) detections keyed by video, frame, input size, caption, checkpoint and raw thresholds.
+
+    Rows hold every box above ``raw_box_threshold`` so later runs can apply
+    their own box threshold, top-k, area filter and NMS without a GD forward.
+    Phrases are extracted with ``raw_text_threshold`` and cannot be refiltered,
+    so it is part of the key.
+    ``gd_checkpoint`` is a hash of the checkpoint file, so different
+    checkpoints with the same file name do not share rows. ``input_size``
+    is the ``WxH`` of the image given to GD, so detections on sidecar
+    thumbnails and on full frames are stored separately.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with sqlite3.connect(path, timeout=30) as conn:
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(detections)")}
+            if columns and not {"input_size", "raw_text_threshold"} <= columns:
+                # Rows from before input_size / raw_text_threshold were part of the key cannot be told apart.
+                conn.execute("DROP TABLE detections")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS detections (
+                    video_checksum TEXT,
+                    frame_index INTEGER,
+                    input_size TEXT,
+                    caption_hash TEXT,
+                    gd_checkpoint TEXT,
+                    raw_box_threshold REAL,
+                    raw_text_threshold REAL,
+                    boxes TEXT,
+                    scores TEXT,
+                    phrases TEXT,
+                    PRIMARY KEY (
+                        video_checksum, frame_index, input_size, caption_hash, gd_checkpoint,
+                        raw_box_threshold, raw_text_threshold
+                    )
+                )
+                """
+            )
+            conn.commit()
+
+    def get(
+        self,
+        video_checksum: str,
+        frame_index: int,
+        input_size: str,
+        caption_hash: str,
+        gd_checkpoint: str,
+        raw_box_threshold: float,
+        raw_text_threshold: float,
+    ) -> Optional[RawDetections]:
+        with sqlite3.connect(self.path, timeout=30) as conn:
+            row = conn.execute(
+                """
+                SELECT boxes, scores, phrases FROM detections
+                WHERE video_checksum=? AND frame_index=? AND input_size=? AND caption_hash=?
+                    AND gd_checkpoint=? AND raw_box_threshold=? AND raw_text_threshold=?
+                """,
+                (
+                    video_checksum,
+                    int(frame_index),
+                    input_size,
+                    caption_hash,
+                    gd_checkpoint,
+                    float(raw_box_threshold),
+                    float(raw_text_threshold),
+                ),
+            ).fetchone()
+        if not row:
+            return None
+        return json.loads(row[0]), json.loads(row[1]), json.loads(row[2])
+
+    def put(
+        self,
+        video_checksum: str,
+        frame_index: int,
+        input_size: str,
+        caption_hash: str,
+        gd_checkpoint: str,
+        raw_box_threshold: float,
+        raw_text_threshold: float,
+        detections: RawDetections,
+    ) -> None:
+        boxes, scores, phrases = detections
+        with sqlite3.connect(self.path, timeout=30) as conn:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO detections
+                (video_checksum, frame_index, input_size, caption_hash, gd_checkpoint, raw_box_threshold,
+                 raw_text_threshold, boxes, scores, phrases)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    video_checksum,
+                    int(frame_index),
+                    input_size,
+                    caption_hash,
+                    gd_checkpoint,
+                    float(raw_box_threshold),
+                    float(raw_text_threshold),
+                    json.dumps(boxes),
+                    json.dumps(scores),
+                    json.dumps(phrases, ensure_ascii=True),
+                ),
+            )
+            conn.commit()
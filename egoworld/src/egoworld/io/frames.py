@@ -0,0 +1,173 @@
+"""Per-frame operator results as Arrow record batches.
+
+Operators build results column by column and hand the batch to Ray, which
+serializes Arrow buffers out-of-band; writers pass it to Parquet as-is.
+Helpers also accept the legacy list-of-dicts form.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Sequence, Tuple, Union
+
+import numpy as np
+
+from egoworld.manifests.schema import MASK_ENCODINGS, mask_output_schema, mask_schema, object_mask_schema
+from egoworld.utils import rle as rle_ops
+
+
+def _pa():  # pragma: no cover - optional dependency
+    import pyarrow as pa
+
+    return pa
+
+
+Frames = Union[List[Dict[str, Any]], Any]
+
+
+class MaskFrameBuilder:
+    """Accumulates mask rows as columns and emits a RecordBatch."""
+
+    def __init__(self) -> None:
+        self.frame_index: List[int] = []
+        self.timestamp_s: List[float] = []
+        self.mask_rle: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self.frame_index)
+
+    def append(self, frame_index: int, timestamp_s: float, mask_rle: str) -> None:
+        self.frame_index.append(int(frame_index))
+        self.timestamp_s.append(float(timestamp_s))
+        self.mask_rle.append(mask_rle)
+
+    def to_batch(self):
+        pa = _pa()
+        schema = mask_schema()
+        return pa.RecordBatch.from_arrays(
+            [
+                pa.array(self.frame_index, type=pa.int64()),
+                pa.array(self.timestamp_s, type=pa.float64()),
+                pa.array(self.mask_rle, type=pa.string()),
+            ],
+            schema=schema,
+        )
+
+
+class ObjectFrameBuilder:
+    """Accumulates per-object mask rows (bbox-cropped RLE) and emits a RecordBatch."""
+
+    def __init__(self) -> None:
+        self.columns: Dict[str, List[Any]] = {name: [] for name in object_mask_schema().names}
+
+    def __len__(self) -> int:
+        return len(self.columns["frame_index"])
+
+    def append(
+        self,
+        frame_index: int,
+        timestamp_s: float,
+        obj_ids: Sequence[int],
+        masks: np.ndarray,
+        origins: Dict[int, Tuple[str, float]],
+    ) -> int:
+        """Add the non-empty objects of one frame; returns the number of rows added."""
+        keep, boxes, areas, crops = rle_ops.encode_crops(masks)
+        height, width = np.asarray(masks).shape[-2:]
+        cols = self.columns
+        for i, k in enumerate(keep):
+            obj_id = int(obj_ids[k])
+            phrase, score = origins.get(obj_id, ("", 0.0))
+            cols["frame_index"].append(int(frame_index))
+            cols["timestamp_s"].append(float(timestamp_s))
+            cols["obj_id"].append(obj_id)
+            cols["bbox"].append(boxes[i].tolist())
+            cols["mask_area"].append(int(areas[i]))
+            cols["mask_rle"].append(crops[i])
+            cols["phrase"].append(phrase)
+            cols["score"].append(float(score))
+            cols["mask_height"].append(int(height))
+            cols["mask_width"].append(int(width))
+        return len(keep)
+
+    def to_batch(self):
+        pa = _pa()
+        schema = object_mask_schema()
+        return pa.RecordBatch.from_arrays(
+            [pa.array(self.columns[field.name], type=field.type) for field in schema],
+            schema=schema,
+        )
+
+
+def is_arrow(frames: Frames) -> bool:
+    return hasattr(frames, "num_rows") and hasattr(frames, "schema")
+
+
+def num_frames(frames: Frames) -> int:
+    return int(frames.num_rows) if is_arrow(frames) else len(frames)
+
+
+def frame_indices(frames: Frames) -> List[int]:
+    if is_arrow(frames):
+        if frames.num_rows == 0 or "frame_index" not in frames.schema.names:
+            return []
+        return frames.column("frame_index").to_pylist()
+    return [row["frame_index"] for row in frames]
+
+
+def slice_frames(frames: Frames, start: int, stop: int) -> Frames:
+    if is_arrow(frames):
+        return frames.slice(start, max(0, stop - start))
+    return frames[start:stop]
+
+
+def to_table(frames: Frames, schema=None):
+    """Arrow table for frames, skipping the row conversion for Arrow input."""
+    pa = _pa()
+    if isinstance(frames, pa.RecordBatch):
+        table = pa.Table.from_batches([frames])
+    elif isinstance(frames, pa.Table):
+        table = frames
+    elif frames:
+        return pa.Table.from_pylist(frames, schema=schema)
+    else:
+        table = None
+    if table is None or (table.num_rows == 0 and schema is not None):
+        schema = schema if schema is not None else pa.schema([])
+        return pa.table({field.name: pa.array([], type=field.type) for field in schema}, schema=schema)
+    if schema is not None and not table.schema.equals(schema):
+        table = table.select(schema.names).cast(schema)
+    return table
+
+
+def with_mask_stats(frames: Frames):
+    """Mask frames as a table with ``mask_area``/``mask_bbox`` computed on the RLE."""
+    pa = _pa()
+    schema = mask_output_schema()
+    table = to_table(frames, schema=mask_schema())
+    if table.num_rows == 0:
+        return to_table([], schema=schema)
+    areas, boxes = rle_ops.mask_stats(table.column("mask_rle").to_pylist())
+    table = table.append_column("mask_area", pa.array(areas, type=pa.int64()))
+    flat = pa.array(boxes.reshape(-1), type=pa.int32())
+    table = table.append_column("mask_bbox", pa.FixedSizeListArray.from_arrays(flat, 4))
+    return table.cast(schema)
+
+
+def encode_mask_frames(frames: Frames, encoding: str = "rle", keyframe_interval: int = 30):
+    """masks.parquet table for one clip: mask stats plus the configured mask encoding."""
+    if encoding not in MASK_ENCODINGS:
+        raise ValueError(f"unknown mask_encoding {encoding!r}; expected one of {MASK_ENCODINGS}")
+    table = with_mask_stats(frames)
+    if encoding == "rle":
+        return table
+    pa = _pa()
+    schema = mask_output_schema(encoding)
+    if table.num_rows == 0:
+        return to_table([], schema=schema)
+    encoded, keys = rle_ops.delta_encode(table.column("mask_rle").to_pylist(), keyframe_interval)
+    key_frame = []
+    for frame_index, is_key in zip(table.column("frame_index").to_pylist(), keys):
+        key_frame.append(frame_index if is_key else key_frame[-1])
+    table = table.set_column(table.schema.get_field_index("mask_rle"), "mask_rle", pa.array(encoded, pa.string()))
+    table = table.append_column("mask_key_frame", pa.array(key_frame, pa.int64()))
+    return table.cast(schema)
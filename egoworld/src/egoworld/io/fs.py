@@ -0,0 +1,432 @@
+"""Storage backends for outputs and manifests: local directories and S3-style object stores."""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, List, Optional, Sequence, Tuple
+import hashlib
+import io
+import os
+import posixpath
+import threading
+
+
+_SCHEME_SEP = "://"
+_EXECUTORS: Dict[Tuple[str, int], ThreadPoolExecutor] = {}
+_EXECUTORS_LOCK = threading.Lock()
+
+
+def is_url(path: str) -> bool:
+    return _SCHEME_SEP in str(path)
+
+
+def join_path(root: str, *parts: str) -> str:
+    """Join path components; object-store URLs keep their ``scheme://`` prefix."""
+    root = str(root)
+    if is_url(root):
+        return posixpath.join(root, *parts)
+    return str(Path(root, *parts))
+
+
+def shared_executor(name: str, max_workers: int) -> ThreadPoolExecutor:
+    """Process-wide thread pool per (name, size), reused by every filesystem and writer.
+
+    Pools are never created per instance, so rebuilding a writer or
+    reconfiguring storage does not leave idle threads behind. Callers use
+    different names for work that waits on another pool (stream encodes wait
+    on upload parts), which keeps nested submissions from deadlocking.
+    """
+    key = (name, max(1, int(max_workers)))
+    with _EXECUTORS_LOCK:
+        pool = _EXECUTORS.get(key)
+        if pool is None:
+            pool = _EXECUTORS[key] = ThreadPoolExecutor(max_workers=key[1], thread_name_prefix=f"egoworld-{name}")
+        return pool
+
+
+def _is_not_found(exc: Exception) -> bool:
+    if isinstance(exc, (FileNotFoundError, KeyError)):
+        return True
+    code = str(getattr(exc, "response", {}).get("Error", {}).get("Code", ""))
+    return code in ("404", "NoSuchKey", "NotFound")
+
+
+class FileSystem(ABC):
+    """Minimal storage interface used by writers and manifest readers."""
+
+    @abstractmethod
+    def write_bytes(self, path: str, data: Any) -> None:
+        ...
+
+    def write_many(self, items: Sequence[Tuple[str, Any]]) -> None:
+        """Write several (path, data) payloads; backends may batch them."""
+        for path, data in items:
+            self.write_bytes(path, data)
+
+    @abstractmethod
+    def open_input(self, path: str) -> BinaryIO:
+        ...
+
+    def read_bytes(self, path: str) -> bytes:
+        with self.open_input(path) as handle:
+            return handle.read()
+
+    @abstractmethod
+    def size(self, path: str) -> Optional[int]:
+        """Object size in bytes, or None when it does not exist."""
+
+    def makedirs(self, path: str) -> None:
+        return None
+
+    @abstractmethod
+    def delete(self, path: str) -> None:
+        ...
+
+    @abstractmethod
+    def list_dir(self, path: str) -> List[str]:
+        """Paths of the files directly under ``path``, sorted; empty when it does not exist."""
+
+
+class LocalFileSystem(FileSystem):
+    """Local or mounted directories; writes go through a tmp file and ``os.replace``."""
+
+    def write_bytes(self, path: str, data: Any) -> None:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as handle:
+            handle.write(memoryview(data))
+        os.replace(tmp_path, path)
+
+    def open_input(self, path: str) -> BinaryIO:
+        return open(path, "rb")
+
+    def size(self, path: str) -> Optional[int]:
+        try:
+            return os.stat(path).st_size
+        except FileNotFoundError:
+            return None
+
+    def makedirs(self, path: str) -> None:
+        Path(path).mkdir(parents=True, exist_ok=True)
+
+    def delete(self, path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def list_dir(self, path: str) -> List[str]:
+        try:
+            return sorted(str(p) for p in Path(path).iterdir() if p.is_file())
+        except FileNotFoundError:
+            return []
+
+
+class InMemoryObjectStore:
+    """In-process stand-in for an S3-compatible client (boto3 call shapes).
+
+    Supports the subset used by ``ObjectStoreFileSystem``: put/get/head/delete,
+    list_objects_v2 and multipart uploads. Completed multipart objects become
+    visible atomically, as on S3.
+    """
+
+    def __init__(self) -> None:
+        self.objects: Dict[Tuple[str, str], bytes] = {}
+        self.uploads: Dict[str, Dict[int, bytes]] = {}
+        self.requests: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._next_upload = 0
+
+    def _count(self, op: str) -> None:
+        with self._lock:
+            self.requests[op] = self.requests.get(op, 0) + 1
+
+    def put_object(self, Bucket: str, Key: str, Body: Any) -> Dict[str, Any]:
+        self._count("put_object")
+        data = bytes(Body)
+        with self._lock:
+            self.objects[(Bucket, Key)] = data
+        return {"ETag": hashlib.md5(data).hexdigest()}
+
+    def get_object(self, Bucket: str, Key: str) -> Dict[str, Any]:
+        self._count("get_object")
+        with self._lock:
+            data = self.objects.get((Bucket, Key))
+        if data is None:
+            raise KeyError(f"NoSuchKey: {Bucket}/{Key}")
+        return {"Body": io.BytesIO(data), "ContentLength": len(data)}
+
+    def head_object(self, Bucket: str, Key: str) -> Dict[str, Any]:
+        self._count("head_object")
+        with self._lock:
+            data = self.objects.get((Bucket, Key))
+        if data is None:
+            raise KeyError(f"NoSuchKey: {Bucket}/{Key}")
+        return {"ContentLength": len(data)}
+
+    def delete_object(self, Bucket: str, Key: str) -> Dict[str, Any]:
+        self._count("delete_object")
+        with self._lock:
+            self.objects.pop((Bucket, Key), None)
+        return {}
+
+    def list_objects_v2(
+        self, Bucket: str, Prefix: str = "", ContinuationToken: str = "", MaxKeys: int = 1000
+    ) -> Dict[str, Any]:
+        self._count("list_objects_v2")
+        with self._lock:
+            items = sorted((k, len(v)) for (b, k), v in self.objects.items() if b == Bucket and k.startswith(Prefix))
+        start = int(ContinuationToken or 0)
+        page = items[start : start + MaxKeys]
+        response: Dict[str, Any] = {
+            "Contents": [{"Key": k, "Size": size} for k, size in page],
+            "KeyCount": len(page),
+            "IsTruncated": start + MaxKeys < len(items),
+        }
+        if response["IsTruncated"]:
+            response["NextContinuationToken"] = str(start + MaxKeys)
+        return response
+
+    def create_multipart_upload(self, Bucket: str, Key: str) -> Dict[str, Any]:
+        self._count("create_multipart_upload")
+        with self._lock:
+            self._next_upload += 1
+            upload_id = f"upload-{self._next_upload}"
+            self.uploads[upload_id] = {}
+        return {"UploadId": upload_id}
+
+    def upload_part(self, Bucket: str, Key: str, PartNumber: int, UploadId: str, Body: Any) -> Dict[str, Any]:
+        self._count("upload_part")
+        data = bytes(Body)
+        with self._lock:
+            self.uploads[UploadId][int(PartNumber)] = data
+        return {"ETag": hashlib.md5(data).hexdigest()}
+
+    def complete_multipart_upload(
+        self,
+        Bucket: str,
+        Key: str,
+        UploadId: str,
+        MultipartUpload: Dict[str, List[Dict[str, Any]]],
+    ) -> Dict[str, Any]:
+        self._count("complete_multipart_upload")
+        with self._lock:
+            parts = self.uploads.pop(UploadId)
+            numbers = [int(p["PartNumber"]) for p in MultipartUpload["Parts"]]
+            self.objects[(Bucket, Key)] = b"".join(parts[n] for n in numbers)
+        return {}
+
+    def abort_multipart_upload(self, Bucket: str, Key: str, UploadId: str) -> Dict[str, Any]:
+        self._count("abort_multipart_upload")
+        with self._lock:
+            self.uploads.pop(UploadId, None)
+        return {}
+
+
+class ObjectStoreFileSystem(FileSystem):
+    """``s3://bucket/key`` paths on an S3-compatible client.
+
+    Small payloads are a single PUT; payloads above ``part_size`` are uploaded
+    as a multipart upload whose parts are sent in parallel. Both are atomic on
+    the store, so no tmp-and-rename is needed. ``write_many`` sends the small
+    payloads of a batch as concurrent PUTs. Requests run on the process-wide
+    ``upload`` pool.
+    """
+
+    def __init__(self, client: Any, part_size: int = 8 * 1024 * 1024, max_concurrency: int = 8):
+        self.client = client
+        # S3 rejects non-final parts below 5 MiB.
+        self.part_size = max(int(part_size), 5 * 1024 * 1024)
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.pool = shared_executor("upload", self.max_concurrency)
+
+    @staticmethod
+    def split(path: str) -> Tuple[str, str]:
+        _, _, rest = str(path).partition(_SCHEME_SEP)
+        bucket, _, key = rest.partition("/")
+        return bucket, key
+
+    def write_bytes(self, path: str, data: Any) -> None:
+        view = memoryview(data)
+        bucket, key = self.split(path)
+        if view.nbytes <= self.part_size:
+            self.client.put_object(Bucket=bucket, Key=key, Body=view.tobytes())
+            return
+        upload_id = self.client.create_multipart_upload(Bucket=bucket, Key=key)["UploadId"]
+        try:
+            offsets = range(0, view.nbytes, self.part_size)
+            futures = [
+                self.pool.submit(
+                    self.client.upload_part,
+                    Bucket=bucket,
+                    Key=key,
+                    PartNumber=number,
+                    UploadId=upload_id,
+                    Body=view[offset : offset + self.part_size].tobytes(),
+                )
+                for number, offset in enumerate(offsets, start=1)
+            ]
+            parts = [
+                {"ETag": future.result()["ETag"], "PartNumber": number}
+                for number, future in enumerate(futures, start=1)
+            ]
+            self.client.complete_multipart_upload(
+                Bucket=bucket,
+                Key=key,
+                UploadId=upload_id,
+                MultipartUpload={"Parts": parts},
+            )
+        except Exception:
+            self.client.abort_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id)
+            raise
+
+    def write_many(self, items: Sequence[Tuple[str, Any]]) -> None:
+        small = [(path, memoryview(data)) for path, data in items if memoryview(data).nbytes <= self.part_size]
+        futures = [
+            self.pool.submit(self.client.put_object, Bucket=bucket, Key=key, Body=view.tobytes())
+            for (bucket, key), view in ((self.split(path), view) for path, view in small)
+        ]
+        # Large payloads go out from this thread; their parts share the pool.
+        for path, data in items:
+            if memoryview(data).nbytes > self.part_size:
+                self.write_bytes(path, data)
+        for future in futures:
+            future.result()
+
+    def open_input(self, path: str) -> BinaryIO:
+        bucket, key = self.split(path)
+        try:
+            body = self.client.get_object(Bucket=bucket, Key=key)["Body"]
+        except Exception as exc:
+            if _is_not_found(exc):
+                raise FileNotFoundError(path) from exc
+            raise
+        return io.BytesIO(body.read())
+
+    def size(self, path: str) -> Optional[int]:
+        bucket, key = self.split(path)
+        try:
+            return int(self.client.head_object(Bucket=bucket, Key=key)["ContentLength"])
+        except Exception as exc:
+            if _is_not_found(exc):
+                return None
+            raise
+
+    def delete(self, path: str) -> None:
+        bucket, key = self.split(path)
+        self.client.delete_object(Bucket=bucket, Key=key)
+
+    def list_dir(self, path: str) -> List[str]:
+        bucket, prefix = self.split(path)
+        prefix = prefix.rstrip("/") + "/"
+        scheme = str(path).partition(_SCHEME_SEP)[0]
+        paths: List[str] = []
+        kwargs: Dict[str, Any] = {"Bucket": bucket, "Prefix": prefix}
+        while True:
+            response = self.client.list_objects_v2(**kwargs)
+            paths += [
+                f"{scheme}{_SCHEME_SEP}{bucket}/{item['Key']}"
+                for item in response.get("Contents", [])
+                if "/" not in item["Key"][len(prefix) :]
+            ]
+            if not response.get("IsTruncated"):
+                return sorted(paths)
+            kwargs["ContinuationToken"] = response["NextContinuationToken"]
+
+
+_LOCAL = LocalFileSystem()
+_OBJECT_STORE: Optional[ObjectStoreFileSystem] = None
+_OBJECT_STORE_LOCK = threading.Lock()
+_STORAGE_OPTIONS: Dict[str, Any] = {}
+
+
+def configure_storage(
+    client: Any = None,
+    part_size: int = 8 * 1024 * 1024,
+    max_concurrency: int = 8,
+    endpoint_url: str = "",
+    region: str = "",
+) -> None:
+    """Set the object-store client/options used for ``s3://`` paths in this process.
+
+    Without ``client`` an already configured client is kept; otherwise one is
+    created from ``endpoint_url``/``region`` on first use. Calling it again
+    with the same client and options keeps the existing filesystem, so every
+    writer in a process shares one client and upload pool.
+    """
+    global _OBJECT_STORE
+    options = dict(part_size=part_size, max_concurrency=max_concurrency, endpoint_url=endpoint_url, region=region)
+    with _OBJECT_STORE_LOCK:
+        if client is None and _OBJECT_STORE is not None:
+            client = _OBJECT_STORE.client
+        if _OBJECT_STORE is not None and client is _OBJECT_STORE.client and options == _STORAGE_OPTIONS:
+            return
+        _STORAGE_OPTIONS.clear()
+        _STORAGE_OPTIONS.update(options)
+        _OBJECT_STORE = ObjectStoreFileSystem(client, part_size, max_concurrency) if client is not None else None
+
+
+def reset_storage() -> None:
+    """Drop the configured object-store client and options."""
+    global _OBJECT_STORE
+    with _OBJECT_STORE_LOCK:
+        _OBJECT_STORE = None
+        _STORAGE_OPTIONS.clear()
+
+
+def _default_client() -> Any:  # pragma: no cover - optional dependency
+    import boto3  # type: ignore
+
+    kwargs: Dict[str, Any] = {}
+    if _STORAGE_OPTIONS.get("endpoint_url"):
+        kwargs["endpoint_url"] = _STORAGE_OPTIONS["endpoint_url"]
+    if _STORAGE_OPTIONS.get("region"):
+        kwargs["region_name"] = _STORAGE_OPTIONS["region"]
+    return boto3.client("s3", **kwargs)
+
+
+def arrow_path(path: str) -> str:
+    """``path`` as a pyarrow filesystem sees it: URLs lose their ``scheme://`` prefix."""
+    return str(path).partition(_SCHEME_SEP)[2] if is_url(path) else str(path)
+
+
+def arrow_filesystem(path: str, use_mmap: bool = False) -> Any:
+    """pyarrow filesystem for reading ``path`` with ranged reads (Arrow datasets).
+
+    ``s3://`` uses the configured ``endpoint_url``/``region``; other schemes
+    are resolved by ``pyarrow.fs.FileSystem.from_uri``. Paths passed to the
+    returned filesystem go through ``arrow_path``.
+    """
+    import pyarrow.fs as pafs
+
+    if not is_url(path):
+        return pafs.LocalFileSystem(use_mmap=use_mmap)
+    scheme = str(path).partition(_SCHEME_SEP)[0]
+    if scheme != "s3":
+        return pafs.FileSystem.from_uri(str(path))[0]
+    kwargs: Dict[str, Any] = {}
+    endpoint = _STORAGE_OPTIONS.get("endpoint_url", "")
+    if endpoint:
+        if is_url(endpoint):
+            kwargs["scheme"], _, endpoint = endpoint.partition(_SCHEME_SEP)
+        kwargs["endpoint_override"] = endpoint
+    if _STORAGE_OPTIONS.get("region"):
+        kwargs["region"] = _STORAGE_OPTIONS["region"]
+    return pafs.S3FileSystem(**kwargs)
+
+
+def filesystem_for(path: str) -> FileSystem:
+    """Backend for a path: object store for ``scheme://`` URLs, local otherwise."""
+    global _OBJECT_STORE
+    if not is_url(path):
+        return _LOCAL
+    with _OBJECT_STORE_LOCK:
+        if _OBJECT_STORE is None:
+            _OBJECT_STORE = ObjectStoreFileSystem(
+                _default_client(),
+                _STORAGE_OPTIONS.get("part_size", 8 * 1024 * 1024),
+                _STORAGE_OPTIONS.get("max_concurrency", 8),
+            )
+        return _OBJECT_STORE
@@ -4,10 +4,35 @@ from __future__ import annotations
 
 from pathlib import Path
 
+from egoworld.io.fs import join_path
 
-def run_dir(output_root: str, run_id: str) -> Path:
-    return Path(output_root) / f"run_id={run_id}"
 
+COMPACTED_DIR = "compacted"
+CATALOG_DIR = "_catalog"
 
-def clip_dir(output_root: str, run_id: str, video_id: str, clip_id: str) -> Path:
-    return run_dir(output_root, run_id) / f"video_id={video_id}" / f"clip_id={clip_id}"
+
+def run_dir(output_root: str, run_id: str) -> str:
+    return join_path(output_root, f"run_id={run_id}")
+
+
+def clip_dir(output_root: str, run_id: str, video_id: str, clip_id: str) -> str:
+    return join_path(run_dir(output_root, run_id), f"video_id={video_id}", f"clip_id={clip_id}")
+
+
+def compacted_dir(output_root: str, run_id: str) -> str:
+    """Per-video compacted dataset of a run: a symlink to the current version written by ``compact``."""
+    return join_path(run_dir(output_root, run_id), COMPACTED_DIR)
+
+
+def catalog_dir(output_root: str, run_id: str) -> str:
+    """Shared output catalog of a run: JSON-lines segments, one series per writer process."""
+    return join_path(run_dir(output_root, run_id), CATALOG_DIR)
+
+
+def catalog_path(state_db_path: str, run_id: str) -> Path:
+    """Local SQLite index of a run's catalog, next to the state DB.
+
+    Writers append to it for fast lookups; ``OutputCatalog.sync`` imports the
+    segments other processes published under ``catalog_dir``.
+    """
+    return Path(state_db_path).parent / f"catalog_run_id={run_id}.db"
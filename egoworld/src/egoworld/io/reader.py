@@ -0,0 +1,250 @@
+"""Read pipeline outputs of a run with Parquet pushdown and lazy mask decoding."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+import os
+
+import numpy as np
+
+from egoworld.io.catalog import OutputCatalog
+from egoworld.io.fs import arrow_filesystem, arrow_path, is_url, join_path
+from egoworld.io.paths import COMPACTED_DIR, run_dir
+from egoworld.utils import rle as rle_ops
+from egoworld.utils.mask import decode_mask_rle
+
+
+def _pa():  # pragma: no cover - optional dependency
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    return pa, ds
+
+
+class MaskSequence:
+    """Mask rows of a filtered read; RLE strings are decoded only on access.
+
+    For ``rle_delta`` tables (``mask_key_frame`` column) a frame is rebuilt by
+    XOR-ing run-lengths forward from its keyframe row, so random access costs
+    at most ``keyframe_interval - 1`` RLE merges plus one decode; sequential
+    access reuses the previous frame and costs one merge. ``visible`` hides
+    rows that were read only as keyframe context.
+    """
+
+    def __init__(self, table: Any, visible: Optional[np.ndarray] = None):
+        self.table = table
+        self._rle = table.column("mask_rle")
+        frames = np.asarray(table.column("frame_index").to_numpy(), dtype=np.int64)
+        self._rows = np.flatnonzero(visible) if visible is not None else np.arange(table.num_rows)
+        self.frame_index = frames[self._rows]
+        self._chain: Optional[np.ndarray] = None
+        self._last: Optional[Tuple[int, rle_ops.Rle]] = None
+        if "mask_key_frame" in table.column_names:
+            key_frame = np.asarray(table.column("mask_key_frame").to_numpy(), dtype=np.int64)
+            rows = np.arange(table.num_rows)
+            # Row of the nearest keyframe at or before each row.
+            self._chain = np.maximum.accumulate(np.where(frames == key_frame, rows, -1)) if len(rows) else rows
+            self._frames, self._key_frame = frames, key_frame
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def _reconstruct(self, row: int) -> rle_ops.Rle:
+        start = int(self._chain[row])
+        if start < 0 or self._frames[start] != self._key_frame[row]:
+            raise ValueError(f"keyframe {self._key_frame[row]} of frame {self._frames[row]} is not in this read")
+        if self._last is not None and start <= self._last[0] <= row and self._chain[self._last[0]] == start:
+            base, current = self._last
+        else:
+            base, current = start, rle_ops.parse_rle(self._rle[start].as_py())
+        for r in range(base + 1, row + 1):
+            current = rle_ops.xor(current, self._rle[r].as_py())
+        self._last = (row, current)
+        return current
+
+    def __getitem__(self, i: int) -> np.ndarray:
+        row = int(self._rows[i])
+        if self._chain is None:
+            return decode_mask_rle(self._rle[row].as_py())
+        return rle_ops.to_mask(self._reconstruct(row))
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def stack(self) -> np.ndarray:
+        """All masks as a (T, H, W) uint8 array."""
+        if len(self) == 0:
+            return np.zeros((0, 0, 0), dtype=np.uint8)
+        first = self[0]
+        out = np.empty((len(self),) + first.shape, dtype=np.uint8)
+        out[0] = first
+        for i in range(1, len(self)):
+            out[i] = self[i]
+        return out
+
+
+class RunReader:
+    """Open one run's outputs as Arrow datasets.
+
+    Uses ``compacted/`` when present (one file per video and stream, ``clip_id``
+    column; the version it points to when the reader is opened), otherwise the per-clip ``video_id=/clip_id=`` layout. File lists
+    come from the run catalog when given, else from a glob restricted to the
+    requested videos. Datasets are cached per (stream, videos), so Parquet
+    footers are read once for repeated queries. Object-store runs (``s3://``)
+    are read through a pyarrow filesystem with ranged reads.
+
+    ``frame_range`` arguments are half-open ``(start, end)``, like clip frame
+    ranges: ``(10, 20)`` selects frames 10 to 19.
+    """
+
+    def __init__(
+        self,
+        output_root: str,
+        run_id: str,
+        catalog: Optional[OutputCatalog] = None,
+        memory_map: bool = True,
+    ):
+        self.root = run_dir(output_root, run_id)
+        self.catalog = catalog
+        self.memory_map = memory_map
+        compacted = join_path(self.root, COMPACTED_DIR)
+        self.compacted = not is_url(self.root) and os.path.isdir(compacted)
+        # Resolved once, so a later compaction swapping the symlink does not mix versions in this reader.
+        self._compacted_root = os.path.realpath(compacted) if self.compacted else compacted
+        self._datasets: Dict[Tuple[str, Optional[Tuple[str, ...]]], Any] = {}
+
+    def _filesystem(self):
+        return arrow_filesystem(self.root, use_mmap=self.memory_map)
+
+    def _files(self, stream: str, video_ids: Optional[Sequence[str]]) -> List[str]:
+        name = f"{stream}.parquet"
+        if self.compacted:
+            base = self._compacted_root
+            videos = video_ids or [p.name.split("=", 1)[1] for p in Path(base).glob("video_id=*")]
+            return sorted(p for p in (join_path(base, f"video_id={v}", name) for v in videos) if os.path.exists(p))
+        if self.catalog is not None:
+            wanted = set(video_ids) if video_ids else None
+            return sorted(
+                e["path"]
+                for e in self.catalog.latest()
+                if e["file"] == name and (wanted is None or e["video_id"] in wanted)
+            )
+        if is_url(self.root):
+            raise ValueError("object-store runs need a catalog or a compacted dataset to list files")
+        patterns = [f"video_id={v}/clip_id=*/{name}" for v in (video_ids or ["*"])]
+        return sorted(str(p) for pattern in patterns for p in Path(self.root).glob(pattern))
+
+    def dataset(self, stream: str = "masks", video_ids: Optional[Sequence[str]] = None):
+        key = (stream, tuple(sorted(video_ids)) if video_ids else None)
+        if key not in self._datasets:
+            pa, ds = _pa()
+            fields = [("video_id", pa.string())]
+            if not self.compacted:
+                fields.append(("clip_id", pa.string()))
+            base = self._compacted_root if self.compacted else self.root
+            self._datasets[key] = ds.dataset(
+                [arrow_path(path) for path in self._files(stream, video_ids)],
+                format="parquet",
+                filesystem=self._filesystem(),
+                partitioning=ds.partitioning(pa.schema(fields), flavor="hive"),
+                partition_base_dir=arrow_path(base),
+            )
+        return self._datasets[key]
+
+    @staticmethod
+    def _filter(
+        clip_ids: Optional[Iterable[str]],
+        frame_range: Optional[Tuple[int, int]],
+        video_ids: Optional[Sequence[str]],
+    ):
+        _, ds = _pa()
+        expr = None
+        parts = []
+        if video_ids:
+            parts.append(ds.field("video_id").isin(list(video_ids)))
+        if clip_ids:
+            parts.append(ds.field("clip_id").isin(list(clip_ids)))
+        if frame_range is not None:
+            lo, hi = frame_range
+            parts.append((ds.field("frame_index") >= int(lo)) & (ds.field("frame_index") < int(hi)))
+        for part in parts:
+            expr = part if expr is None else expr & part
+        return expr
+
+    def read(
+        self,
+        stream: str = "masks",
+        video_ids: Optional[Sequence[str]] = None,
+        clip_ids: Optional[Iterable[str]] = None,
+        frame_range: Optional[Tuple[int, int]] = None,
+        columns: Optional[List[str]] = None,
+    ):
+        """Arrow table of matching rows; filters are pushed down to Parquet.
+
+        ``frame_range`` is half-open: rows with ``start <= frame_index < end``.
+        """
+        dataset = self.dataset(stream, video_ids)
+        table = dataset.to_table(columns=columns, filter=self._filter(clip_ids, frame_range, video_ids))
+        keys = [(c, "ascending") for c in ("video_id", "clip_id", "frame_index") if c in table.column_names]
+        return table.sort_by(keys) if keys else table
+
+    def masks(
+        self,
+        video_ids: Optional[Sequence[str]] = None,
+        clip_ids: Optional[Iterable[str]] = None,
+        frame_range: Optional[Tuple[int, int]] = None,
+    ) -> MaskSequence:
+        """Masks of matching rows, decoded on access; ``frame_range`` is half-open ``(start, end)``."""
+        delta = "mask_key_frame" in self.dataset("masks", video_ids).schema.names
+        if not delta or frame_range is None:
+            return MaskSequence(self.read("masks", video_ids, clip_ids, frame_range))
+        # Delta rows need their keyframe: widen the read back to the earliest one.
+        lo, hi = frame_range
+        keys = self.read("masks", video_ids, clip_ids, frame_range, columns=["mask_key_frame"])
+        if keys.num_rows:
+            lo_read = min(int(lo), int(np.min(keys.column("mask_key_frame").to_numpy())))
+        else:
+            lo_read = int(lo)
+        table = self.read("masks", video_ids, clip_ids, (lo_read, hi))
+        visible = np.asarray(table.column("frame_index").to_numpy()) >= int(lo)
+        return MaskSequence(table, visible)
+
+    def objects(
+        self,
+        video_ids: Optional[Sequence[str]] = None,
+        clip_ids: Optional[Iterable[str]] = None,
+        frame_range: Optional[Tuple[int, int]] = None,
+        obj_ids: Optional[Iterable[int]] = None,
+    ):
+        """Per-object rows (bbox, area, crop RLE, phrase, score) as an Arrow table."""
+        table = self.read("objects", video_ids, clip_ids, frame_range)
+        if obj_ids is not None:
+            pa, _ = _pa()
+            import pyarrow.compute as pc
+
+            table = table.filter(pc.is_in(table.column("obj_id"), value_set=pa.array(list(obj_ids), pa.int32())))
+        return table
+
+    def object_mask(self, video_id: str, clip_id: str, frame_index: int, obj_id: int) -> Optional[np.ndarray]:
+        """One object's full-frame mask, or None when it has no row in that frame."""
+        rows = self.objects([video_id], [clip_id], (frame_index, frame_index + 1), [obj_id]).to_pylist()
+        if not rows:
+            return None
+        row = rows[0]
+        return rle_ops.paste(row["mask_rle"], row["bbox"], row["mask_height"], row["mask_width"])
+
+    def mask(self, video_id: str, clip_id: str, frame_index: int) -> Optional[np.ndarray]:
+        """One decoded mask, or None when the frame has no mask row."""
+        seq = self.masks([video_id], [clip_id], (frame_index, frame_index + 1))
+        return seq[0] if len(seq) else None
+
+
+def open_run(
+    output_root: str,
+    run_id: str,
+    catalog: Optional[OutputCatalog] = None,
+    memory_map: bool = True,
+) -> RunReader:
+    return RunReader(output_root, run_id, catalog=catalog, memory_map=memory_map)
@@ -0,0 +1,143 @@
+"""Content-addressed operator result cache stored as Arrow IPC streams."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Dict, Optional
+import json
+import os
+
+from egoworld.io.frames import is_arrow, num_frames, to_table
+from egoworld.utils.hashing import sha256_text
+
+
+_META_KEY = b"egoworld.result"
+_TABLE_KEY = b"egoworld.table"
+_NO_FRAMES_KEY = b"egoworld.no_frames"
+
+
+def _pa():  # pragma: no cover - optional dependency
+    import pyarrow as pa
+
+    return pa
+
+
+def result_cache_key(
+    checksum: str,
+    frame_start: int,
+    frame_end: int,
+    operator: str,
+    model_version: str,
+    params: Dict[str, Any],
+) -> str:
+    params_hash = sha256_text(json.dumps(params, sort_keys=True, ensure_ascii=True, default=str))
+    payload = json.dumps(
+        {
+            "checksum": checksum,
+            "frame_start": int(frame_start),
+            "frame_end": int(frame_end),
+            "operator": operator,
+            "model_version": model_version,
+            "params_hash": params_hash,
+        },
+        sort_keys=True,
+    )
+    return sha256_text(payload)
+
+
+class ResultCache:
+    """Per-clip operator results keyed by content, evicted LRU by total size.
+
+    Each entry is one file of consecutive zstd-compressed Arrow IPC streams:
+    first the per-frame rows (returned as an Arrow table) with the remaining
+    result fields as JSON in its schema metadata, then one stream per other
+    Arrow-valued field (per-object masks), named in its schema metadata. Each
+    payload is stored once. Reads refresh the file mtime, which is the LRU
+    clock used by eviction.
+    """
+
+    def __init__(self, root: str, max_bytes: int):
+        self.root = Path(root)
+        self.max_bytes = int(max_bytes)
+        self._approx_bytes: Optional[int] = None
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.arrow"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        pa = _pa()
+        path = self._path(key)
+        try:
+            with pa.memory_map(str(path), "r") as source:
+                table = pa.ipc.open_stream(source).read_all()
+                extras = []
+                while source.tell() < source.size():
+                    extras.append(pa.ipc.open_stream(source).read_all())
+            os.utime(path)
+        except (FileNotFoundError, pa.ArrowInvalid):
+            return None
+        metadata = table.schema.metadata or {}
+        result = json.loads(metadata.get(_META_KEY, b"{}").decode("utf-8"))
+        for extra in extras:
+            extra_metadata = dict(extra.schema.metadata or {})
+            name = extra_metadata.pop(_TABLE_KEY).decode("utf-8")
+            result[name] = extra.replace_schema_metadata(extra_metadata or None)
+        if _NO_FRAMES_KEY not in metadata:
+            result["frames"] = table.replace_schema_metadata(None)
+        return result
+
+    def put(self, key: str, result: Dict[str, Any]) -> None:
+        pa = _pa()
+        frames = result.get("frames", [])
+        tables = {k: v for k, v in result.items() if k != "frames" and is_arrow(v)}
+        fields = {k: v for k, v in result.items() if k != "frames" and k not in tables}
+        table = to_table(frames) if num_frames(frames) else pa.table({})
+        options = pa.ipc.IpcWriteOptions(compression="zstd")
+        metadata = {_META_KEY: json.dumps(fields, ensure_ascii=True, default=str).encode("utf-8")}
+        if "frames" not in result:
+            metadata[_NO_FRAMES_KEY] = b"1"
+        streams = [table.replace_schema_metadata(metadata)]
+        for name, value in tables.items():
+            extra = to_table(value)
+            extra_metadata = dict(extra.schema.metadata or {})
+            extra_metadata[_TABLE_KEY] = name.encode("utf-8")
+            streams.append(extra.replace_schema_metadata(extra_metadata))
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with pa.OSFile(tmp_path, "wb") as sink:
+            for stream in streams:
+                with pa.ipc.new_stream(sink, stream.schema, options=options) as writer:
+                    writer.write_table(stream)
+        os.replace(tmp_path, path)
+        if self._approx_bytes is None:
+            self.evict()
+            return
+        self._approx_bytes += path.stat().st_size
+        if self._approx_bytes > self.max_bytes:
+            self.evict()
+
+    def evict(self) -> int:
+        """Remove least recently used entries until the cache fits max_bytes."""
+        entries = []
+        total = 0
+        for path in self.root.glob("*/*.arrow"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+        removed = 0
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        self._approx_bytes = total
+        return removed
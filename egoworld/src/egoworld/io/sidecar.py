@@ -0,0 +1,230 @@
+"""Per-video sidecar from the manifest decode: prompt thumbnails and frame statistics."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+import json
+import os
+import shutil
+
+import numpy as np
+
+
+def _thumbnail(frame_bgr: np.ndarray, thumb_width: int) -> np.ndarray:
+    """RGB copy of a BGR frame, downscaled to ``thumb_width`` when wider."""
+    import cv2
+
+    h, w = frame_bgr.shape[:2]
+    if thumb_width > 0 and w > thumb_width:
+        size = (thumb_width, max(1, round(h * thumb_width / w)))
+        frame_bgr = cv2.resize(frame_bgr, size, interpolation=cv2.INTER_AREA)
+    return cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB)
+
+
+class SidecarWriter:
+    """Collects one video's sidecar during a decode pass; ``commit`` publishes it.
+
+    Thumbnails are taken every ``round(prompt_interval_s * fps)`` frames and
+    written straight into a memory-mapped array sized from the container's
+    frame count (grown if the count was low), so long videos are not held in
+    memory. Statistics are one (brightness, motion) pair per decoded frame.
+    """
+
+    def __init__(self, path: Path, prompt_interval_s: float, thumb_width: int):
+        self.path = path
+        self.prompt_interval_s = float(prompt_interval_s)
+        self.thumb_width = int(thumb_width)
+        self.tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        self.fps = 0.0
+        self.stride = 1
+        self.frame_index: List[int] = []
+        self.brightness: List[float] = []
+        self.motion: List[float] = []
+        self.thumb_frame: List[int] = []
+        self._thumbs: Optional[np.ndarray] = None
+        self.committed = False
+
+    def begin(self, fps: float, frame_count: int) -> None:
+        shutil.rmtree(self.tmp, ignore_errors=True)
+        self.tmp.mkdir(parents=True)
+        self.frame_index, self.brightness, self.motion, self.thumb_frame = [], [], [], []
+        self._thumbs = None
+        self.fps = float(fps or 30.0)
+        self.stride = max(1, int(round(self.prompt_interval_s * self.fps)))
+        self._capacity = max(1, int(frame_count) // self.stride + 1)
+
+    def wants_thumb(self, frame_idx: int) -> bool:
+        return frame_idx % self.stride == 0
+
+    def add_thumb(self, frame_idx: int, frame_bgr: np.ndarray) -> None:
+        rgb = _thumbnail(frame_bgr, self.thumb_width)
+        count = len(self.thumb_frame)
+        if self._thumbs is None or count >= len(self._thumbs):
+            self._grow(rgb.shape, max(self._capacity, 2 * count))
+        self._thumbs[count] = rgb
+        self.thumb_frame.append(int(frame_idx))
+
+    def _grow(self, shape: Tuple[int, ...], capacity: int) -> None:
+        path = self.tmp / f"thumbs.{capacity}.npy"
+        grown = np.lib.format.open_memmap(path, mode="w+", dtype=np.uint8, shape=(capacity,) + tuple(shape))
+        if self._thumbs is not None:
+            grown[: len(self._thumbs)] = self._thumbs
+            old = Path(self._thumbs.filename)
+            del self._thumbs
+            old.unlink()
+        self._thumbs = grown
+
+    def add_stats(self, frame_idx: int, brightness: float, motion: float) -> None:
+        self.frame_index.append(int(frame_idx))
+        self.brightness.append(float(brightness))
+        self.motion.append(float(motion))
+
+    def commit(self) -> None:
+        """Write the arrays and rename the sidecar into place (first writer wins)."""
+        count = len(self.thumb_frame)
+        if self._thumbs is not None:
+            self._thumbs.flush()
+            name = Path(self._thumbs.filename)
+            del self._thumbs
+            self._thumbs = None
+            name.rename(self.tmp / "thumbs.npy")
+        np.save(self.tmp / "thumb_frame.npy", np.asarray(self.thumb_frame, dtype=np.int64))
+        np.save(self.tmp / "frame_index.npy", np.asarray(self.frame_index, dtype=np.int64))
+        np.save(self.tmp / "brightness.npy", np.asarray(self.brightness, dtype=np.float32))
+        np.save(self.tmp / "motion.npy", np.asarray(self.motion, dtype=np.float32))
+        meta = {
+            "fps": self.fps,
+            "prompt_interval_s": self.prompt_interval_s,
+            "stride": self.stride,
+            "thumb_width": self.thumb_width,
+            "thumbs": count,
+        }
+        (self.tmp / "meta.json").write_text(json.dumps(meta))
+        try:
+            os.replace(self.tmp, self.path)
+        except OSError:
+            # Another worker published the same video first.
+            shutil.rmtree(self.tmp, ignore_errors=True)
+        self.committed = True
+
+    def abort(self) -> None:
+        self._thumbs = None
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+
+class Sidecar:
+    """Read view of a committed sidecar; arrays are memory-mapped.
+
+    Besides the grid thumbnails, ``clip_starts/<frame>.npy`` holds one
+    thumbnail per clip first frame that is off the grid, added after the
+    manifest pass has cut the video into clips (``add_clip_starts``).
+    """
+
+    def __init__(self, path: Path):
+        meta = json.loads((path / "meta.json").read_text())
+        self.path = path
+        self.fps = float(meta["fps"])
+        self.stride = int(meta["stride"])
+        self.thumb_width = int(meta.get("thumb_width", 0))
+        self.thumb_frame = np.load(path / "thumb_frame.npy", mmap_mode="r")
+        thumbs = path / "thumbs.npy"
+        self.thumbs = np.load(thumbs, mmap_mode="r")[: int(meta["thumbs"])] if thumbs.exists() else None
+        self.frame_index = np.load(path / "frame_index.npy", mmap_mode="r")
+        self.brightness = np.load(path / "brightness.npy", mmap_mode="r")
+        self.motion = np.load(path / "motion.npy", mmap_mode="r")
+
+    def prompt_frames(self, frame_start: int, frame_end: int, max_frames: int) -> List[Tuple[int, np.ndarray]]:
+        """(source frame index, RGB thumbnail) for thumbnails in [frame_start, frame_end)."""
+        if self.thumbs is None:
+            return []
+        lo, hi = np.searchsorted(self.thumb_frame, [frame_start, frame_end])
+        hi = min(int(hi), int(lo) + max(0, int(max_frames)))
+        return [(int(self.thumb_frame[i]), np.asarray(self.thumbs[i])) for i in range(int(lo), hi)]
+
+    def clip_start(self, frame_idx: int) -> Optional[np.ndarray]:
+        """RGB thumbnail stored for a clip's first frame, or None."""
+        try:
+            return np.load(self.path / "clip_starts" / f"{int(frame_idx)}.npy")
+        except FileNotFoundError:
+            return None
+
+    def add_clip_starts(self, video_path: str, frame_indices: Iterable[int]) -> int:
+        """Store thumbnails of clip first frames that are neither on the grid nor stored yet.
+
+        Each frame is read with a seek, so a video costs one short read per
+        clip here instead of one per clip in every SAM2 worker. Returns the
+        number of frames stored.
+        """
+        import cv2
+
+        starts = self.path / "clip_starts"
+        on_grid = {int(f) for f in self.thumb_frame} if self.thumbs is not None else set()
+        missing = [
+            f for f in sorted({int(f) for f in frame_indices} - on_grid) if not (starts / f"{f}.npy").exists()
+        ]
+        if not missing:
+            return 0
+        starts.mkdir(exist_ok=True)
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            raise ValueError(f"cannot open video: {video_path}")
+        stored = 0
+        try:
+            for frame_idx in missing:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
+                ok, frame = cap.read()
+                if not ok:
+                    break
+                tmp = starts / f"{frame_idx}.{os.getpid()}.tmp.npy"
+                np.save(tmp, _thumbnail(frame, self.thumb_width))
+                os.replace(tmp, starts / f"{frame_idx}.npy")
+                stored += 1
+        finally:
+            cap.release()
+        return stored
+
+    def stats(self, frame_start: int, frame_end: int) -> Dict[str, float]:
+        """Brightness and motion over decoded frames in [frame_start, frame_end); empty if none."""
+        lo, hi = np.searchsorted(self.frame_index, [frame_start, frame_end])
+        if hi <= lo:
+            return {}
+        brightness = np.asarray(self.brightness[lo:hi])
+        # The first decoded frame of a clip differs from a frame outside it.
+        motion = np.asarray(self.motion[lo + 1 : hi]) if hi - lo > 1 else np.zeros(1, np.float32)
+        return {
+            "frames": float(hi - lo),
+            "brightness_mean": float(brightness.mean()),
+            "brightness_min": float(brightness.min()),
+            "brightness_max": float(brightness.max()),
+            "motion_mean": float(motion.mean()),
+            "motion_max": float(motion.max()),
+        }
+
+
+class SidecarStore:
+    """Sidecars keyed by video checksum and prompt interval, one directory each.
+
+    An existing sidecar is kept as is; delete its directory to rebuild it
+    with other thumbnail settings.
+    """
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, checksum: str, prompt_interval_s: float) -> Path:
+        return self.root / f"{checksum}-p{int(round(prompt_interval_s * 1000))}"
+
+    def open(self, checksum: str, prompt_interval_s: float) -> Optional[Sidecar]:
+        path = self._path(checksum, prompt_interval_s)
+        if not (path / "meta.json").exists():
+            return None
+        return Sidecar(path)
+
+    def writer(self, checksum: str, prompt_interval_s: float, thumb_width: int) -> Optional[SidecarWriter]:
+        """A writer for a missing sidecar, or None when it already exists."""
+        path = self._path(checksum, prompt_interval_s)
+        if (path / "meta.json").exists():
+            return None
+        return SidecarWriter(path, prompt_interval_s, thumb_width)
@@ -1,13 +1,16 @@
-"""Output writers with fixed Parquet parameters and atomic writes."""
+"""Output writers with fixed Parquet parameters and atomic writes on any storage backend."""
 
 from __future__ import annotations
 
-from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+import hashlib
+import io
 import json
 import os
 
 from egoworld.config import ParquetConfig
+from egoworld.io.frames import Frames, to_table
+from egoworld.io.fs import FileSystem, filesystem_for, is_url
 
 
 def _pa():  # pragma: no cover - optional dependency
@@ -17,46 +20,92 @@ def _pa():  # pragma: no cover - optional dependency
     return pa, pq
 
 
-def _empty_table(schema):
-    pa, _ = _pa()
-    data = {field.name: pa.array([], type=field.type) for field in schema}
-    return pa.table(data, schema=schema)
-
-
-def write_parquet_table(
-    path: str,
-    rows: List[Dict[str, Any]],
-    schema=None,
-    parquet: Optional[ParquetConfig] = None,
-) -> None:
+def _unchanged(fs: FileSystem, path: str, size: int, sha256: str, expected_sha256: Optional[str]) -> bool:
+    if not expected_sha256 or expected_sha256 != sha256:
+        return False
+    return fs.size(path) == size
+
+
+def _write_bytes(path: str, data, expected_sha256: Optional[str] = None) -> Dict[str, Any]:
+    """Atomically write encoded bytes unless the file already holds them.
+
+    ``expected_sha256`` is the hash recorded for the existing file (catalog or
+    meta.json); when it matches the new content and the file is still there
+    with the same size, the rewrite is skipped.
+    """
+    fs = filesystem_for(path)
+    view = memoryview(data)
+    sha256 = hashlib.sha256(view).hexdigest()
+    info = {"path": path, "bytes": view.nbytes, "sha256": sha256, "skipped": False}
+    if _unchanged(fs, path, view.nbytes, sha256, expected_sha256):
+        info["skipped"] = True
+        return info
+    fs.write_bytes(path, view)
+    return info
+
+
+def write_encoded(items: Sequence[Tuple[str, Any, Optional[str]]]) -> List[Dict[str, Any]]:
+    """Write several encoded payloads, given as (path, data, expected_sha256).
+
+    Same skip rule as ``_write_bytes``; the remaining payloads go to their
+    backend's ``write_many`` in one batch, so on an object store a clip's small
+    files are concurrent PUTs rather than one request after another.
+    """
+    infos: List[Dict[str, Any]] = []
+    batches: Dict[int, Tuple[FileSystem, List[Tuple[str, Any]]]] = {}
+    for path, data, expected_sha256 in items:
+        fs = filesystem_for(path)
+        view = memoryview(data)
+        sha256 = hashlib.sha256(view).hexdigest()
+        skipped = _unchanged(fs, path, view.nbytes, sha256, expected_sha256)
+        infos.append({"path": path, "bytes": view.nbytes, "sha256": sha256, "skipped": skipped})
+        if not skipped:
+            batches.setdefault(id(fs), (fs, []))[1].append((path, view))
+    for fs, batch in batches.values():
+        fs.write_many(batch)
+    return infos
+
+
+def encode_parquet(rows: Frames, schema=None, parquet: Optional[ParquetConfig] = None) -> Tuple[Any, int]:
+    """Encode rows (dicts or an Arrow batch/table) to an in-memory Parquet buffer; returns (buffer, rows)."""
     pa, pq = _pa()
     parquet = parquet or ParquetConfig()
-    Path(path).parent.mkdir(parents=True, exist_ok=True)
-    tmp_path = f"{path}.tmp"
-
-    if rows:
-        table = pa.Table.from_pylist(rows, schema=schema)
-    else:
-        if schema is None:
-            schema = pa.schema([])
-        table = _empty_table(schema)
-
+    table = to_table(rows, schema=schema)
+    sink = pa.BufferOutputStream()
     pq.write_table(
         table,
-        tmp_path,
+        sink,
         compression=parquet.compression,
         row_group_size=parquet.row_group_size,
         data_page_size=parquet.data_page_size,
     )
-    os.replace(tmp_path, path)
+    return sink.getvalue(), table.num_rows
+
+
+def write_parquet_table(
+    path: str,
+    rows: Frames,
+    schema=None,
+    parquet: Optional[ParquetConfig] = None,
+    expected_sha256: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Atomically write rows (dicts or an Arrow batch/table) to Parquet.
+
+    Returns {path, rows, bytes, sha256, skipped}; see ``_write_bytes`` for
+    ``expected_sha256``.
+    """
+    # Encode into memory first so the content hash is known before any I/O.
+    data, rows_written = encode_parquet(rows, schema=schema, parquet=parquet)
+    info = _write_bytes(path, data, expected_sha256)
+    info["rows"] = rows_written
+    return info
 
 
-def write_json(path: str, payload: Dict[str, Any]) -> None:
-    Path(path).parent.mkdir(parents=True, exist_ok=True)
-    tmp_path = f"{path}.tmp"
-    with open(tmp_path, "w", encoding="utf-8") as handle:
-        json.dump(payload, handle, ensure_ascii=True, indent=2)
-    os.replace(tmp_path, path)
+def write_json(path: str, payload: Dict[str, Any], expected_sha256: Optional[str] = None) -> Dict[str, Any]:
+    data = json.dumps(payload, ensure_ascii=True, indent=2).encode("utf-8")
+    info = _write_bytes(path, data, expected_sha256)
+    info["rows"] = 0
+    return info
 
 
 def write_run_manifest(path: str, manifest: Dict[str, Any]) -> None:
@@ -64,9 +113,141 @@ def write_run_manifest(path: str, manifest: Dict[str, Any]) -> None:
 
 
 def write_json_lines(path: str, rows: Iterable[Dict[str, Any]]) -> None:
-    Path(path).parent.mkdir(parents=True, exist_ok=True)
-    tmp_path = f"{path}.tmp"
-    with open(tmp_path, "w", encoding="utf-8") as handle:
-        for row in rows:
-            handle.write(json.dumps(row, ensure_ascii=True) + "\n")
-    os.replace(tmp_path, path)
+    data = "".join(json.dumps(row, ensure_ascii=True) + "\n" for row in rows)
+    filesystem_for(path).write_bytes(path, data.encode("utf-8"))
+
+
+class JsonLinesWriter:
+    """Append JSON rows as they arrive; the file appears atomically on ``close``.
+
+    Local paths stream to ``<path>.tmp`` (flushed per row) and are renamed into
+    place; object-store paths are buffered and written with one upload.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.rows = 0
+        if is_url(path):
+            self._tmp = ""
+            self._handle = io.BytesIO()
+        else:
+            filesystem_for(path).makedirs(os.path.dirname(path) or ".")
+            self._tmp = f"{path}.tmp"
+            self._handle = open(self._tmp, "wb")
+
+    def write(self, row: Dict[str, Any]) -> None:
+        self._handle.write((json.dumps(row, ensure_ascii=True) + "\n").encode("utf-8"))
+        if self._tmp:
+            self._handle.flush()
+        self.rows += 1
+
+    def close(self) -> None:
+        if self._handle.closed:
+            return
+        if self._tmp:
+            self._handle.close()
+            os.replace(self._tmp, self.path)
+        else:
+            filesystem_for(self.path).write_bytes(self.path, self._handle.getbuffer())
+            self._handle.close()
+
+    def abort(self) -> None:
+        """Drop everything written so far without touching ``path``."""
+        self._handle.close()
+        if self._tmp:
+            try:
+                os.remove(self._tmp)
+            except FileNotFoundError:
+                pass
+
+    def __enter__(self) -> "JsonLinesWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class ParquetRowsWriter:
+    """Stream rows into one Parquet file in batches; the file appears atomically on ``close``.
+
+    Rows are buffered into record batches of ``batch_rows`` with ``schema``
+    (missing keys become nulls, unknown keys are dropped). Local paths write
+    to ``<path>.tmp`` and are renamed; object-store paths are uploaded once.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        schema: Any,
+        batch_rows: int = 64 * 1024,
+        parquet: Optional[ParquetConfig] = None,
+    ):
+        pa, pq = _pa()
+        parquet = parquet or ParquetConfig()
+        self.path = path
+        self.schema = schema
+        self.batch_rows = max(1, int(batch_rows))
+        self.rows = 0
+        self._buffer: List[Dict[str, Any]] = []
+        if is_url(path):
+            self._tmp = ""
+            self._sink = pa.BufferOutputStream()
+        else:
+            filesystem_for(path).makedirs(os.path.dirname(path) or ".")
+            self._tmp = f"{path}.tmp"
+            self._sink = self._tmp
+        self._writer = pq.ParquetWriter(
+            self._sink,
+            schema,
+            compression=parquet.compression,
+            data_page_size=parquet.data_page_size,
+        )
+        self._closed = False
+
+    def _flush(self) -> None:
+        if self._buffer:
+            pa, _ = _pa()
+            self._writer.write_batch(pa.RecordBatch.from_pylist(self._buffer, schema=self.schema))
+            self._buffer = []
+
+    def write(self, row: Dict[str, Any]) -> None:
+        self._buffer.append(row)
+        self.rows += 1
+        if len(self._buffer) >= self.batch_rows:
+            self._flush()
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._flush()
+        self._writer.close()
+        self._closed = True
+        if self._tmp:
+            os.replace(self._tmp, self.path)
+        else:
+            filesystem_for(self.path).write_bytes(self.path, memoryview(self._sink.getvalue()))
+
+    def abort(self) -> None:
+        """Drop everything written so far without touching ``path``."""
+        if self._closed:
+            return
+        self._buffer = []
+        self._writer.close()
+        self._closed = True
+        if self._tmp:
+            try:
+                os.remove(self._tmp)
+            except FileNotFoundError:
+                pass
+
+    def __enter__(self) -> "ParquetRowsWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
@@ -0,0 +1 @@
+"""manifests package."""
@@ -0,0 +1,561 @@
+"""Build video and clip manifests (ffprobe metadata + scene detection)."""
+
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+import json
+import math
+import os
+import subprocess
+
+from egoworld.config import ChecksumConfig, ProxyConfig, SceneDetectConfig
+from egoworld.io.checksum_cache import ChecksumCache
+from egoworld.io.sidecar import SidecarStore
+from egoworld.io.writers import ParquetRowsWriter, write_json_lines
+from egoworld.manifests.scenes import cached_content_scores, scenes_from_scores
+from egoworld.utils.hashing import checksum_file, sha256_text
+from egoworld.utils.video import (
+    frames_from_seconds,
+    proxy_dimensions,
+    seconds_from_frames,
+    transcode_proxy,
+)
+
+
+@dataclass
+class VideoMeta:
+    video_id: str
+    path: str
+    duration_s: float
+    fps: float
+    width: int
+    height: int
+    audio: bool
+    checksum: str
+    split: str
+    checksum_mode: str = "sha256"
+    proxy_path: str = ""
+    proxy_width: int = 0
+    proxy_height: int = 0
+    proxy_scale: float = 1.0
+    proxy_scale_x: float = 1.0
+    proxy_scale_y: float = 1.0
+    file_size: int = 0
+    file_mtime_ns: int = 0
+    file_inode: int = 0
+    canonical_video_id: str = ""
+    manifest_config: str = ""
+
+
+FILE_SIGNATURE_FIELDS = ("file_size", "file_mtime_ns", "file_inode")
+
+
+def file_signature(path: str) -> Dict[str, int]:
+    """Size, mtime and inode used to tell whether a video changed since it was indexed."""
+    st = os.stat(path)
+    return {"file_size": int(st.st_size), "file_mtime_ns": int(st.st_mtime_ns), "file_inode": int(st.st_ino)}
+
+
+# Scene-detection fields that shape clip rows; cache and sidecar locations do not.
+_SCENE_FIELDS = (
+    "method",
+    "min_scene_len_s",
+    "fallback_full_clip",
+    "overlap_s",
+    "max_clip_len_s",
+    "target_clip_len_s",
+    "threshold",
+    "fast_width",
+    "fast_frame_skip",
+)
+
+
+def manifest_config_hash(
+    scenedetect: SceneDetectConfig,
+    proxy: Optional[ProxyConfig] = None,
+    checksum: Optional[ChecksumConfig] = None,
+) -> str:
+    """Hash of the config a video's rows are built with: scenes, splitting, overlap, proxy, checksum."""
+    payload = {
+        "scenedetect": {name: getattr(scenedetect, name) for name in _SCENE_FIELDS},
+        "proxy": asdict(proxy) if proxy is not None and proxy.enabled else None,
+        "checksum": (checksum or ChecksumConfig()).spec(),
+    }
+    return sha256_text(json.dumps(payload, sort_keys=True))[:16]
+
+
+def make_video_id(path: str) -> str:
+    return sha256_text(os.path.abspath(path))[:16]
+
+
+def canonical_video_id(row: Dict[str, Any], seen: Dict[Tuple[str, str], Any]) -> str:
+    """video_id of the first video seen with the same content.
+
+    ``seen`` carries the first row per checksum across calls, so the
+    canonical copy of a duplicated recording is the first in build order.
+    Videos without a checksum are their own canonical video. A ``sampled``
+    checksum covers a few blocks only, so a match is confirmed with a full
+    sha256 of both files; full-content modes (sha256, xxh3) are trusted.
+    """
+    if not row.get("checksum"):
+        return row["video_id"]
+    mode = row.get("checksum_mode") or "sha256"
+    first = seen.setdefault((mode, row["checksum"]), row)
+    if first is row or not mode.startswith("sampled"):
+        return first["video_id"]
+    seen.setdefault(("full", _full_sha256(first["path"], seen)), first)
+    return seen.setdefault(("full", _full_sha256(row["path"], seen)), row)["video_id"]
+
+
+def _full_sha256(path: str, seen: Dict[Tuple[str, str], Any]) -> str:
+    key = ("sha256-of", path)
+    if key not in seen:
+        seen[key] = checksum_file(path, "sha256")
+    return seen[key]
+
+
+def make_clip_id(video_id: str, frame_start: int, frame_end: int) -> str:
+    digest = sha256_text(f"{video_id}:{frame_start}:{frame_end}")[:8]
+    return f"{video_id}-{frame_start:09d}-{frame_end:09d}-{digest}"
+
+
+def run_ffprobe(path: str) -> Dict[str, Any]:
+    cmd = [
+        "ffprobe",
+        "-v",
+        "error",
+        "-print_format",
+        "json",
+        "-show_streams",
+        "-show_format",
+        path,
+    ]
+    result = subprocess.run(cmd, check=True, capture_output=True, text=True)
+    return json.loads(result.stdout)
+
+
+def _parse_rate(rate: str) -> float:
+    if not rate:
+        return 0.0
+    if "/" in rate:
+        num, den = rate.split("/", 1)
+        try:
+            num_f = float(num)
+            den_f = float(den)
+        except ValueError:
+            return 0.0
+        if den_f == 0:
+            return 0.0
+        return num_f / den_f
+    try:
+        return float(rate)
+    except ValueError:
+        return 0.0
+
+
+def video_checksum(path: str, config: Optional[ChecksumConfig] = None) -> str:
+    """Checksum of ``path`` in the configured mode, via the checksum cache when set."""
+    config = config or ChecksumConfig()
+    if not config.cache_path:
+        return checksum_file(path, config.mode, config.sample_blocks, config.block_size)
+    cache = ChecksumCache(config.cache_path)
+    st = os.stat(path)
+    spec = config.spec()
+    cached = cache.get(st, spec)
+    if cached is not None:
+        return cached
+    checksum = checksum_file(path, config.mode, config.sample_blocks, config.block_size)
+    cache.put(st, spec, checksum, path)
+    return checksum
+
+
+def parse_video_meta(path: str, split: str = "train", checksum: Optional[ChecksumConfig] = None) -> VideoMeta:
+    probe = run_ffprobe(path)
+    streams = probe.get("streams", [])
+    video_stream = next((s for s in streams if s.get("codec_type") == "video"), None)
+    if video_stream is None:
+        raise ValueError(f"no video stream found: {path}")
+    fps = _parse_rate(video_stream.get("avg_frame_rate", "")) or _parse_rate(
+        video_stream.get("r_frame_rate", "")
+    )
+    if fps <= 0:
+        raise ValueError(f"invalid fps for video: {path}")
+    duration = probe.get("format", {}).get("duration") or video_stream.get("duration") or 0.0
+    duration_s = float(duration)
+    if duration_s <= 0:
+        raise ValueError(f"invalid duration for video: {path}")
+    audio = any(s.get("codec_type") == "audio" for s in streams)
+    return VideoMeta(
+        video_id=make_video_id(path),
+        path=path,
+        duration_s=duration_s,
+        fps=fps,
+        width=int(video_stream.get("width", 0)),
+        height=int(video_stream.get("height", 0)),
+        audio=audio,
+        checksum=video_checksum(path, checksum),
+        split=split,
+        checksum_mode=(checksum or ChecksumConfig()).spec(),
+    )
+
+
+def detect_scenes(
+    video_path: str,
+    duration_s: float,
+    config: SceneDetectConfig,
+    checksum: str = "",
+) -> Tuple[List[Tuple[float, float]], bool]:
+    """Return (scenes, used_fallback) where scenes are (start_s, end_s) pairs.
+
+    ``fast`` scores a downscaled, frame-skipping decode; with
+    ``score_cache_dir`` and a checksum the raw scores are cached, so new
+    thresholds or scene lengths are recomputed without decoding.
+
+    With ``sidecar_dir`` and a checksum, a missing sidecar (prompt
+    thumbnails, frame statistics) is filled from the ``fast`` decode, the
+    only method that takes one (``SceneDetectConfig`` rejects the others).
+    Sidecar failures do not fail the video.
+    """
+    sidecar = None
+    if config.sidecar_dir and checksum:
+        sidecar = SidecarStore(config.sidecar_dir).writer(checksum, config.prompt_interval_s, config.thumb_width)
+    scenes: List[Tuple[float, float]] = []
+    if config.method == "scenedetect":
+        try:
+            scenes = _detect_with_scenedetect(video_path, config)
+        except Exception:
+            scenes = []
+    elif config.method == "fast":
+        try:
+            frame_index, scores, fps = cached_content_scores(
+                video_path, checksum, config.fast_width, config.fast_frame_skip, config.score_cache_dir, sidecar
+            )
+            scenes = scenes_from_scores(
+                frame_index, scores, fps, duration_s, config.threshold, config.min_scene_len_s
+            )
+        except Exception:
+            scenes = []
+    if scenes:
+        return scenes, False
+    if config.fallback_full_clip:
+        return [(0.0, float(duration_s))], True
+    return [], False
+
+
+def _detect_with_scenedetect(video_path: str, config: SceneDetectConfig) -> List[Tuple[float, float]]:
+    from scenedetect import ContentDetector, SceneManager, open_video  # type: ignore
+
+    video = open_video(video_path)
+    fps = float(video.frame_rate or 0.0)
+    min_scene_len = max(1, frames_from_seconds(config.min_scene_len_s, fps))
+    manager = SceneManager()
+    manager.add_detector(ContentDetector(threshold=config.threshold, min_scene_len=min_scene_len))
+    manager.detect_scenes(video)
+    return [(start.get_seconds(), end.get_seconds()) for start, end in manager.get_scene_list()]
+
+
+def build_proxy(meta: VideoMeta, proxy: ProxyConfig) -> VideoMeta:
+    """Transcode a model-resolution proxy once and record it on the video meta.
+
+    Proxies keep the source frame rate and timestamps so frame indices stay
+    aligned; masks produced on the proxy are stored with ``proxy_scale_x``
+    and ``proxy_scale_y``. Each side is rounded to an even size on its own, so
+    the two ratios can differ; ``proxy_scale`` stays the width ratio.
+    The file name carries a hash of the source checksum and the proxy
+    settings, so a changed source or encoding gets a new proxy instead of
+    reusing a stale one.
+    """
+    width, height = proxy_dimensions(meta.width, meta.height, proxy.max_side)
+    if width >= meta.width and height >= meta.height:
+        return meta
+    key = sha256_text(
+        f"{meta.checksum_mode}:{meta.checksum}:{width}x{height}:{proxy.gop}:{proxy.codec}:{proxy.crf}:{proxy.preset}"
+    )[:16]
+    proxy_path = Path(proxy.output_dir) / f"{meta.video_id}-{key}.mp4"
+    if not proxy_path.exists():
+        transcode_proxy(
+            meta.path,
+            str(proxy_path),
+            width,
+            height,
+            gop=proxy.gop,
+            codec=proxy.codec,
+            crf=proxy.crf,
+            preset=proxy.preset,
+        )
+    meta.proxy_path = str(proxy_path)
+    meta.proxy_width = width
+    meta.proxy_height = height
+    meta.proxy_scale_x = float(width) / float(meta.width) if meta.width else 1.0
+    meta.proxy_scale_y = float(height) / float(meta.height) if meta.height else 1.0
+    meta.proxy_scale = meta.proxy_scale_x
+    return meta
+
+
+def split_scene(
+    start_s: float,
+    end_s: float,
+    fps: float,
+    max_len_s: float,
+    target_len_s: float = 0.0,
+) -> List[Tuple[float, float]]:
+    """Split a scene longer than ``max_len_s`` into equal, frame-aligned chunks.
+
+    The chunk count is the larger of ``ceil(len / max_len_s)`` and
+    ``round(len / target_len_s)``, so every chunk is at most ``max_len_s``
+    and near ``target_len_s``. Outer bounds are returned unchanged; inner
+    bounds fall on frame boundaries.
+    """
+    length = end_s - start_s
+    if max_len_s <= 0 or length <= max_len_s or fps <= 0:
+        return [(start_s, end_s)]
+    count = int(math.ceil(length / max_len_s))
+    if target_len_s > 0:
+        count = max(count, int(round(length / target_len_s)))
+    frame_start = frames_from_seconds(start_s, fps)
+    frame_end = frames_from_seconds(end_s, fps)
+    count = max(1, min(count, frame_end - frame_start))
+    inner = [seconds_from_frames(frame_start + (k * (frame_end - frame_start)) // count, fps) for k in range(1, count)]
+    bounds = [start_s] + inner + [end_s]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def _build_clip_rows(
+    meta: VideoMeta,
+    scenes: List[Tuple[float, float]],
+    used_fallback: bool,
+    config: SceneDetectConfig,
+) -> List[Dict[str, Any]]:
+    rows: List[Dict[str, Any]] = []
+    max_frame = int(meta.duration_s * meta.fps)
+    # max_clip_len_s caps the whole clip, overlap included, so chunks are
+    # split to leave room for overlap_s on both sides.
+    padding = 2 * config.overlap_s
+    max_len_s = config.max_clip_len_s - padding if config.max_clip_len_s > 0 else 0.0
+    target_len_s = max(config.target_clip_len_s - padding, 0.0) if config.target_clip_len_s > 0 else 0.0
+    max_frames = int(math.floor(config.max_clip_len_s * meta.fps)) if config.max_clip_len_s > 0 else 0
+    chunks = [
+        chunk
+        for scene_start, scene_end in scenes
+        for chunk in split_scene(scene_start, scene_end, meta.fps, max_len_s, target_len_s)
+    ]
+    for scene_start, scene_end in chunks:
+        start = max(0.0, scene_start - config.overlap_s)
+        end = min(meta.duration_s, scene_end + config.overlap_s)
+        frame_start = frames_from_seconds(start, meta.fps)
+        frame_end = min(frames_from_seconds(end, meta.fps), max_frame)
+        if max_frames:
+            # Frame rounding of the overlap can add one frame past the cap.
+            frame_end = min(frame_end, frame_start + max_frames)
+        if frame_end <= frame_start:
+            continue
+        rows.append(
+            {
+                "clip_id": make_clip_id(meta.video_id, frame_start, frame_end),
+                "video_id": meta.video_id,
+                "start_s": seconds_from_frames(frame_start, meta.fps),
+                "end_s": seconds_from_frames(frame_end, meta.fps),
+                "frame_start": frame_start,
+                "frame_end": frame_end,
+                "overlap_s": config.overlap_s,
+                "scenedetect_failed": used_fallback,
+                "status": "Pending",
+                "last_error": "",
+                "retry_count": 0,
+            }
+        )
+    return rows
+
+
+def build_video(
+    path: str,
+    split: str,
+    scenedetect: SceneDetectConfig,
+    proxy: Optional[ProxyConfig] = None,
+    checksum: Optional[ChecksumConfig] = None,
+) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """Video manifest row and clip rows for one video (ffprobe, checksum, scenes, proxy)."""
+    # Taken before any reads, so a file modified while it is processed is picked up next time.
+    signature = file_signature(path) if os.path.exists(path) else {}
+    meta = parse_video_meta(path, split, checksum)
+    for name, value in signature.items():
+        setattr(meta, name, value)
+    meta.manifest_config = manifest_config_hash(scenedetect, proxy, checksum)
+    if proxy is not None and proxy.enabled:
+        meta = build_proxy(meta, proxy)
+    scenes, used_fallback = detect_scenes(path, meta.duration_s, scenedetect, meta.checksum)
+    clips = _build_clip_rows(meta, scenes, used_fallback, scenedetect)
+    if scenedetect.sidecar_dir and meta.checksum:
+        _store_clip_starts(path, meta.checksum, clips, scenedetect)
+    return asdict(meta), clips
+
+
+def _store_clip_starts(path: str, checksum: str, clips: List[Dict[str, Any]], config: SceneDetectConfig) -> None:
+    """Add each clip's first frame to the video's sidecar, so SAM2 prompting never reads the source for it.
+
+    Also runs for a sidecar from an earlier build, since clip starts depend
+    on the scene settings. Failures do not fail the video.
+    """
+    sidecar = SidecarStore(config.sidecar_dir).open(checksum, config.prompt_interval_s)
+    if sidecar is None:
+        return
+    try:
+        sidecar.add_clip_starts(path, [int(clip["frame_start"]) for clip in clips])
+    except Exception:
+        pass
+
+
+def build_manifests(
+    video_paths: Iterable[str],
+    split: str = "train",
+    scenedetect: Optional[SceneDetectConfig] = None,
+    proxy: Optional[ProxyConfig] = None,
+    checksum: Optional[ChecksumConfig] = None,
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    scenedetect = scenedetect or SceneDetectConfig()
+    video_rows: List[Dict[str, Any]] = []
+    clip_rows: List[Dict[str, Any]] = []
+    seen: Dict[Tuple[str, str], str] = {}
+    for path in video_paths:
+        video, clips = build_video(path, split, scenedetect, proxy, checksum)
+        video["canonical_video_id"] = canonical_video_id(video, seen)
+        video_rows.append(video)
+        clip_rows.extend(clips)
+    return video_rows, clip_rows
+
+
+@dataclass
+class VideoResult:
+    """Outcome of building one video: rows on success, an error row otherwise."""
+
+    path: str
+    video: Optional[Dict[str, Any]]
+    clips: List[Dict[str, Any]]
+    error: Optional[Dict[str, Any]] = None
+
+
+def _build_video_safe(
+    path: str,
+    split: str,
+    scenedetect: SceneDetectConfig,
+    proxy: Optional[ProxyConfig],
+    checksum: Optional[ChecksumConfig] = None,
+) -> VideoResult:
+    try:
+        video, clips = build_video(path, split, scenedetect, proxy, checksum)
+    except Exception as exc:
+        error = {
+            "video_id": make_video_id(path),
+            "path": path,
+            "split": split,
+            "error_type": type(exc).__name__,
+            "error": str(exc)[:1000],
+        }
+        return VideoResult(path=path, video=None, clips=[], error=error)
+    return VideoResult(path=path, video=video, clips=clips)
+
+
+def index_previous(
+    video_rows: Iterable[Dict[str, Any]],
+    clip_rows: Iterable[Dict[str, Any]],
+) -> Dict[str, VideoResult]:
+    """Existing manifest rows as {path: VideoResult} for incremental builds."""
+    clips_by_video: Dict[str, List[Dict[str, Any]]] = {}
+    for clip in clip_rows:
+        clips_by_video.setdefault(clip["video_id"], []).append(clip)
+    return {
+        row["path"]: VideoResult(path=row["path"], video=row, clips=clips_by_video.get(row["video_id"], []))
+        for row in video_rows
+    }
+
+
+def reusable(previous: Optional[VideoResult], path: str, config_hash: str) -> bool:
+    """True when ``path`` still has the size, mtime and inode recorded for it
+    and its rows were built with the same manifest config.
+
+    ``config_hash`` is ``manifest_config_hash`` of the current build; rows
+    built with other scene-detection, splitting, proxy or checksum settings
+    (or before the hash was recorded) are rebuilt, so one manifest never
+    mixes configs.
+    """
+    if previous is None or previous.video is None:
+        return False
+    if previous.video.get("manifest_config") != config_hash:
+        return False
+    try:
+        signature = file_signature(path)
+    except OSError:
+        return False
+    return all(previous.video.get(name) == value for name, value in signature.items())
+
+
+def iter_video_results(
+    video_paths: Iterable[str],
+    split: str = "train",
+    scenedetect: Optional[SceneDetectConfig] = None,
+    proxy: Optional[ProxyConfig] = None,
+    workers: int = 1,
+    previous: Optional[Dict[str, VideoResult]] = None,
+    checksum: Optional[ChecksumConfig] = None,
+) -> Iterator[VideoResult]:
+    """Build videos in sorted path order, optionally across a process pool.
+
+    Results are yielded in that order as soon as every earlier video is done,
+    so output is deterministic while rows stream out. A failing video yields
+    an error row instead of raising. Videos in ``previous`` whose file
+    signature and manifest config are unchanged are yielded as-is (same rows,
+    same clip_ids) without any probing. ``canonical_video_id`` is (re)assigned on every row
+    in that order, so the first path of a duplicated recording is canonical.
+    """
+    scenedetect = scenedetect or SceneDetectConfig()
+    previous = previous or {}
+    checksum = checksum or ChecksumConfig()
+    paths = sorted(video_paths)
+    config_hash = manifest_config_hash(scenedetect, proxy, checksum)
+    kept = {path for path in paths if reusable(previous.get(path), path, config_hash)}
+    todo = [path for path in paths if path not in kept]
+    if workers <= 1:
+        built: Iterator[VideoResult] = (
+            _build_video_safe(path, split, scenedetect, proxy, checksum) for path in todo
+        )
+        pool = None
+    else:
+        pool = ProcessPoolExecutor(max_workers=workers)
+        n = len(todo)
+        built = pool.map(_build_video_safe, todo, [split] * n, [scenedetect] * n, [proxy] * n, [checksum] * n)
+    seen: Dict[Tuple[str, str], str] = {}
+    try:
+        for path in paths:
+            result = previous[path] if path in kept else next(built)
+            if result.video is not None:
+                result.video["canonical_video_id"] = canonical_video_id(result.video, seen)
+            yield result
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+
+def dataset_hash(video_rows: Iterable[Dict[str, Any]]) -> str:
+    """Order-independent hash of (video_id, checksum_mode, checksum) over a video manifest.
+
+    Including the mode keeps hashes of the same files in different checksum
+    modes distinct; copy it into the config's ``dataset_hash`` for a run.
+    """
+    lines = sorted(
+        f"{row['video_id']}\t{row.get('checksum_mode') or 'sha256'}\t{row['checksum']}" for row in video_rows
+    )
+    return sha256_text("\n".join(lines))
+
+
+def write_manifest_json(path: str, rows: Iterable[Dict[str, Any]]) -> None:
+    write_json_lines(path, rows)
+
+
+def write_manifest_parquet(path: str, rows: Iterable[Dict[str, Any]], schema: Any) -> None:
+    """Write manifest rows to Parquet with a typed manifest schema (see ``manifests.schema``)."""
+    with ParquetRowsWriter(path, schema) as writer:
+        for row in rows:
+            writer.write(row)
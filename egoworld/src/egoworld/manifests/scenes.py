@@ -0,0 +1,197 @@
+"""Fast content-score scene detection with a per-video score cache."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+import os
+
+import numpy as np
+
+from egoworld.io.sidecar import SidecarWriter
+
+
+SceneScores = Tuple[np.ndarray, np.ndarray, float]
+
+
+def content_scores(
+    video_path: str,
+    width: int = 256,
+    frame_skip: int = 1,
+    sidecar: Optional[SidecarWriter] = None,
+) -> SceneScores:
+    """Per-frame content scores of a downscaled, frame-skipping decode.
+
+    Scores follow PySceneDetect's ContentDetector: the mean absolute HSV
+    difference to the previous decoded frame, averaged over the three
+    channels. Only every ``frame_skip + 1``-th frame is retrieved (the others
+    are grabbed without conversion) and frames are resized to ``width``
+    before the colour conversion. Returns (frame_index, score, fps); the
+    first decoded frame has score 0.
+
+    With a ``sidecar`` the same pass also stores prompt thumbnails (frames
+    on its stride are retrieved even when skipped for scoring) and, per
+    scored frame, brightness (mean V) and motion (mean absolute V
+    difference to the previous scored frame); the sidecar is committed when
+    the decode completes and discarded otherwise.
+    """
+    import cv2
+
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise ValueError(f"cannot open video: {video_path}")
+    fps = float(cap.get(cv2.CAP_PROP_FPS) or 0.0)
+    if sidecar is not None:
+        sidecar.begin(fps, int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0))
+    step = max(1, int(frame_skip) + 1)
+    frames: List[int] = []
+    scores: List[float] = []
+    prev: Optional[np.ndarray] = None
+    size: Optional[Tuple[int, int]] = None
+    frame_idx = 0
+    try:
+        while True:
+            scored = frame_idx % step == 0
+            thumb = sidecar is not None and sidecar.wants_thumb(frame_idx)
+            if not scored and not thumb:
+                if not cap.grab():
+                    break
+                frame_idx += 1
+                continue
+            ok, frame = cap.read()
+            if not ok:
+                break
+            if thumb:
+                sidecar.add_thumb(frame_idx, frame)
+            if not scored:
+                frame_idx += 1
+                continue
+            if size is None:
+                h, w = frame.shape[:2]
+                size = (w, h) if width <= 0 or w <= width else (int(width), max(1, round(h * width / w)))
+            if size != (frame.shape[1], frame.shape[0]):
+                frame = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+            hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV).astype(np.int16)
+            if prev is None:
+                score = 0.0
+            else:
+                score = float(np.abs(hsv - prev).reshape(-1, 3).mean(axis=0).mean())
+            if sidecar is not None:
+                motion = 0.0 if prev is None else float(np.abs(hsv[..., 2] - prev[..., 2]).mean())
+                sidecar.add_stats(frame_idx, float(hsv[..., 2].mean()), motion)
+            frames.append(frame_idx)
+            scores.append(score)
+            prev = hsv
+            frame_idx += 1
+        if sidecar is not None:
+            sidecar.commit()
+    finally:
+        cap.release()
+        if sidecar is not None and not sidecar.committed:
+            sidecar.abort()
+    return np.asarray(frames, dtype=np.int64), np.asarray(scores, dtype=np.float32), fps
+
+
+def scenes_from_scores(
+    frame_index: np.ndarray,
+    scores: np.ndarray,
+    fps: float,
+    duration_s: float,
+    threshold: float,
+    min_scene_len_s: float,
+) -> List[Tuple[float, float]]:
+    """(start_s, end_s) scenes from cached scores, using ContentDetector's cut rule.
+
+    A frame starts a new scene when its score reaches ``threshold`` and at
+    least ``min_scene_len_s`` has passed since the previous cut.
+    """
+    if fps <= 0 or len(frame_index) == 0:
+        return []
+    min_len = max(1, int(round(min_scene_len_s * fps)))
+    cuts: List[int] = []
+    last = int(frame_index[0])
+    for idx in frame_index[np.asarray(scores) >= threshold]:
+        if int(idx) - last >= min_len:
+            cuts.append(int(idx))
+            last = int(idx)
+    bounds = [float(frame_index[0]) / fps] + [c / fps for c in cuts] + [float(duration_s)]
+    return [(start, end) for start, end in zip(bounds[:-1], bounds[1:]) if end > start]
+
+
+def boundary_agreement(
+    reference: Sequence[Tuple[float, float]],
+    candidate: Sequence[Tuple[float, float]],
+    tolerance_s: float = 0.5,
+) -> Dict[str, float]:
+    """Precision/recall of candidate scene cuts against reference cuts within ``tolerance_s``."""
+    ref = sorted(start for start, _ in reference[1:])
+    cand = sorted(start for start, _ in candidate[1:])
+    matched = 0
+    used = [False] * len(cand)
+    for cut in ref:
+        for i, other in enumerate(cand):
+            if not used[i] and abs(other - cut) <= tolerance_s:
+                used[i] = True
+                matched += 1
+                break
+    precision = matched / len(cand) if cand else 1.0
+    recall = matched / len(ref) if ref else 1.0
+    return {
+        "reference_cuts": float(len(ref)),
+        "cuts": float(len(cand)),
+        "precision": precision,
+        "recall": recall,
+    }
+
+
+class SceneScoreCache:
+    """Raw content scores per video checksum and decode settings, one .npz file each.
+
+    Changing ``threshold``, ``min_scene_len_s`` or ``overlap_s`` reuses the
+    cached scores; changing the width or frame skip decodes again.
+    """
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, checksum: str, width: int, frame_skip: int) -> Path:
+        return self.root / f"{checksum}-w{int(width)}-s{int(frame_skip)}.npz"
+
+    def get(self, checksum: str, width: int, frame_skip: int) -> Optional[SceneScores]:
+        path = self._path(checksum, width, frame_skip)
+        if not path.exists():
+            return None
+        with np.load(path) as data:
+            return data["frame_index"], data["score"], float(data["fps"])
+
+    def put(self, checksum: str, width: int, frame_skip: int, scores: SceneScores) -> None:
+        frame_index, score, fps = scores
+        path = self._path(checksum, width, frame_skip)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp, "wb") as handle:
+            np.savez(handle, frame_index=frame_index, score=score, fps=np.float64(fps))
+        os.replace(tmp, path)
+
+
+def cached_content_scores(
+    video_path: str,
+    checksum: str,
+    width: int,
+    frame_skip: int,
+    cache_dir: str = "",
+    sidecar: Optional[SidecarWriter] = None,
+) -> SceneScores:
+    """``content_scores`` through the score cache when a directory and checksum are given.
+
+    A pending ``sidecar`` needs the decode, so it bypasses cache hits.
+    """
+    cache = SceneScoreCache(cache_dir) if cache_dir and checksum else None
+    if cache is not None and sidecar is None:
+        hit = cache.get(checksum, width, frame_skip)
+        if hit is not None:
+            return hit
+    scores = content_scores(video_path, width, frame_skip, sidecar)
+    if cache is not None:
+        cache.put(checksum, width, frame_skip, scores)
+    return scores
@@ -0,0 +1,212 @@
+"""Manifest schemas and output field specs."""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List
+
+
+VIDEO_MANIFEST_FIELDS: List[str] = [
+    "video_id",
+    "path",
+    "duration_s",
+    "fps",
+    "width",
+    "height",
+    "audio",
+    "checksum",
+    "checksum_mode",
+    "split",
+    "proxy_path",
+    "proxy_width",
+    "proxy_height",
+    "proxy_scale",
+    "proxy_scale_x",
+    "proxy_scale_y",
+    "file_size",
+    "file_mtime_ns",
+    "file_inode",
+    "canonical_video_id",
+    "manifest_config",
+]
+
+CLIP_MANIFEST_FIELDS: List[str] = [
+    "clip_id",
+    "video_id",
+    "start_s",
+    "end_s",
+    "frame_start",
+    "frame_end",
+    "overlap_s",
+    "scenedetect_failed",
+    "status",
+    "last_error",
+    "retry_count",
+]
+
+RUN_MANIFEST_FIELDS: List[str] = [
+    "run_id",
+    "created_at",
+    "config_path",
+    "code_git_hash",
+    "model_versions",
+    "dataset_hash",
+    "parquet_params",
+    "coordinate_spec_version",
+    "mask_encoding",
+    "mask_keyframe_interval",
+    "time_base",
+]
+
+MASK_ENCODINGS: List[str] = ["rle", "rle_delta"]
+
+CLIP_STATUSES: List[str] = ["Pending", "Running", "Writing", "Done", "Failed", "Skipped"]
+
+FIELD_SPECS: Dict[str, Any] = {
+    "time": {
+        "time_base": "seconds",
+        "frame_index_base": 0,
+        "alignment": "start_s = frame_start / fps, end_s = frame_end / fps",
+        "per_frame_fields": ["frame_index", "timestamp_s"],
+    },
+    "mask": {
+        "encoding": "rle",
+        "format": "coco",
+        "resolution": "native video resolution unless mask_scale_x/mask_scale_y are recorded",
+        "scale": (
+            "mask_x = native_x * mask_scale_x, mask_y = native_y * mask_scale_y "
+            "(meta.json, 1.0 = native; mask_scale is mask_scale_x)"
+        ),
+        "objects": "objects.parquet: per-object bbox [x, y, w, h] and RLE of the bbox crop",
+        "delta": (
+            "rle_delta: keyframe RLE every mask_keyframe_interval rows, other rows are the XOR "
+            "with the previous row; mask_key_frame is the frame_index of the row's keyframe"
+        ),
+    },
+    "coordinates": {
+        "handedness": "right",
+        "axis_order": "x,y,z",
+        "length_unit": "meters",
+        "quat_order": "wxyz",
+        "coord_frame": "camera",
+    },
+}
+
+
+def _pa():  # pragma: no cover - optional dependency
+    import pyarrow as pa
+
+    return pa
+
+
+def video_manifest_schema():
+    """Typed Arrow schema of video manifest rows (``VIDEO_MANIFEST_FIELDS``)."""
+    pa = _pa()
+    return pa.schema(
+        [
+            pa.field("video_id", pa.string()),
+            pa.field("path", pa.string()),
+            pa.field("duration_s", pa.float64()),
+            pa.field("fps", pa.float64()),
+            pa.field("width", pa.int32()),
+            pa.field("height", pa.int32()),
+            pa.field("audio", pa.bool_()),
+            pa.field("checksum", pa.string()),
+            pa.field("checksum_mode", pa.string()),
+            pa.field("split", pa.string()),
+            pa.field("proxy_path", pa.string()),
+            pa.field("proxy_width", pa.int32()),
+            pa.field("proxy_height", pa.int32()),
+            pa.field("proxy_scale", pa.float64()),
+            pa.field("proxy_scale_x", pa.float64()),
+            pa.field("proxy_scale_y", pa.float64()),
+            pa.field("file_size", pa.int64()),
+            pa.field("file_mtime_ns", pa.int64()),
+            pa.field("file_inode", pa.uint64()),
+            pa.field("canonical_video_id", pa.string()),
+            pa.field("manifest_config", pa.string()),
+        ]
+    )
+
+
+def clip_manifest_schema():
+    """Typed Arrow schema of clip manifest rows (``CLIP_MANIFEST_FIELDS``)."""
+    pa = _pa()
+    return pa.schema(
+        [
+            pa.field("clip_id", pa.string()),
+            pa.field("video_id", pa.string()),
+            pa.field("start_s", pa.float64()),
+            pa.field("end_s", pa.float64()),
+            pa.field("frame_start", pa.int64()),
+            pa.field("frame_end", pa.int64()),
+            pa.field("overlap_s", pa.float64()),
+            pa.field("scenedetect_failed", pa.bool_()),
+            pa.field("status", pa.string()),
+            pa.field("last_error", pa.string()),
+            pa.field("retry_count", pa.int32()),
+        ]
+    )
+
+
+def mask_schema():
+    """Arrow schema of per-frame mask rows (masks.parquet)."""
+    pa = _pa()
+    return pa.schema(
+        [
+            pa.field("frame_index", pa.int64()),
+            pa.field("timestamp_s", pa.float64()),
+            pa.field("mask_rle", pa.string()),
+        ]
+    )
+
+
+def mask_output_schema(encoding: str = "rle"):
+    """Schema of masks.parquet: mask rows plus stats computed from the RLE at write time.
+
+    ``mask_bbox`` is COCO-style [x, y, w, h] in mask pixels, zeros when empty.
+    ``rle_delta`` adds ``mask_key_frame``; area and bbox describe the full mask.
+    """
+    pa = _pa()
+    fields = list(mask_schema()) + [
+        pa.field("mask_area", pa.int64()),
+        pa.field("mask_bbox", pa.list_(pa.int32(), 4)),
+    ]
+    if encoding == "rle_delta":
+        fields.append(pa.field("mask_key_frame", pa.int64()))
+    return pa.schema(fields)
+
+
+def object_mask_schema():
+    """Schema of objects.parquet: one row per tracked object and frame.
+
+    ``bbox`` is [x, y, w, h] in mask pixels; ``mask_rle`` is the COCO RLE of the
+    bbox crop. ``phrase``/``score`` are the GroundingDINO detection that created
+    the track; ``mask_height``/``mask_width`` give the full mask size.
+    """
+    pa = _pa()
+    return pa.schema(
+        [
+            pa.field("frame_index", pa.int64()),
+            pa.field("timestamp_s", pa.float64()),
+            pa.field("obj_id", pa.int32()),
+            pa.field("bbox", pa.list_(pa.int32(), 4)),
+            pa.field("mask_area", pa.int64()),
+            pa.field("mask_rle", pa.string()),
+            pa.field("phrase", pa.string()),
+            pa.field("score", pa.float32()),
+            pa.field("mask_height", pa.int32()),
+            pa.field("mask_width", pa.int32()),
+        ]
+    )
+
+
+def pose_schema():
+    """Arrow schema of per-frame pose rows (hand/object pose, mapping, fast3r)."""
+    pa = _pa()
+    return pa.schema(
+        [
+            pa.field("frame_index", pa.int64()),
+            pa.field("timestamp_s", pa.float64()),
+            pa.field("pose", pa.list_(pa.float32())),
+        ]
+    )
@@ -0,0 +1,73 @@
+"""Columnar manifest I/O: typed Arrow tables from JSONL or Parquet manifests."""
+
+from __future__ import annotations
+
+from typing import Any, Optional
+
+from egoworld.io.fs import filesystem_for, is_url
+from egoworld.manifests.schema import clip_manifest_schema, video_manifest_schema
+
+
+JSON_BLOCK_SIZE = 16 * 1024 * 1024
+
+
+def _pa():  # pragma: no cover - optional dependency
+    import pyarrow as pa
+    import pyarrow.json as pajson
+    import pyarrow.parquet as pq
+
+    return pa, pajson, pq
+
+
+def manifest_format(path: str) -> str:
+    return "parquet" if path.endswith(".parquet") else "jsonl"
+
+
+def conform(table: Any, schema: Any) -> Any:
+    """Cast ``table`` to ``schema``; missing fields become nulls, extra columns are kept last."""
+    pa, _, _ = _pa()
+    columns, fields = [], []
+    for field in schema:
+        if field.name in table.column_names:
+            column = table.column(field.name)
+            columns.append(column if column.type == field.type else column.cast(field.type))
+        else:
+            columns.append(pa.nulls(table.num_rows, field.type))
+        fields.append(field)
+    for name in table.column_names:
+        if name not in schema.names:
+            columns.append(table.column(name))
+            fields.append(table.schema.field(name))
+    return pa.Table.from_arrays(columns, schema=pa.schema(fields))
+
+
+def read_manifest_table(path: str, schema: Optional[Any] = None) -> Any:
+    """Manifest rows as an Arrow table.
+
+    JSONL goes through pyarrow's multithreaded JSON reader (``schema`` fixes
+    the column types, other fields are inferred); Parquet is read directly.
+    With a schema the result is conformed to it, so manifests written before a
+    field existed read with nulls in that column.
+    """
+    pa, pajson, pq = _pa()
+    fs = filesystem_for(path)
+    if manifest_format(path) == "parquet":
+        with fs.open_input(path) as handle:
+            table = pq.read_table(handle)
+    elif not fs.size(path):
+        table = (schema or pa.schema([])).empty_table()
+    else:
+        read_options = pajson.ReadOptions(use_threads=True, block_size=JSON_BLOCK_SIZE)
+        parse_options = pajson.ParseOptions(explicit_schema=schema, unexpected_field_behavior="infer")
+        source = fs.open_input(path) if is_url(path) else path
+        table = pajson.read_json(source, read_options=read_options, parse_options=parse_options)
+    return conform(table, schema) if schema is not None else table
+
+
+def read_video_manifest(path: str) -> Any:
+    return read_manifest_table(path, video_manifest_schema())
+
+
+def read_clip_manifest(path: str) -> Any:
+    return read_manifest_table(path, clip_manifest_schema())
+
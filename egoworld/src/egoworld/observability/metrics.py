@@ -7,6 +7,9 @@ from typing import Any
 
 
 class _NoOp:
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        return None
+
     def inc(self, *args: Any, **kwargs: Any) -> None:
         return None
 
@@ -16,6 +19,9 @@ class _NoOp:
     def set(self, *args: Any, **kwargs: Any) -> None:
         return None
 
+    def labels(self, *args: Any, **kwargs: Any) -> "_NoOp":
+        return self
+
 
 def _get_metrics():
     try:
@@ -33,6 +39,7 @@ class Metrics:
     stage_latency: Any
     gpu_util: Any
     failure_count: Any
+    write_latency: Any
 
 
 _def_counter, _def_gauge, _def_hist = _get_metrics()
@@ -43,4 +50,5 @@ DEFAULT_METRICS = Metrics(
     stage_latency=_def_hist("stage_latency_seconds", "Stage latency", ["stage"]),
     gpu_util=_def_gauge("gpu_utilization", "GPU utilization"),
     failure_count=_def_counter("clip_failures_total", "Total clip failures"),
+    write_latency=_def_hist("write_latency_seconds", "Clip write latency", ["writer"]),
 )
@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from typing import Dict, Iterable, List
+from typing import Dict, Iterable, List, Optional
 
 
 def empty_mask_rate(masks: Iterable[Dict[str, object]]) -> float:
@@ -22,3 +22,17 @@ def distribution_stats(values: List[float]) -> Dict[str, float]:
         "max": max(values),
         "mean": total / len(values),
     }
+
+
+def mask_area_stats(mask_rles: List[object], areas: Optional[List[int]] = None) -> Dict[str, float]:
+    """Area distribution and empty rate for RLE masks, without decoding them.
+
+    ``areas`` may be passed straight from the ``mask_area`` column.
+    """
+    if areas is None:
+        from egoworld.utils.rle import areas as rle_areas
+
+        areas = [int(a) for a in rle_areas(mask_rles)]
+    stats = distribution_stats([float(a) for a in areas])
+    stats["empty_rate"] = (sum(1 for a in areas if a == 0) / len(areas)) if areas else 1.0
+    return stats
@@ -0,0 +1,49 @@
+"""Run summary counters written next to the run manifest."""
+
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass
+from typing import Any, Dict
+import resource
+import sys
+
+
+@dataclass
+class RunSummary:
+    run_id: str
+    mode: str = "clip"
+    clips_total: int = 0
+    clips_done: int = 0
+    clips_failed: int = 0
+    frames_processed: int = 0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    writer_mode: str = "pool"
+    num_writers: int = 1
+    write_queue_max: int = 0
+    write_latency_s_max: float = 0.0
+    write_s_total: float = 0.0
+    files_skipped: int = 0
+    bytes_skipped: int = 0
+    driver_result_bytes: int = 0
+    driver_peak_rss_bytes: int = 0
+    clips_aliased: int = 0
+    gpu_s_total: float = 0.0
+    gpu_video_s: float = 0.0
+    gpu_hours_saved: float = 0.0
+    clips_skipped: int = 0
+    clips_deprioritized: int = 0
+    clips_triage_reused: int = 0
+    triage_s: float = 0.0
+    triage_gpu_s_saved: float = 0.0
+    wall_time_s: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def peak_rss_bytes() -> int:
+    """Peak resident set size of this process."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes on Linux.
+    return int(peak) if sys.platform == "darwin" else int(peak) * 1024
@@ -103,6 +103,13 @@ class GroundingDINOOperator:
                 pass
 
 
+def select_detections(detections: List[Detection], box_threshold: float, max_boxes: int) -> List[Detection]:
+    """Apply a box threshold and top-k to raw detections (highest score first)."""
+    kept = [d for d in detections if d.score > box_threshold]
+    kept.sort(key=lambda d: d.score, reverse=True)
+    return kept[:max_boxes]
+
+
 def _write_image(path: str, image_rgb: np.ndarray) -> None:
     import cv2
 
@@ -3,18 +3,28 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, Dict, List, Tuple
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+import logging
 import os
+import shutil
 import subprocess
+import sys
 import tempfile
 
 import numpy as np
 
+from egoworld.io.detection_store import DetectionStore
+from egoworld.io.frames import MaskFrameBuilder, ObjectFrameBuilder
+from egoworld.io.sidecar import SidecarStore
 from egoworld.operators.base import Operator
-from egoworld.operators.groundingdino_op import GroundingDINOOperator
+from egoworld.operators.groundingdino_op import Detection, GroundingDINOOperator, select_detections
+from egoworld.utils.hashing import sha256_file, sha256_text
 from egoworld.utils.mask import encode_mask_rle
 from egoworld.utils.video import get_video_info, iter_frames, seconds_from_frames
 
+logger = logging.getLogger(__name__)
+
 
 @dataclass
 class PromptConfig:
@@ -30,6 +40,35 @@ class PromptConfig:
     gd_config: str = "./models/groundingdino/GroundingDINO_SwinT_OGC.py"
     gd_checkpoint: str = "./models/groundingdino/groundingdino_swint_ogc.pth"
     gd_device: str = "cuda"
+    detection_store: str = ""
+    raw_box_threshold: float = 0.1
+    raw_text_threshold: float = 0.25
+    sidecar_dir: str = ""
+
+
+@dataclass
+class WindowConfig:
+    window_frames: int = 0
+    overlap_frames: int = 8
+    offload_video_to_cpu: bool = False
+    offload_state_to_cpu: bool = False
+
+    def init_state_kwargs(self) -> Dict[str, Any]:
+        kwargs: Dict[str, Any] = {}
+        if self.offload_video_to_cpu:
+            kwargs["offload_video_to_cpu"] = True
+        if self.offload_state_to_cpu:
+            kwargs["offload_state_to_cpu"] = True
+        return kwargs
+
+
+@dataclass
+class BoxPrompt:
+    frame_idx: int
+    obj_id: int
+    box: Tuple[float, float, float, float]
+    phrase: str = ""
+    score: float = 0.0
 
 
 class Sam2Operator(Operator):
@@ -81,6 +120,7 @@ class Sam2Operator(Operator):
         start_s: float,
         end_s: float,
         params: Dict[str, Any] | None = None,
+        checksum: str = "",
     ) -> Dict[str, Any]:
         params = params or self.params
         self._ensure_predictor()
@@ -93,14 +133,18 @@ class Sam2Operator(Operator):
         fps = video_info.fps or 30.0
 
         prompt_cfg = _load_prompt_config(params.get("prompting", {}))
-        prompt_frames = _collect_prompt_frames(
-            clip_path,
-            prompt_cfg.prompt_interval_s,
-            prompt_cfg.max_prompts_per_clip,
-        )
+        window_cfg = _load_window_config(params.get("windowing", {}))
+        union_masks, object_masks = _mask_streams(params)
+        prompt_frames = _sidecar_prompt_frames(prompt_cfg, checksum, start_s, end_s, fps)
+        if prompt_frames is None:
+            prompt_frames = _collect_prompt_frames(
+                clip_path,
+                prompt_cfg.prompt_interval_s,
+                prompt_cfg.max_prompts_per_clip,
+            )
 
         if not prompt_frames:
-            return _empty_result(video_path, start_s, end_s)
+            return _empty_result(video_path, start_s, end_s, params)
 
         gd = None
         if prompt_cfg.source == "groundingdino":
@@ -113,64 +157,69 @@ class Sam2Operator(Operator):
 
         try:
             with torch.inference_mode(), torch.autocast(device_type=device_type, dtype=autocast_dtype):
-                state = _init_state_with_fallback(predictor, clip_path)
-                obj_id = 1
-                tracked_boxes: Dict[int, Tuple[float, float, float, float]] = {}
-
-                for frame_idx, _, frame_rgb in prompt_frames:
-                    detections: List[Tuple[float, float, float, float]] = []
-                    if gd is not None:
-                        results = gd.predict(
-                            frame_rgb,
-                            prompt_cfg.prompt_text,
-                            box_threshold=prompt_cfg.box_threshold,
-                            text_threshold=prompt_cfg.text_threshold,
-                            max_boxes=prompt_cfg.max_boxes_per_frame,
-                        )
-                        detections = [d.box_xyxy for d in results]
-
-                    detections = _filter_boxes(detections, prompt_cfg.min_box_area, prompt_cfg.nms_iou)
-
-                    for box in detections:
-                        matched_id = _match_box(tracked_boxes, box, iou_threshold=0.5)
-                        if matched_id is None:
-                            matched_id = obj_id
-                            obj_id += 1
-                        tracked_boxes[matched_id] = box
-                        _add_box_prompt(predictor, state, frame_idx, matched_id, box)
-
-                if not tracked_boxes:
-                    return _empty_result(video_path, start_s, end_s)
-
-                frames: List[Dict[str, Any]] = []
+                prompts = _detect_prompts(
+                    gd,
+                    prompt_frames,
+                    prompt_cfg,
+                    checksum=checksum,
+                    frame_offset=int(round(start_s * fps)),
+                    frame_width=video_info.width,
+                )
+                if not prompts:
+                    return _empty_result(video_path, start_s, end_s, params)
+
+                window_stats: List[Dict[str, Any]] = []
+                if window_cfg.window_frames > 0:
+                    windows = _iter_window_dirs(
+                        _decode_frames(clip_path),
+                        window_cfg.window_frames,
+                        window_cfg.overlap_frames,
+                    )
+                    propagation = _propagate_windowed(
+                        predictor,
+                        windows,
+                        _prompts_in_range(prompts),
+                        window_cfg,
+                        window_stats,
+                    )
+                else:
+                    propagation = _propagate_full(predictor, clip_path, prompts, window_cfg)
+
+                frames = MaskFrameBuilder()
+                objects = ObjectFrameBuilder()
+                origins = _track_origins(prompts)
                 empty_count = 0
                 total_count = 0
 
-                for out_frame_idx, _, out_mask_logits in predictor.propagate_in_video(state):
+                for out_frame_idx, obj_ids, masks in propagation:
                     total_count += 1
-                    mask = _union_masks(out_mask_logits)
+                    frame_index = out_frame_idx + int(round(start_s * fps))
+                    timestamp_s = seconds_from_frames(frame_index, fps)
+                    if object_masks:
+                        objects.append(frame_index, timestamp_s, obj_ids, masks, origins)
+                    mask = _union_masks(masks)
                     if mask is None:
                         empty_count += 1
                         continue
-                    rle = encode_mask_rle(mask)
-                    frame_index = out_frame_idx + int(round(start_s * fps))
-                    frames.append(
-                        {
-                            "frame_index": int(frame_index),
-                            "timestamp_s": float(seconds_from_frames(frame_index, fps)),
-                            "mask_rle": rle,
-                        }
-                    )
+                    if union_masks:
+                        frames.append(frame_index, timestamp_s, encode_mask_rle(mask))
 
                 empty_rate = empty_count / max(1, total_count)
-                return {
-                    "frames": frames,
+                result = {
                     "mask_encoding": "rle",
                     "empty_mask_rate": float(empty_rate),
+                    "frames_processed": total_count,
                     "start_s": start_s,
                     "end_s": end_s,
                     "video_path": video_path,
                 }
+                if union_masks:
+                    result["frames"] = frames.to_batch()
+                if object_masks:
+                    result["objects"] = objects.to_batch()
+                if window_stats:
+                    result["windows"] = window_stats
+                return result
         finally:
             if clip_path != video_path:
                 try:
@@ -178,6 +227,82 @@ class Sam2Operator(Operator):
                 except OSError:
                     pass
 
+    def run_session(
+        self,
+        video_path: str,
+        segments: List[Tuple[int, int]],
+        params: Dict[str, Any] | None = None,
+        checksum: str = "",
+    ) -> Dict[str, Any]:
+        """Track consecutive segments of one video in a single decode pass.
+
+        ``segments`` are non-overlapping [frame_start, frame_end) ranges in
+        frame order. SAM2 state and object ids are reset at every segment
+        boundary, and each frame is decoded and tracked exactly once.
+        """
+        params = params or self.params
+        self._ensure_predictor()
+        predictor = self._predictor
+
+        precision = params.get("precision", "bf16")
+        device = params.get("device", "cuda")
+        fps = get_video_info(video_path).fps or 30.0
+        prompt_cfg = _load_prompt_config(params.get("prompting", {}))
+        window_cfg = _load_window_config(params.get("windowing", {}))
+        union_masks, object_masks = _mask_streams(params)
+        stride = max(1, int(round(prompt_cfg.prompt_interval_s * fps)))
+        window_frames = window_cfg.window_frames if window_cfg.window_frames > 0 else sys.maxsize
+
+        def keep(frame_idx: int) -> bool:
+            return frame_idx % stride == 0 and frame_idx // stride < prompt_cfg.max_prompts_per_clip
+
+        gd = None
+        if prompt_cfg.source == "groundingdino":
+            gd = self._ensure_groundingdino(prompt_cfg)
+
+        frames = MaskFrameBuilder()
+        objects = ObjectFrameBuilder()
+        tracked: List[int] = []
+        empty: List[int] = []
+        window_stats: List[Dict[str, Any]] = []
+        streams = (frames if union_masks else None, objects if object_masks else None)
+        if not segments:
+            return _session_result(video_path, streams, tracked, empty, 0, window_stats)
+
+        import torch
+
+        autocast_dtype = torch.bfloat16 if precision == "bf16" else torch.float16
+        device_type = "cuda" if "cuda" in device else "cpu"
+
+        cursor = _FrameCursor(video_path, segments[0][0], fps)
+        try:
+            with torch.inference_mode(), torch.autocast(device_type=device_type, dtype=autocast_dtype):
+                for seg_start, seg_end in segments:
+                    tracker = _PromptTracker(gd, prompt_cfg, checksum=checksum, frame_offset=seg_start)
+                    windows = _iter_window_dirs(
+                        cursor.take(seg_start, seg_end),
+                        window_frames,
+                        window_cfg.overlap_frames,
+                        keep=keep,
+                    )
+                    for local_idx, obj_ids, masks in _propagate_windowed(
+                        predictor, windows, tracker.prompts_for_window, window_cfg, window_stats
+                    ):
+                        frame_index = seg_start + local_idx
+                        timestamp_s = seconds_from_frames(frame_index, fps)
+                        tracked.append(frame_index)
+                        if object_masks:
+                            objects.append(frame_index, timestamp_s, obj_ids, masks, tracker.origins)
+                        mask = _union_masks(masks)
+                        if mask is None:
+                            empty.append(frame_index)
+                            continue
+                        if union_masks:
+                            frames.append(frame_index, timestamp_s, encode_mask_rle(mask))
+        finally:
+            cursor.close()
+        return _session_result(video_path, streams, tracked, empty, len(segments), window_stats)
+
 
 def _load_prompt_config(raw: Dict[str, Any]) -> PromptConfig:
     return PromptConfig(
@@ -195,9 +320,412 @@ def _load_prompt_config(raw: Dict[str, Any]) -> PromptConfig:
             "gd_checkpoint", "./models/groundingdino/groundingdino_swint_ogc.pth"
         ),
         gd_device=raw.get("gd_device", "cuda"),
+        detection_store=raw.get("detection_store", ""),
+        raw_box_threshold=float(raw.get("raw_box_threshold", 0.1)),
+        raw_text_threshold=float(raw.get("raw_text_threshold", 0.25)),
+        sidecar_dir=raw.get("sidecar_dir", ""),
+    )
+
+
+def _mask_streams(params: Dict[str, Any]) -> Tuple[bool, bool]:
+    """(union, objects): which mask outputs to produce; the one place their defaults live."""
+    return bool(params.get("union_masks", True)), bool(params.get("object_masks", True))
+
+
+def _load_window_config(raw: Dict[str, Any]) -> WindowConfig:
+    return WindowConfig(
+        window_frames=int(raw.get("window_frames", 0)),
+        overlap_frames=max(1, int(raw.get("overlap_frames", 8))),
+        offload_video_to_cpu=bool(raw.get("offload_video_to_cpu", False)),
+        offload_state_to_cpu=bool(raw.get("offload_state_to_cpu", False)),
     )
 
 
+@lru_cache(maxsize=8)
+def _hash_checkpoint(path: str, size: int, mtime_ns: int) -> str:
+    return sha256_file(path)
+
+
+def checkpoint_id(path: str) -> str:
+    """Content hash of a model checkpoint, or its absolute path when it cannot be read.
+
+    Hashes are cached per process by path, size and mtime.
+    """
+    path = os.path.abspath(path)
+    try:
+        st = os.stat(path)
+    except OSError:
+        return path
+    return _hash_checkpoint(path, int(st.st_size), int(st.st_mtime_ns))
+
+
+def _store_bypass_reason(cfg: PromptConfig) -> str:
+    """Why the detection store cannot serve ``cfg``, or "" when it can."""
+    if cfg.box_threshold < cfg.raw_box_threshold:
+        return f"box_threshold {cfg.box_threshold} is below raw_box_threshold {cfg.raw_box_threshold}"
+    if cfg.text_threshold != cfg.raw_text_threshold:
+        # Phrases are extracted per token at predict time and cannot be refiltered.
+        return f"text_threshold {cfg.text_threshold} differs from raw_text_threshold {cfg.raw_text_threshold}"
+    return ""
+
+
+@lru_cache(maxsize=None)
+def _log_store_bypass(path: str, reason: str) -> None:
+    logger.warning("Detection store %s bypassed: %s", path, reason)
+
+
+class _PromptTracker:
+    """GroundingDINO prompting with object ids that stay stable across frames."""
+
+    def __init__(
+        self,
+        gd: GroundingDINOOperator | None,
+        prompt_cfg: PromptConfig,
+        checksum: str = "",
+        frame_offset: int = 0,
+    ):
+        self.gd = gd
+        self.prompt_cfg = prompt_cfg
+        self.tracked_boxes: Dict[int, Tuple[float, float, float, float]] = {}
+        # obj_id -> (phrase, score) of the detection that created the track.
+        self.origins: Dict[int, Tuple[str, float]] = {}
+        self.next_obj_id = 1
+        self.frame_offset = frame_offset
+        self.checksum = checksum
+        self.store: DetectionStore | None = None
+        self.checkpoint = ""
+        if prompt_cfg.detection_store and checksum:
+            reason = _store_bypass_reason(prompt_cfg)
+            if reason:
+                _log_store_bypass(prompt_cfg.detection_store, reason)
+            else:
+                self.store = DetectionStore(prompt_cfg.detection_store)
+                self.checkpoint = checkpoint_id(prompt_cfg.gd_checkpoint)
+        self.gd_forwards = 0
+
+    def _raw_detections(self, frame_idx: int, frame_rgb: np.ndarray, scale: float) -> List[Detection]:
+        cfg = self.prompt_cfg
+        key = (
+            self.checksum,
+            self.frame_offset + int(frame_idx),
+            f"{frame_rgb.shape[1]}x{frame_rgb.shape[0]}",
+            sha256_text(cfg.prompt_text),
+            self.checkpoint,
+            cfg.raw_box_threshold,
+            cfg.raw_text_threshold,
+        )
+        cached = self.store.get(*key)
+        if cached is not None:
+            boxes, scores, phrases = cached
+            return [Detection(tuple(b), float(sc), str(ph)) for b, sc, ph in zip(boxes, scores, phrases)]
+        self.gd_forwards += 1
+        raw = _scale_detections(
+            self.gd.predict(
+                frame_rgb,
+                cfg.prompt_text,
+                box_threshold=cfg.raw_box_threshold,
+                text_threshold=cfg.raw_text_threshold,
+                max_boxes=sys.maxsize,
+            ),
+            scale,
+        )
+        self.store.put(
+            *key,
+            (
+                [list(d.box_xyxy) for d in raw],
+                [d.score for d in raw],
+                [d.phrase for d in raw],
+            ),
+        )
+        return raw
+
+    def detect(self, frame_idx: int, frame_rgb: np.ndarray, scale: float = 1.0) -> List[BoxPrompt]:
+        """Prompts for one frame; ``scale`` maps boxes from a thumbnail back to clip pixels."""
+        cfg = self.prompt_cfg
+        detections: List[Detection] = []
+        if self.gd is not None and self.store is not None:
+            detections = select_detections(
+                self._raw_detections(frame_idx, frame_rgb, scale),
+                cfg.box_threshold,
+                cfg.max_boxes_per_frame,
+            )
+        elif self.gd is not None:
+            self.gd_forwards += 1
+            detections = _scale_detections(
+                self.gd.predict(
+                    frame_rgb,
+                    cfg.prompt_text,
+                    box_threshold=cfg.box_threshold,
+                    text_threshold=cfg.text_threshold,
+                    max_boxes=cfg.max_boxes_per_frame,
+                ),
+                scale,
+            )
+
+        detections = _filter_detections(detections, cfg.min_box_area, cfg.nms_iou)
+
+        prompts: List[BoxPrompt] = []
+        for det in detections:
+            box = tuple(det.box_xyxy)
+            matched_id = _match_box(self.tracked_boxes, box, iou_threshold=0.5)
+            if matched_id is None:
+                matched_id = self.next_obj_id
+                self.next_obj_id += 1
+                self.origins[matched_id] = (str(det.phrase), float(det.score))
+            self.tracked_boxes[matched_id] = box
+            prompts.append(
+                BoxPrompt(
+                    frame_idx=int(frame_idx),
+                    obj_id=matched_id,
+                    box=box,
+                    phrase=str(det.phrase),
+                    score=float(det.score),
+                )
+            )
+        return prompts
+
+    def prompts_for_window(
+        self,
+        win_start: int,
+        count: int,
+        kept: List[Tuple[int, np.ndarray]],
+    ) -> List[BoxPrompt]:
+        prompts: List[BoxPrompt] = []
+        for frame_idx, frame_rgb in kept:
+            prompts.extend(self.detect(frame_idx, frame_rgb))
+        return prompts
+
+
+def _detect_prompts(
+    gd: GroundingDINOOperator | None,
+    prompt_frames: List[Tuple[int, float, np.ndarray]],
+    prompt_cfg: PromptConfig,
+    checksum: str = "",
+    frame_offset: int = 0,
+    frame_width: int = 0,
+) -> List[BoxPrompt]:
+    tracker = _PromptTracker(gd, prompt_cfg, checksum=checksum, frame_offset=frame_offset)
+    prompts: List[BoxPrompt] = []
+    for frame_idx, _, frame_rgb in prompt_frames:
+        scale = frame_width / frame_rgb.shape[1] if frame_width else 1.0
+        prompts.extend(tracker.detect(frame_idx, frame_rgb, scale))
+    return prompts
+
+
+def _scale_detections(detections: List[Detection], scale: float) -> List[Detection]:
+    if scale == 1.0:
+        return detections
+    return [Detection(tuple(v * scale for v in d.box_xyxy), d.score, d.phrase) for d in detections]
+
+
+def _track_origins(prompts: List[BoxPrompt]) -> Dict[int, Tuple[str, float]]:
+    """obj_id -> (phrase, score) of the first prompt of each track."""
+    origins: Dict[int, Tuple[str, float]] = {}
+    for prompt in prompts:
+        origins.setdefault(prompt.obj_id, (prompt.phrase, prompt.score))
+    return origins
+
+
+def _prompts_in_range(prompts: List[BoxPrompt]) -> Callable[[int, int, List[Tuple[int, np.ndarray]]], List[BoxPrompt]]:
+    def select(win_start: int, count: int, kept: List[Tuple[int, np.ndarray]]) -> List[BoxPrompt]:
+        return [p for p in prompts if win_start <= p.frame_idx < win_start + count]
+
+    return select
+
+
+def _propagate_full(
+    predictor: Any,
+    clip_path: str,
+    prompts: List[BoxPrompt],
+    window_cfg: WindowConfig,
+) -> Iterator[Tuple[int, List[int], np.ndarray]]:
+    state = _init_state_with_fallback(predictor, clip_path, **window_cfg.init_state_kwargs())
+    for prompt in prompts:
+        _add_box_prompt(predictor, state, prompt.frame_idx, prompt.obj_id, prompt.box)
+    for out_frame_idx, out_obj_ids, out_mask_logits in predictor.propagate_in_video(state):
+        yield int(out_frame_idx), [int(i) for i in out_obj_ids], _logits_to_masks(out_mask_logits)
+
+
+_NO_MASKS = np.zeros((0, 0, 0), dtype=bool)
+
+
+def _propagate_windowed(
+    predictor: Any,
+    windows: Iterator[Tuple[int, str, int, int, List[Tuple[int, np.ndarray]]]],
+    prompts_for_window: Callable[[int, int, List[Tuple[int, np.ndarray]]], List[BoxPrompt]],
+    window_cfg: WindowConfig,
+    window_stats: List[Dict[str, Any]],
+) -> Iterator[Tuple[int, List[int], np.ndarray]]:
+    """Propagate over overlapping windows so memory is bounded by window size.
+
+    Each window gets its own inference state. The last masks of every live
+    object at the first frame of the next window are carried over as mask
+    prompts; overlap frames are re-tracked for warm-up but emitted only once.
+    A window with no live objects and no prompts is not tracked; once
+    tracking has started its frames are emitted as empty, as whole-clip
+    propagation would, so ``empty_mask_rate`` keeps the same denominator.
+    """
+    carry: Dict[int, np.ndarray] = {}
+    started = False
+    for win_start, win_dir, count, carried, kept in windows:
+        local_prompts = prompts_for_window(win_start, count, kept)
+        if not carry and not local_prompts:
+            if started:
+                for local_idx in range(carried, count):
+                    yield win_start + local_idx, [], _NO_MASKS
+                window_stats.append({"start_frame": win_start, "num_frames": count, "skipped": True})
+            continue
+        started = True
+        _reset_peak_memory()
+        state = _init_state_with_fallback(predictor, win_dir, **window_cfg.init_state_kwargs())
+        for obj_id, mask in carry.items():
+            _add_mask_prompt(predictor, state, 0, obj_id, mask)
+        for prompt in local_prompts:
+            _add_box_prompt(predictor, state, prompt.frame_idx - win_start, prompt.obj_id, prompt.box)
+
+        carry_frame = count - min(window_cfg.overlap_frames, count)
+        next_carry: Dict[int, np.ndarray] = {}
+        for out_frame_idx, out_obj_ids, out_mask_logits in predictor.propagate_in_video(state):
+            local_idx = int(out_frame_idx)
+            obj_ids = [int(i) for i in out_obj_ids]
+            masks = _logits_to_masks(out_mask_logits)
+            if local_idx == carry_frame:
+                next_carry = {oid: m for oid, m in zip(obj_ids, masks) if m.any()}
+            if local_idx >= carried:
+                yield win_start + local_idx, obj_ids, masks
+        carry = next_carry
+
+        _reset_state(predictor, state)
+        del state
+        stats = {
+            "start_frame": win_start,
+            "num_frames": count,
+            "num_objects": len(carry),
+            "peak_gpu_mem_bytes": _peak_memory_bytes(),
+        }
+        window_stats.append(stats)
+        logger.info(
+            "sam2 window start=%d frames=%d carried_objects=%d peak_gpu_mem_bytes=%d",
+            win_start,
+            count,
+            len(carry),
+            stats["peak_gpu_mem_bytes"],
+        )
+
+
+def _decode_frames(video_path: str) -> Iterator[Tuple[int, np.ndarray]]:
+    for frame_idx, _, frame_rgb in iter_frames(video_path, 0.0, 1e9, 1):
+        yield frame_idx, frame_rgb
+
+
+class _FrameCursor:
+    """Sequential decoder shared by consecutive segments of one video."""
+
+    def __init__(self, video_path: str, start_frame: int, fps: float):
+        self._start_frame = start_frame
+        self._frames = iter_frames(video_path, seconds_from_frames(start_frame, fps), 1e9, 1)
+        self._pending: Tuple[int, np.ndarray] | None = None
+
+    def take(self, start: int, end: int) -> Iterator[Tuple[int, np.ndarray]]:
+        """Yield (index relative to start, frame) for absolute frames in [start, end)."""
+        while True:
+            if self._pending is None:
+                item = next(self._frames, None)
+                if item is None:
+                    return
+                self._pending = (self._start_frame + item[0], item[2])
+            frame_idx, frame_rgb = self._pending
+            if frame_idx >= end:
+                return
+            self._pending = None
+            if frame_idx >= start:
+                yield frame_idx - start, frame_rgb
+
+    def close(self) -> None:
+        self._frames.close()
+
+
+def _iter_window_dirs(
+    frames: Iterator[Tuple[int, np.ndarray]],
+    window_frames: int,
+    overlap_frames: int,
+    keep: Callable[[int], bool] | None = None,
+) -> Iterator[Tuple[int, str, int, int, List[Tuple[int, np.ndarray]]]]:
+    """Write frames into rolling JPEG windows.
+
+    Yields (start_frame, jpeg_dir, num_frames, num_carried, kept_frames) where
+    kept_frames are the new frames selected by ``keep`` (e.g. prompt frames).
+    Overlap frames are copied from the previous window directory instead of
+    being decoded again. Only one window directory lives on disk at a time.
+    """
+    import cv2
+
+    win_start = 0
+    prev_dir: str | None = None
+    prev_count = 0
+    try:
+        while True:
+            win_dir = tempfile.mkdtemp(prefix="egoworld_sam2_win_")
+            carried = 0
+            if prev_dir is not None:
+                carried = min(overlap_frames, prev_count)
+                for k in range(carried):
+                    shutil.copyfile(
+                        os.path.join(prev_dir, f"{prev_count - carried + k:05d}.jpg"),
+                        os.path.join(win_dir, f"{k:05d}.jpg"),
+                    )
+                shutil.rmtree(prev_dir, ignore_errors=True)
+                prev_dir = None
+            count = carried
+            kept: List[Tuple[int, np.ndarray]] = []
+            if count < window_frames:
+                for frame_idx, frame_rgb in frames:
+                    cv2.imwrite(
+                        os.path.join(win_dir, f"{count:05d}.jpg"),
+                        cv2.cvtColor(frame_rgb, cv2.COLOR_RGB2BGR),
+                        [cv2.IMWRITE_JPEG_QUALITY, 95],
+                    )
+                    if keep is not None and keep(frame_idx):
+                        kept.append((frame_idx, frame_rgb))
+                    count += 1
+                    if count >= window_frames:
+                        break
+            prev_dir = win_dir
+            prev_count = count
+            if count == carried:
+                return
+            yield win_start, win_dir, count, carried, kept
+            if count < window_frames:
+                return
+            win_start += count - min(overlap_frames, count)
+    finally:
+        if hasattr(frames, "close"):
+            frames.close()
+        if prev_dir is not None:
+            shutil.rmtree(prev_dir, ignore_errors=True)
+
+
+def _reset_peak_memory() -> None:
+    try:
+        import torch
+
+        if torch.cuda.is_available():
+            torch.cuda.reset_peak_memory_stats()
+    except Exception:
+        return None
+
+
+def _peak_memory_bytes() -> int:
+    try:
+        import torch
+
+        if torch.cuda.is_available():
+            return int(torch.cuda.max_memory_allocated())
+    except Exception:
+        return 0
+    return 0
+
+
 def _collect_prompt_frames(
     video_path: str,
     interval_s: float,
@@ -214,6 +742,39 @@ def _collect_prompt_frames(
     return frames
 
 
+def _sidecar_prompt_frames(
+    prompt_cfg: PromptConfig,
+    checksum: str,
+    start_s: float,
+    end_s: float,
+    fps: float,
+) -> List[Tuple[int, float, np.ndarray]] | None:
+    """Prompt frames from the manifest sidecar, or None when the clip must be decoded.
+
+    Sidecar thumbnails sit on the video's prompt grid rather than the clip's;
+    when no grid thumbnail falls on the clip's first frame, the thumbnail the
+    manifest pass stored for that clip start is used. Without one the clip
+    is decoded as if there were no sidecar, so the source is never read here.
+    """
+    if not prompt_cfg.sidecar_dir or not checksum:
+        return None
+    sidecar = SidecarStore(prompt_cfg.sidecar_dir).open(checksum, prompt_cfg.prompt_interval_s)
+    if sidecar is None or sidecar.thumbs is None or abs(sidecar.fps - fps) > 0.01:
+        return None
+    offset = int(round(start_s * fps))
+    end = int(round(end_s * fps)) + 1 if end_s > 0 else sys.maxsize
+    frames = [
+        (frame_idx - offset, seconds_from_frames(frame_idx - offset, fps), frame_rgb)
+        for frame_idx, frame_rgb in sidecar.prompt_frames(offset, end, prompt_cfg.max_prompts_per_clip)
+    ]
+    if not frames or frames[0][0] > 0:
+        first = sidecar.clip_start(offset)
+        if first is None:
+            return None
+        frames = [(0, 0.0, first)] + frames
+    return frames[: prompt_cfg.max_prompts_per_clip]
+
+
 def _extract_clip(video_path: str, start_s: float, end_s: float) -> str:
     if start_s <= 0 and end_s <= 0:
         return video_path
@@ -244,13 +805,26 @@ def _extract_clip(video_path: str, start_s: float, end_s: float) -> str:
         return video_path
 
 
-def _init_state_with_fallback(predictor: Any, clip_path: str) -> Any:
+def _init_state_with_fallback(predictor: Any, clip_path: str, **kwargs: Any) -> Any:
+    if kwargs:
+        try:
+            return predictor.init_state(video_path=clip_path, **kwargs)
+        except TypeError:
+            pass
     try:
         return predictor.init_state(clip_path)
     except Exception:
         return predictor.init_state(video_path=clip_path)
 
 
+def _reset_state(predictor: Any, state: Any) -> None:
+    if hasattr(predictor, "reset_state"):
+        try:
+            predictor.reset_state(state)
+        except Exception:
+            return None
+
+
 def _add_box_prompt(predictor: Any, state: Any, frame_idx: int, obj_id: int, box: Tuple[float, float, float, float]) -> None:
     try:
         predictor.add_new_points_or_box(
@@ -263,6 +837,26 @@ def _add_box_prompt(predictor: Any, state: Any, frame_idx: int, obj_id: int, box
         predictor.add_new_points_or_box(state, frame_idx, obj_id, box)
 
 
+def _add_mask_prompt(predictor: Any, state: Any, frame_idx: int, obj_id: int, mask: np.ndarray) -> None:
+    try:
+        predictor.add_new_mask(state, frame_idx=frame_idx, obj_id=obj_id, mask=mask.astype(bool))
+    except TypeError:
+        predictor.add_new_mask(state, frame_idx, obj_id, mask.astype(bool))
+
+
+def _logits_to_masks(mask_logits: Any) -> np.ndarray:
+    """Convert SAM2 logits (N, 1, H, W) into boolean masks (N, H, W)."""
+    masks = mask_logits
+    if hasattr(mask_logits, "detach"):
+        masks = (mask_logits > 0).detach().cpu().numpy()
+    masks = np.asarray(masks)
+    if masks.ndim == 2:
+        masks = masks[None]
+    if masks.size == 0:
+        return np.zeros((0, 0, 0), dtype=bool)
+    return masks.reshape(-1, masks.shape[-2], masks.shape[-1]) > 0
+
+
 def _union_masks(mask_logits: Any) -> np.ndarray | None:
     if mask_logits is None:
         return None
@@ -274,6 +868,7 @@ def _union_masks(mask_logits: Any) -> np.ndarray | None:
         return None
     if masks.ndim == 2:
         return masks.astype(np.uint8)
+    masks = masks.reshape(-1, masks.shape[-2], masks.shape[-1])
     union = np.any(masks > 0, axis=0)
     return union.astype(np.uint8)
 
@@ -289,12 +884,28 @@ def _filter_boxes(
     return _nms(boxes, nms_iou)
 
 
+def _filter_detections(detections: List[Detection], min_area: float, nms_iou: float) -> List[Detection]:
+    """``_filter_boxes`` that keeps each box's phrase and score."""
+    detections = [d for d in detections if _box_area(d.box_xyxy) >= min_area]
+    if not detections:
+        return []
+    return [detections[i] for i in _nms_indices([d.box_xyxy for d in detections], nms_iou)]
+
+
 def _box_area(box: Tuple[float, float, float, float]) -> float:
     x1, y1, x2, y2 = box
     return max(0.0, x2 - x1) * max(0.0, y2 - y1)
 
 
 def _nms(boxes: List[Tuple[float, float, float, float]], iou_threshold: float) -> List[Tuple[float, float, float, float]]:
+    if not boxes:
+        return []
+    boxes_np = np.array(boxes)
+    return [tuple(boxes_np[i]) for i in _nms_indices(boxes, iou_threshold)]
+
+
+def _nms_indices(boxes: List[Tuple[float, float, float, float]], iou_threshold: float) -> List[int]:
+    """Indices of the boxes kept by NMS, largest area first."""
     if not boxes:
         return []
     boxes_np = np.array(boxes)
@@ -307,7 +918,7 @@ def _nms(boxes: List[Tuple[float, float, float, float]], iou_threshold: float) -
     keep = []
     while order.size > 0:
         i = order[0]
-        keep.append(tuple(boxes_np[i]))
+        keep.append(int(i))
         if order.size == 1:
             break
         xx1 = np.maximum(x1[i], x1[order[1:]])
@@ -352,15 +963,46 @@ def _iou(a: Tuple[float, float, float, float], b: Tuple[float, float, float, flo
     return inter / (area_a + area_b - inter + 1e-6)
 
 
-def _empty_result(video_path: str, start_s: float, end_s: float) -> Dict[str, Any]:
-    return {
-        "frames": [],
+def _session_result(
+    video_path: str,
+    streams: Tuple[MaskFrameBuilder | None, ObjectFrameBuilder | None],
+    tracked: List[int],
+    empty: List[int],
+    num_segments: int,
+    window_stats: List[Dict[str, Any]],
+) -> Dict[str, Any]:
+    frames, objects = streams
+    result = {
+        "tracked_frames": tracked,
+        "empty_frames": empty,
+        "mask_encoding": "rle",
+        "frames_processed": len(tracked),
+        "segments": num_segments,
+        "video_path": video_path,
+        "windows": window_stats,
+    }
+    if frames is not None:
+        result["frames"] = frames.to_batch()
+    if objects is not None:
+        result["objects"] = objects.to_batch()
+    return result
+
+
+def _empty_result(video_path: str, start_s: float, end_s: float, params: Dict[str, Any]) -> Dict[str, Any]:
+    """Result for a clip without prompts, carrying the same mask streams as a tracked clip."""
+    union_masks, object_masks = _mask_streams(params)
+    result: Dict[str, Any] = {
         "mask_encoding": "rle",
         "empty_mask_rate": 1.0,
         "start_s": start_s,
         "end_s": end_s,
         "video_path": video_path,
     }
+    if union_masks:
+        result["frames"] = []
+    if object_masks:
+        result["objects"] = []
+    return result
 
 
 def _resolve_model_cfg(config_path: str | None) -> str | None:
@@ -0,0 +1,203 @@
+"""Merge a run's per-clip Parquet files into per-video datasets."""
+
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import os
+import shutil
+import time
+
+from egoworld.config import ParquetConfig
+from egoworld.io.catalog import OutputCatalog
+from egoworld.io.fs import is_url
+from egoworld.io.paths import COMPACTED_DIR
+from egoworld.io.writers import write_json
+
+
+def _pa():  # pragma: no cover - optional dependency
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    return pa, pq
+
+
+def _plan(catalog: OutputCatalog) -> Dict[str, Dict[str, List[Dict[str, Any]]]]:
+    """Catalog entries grouped as {video_id: {stream file: [entries by clip]}}."""
+    plan: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
+    for entry in catalog.latest():
+        if not entry["file"].endswith(".parquet"):
+            continue
+        plan.setdefault(entry["video_id"], {}).setdefault(entry["file"], []).append(entry)
+    for streams in plan.values():
+        for entries in streams.values():
+            entries.sort(key=lambda e: e["clip_id"])
+    return plan
+
+
+def _compact_stream(
+    entries: List[Dict[str, Any]],
+    out_path: str,
+    row_group_bytes: int,
+    parquet: ParquetConfig,
+) -> int:
+    """Stream clip files into one Parquet file, flushing row groups at ~row_group_bytes.
+
+    Memory is bounded by one clip table plus one pending row group.
+    """
+    pa, pq = _pa()
+    writer = None
+    pending: List[Any] = []
+    pending_bytes = 0
+    total = 0
+
+    def flush() -> None:
+        nonlocal pending, pending_bytes
+        if pending:
+            table = pa.concat_tables(pending)
+            writer.write_table(table, row_group_size=table.num_rows)
+        pending, pending_bytes = [], 0
+
+    try:
+        for entry in entries:
+            table = pq.read_table(entry["path"])
+            if table.num_rows != int(entry["rows"]):
+                raise ValueError(
+                    f"row count mismatch for {entry['path']}: catalog={entry['rows']} file={table.num_rows}"
+                )
+            table = table.append_column("clip_id", pa.array([entry["clip_id"]] * table.num_rows, pa.string()))
+            if writer is None:
+                writer = pq.ParquetWriter(
+                    out_path,
+                    table.schema,
+                    compression=parquet.compression,
+                    data_page_size=parquet.data_page_size,
+                )
+            total += table.num_rows
+            if table.num_rows == 0:
+                continue
+            pending.append(table)
+            pending_bytes += table.nbytes
+            if pending_bytes >= row_group_bytes:
+                flush()
+        if writer is not None:
+            flush()
+    finally:
+        if writer is not None:
+            writer.close()
+    return total
+
+
+def _compact_video(
+    video_id: str,
+    streams: Dict[str, List[Dict[str, Any]]],
+    staging: str,
+    row_group_bytes: int,
+    parquet: Dict[str, Any],
+) -> Dict[str, Any]:
+    out_dir = Path(staging) / f"video_id={video_id}"
+    out_dir.mkdir(parents=True, exist_ok=True)
+    rows: Dict[str, int] = {}
+    for name, entries in sorted(streams.items()):
+        rows[name] = _compact_stream(entries, str(out_dir / name), row_group_bytes, ParquetConfig(**parquet))
+    return {"video_id": video_id, "rows": rows, "clips": len({e["clip_id"] for es in streams.values() for e in es})}
+
+
+def scan_seconds(paths: List[str]) -> float:
+    """Time to read every row of the given Parquet files."""
+    _, pq = _pa()
+    start = time.perf_counter()
+    for path in paths:
+        pq.read_table(path)
+    return time.perf_counter() - start
+
+
+def _publish(run_root: str, version: str) -> None:
+    """Point ``compacted`` at the version directory ``version`` with one rename.
+
+    The pointer is a relative symlink replaced with ``os.replace``, so readers
+    see the previous or the new dataset and a crash leaves one of them in
+    place. A ``compacted/`` directory from before versioned swaps is moved
+    aside first; only that one-time move leaves a moment without a compacted
+    dataset, during which readers use the per-clip layout.
+    """
+    target = os.path.join(run_root, COMPACTED_DIR)
+    if os.path.isdir(target) and not os.path.islink(target):
+        os.replace(target, os.path.join(run_root, f".{COMPACTED_DIR}-legacy"))
+    link = os.path.join(run_root, f".{COMPACTED_DIR}-{os.getpid()}.link")
+    if os.path.lexists(link):
+        os.remove(link)
+    os.symlink(version, link)
+    os.replace(link, target)
+
+
+def _remove_stale(run_root: str, keep: str) -> None:
+    """Delete versions other than ``keep``, including ones left by a failed compaction."""
+    for path in Path(run_root).glob(f".{COMPACTED_DIR}-*"):
+        if path.name == keep:
+            continue
+        if path.is_dir() and not path.is_symlink():
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            path.unlink()
+    # Left behind by the former rename-based swap.
+    shutil.rmtree(os.path.join(run_root, f"{COMPACTED_DIR}.old"), ignore_errors=True)
+
+
+def compact_run(
+    run_root: str,
+    catalog: OutputCatalog,
+    workers: Optional[int] = None,
+    row_group_bytes: int = 128 * 1024 * 1024,
+    parquet: Optional[ParquetConfig] = None,
+    measure_scan: bool = True,
+) -> Dict[str, Any]:
+    """Compact a run into ``<run_root>/compacted/video_id=*/<stream>.parquet``.
+
+    Clip files are taken from the run catalog (no directory walk), verified
+    against cataloged row counts, and written to a new version directory
+    ``.compacted-v<ns>``. Only after every video succeeded does the
+    ``compacted`` symlink switch to it (``_publish``); older versions are
+    then removed. Compactions of one run must not overlap.
+    """
+    if is_url(run_root):
+        raise ValueError("compaction needs a local or mounted output_root (symlink swap)")
+    parquet = parquet or ParquetConfig()
+    plan = _plan(catalog)
+    sources = [e["path"] for streams in plan.values() for es in streams.values() for e in es]
+    version = f".{COMPACTED_DIR}-v{time.time_ns()}"
+    staging = os.path.join(run_root, version)
+    os.makedirs(staging)
+
+    start = time.perf_counter()
+    videos: List[Dict[str, Any]] = []
+    try:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+            futures = [
+                pool.submit(_compact_video, video_id, streams, staging, row_group_bytes, asdict(parquet))
+                for video_id, streams in sorted(plan.items())
+            ]
+            videos = [future.result() for future in futures]
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    compact_s = time.perf_counter() - start
+
+    outputs = sorted(str(p) for p in Path(staging).glob("video_id=*/*.parquet"))
+    report: Dict[str, Any] = {
+        "videos": len(videos),
+        "clips": sum(v["clips"] for v in videos),
+        "rows": sum(sum(v["rows"].values()) for v in videos),
+        "files_before": len(sources),
+        "files_after": len(outputs),
+        "compact_s": compact_s,
+    }
+    if measure_scan:
+        report["scan_before_s"] = scan_seconds(sources)
+        report["scan_after_s"] = scan_seconds(outputs)
+    write_json(os.path.join(staging, "_compact.json"), report)
+    _publish(run_root, version)
+    _remove_stale(run_root, keep=version)
+    return report
@@ -2,33 +2,58 @@
 
 from __future__ import annotations
 
-from dataclasses import asdict, dataclass
+from bisect import bisect_left
+from dataclasses import asdict, dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+import itertools
 import json
+import logging
 import time
 
 from egoworld.config import PipelineConfig, load_config
-from egoworld.io.paths import clip_dir, run_dir
-from egoworld.io.writers import write_json, write_parquet_table, write_run_manifest
-from egoworld.manifests.schema import FIELD_SPECS
-from egoworld.pipeline.queues import enforce_in_flight
-from egoworld.pipeline.scheduler import sort_clips_by_duration
+from egoworld.io.catalog import OutputCatalog
+from egoworld.io.frames import encode_mask_frames, frame_indices, slice_frames
+from egoworld.io.fs import configure_storage, filesystem_for, join_path, shared_executor
+from egoworld.io.paths import catalog_dir, catalog_path, clip_dir, run_dir
+from egoworld.io.result_cache import ResultCache, result_cache_key
+from egoworld.io.writers import encode_parquet, write_encoded, write_json, write_run_manifest
+from egoworld.manifests.build_manifest import make_clip_id
+from egoworld.manifests.schema import FIELD_SPECS, mask_output_schema, object_mask_schema, pose_schema
+from egoworld.manifests.table import read_clip_manifest, read_manifest_table, read_video_manifest
+from egoworld.observability.metrics import DEFAULT_METRICS
+from egoworld.observability.summary import RunSummary, peak_rss_bytes
+from egoworld.pipeline.queues import enforce_in_flight, prefetch
+from egoworld.pipeline.scheduler import plan_video_segments, writer_shard
+from egoworld.pipeline.triage import ClipTriage, measure_key, thresholds_key, triage_clips, triage_reason
 from egoworld.pipeline.state_store import (
     bulk_insert_pending,
+    bulk_set_status,
+    get_clip_output,
+    get_clip_state,
     get_resumable_clips,
     init_db,
+    load_triage,
     mark_dead_letter,
+    mark_skipped,
+    record_clip_output,
+    save_triage,
     upsert_clip_status,
 )
-from egoworld.utils.errors import classify_error
-from egoworld.operators.sam2_op import Sam2Operator
+from egoworld.utils.errors import HeldResultLost, classify_error
+from egoworld.operators.sam2_op import Sam2Operator, _load_prompt_config
 from egoworld.operators.hamer_op import HamerOperator
 from egoworld.operators.foundationpose_op import FoundationPoseOperator
 from egoworld.operators.dex_retarget_op import DexRetargetOperator
 from egoworld.operators.fast3r_op import Fast3ROperator
 
+logger = logging.getLogger(__name__)
+
+# Ray concurrency group of a co-located GPU actor: one thread that runs its
+# writes next to the default (GPU) queue.
+WRITE_GROUP = "write"
+
 
 @dataclass
 class ClipTask:
@@ -41,89 +66,174 @@ class ClipTask:
     frame_end: int
     scenedetect_failed: bool
     retry_count: int = 0
+    proxy_path: str = ""
+    proxy_scale: float = 1.0
+    proxy_scale_x: float = 1.0
+    proxy_scale_y: float = 1.0
+    checksum: str = ""
 
 
-def _load_json_lines(path: str) -> List[Dict[str, Any]]:
-    rows: List[Dict[str, Any]] = []
-    with open(path, "r", encoding="utf-8") as handle:
-        for line in handle:
-            line = line.strip()
-            if not line:
-                continue
-            rows.append(json.loads(line))
-    return rows
+def load_manifest(path: str) -> List[Dict[str, Any]]:
+    """Manifest rows as dicts, for tooling and small manifests.
 
+    The pipeline itself keeps manifests columnar (``manifests.table`` and
+    ``ClipTasks``).
+    """
+    return read_manifest_table(path).to_pylist()
 
-def _load_parquet(path: str) -> List[Dict[str, Any]]:
-    try:
-        import pyarrow.parquet as pq  # type: ignore
-    except Exception as exc:  # pragma: no cover
-        raise RuntimeError("pyarrow is required for parquet manifests") from exc
-    table = pq.read_table(path)
-    return table.to_pylist()
 
+def make_run_id() -> str:
+    return datetime.utcnow().strftime("%Y%m%d_%H%M%S")
 
-def load_manifest(path: str) -> List[Dict[str, Any]]:
-    if path.endswith(".parquet"):
-        return _load_parquet(path)
-    return _load_json_lines(path)
 
+def _clip_id_rows(clips: Any, batch_rows: int = 64 * 1024) -> Iterator[Dict[str, Any]]:
+    for batch in clips.select(["clip_id", "video_id"]).to_batches(max_chunksize=batch_rows):
+        yield from batch.to_pylist()
 
-def make_run_id() -> str:
-    return datetime.utcnow().strftime("%Y%m%d_%H%M%S")
 
+class ClipTasks:
+    """ClipTasks over Arrow clip and video manifest tables, built on iteration.
 
-def _mask_schema():  # pragma: no cover - optional dependency
-    import pyarrow as pa
+    Holds the clip table as read plus, per task, its clip row (``order``,
+    None = every row in file order) and its video row. Filtering and sorting
+    only rewrite those index arrays; rows are taken and turned into
+    ``ClipTask`` objects a batch at a time, so a 10M-clip manifest stays one
+    set of Arrow buffers.
+    """
 
-    return pa.schema(
-        [
-            pa.field("frame_index", pa.int64()),
-            pa.field("timestamp_s", pa.float64()),
-            pa.field("mask_rle", pa.string()),
-        ]
-    )
+    _CLIP_COLUMNS = [
+        "clip_id", "video_id", "start_s", "end_s", "frame_start", "frame_end", "scenedetect_failed", "retry_count"
+    ]
+    _VIDEO_COLUMNS = ["path", "proxy_path", "proxy_scale", "proxy_scale_x", "proxy_scale_y", "checksum"]
 
+    def __init__(self, clips: Any, videos: Any, video_rows: Any, order: Any = None):
+        self.clips = clips
+        self.videos = videos
+        self.video_rows = video_rows
+        self.order = order
 
-def _pose_schema():  # pragma: no cover - optional dependency
-    import pyarrow as pa
+    @classmethod
+    def from_manifests(cls, clips: Any, videos: Any, clip_ids: Optional[Iterable[str]] = None) -> "ClipTasks":
+        """Resolve each clip's video row, keeping only ``clip_ids`` when given.
 
-    return pa.schema(
-        [
-            pa.field("frame_index", pa.int64()),
-            pa.field("timestamp_s", pa.float64()),
-            pa.field("pose", pa.list_(pa.float32())),
-        ]
-    )
+        Raises RuntimeError when a kept clip references a video that is
+        missing from the video manifest or has an empty path.
+        """
+        import pyarrow as pa
+        import pyarrow.compute as pc
 
+        clips = clips.select(cls._CLIP_COLUMNS)
+        for name in ("proxy_scale_x", "proxy_scale_y"):
+            if name not in videos.column_names:
+                # Video manifests from before per-axis proxy scales.
+                videos = videos.append_column(name, pa.nulls(videos.num_rows, pa.float64()))
+        videos = videos.select(["video_id"] + cls._VIDEO_COLUMNS)
+        order = None
+        video_ids = clips.column("video_id")
+        if clip_ids is not None:
+            wanted = pa.array(list(clip_ids), pa.string())
+            order = pc.indices_nonzero(pc.is_in(clips.column("clip_id"), value_set=wanted))
+            video_ids = video_ids.take(order)
+        video_rows = pc.index_in(video_ids, value_set=videos.column("video_id"))
+        if video_rows.null_count:
+            missing = video_ids.filter(pc.is_null(video_rows))[0].as_py()
+            raise RuntimeError(f"clip_manifest references missing video_id: {missing}")
+        pathless = pc.indices_nonzero(pc.fill_null(pc.equal(videos.column("path"), ""), True))
+        used = pathless.filter(pc.is_in(pathless, value_set=pc.unique(video_rows)))
+        if len(used):
+            video_id = videos.column("video_id")[used[0].as_py()].as_py()
+            raise RuntimeError(f"video_manifest has empty path for video_id: {video_id}")
+        return cls(clips, videos, video_rows, order)
 
-def _build_clip_tasks(clips: List[Dict[str, Any]], video_manifest: Dict[str, Dict[str, Any]]) -> List[ClipTask]:
-    tasks: List[ClipTask] = []
-    for clip in clips:
-        video = video_manifest.get(clip["video_id"])
-        if not video:
-            raise RuntimeError(f"clip_manifest references missing video_id: {clip['video_id']}")
-        if not video.get("path"):
-            raise RuntimeError(f"video_manifest has empty path for video_id: {clip['video_id']}")
-        tasks.append(
-            ClipTask(
-                clip_id=clip["clip_id"],
-                video_id=clip["video_id"],
-                video_path=video["path"],
-                start_s=float(clip["start_s"]),
-                end_s=float(clip["end_s"]),
-                frame_start=int(clip["frame_start"]),
-                frame_end=int(clip["frame_end"]),
-                scenedetect_failed=bool(clip.get("scenedetect_failed", False)),
-                retry_count=int(clip.get("retry_count", 0)),
-            )
-        )
-    return tasks
+    def sort_by_duration(self) -> "ClipTasks":
+        """Longest clips first (stable), like ``scheduler.sort_clips_by_duration``."""
+        import pyarrow.compute as pc
+
+        start, end = self.clips.column("start_s"), self.clips.column("end_s")
+        if self.order is not None:
+            start, end = start.take(self.order), end.take(self.order)
+        return self._take(pc.array_sort_indices(pc.subtract(end, start), order="descending"))
+
+    def exclude(self, clip_ids: Iterable[str]) -> "ClipTasks":
+        import pyarrow.compute as pc
+
+        return self._take(pc.indices_nonzero(pc.invert(self._flags(clip_ids))))
+
+    def _flags(self, clip_ids: Iterable[str]) -> Any:
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        ids = self.clips.column("clip_id")
+        if self.order is not None:
+            ids = ids.take(self.order)
+        return pc.is_in(ids, value_set=pa.array(list(clip_ids), pa.string()))
 
+    def _take(self, perm: Any) -> "ClipTasks":
+        order = perm if self.order is None else self.order.take(perm)
+        return ClipTasks(self.clips, self.videos, self.video_rows.take(perm), order)
 
-def _load_video_index(video_manifest_path: str) -> Dict[str, Dict[str, Any]]:
-    rows = load_manifest(video_manifest_path)
-    return {row["video_id"]: row for row in rows}
+    def __len__(self) -> int:
+        return len(self.video_rows)
+
+    def __iter__(self) -> Iterator[ClipTask]:
+        batch_rows = 4096
+        for offset in range(0, len(self), batch_rows):
+            if self.order is None:
+                clips = self.clips.slice(offset, batch_rows)
+            else:
+                clips = self.clips.take(self.order[offset : offset + batch_rows])
+            videos = self.videos.take(self.video_rows[offset : offset + batch_rows])
+            for clip, video in zip(clips.to_pylist(), videos.to_pylist()):
+                proxy_scale = float(video["proxy_scale"] or 1.0)
+                yield ClipTask(
+                    clip_id=clip["clip_id"],
+                    video_id=clip["video_id"],
+                    video_path=video["path"],
+                    start_s=float(clip["start_s"]),
+                    end_s=float(clip["end_s"]),
+                    frame_start=int(clip["frame_start"]),
+                    frame_end=int(clip["frame_end"]),
+                    scenedetect_failed=bool(clip["scenedetect_failed"]),
+                    retry_count=int(clip["retry_count"] or 0),
+                    proxy_path=video["proxy_path"] or "",
+                    proxy_scale=proxy_scale,
+                    proxy_scale_x=float(video["proxy_scale_x"] or proxy_scale),
+                    proxy_scale_y=float(video["proxy_scale_y"] or proxy_scale),
+                    checksum=video["checksum"] or "",
+                )
+
+
+def _alias_clips(clips: Any, videos: Any) -> Dict[str, Tuple[str, str]]:
+    """{clip_id: (canonical_video_id, canonical_clip_id)} for clips of duplicate videos.
+
+    A clip is an alias when its video has another ``canonical_video_id`` and
+    the canonical video has a clip with the same frame range; other clips of
+    duplicate videos are processed normally.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    if "canonical_video_id" not in videos.column_names:
+        return {}
+    canonical = {
+        row["video_id"]: row["canonical_video_id"]
+        for row in videos.select(["video_id", "canonical_video_id"]).to_pylist()
+        if row["canonical_video_id"] and row["canonical_video_id"] != row["video_id"]
+    }
+    if not canonical:
+        return {}
+    rows = clips.filter(pc.is_in(clips.column("video_id"), value_set=pa.array(list(canonical), pa.string())))
+    targets = {
+        row["clip_id"]: (
+            canonical[row["video_id"]],
+            make_clip_id(canonical[row["video_id"]], row["frame_start"], row["frame_end"]),
+        )
+        for row in rows.select(["clip_id", "video_id", "frame_start", "frame_end"]).to_pylist()
+    }
+    wanted = pa.array([clip_id for _, clip_id in targets.values()], pa.string())
+    ids = clips.column("clip_id")
+    present = set(ids.filter(pc.is_in(ids, value_set=wanted)).to_pylist())
+    return {clip_id: target for clip_id, target in targets.items() if target[1] in present}
 
 
 def _clip_to_dict(task: ClipTask) -> Dict[str, Any]:
@@ -137,9 +247,104 @@ def _clip_to_dict(task: ClipTask) -> Dict[str, Any]:
         "frame_end": task.frame_end,
         "scenedetect_failed": task.scenedetect_failed,
         "retry_count": task.retry_count,
+        "proxy_path": task.proxy_path,
+        "proxy_scale": task.proxy_scale,
+        "proxy_scale_x": task.proxy_scale_x,
+        "proxy_scale_y": task.proxy_scale_y,
+        "checksum": task.checksum,
+    }
+
+
+def _split_session_result(session: Dict[str, Any], clips: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Split a whole-video SAM2 session into per-clip mask results.
+
+    Each clip gets the frames in [frame_start, frame_end). Overlapping clips
+    share rows for their common frames. ``frames_processed`` is attributed
+    to the first clip covering a frame so it sums to the session.
+    """
+    if not session:
+        return [{} for _ in clips]
+    streams = {name: session[name] for name in ("frames", "objects") if name in session}
+    index = {name: frame_indices(rows) for name, rows in streams.items()}
+    tracked = session.get("tracked_frames", [])
+    empty = session.get("empty_frames", [])
+    results: List[Dict[str, Any]] = []
+    owned_until = 0
+    for clip in clips:
+        lo, hi = int(clip["frame_start"]), int(clip["frame_end"])
+        clip_tracked = bisect_left(tracked, hi) - bisect_left(tracked, lo)
+        clip_empty = bisect_left(empty, hi) - bisect_left(empty, lo)
+        owned_lo = max(lo, owned_until)
+        owned = bisect_left(tracked, hi) - bisect_left(tracked, owned_lo) if owned_lo < hi else 0
+        owned_until = max(owned_until, hi)
+        result = {
+            name: slice_frames(rows, bisect_left(index[name], lo), bisect_left(index[name], hi))
+            for name, rows in streams.items()
+        }
+        result.update(
+            {
+                "mask_encoding": session.get("mask_encoding", "rle"),
+                "empty_mask_rate": float(clip_empty / clip_tracked) if clip_tracked else 1.0,
+                "frames_processed": owned,
+                "start_s": clip["start_s"],
+                "end_s": clip["end_s"],
+                "video_path": session.get("video_path", clip["video_path"]),
+            }
+        )
+        results.append(result)
+    return results
+
+
+def _group_tasks_by_video(tasks: List[ClipTask]) -> List[List[ClipTask]]:
+    groups: Dict[str, List[ClipTask]] = {}
+    for task in tasks:
+        groups.setdefault(task.video_id, []).append(task)
+    jobs = [sorted(group, key=lambda t: t.frame_start) for group in groups.values()]
+    jobs.sort(key=lambda group: sum(t.end_s - t.start_s for t in group), reverse=True)
+    return jobs
+
+
+def _video_payload(tasks: List[ClipTask]) -> Dict[str, Any]:
+    first = tasks[0]
+    return {
+        "video_id": first.video_id,
+        "video_path": first.video_path,
+        "proxy_path": first.proxy_path,
+        "proxy_scale": first.proxy_scale,
+        "proxy_scale_x": first.proxy_scale_x,
+        "proxy_scale_y": first.proxy_scale_y,
+        "clips": [_clip_to_dict(task) for task in tasks],
     }
 
 
+def _proxy_scales(source: Dict[str, Any]) -> Tuple[float, float]:
+    """(x, y) proxy-to-native pixel ratios of a clip or video; (1.0, 1.0) without a proxy.
+
+    Rows from before per-axis scales only carry ``proxy_scale`` (the width
+    ratio), which is then used for both axes.
+    """
+    if not source.get("proxy_path"):
+        return 1.0, 1.0
+    scale = float(source.get("proxy_scale") or 1.0)
+    return float(source.get("proxy_scale_x") or scale), float(source.get("proxy_scale_y") or scale)
+
+
+def _with_mask_scale(masks: Dict[str, Any], source: Dict[str, Any]) -> None:
+    """Record the scales of masks computed on ``source``'s proxy."""
+    scale_x, scale_y = _proxy_scales(source)
+    masks.update({"mask_scale": scale_x, "mask_scale_x": scale_x, "mask_scale_y": scale_y})
+
+
+def _sam2_params(params: Dict[str, Any], source: Dict[str, Any]) -> Dict[str, Any]:
+    """SAM2 params for a clip or video; on a proxy, ``min_box_area`` (source pixels) is scaled by scale_x * scale_y."""
+    if not source.get("proxy_path"):
+        return params
+    scale_x, scale_y = _proxy_scales(source)
+    prompting = dict(params.get("prompting", {}))
+    prompting["min_box_area"] = _load_prompt_config(prompting).min_box_area * scale_x * scale_y
+    return {**params, "prompting": prompting}
+
+
 class _ActorInitMixin:
     def __init__(self, config: Dict[str, Any]):
         self.config = config
@@ -161,20 +366,111 @@ class Sam2Actor(_ActorInitMixin):
         self.retarget = DexRetargetOperator(self.retarget_cfg.get("params", {}).get("model_path"))
         self.fast3r = Fast3ROperator(self.fast3r_cfg.get("params", {}).get("model_name_or_path"))
 
+        cache_cfg = config.get("cache", {})
+        self.result_cache = None
+        if cache_cfg.get("enabled", False):
+            self.result_cache = ResultCache(cache_cfg["root"], cache_cfg["max_bytes"])
+        self.model_versions = config.get("model_versions", {})
+        self.clip_writer = None
+        # Co-located mode: results are held here by clip_id until the driver
+        # has marked the clip Writing and calls ``write_held``. The driver runs
+        # write_held and flush_catalog in the actor's WRITE_GROUP thread, so
+        # writes overlap the next GPU job instead of queuing in front of it.
+        self.held: Dict[str, Dict[str, Any]] = {}
+        if config.get("writer", {}).get("mode") == "colocated":
+            self.clip_writer = ClipWriter(config)
+        self.execution_mode = config.get("execution", {}).get("mode", "clip")
+
+    def _sam2_cache_key(self, clip: Dict[str, Any]) -> str | None:
+        if self.result_cache is None or not clip.get("checksum"):
+            return None
+        return result_cache_key(
+            clip["checksum"],
+            clip["frame_start"],
+            clip["frame_end"],
+            "sam2",
+            self.model_versions.get("sam2", ""),
+            {
+                "params": self.sam2_cfg.get("params", {}),
+                "proxy_scale": list(_proxy_scales(clip)) if clip.get("proxy_path") else 1.0,
+                "mode": self.execution_mode,
+            },
+        )
+
+    def _cache_get(self, key: str | None) -> Dict[str, Any] | None:
+        if key is None:
+            return None
+        cached = self.result_cache.get(key)
+        if cached is not None:
+            cached["cache_hit"] = True
+            cached["frames_processed"] = 0
+        return cached
+
+    def _cache_put(self, key: str | None, masks: Dict[str, Any]) -> None:
+        if key is None:
+            return
+        self.result_cache.put(key, masks)
+        masks["cache_hit"] = False
+
     def process(self, clip: Dict[str, Any]) -> Dict[str, Any]:
         masks = {}
-        hand_pose = {}
-        object_pose = {}
-        mapping = {}
-        fast3r = {}
-
         if self.sam2_cfg.get("enabled", True):
+            key = self._sam2_cache_key(clip)
+            cached = self._cache_get(key)
+            if cached is not None:
+                return self._run_clip_operators(clip, cached)
+            # Masks are computed on the proxy when one exists and stored with its scale.
+            start = time.perf_counter()
             masks = self.sam2.run(
-                clip["video_path"],
+                clip.get("proxy_path") or clip["video_path"],
                 clip["start_s"],
                 clip["end_s"],
-                params=self.sam2_cfg.get("params", {}),
+                params=_sam2_params(self.sam2_cfg.get("params", {}), clip),
+                checksum=clip.get("checksum", ""),
             )
+            if clip.get("proxy_path"):
+                _with_mask_scale(masks, clip)
+            self._cache_put(key, masks)
+            masks["gpu_s"] = time.perf_counter() - start
+        return self._run_clip_operators(clip, masks)
+
+    def process_video(self, video: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Run one SAM2 session over all clips of a video, then split per clip."""
+        clips = sorted(video["clips"], key=lambda c: (c["frame_start"], c["frame_end"]))
+        if not self.sam2_cfg.get("enabled", True):
+            return [self._run_clip_operators(clip, {}) for clip in clips]
+
+        keys = [self._sam2_cache_key(clip) for clip in clips]
+        cached = [self._cache_get(key) for key in keys]
+        if all(entry is not None for entry in cached):
+            return [self._run_clip_operators(clip, masks) for clip, masks in zip(clips, cached)]
+
+        start = time.perf_counter()
+        session = self.sam2.run_session(
+            video.get("proxy_path") or video["video_path"],
+            plan_video_segments(clips),
+            params=_sam2_params(self.sam2_cfg.get("params", {}), video),
+            checksum=clips[0].get("checksum", ""),
+        )
+        session_s = time.perf_counter() - start
+        split = _split_session_result(session, clips)
+        owned = sum(int(masks.get("frames_processed", 0)) for masks in split)
+        results = []
+        for clip, key, masks in zip(clips, keys, split):
+            if video.get("proxy_path"):
+                _with_mask_scale(masks, video)
+            self._cache_put(key, masks)
+            # Session time is attributed to clips by the frames each one owns.
+            masks["gpu_s"] = session_s * int(masks.get("frames_processed", 0)) / owned if owned else 0.0
+            results.append(self._run_clip_operators(clip, masks))
+        return results
+
+    def _run_clip_operators(self, clip: Dict[str, Any], masks: Dict[str, Any]) -> Dict[str, Any]:
+        hand_pose = {}
+        object_pose = {}
+        mapping = {}
+        fast3r = {}
+
         if self.hamer_cfg.get("enabled", False):
             hand_pose = self.hamer.run(clip["video_path"], clip["start_s"], clip["end_s"])
         if self.foundation_cfg.get("enabled", False):
@@ -188,7 +484,7 @@ class Sam2Actor(_ActorInitMixin):
                 clip["end_s"],
                 params=self.fast3r_cfg.get("params", {}),
             )
-        return {
+        result = {
             "clip": clip,
             "masks": masks,
             "hand_pose": hand_pose,
@@ -196,72 +492,365 @@ class Sam2Actor(_ActorInitMixin):
             "mapping": mapping,
             "fast3r": fast3r,
         }
+        if self.clip_writer is not None:
+            self.held[clip["clip_id"]] = result
+            return {"clip": clip, "status": "held", "masks": _mask_counters(masks)}
+        return result
 
+    def write_held(self, clip_id: str) -> Dict[str, Any]:
+        """Write a held result; it stays held when the write fails so only the write is retried.
+
+        Raises HeldResultLost when the result is gone (the actor restarted);
+        the driver then recomputes the clip.
+        """
+        result = self.held.get(clip_id)
+        if result is None:
+            raise HeldResultLost(f"no held result for clip {clip_id}")
+        receipt = self.clip_writer.write(result)
+        self.held.pop(clip_id, None)
+        return receipt
+
+    def discard_held(self, clip_id: str) -> None:
+        self.held.pop(clip_id, None)
+
+    def flush_catalog(self) -> None:
+        if self.clip_writer is not None:
+            self.clip_writer.catalog.flush()
+
+
+def _mask_counters(masks: Dict[str, Any]) -> Dict[str, Any]:
+    """Only the mask counters the driver summarizes, never the mask frames."""
+    return {key: masks[key] for key in ("frames_processed", "cache_hit", "gpu_s") if key in masks}
+
+
+def _result_nbytes(result: Dict[str, Any]) -> int:
+    """Approximate payload size of a result, dominated by mask RLE strings."""
+    total = 0
+    masks = result.get("masks", {})
+    for name in ("frames", "objects"):
+        rows = masks.get(name, [])
+        if hasattr(rows, "nbytes"):
+            total += int(rows.nbytes)
+        else:
+            total += sum(len(row.get("mask_rle") or "") for row in rows)
+    return total
+
+
+class ClipWriter:
+    """Writes one clip result (meta.json + stream Parquet files) under the run root.
+
+    Used by ``WriterActor`` and, in co-located mode, directly inside the GPU
+    actor so results never travel through the driver.
+    """
 
-class WriterActor(_ActorInitMixin):
     def __init__(self, config: Dict[str, Any]):
-        super().__init__(config)
         from egoworld.config import ParquetConfig
 
+        self.config = config
         self.parquet = ParquetConfig(**config.get("parquet", {}))
+        configure_storage(**config.get("storage", {}))
+        stream_threads = int(config.get("writer", {}).get("stream_threads") or 1)
+        self.catalog = OutputCatalog(
+            str(catalog_path(config["paths"]["state_db_path"], config["run_id"])),
+            shared_dir=catalog_dir(config["paths"]["output_root"], config["run_id"]),
+        )
+        # Stream files are independent and pyarrow releases the GIL while
+        # encoding, so they are encoded concurrently on a per-process pool
+        # shared by every writer.
+        self.pool = shared_executor("streams", stream_threads)
+
+    def _streams(self, result: Dict[str, Any]) -> List[Tuple[str, List[Dict[str, Any]], Any]]:
+        coordinates = self.config["coordinates"]
+        encoding = coordinates["mask_encoding"]
+        masks = result.get("masks", {})
+        streams = []
+        # The full-frame union stream is skipped only when SAM2 produced per-object masks instead.
+        if "frames" in masks or "objects" not in masks:
+            streams.append(
+                (
+                    "masks.parquet",
+                    encode_mask_frames(
+                        masks.get("frames", []),
+                        encoding,
+                        coordinates.get("mask_keyframe_interval", 30),
+                    ),
+                    mask_output_schema(encoding),
+                )
+            )
+        if "objects" in masks:
+            streams.append(("objects.parquet", masks["objects"], object_mask_schema()))
+        streams += [
+            ("hand_pose.parquet", result.get("hand_pose", {}).get("hand_pose", []), pose_schema()),
+            ("object_pose.parquet", result.get("object_pose", {}).get("object_pose", []), pose_schema()),
+            ("mapping.parquet", result.get("mapping", {}).get("mapping", []), pose_schema()),
+        ]
+        fast3r_enabled = (
+            self.config.get("operators", {})
+            .get("fast3r", {})
+            .get("enabled", False)
+        )
+        if fast3r_enabled:
+            streams.append(
+                ("fast3r_pose.parquet", result.get("fast3r", {}).get("camera_poses", []), pose_schema())
+            )
+        return streams
 
     def write(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Write all outputs for a clip and return a small receipt."""
+        start = time.time()
         clip = result["clip"]
         run_id = self.config["run_id"]
         out_dir = clip_dir(self.config["paths"]["output_root"], run_id, clip["video_id"], clip["clip_id"])
-        out_dir.mkdir(parents=True, exist_ok=True)
+        filesystem_for(out_dir).makedirs(out_dir)
+
+        # Hashes of the last write of this clip; identical outputs are not rewritten.
+        previous = {name: entry["sha256"] for name, entry in self.catalog.lookup(clip["clip_id"]).items()}
+        streams = self._streams(result)
+        futures = [
+            self.pool.submit(encode_parquet, rows, schema=schema, parquet=self.parquet)
+            for _, rows, schema in streams
+        ]
+        encoded = [future.result() for future in futures]
+        # All stream files go out as one batch (concurrent PUTs on an object store).
+        files = write_encoded(
+            [(join_path(out_dir, name), data, previous.get(name)) for (name, _, _), (data, _) in zip(streams, encoded)]
+        )
+        for info, (_, rows) in zip(files, encoded):
+            info["rows"] = rows
 
+        # meta.json goes last and records the stream hashes, so it marks a
+        # complete clip write.
+        masks = result.get("masks", {})
         meta = {
             "clip": clip,
             "field_specs": FIELD_SPECS,
             "mask_encoding": self.config["coordinates"]["mask_encoding"],
+            "mask_keyframe_interval": self.config["coordinates"].get("mask_keyframe_interval", 30),
+            "mask_scale": float(masks.get("mask_scale", 1.0)),
+            "mask_scale_x": float(masks.get("mask_scale_x", masks.get("mask_scale", 1.0))),
+            "mask_scale_y": float(masks.get("mask_scale_y", masks.get("mask_scale", 1.0))),
             "time_base": self.config["coordinates"]["time_base"],
+            "files": {Path(info["path"]).name: info["sha256"] for info in files},
         }
-        write_json(str(out_dir / "meta.json"), meta)
-
-        masks_rows = result.get("masks", {}).get("frames", [])
-        write_parquet_table(
-            str(out_dir / "masks.parquet"),
-            masks_rows,
-            schema=_mask_schema(),
-            parquet=self.parquet,
-        )
-        hand_rows = result.get("hand_pose", {}).get("hand_pose", [])
-        write_parquet_table(
-            str(out_dir / "hand_pose.parquet"),
-            hand_rows,
-            schema=_pose_schema(),
-            parquet=self.parquet,
-        )
-        obj_rows = result.get("object_pose", {}).get("object_pose", [])
-        write_parquet_table(
-            str(out_dir / "object_pose.parquet"),
-            obj_rows,
-            schema=_pose_schema(),
-            parquet=self.parquet,
-        )
-        map_rows = result.get("mapping", {}).get("mapping", [])
-        write_parquet_table(
-            str(out_dir / "mapping.parquet"),
-            map_rows,
-            schema=_pose_schema(),
-            parquet=self.parquet,
-        )
-        fast3r_enabled = (
-            self.config.get("operators", {})
-            .get("fast3r", {})
-            .get("enabled", False)
+        files.append(write_json(join_path(out_dir, "meta.json"), meta, expected_sha256=previous.get("meta.json")))
+        self.catalog.append(clip["clip_id"], clip["video_id"], files)
+
+        return {
+            "clip": clip,
+            "status": "written",
+            "write_s": time.time() - start,
+            "files": files,
+            "masks": _mask_counters(masks),
+        }
+
+    def write_alias(
+        self,
+        clip: Dict[str, Any],
+        canonical_video_id: str,
+        canonical_clip_id: str,
+        canonical_output: Optional[Tuple[str, str]] = None,
+    ) -> Dict[str, Any]:
+        """Record a duplicate video's clip as an alias of its canonical clip (alias.json only).
+
+        ``canonical_output`` is the (run_id, output_dir) recorded for the
+        canonical clip in the state DB, which may be an earlier run; without
+        it only this run's catalog is consulted.
+        """
+        run_id = self.config["run_id"]
+        output_root = self.config["paths"]["output_root"]
+        out_dir = clip_dir(output_root, run_id, clip["video_id"], clip["clip_id"])
+        filesystem_for(out_dir).makedirs(out_dir)
+        alias_of = {"video_id": canonical_video_id, "clip_id": canonical_clip_id}
+        if canonical_output is not None:
+            alias_of["run_id"], alias_of["path"] = canonical_output
+        elif self.catalog.lookup(canonical_clip_id):
+            alias_of["run_id"] = run_id
+            alias_of["path"] = clip_dir(output_root, run_id, canonical_video_id, canonical_clip_id)
+        previous = self.catalog.lookup(clip["clip_id"]).get("alias.json", {})
+        info = write_json(
+            join_path(out_dir, "alias.json"),
+            {"clip": clip, "alias_of": alias_of},
+            expected_sha256=previous.get("sha256"),
         )
-        if fast3r_enabled:
-            fast3r_rows = result.get("fast3r", {}).get("camera_poses", [])
-            write_parquet_table(
-                str(out_dir / "fast3r_pose.parquet"),
-                fast3r_rows,
-                schema=_pose_schema(),
-                parquet=self.parquet,
-            )
+        self.catalog.append(clip["clip_id"], clip["video_id"], [info])
+        return info
+
+
+class WriterActor(_ActorInitMixin):
+    def __init__(self, config: Dict[str, Any]):
+        super().__init__(config)
+        self.writer = ClipWriter(config)
+
+    def write(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        return self.writer.write(result)
+
+    def flush_catalog(self) -> None:
+        self.writer.catalog.flush()
+
+
+def write_aliases(
+    state_db: str,
+    writer: ClipWriter,
+    alias_rows: List[Dict[str, Any]],
+    aliases: Dict[str, Tuple[str, str]],
+    summary: RunSummary,
+) -> None:
+    """Write alias records for duplicate clips whose canonical clip is Done.
+
+    A canonical clip that ended Failed (dead-lettered) or Skipped passes its
+    status on to its aliases, with the reason in ``last_error``; Failed
+    aliases are resumed together with their canonical clip. Aliases of
+    canonical clips still in flight stay Pending for the next run. GPU-hours
+    saved are estimated from this run's measured GPU seconds per second of
+    processed video.
+    """
+    alias_video_s = 0.0
+    for clip in alias_rows:
+        canonical_video_id, canonical_clip_id = aliases[clip["clip_id"]]
+        state = get_clip_state(state_db, canonical_clip_id)
+        if state is not None and state.status in ("Failed", "Skipped"):
+            reason = f"canonical clip {canonical_clip_id} {state.status}: {state.last_error}"
+            upsert_clip_status(state_db, clip["clip_id"], clip["video_id"], state.status, reason, state.retry_count)
+            if state.status == "Failed":
+                summary.clips_failed += 1
+            continue
+        if state is None or state.status != "Done":
+            continue
+        writer.write_alias(clip, canonical_video_id, canonical_clip_id, get_clip_output(state_db, canonical_clip_id))
+        upsert_clip_status(state_db, clip["clip_id"], clip["video_id"], "Done", "", 0)
+        summary.clips_aliased += 1
+        summary.clips_done += 1
+        alias_video_s += float(clip["end_s"]) - float(clip["start_s"])
+    if summary.gpu_video_s > 0:
+        summary.gpu_hours_saved = alias_video_s * summary.gpu_s_total / summary.gpu_video_s / 3600.0
+
+
+@dataclass
+class TriageOutcome:
+    """Triage results collected while jobs stream to the GPUs."""
+
+    flagged: List[ClipTriage] = field(default_factory=list)
+    reused: int = 0
+    seconds: float = 0.0
+
+
+def triage_verdicts(
+    state_db: str,
+    tasks: Iterable[ClipTask],
+    config: PipelineConfig,
+    outcome: TriageOutcome,
+) -> Iterator[ClipTriage]:
+    """Triage verdicts for ``tasks``, in order.
+
+    Statistics stored for a clip under the same ``measure_key`` are reused
+    without decoding and judged against the current thresholds. New or
+    re-judged verdicts are saved with the thresholds they were judged by.
+    """
+    triage_config = config.triage
+    measure, thresholds = measure_key(triage_config), thresholds_key(triage_config)
+    stored = {clip_id: row for clip_id, row in load_triage(state_db).items() if row[1] == measure}
+    to_measure, tasks = itertools.tee(tasks)
+    measured = triage_clips(
+        (task for task in to_measure if task.clip_id not in stored),
+        triage_config,
+        config.scenedetect.sidecar_dir,
+        config.scenedetect.prompt_interval_s,
+    )
+    rows: List[Tuple[str, str, str, float, float, float, str, str]] = []
+    try:
+        for task in tasks:
+            row = stored.get(task.clip_id)
+            if row is None:
+                result = next(measured)
+            else:
+                result = ClipTriage(task.clip_id, task.video_id, task.end_s - task.start_s, *row[3:7])
+                result.reason = triage_reason((result.brightness, result.sharpness, result.motion), triage_config)
+                outcome.reused += 1
+            if result.source != "none" and (row is None or row[2] != thresholds):
+                rows.append(
+                    (
+                        result.clip_id, measure, thresholds, result.brightness, result.sharpness, result.motion,
+                        result.source, result.reason,
+                    )
+                )
+            if len(rows) >= 256:
+                save_triage(state_db, rows)
+                rows = []
+            yield result
+    finally:
+        save_triage(state_db, rows)
+
+
+def triaged_jobs(
+    state_db: str,
+    jobs: Iterable[List[ClipTask]],
+    config: PipelineConfig,
+    outcome: TriageOutcome,
+) -> Iterator[List[ClipTask]]:
+    """Apply CPU triage to ``jobs`` while they are submitted.
 
-        return {"clip_id": clip["clip_id"], "status": "written"}
+    Triage runs in a background thread over the jobs in submission order, up
+    to 1024 jobs ahead, so the first GPU job waits only for its own verdicts.
+    ``skip`` marks flagged clips Skipped with the reason and drops them.
+    ``deprioritize`` holds them back and yields them after every other job,
+    in the same order; in video mode the flagged clips of a video form their
+    own job.
+    """
+    skip = config.triage.action == "skip"
+    start = time.perf_counter()
+
+    def job_verdicts() -> Iterator[Tuple[List[ClipTask], List[ClipTriage]]]:
+        # Both copies of ``jobs`` are consumed in this thread.
+        to_triage, to_yield = itertools.tee(jobs)
+        verdicts = triage_verdicts(state_db, (task for job in to_triage for task in job), config, outcome)
+        for job in to_yield:
+            yield job, [next(verdicts) for _ in job]
+        verdicts.close()
+        outcome.seconds = time.perf_counter() - start
+
+    held: List[List[ClipTask]] = []
+    skipped: Dict[str, str] = {}
+    for job, verdicts in prefetch(job_verdicts(), depth=1024):
+        flagged = {result.clip_id: result.reason for result in verdicts if result.reason}
+        outcome.flagged += [result for result in verdicts if result.reason]
+        kept = [task for task in job if task.clip_id not in flagged]
+        if kept:
+            yield kept
+        if flagged and skip:
+            skipped.update(flagged)
+            if len(skipped) >= 256:
+                mark_skipped(state_db, skipped)
+                skipped = {}
+        elif flagged:
+            held.append([task for task in job if task.clip_id in flagged])
+    mark_skipped(state_db, skipped)
+    yield from held
+
+
+def reconsider_skipped(state_db: str, config: PipelineConfig) -> List[str]:
+    """Re-judge clips skipped by triage under other thresholds; returns those set back to Pending.
+
+    Clips with stored statistics for the current ``measure_key`` are judged
+    from them without decoding; the others are set back to Pending and
+    measured again by this run's triage.
+    """
+    measure, thresholds = measure_key(config.triage), thresholds_key(config.triage)
+    resumed: List[str] = []
+    still: Dict[str, str] = {}
+    rows = []
+    for clip_id, row in load_triage(state_db, status="Skipped").items():
+        if row[2] == thresholds:
+            continue
+        reason = triage_reason(row[3:6], config.triage) if row[1] == measure else ""
+        if reason:
+            still[clip_id] = reason
+            rows.append(row[:2] + (thresholds,) + row[3:7] + (reason,))
+        else:
+            resumed.append(clip_id)
+    bulk_set_status(state_db, resumed, "Pending")
+    mark_skipped(state_db, still)
+    save_triage(state_db, rows)
+    return resumed
 
 
 def run_pipeline(
@@ -273,24 +862,38 @@ def run_pipeline(
     run_id = config.run_id or make_run_id()
     config.run_id = run_id
 
+    configure_storage(**asdict(config.storage))
     state_db = config.paths.state_db_path
     init_db(state_db)
 
-    video_index = _load_video_index(video_manifest_path)
-    clip_rows = load_manifest(clip_manifest_path)
-    bulk_insert_pending(state_db, clip_rows)
-    resumable = set(get_resumable_clips(state_db))
-    clip_rows = [row for row in clip_rows if row.get("clip_id") in resumable]
-    clip_tasks = _build_clip_tasks(clip_rows, video_index)
-    clip_tasks = sort_clips_by_duration([_clip_to_dict(t) for t in clip_tasks])
-    clip_tasks = [ClipTask(**task) for task in clip_tasks]
+    videos = read_video_manifest(video_manifest_path)
+    clips = read_clip_manifest(clip_manifest_path)
+    bulk_insert_pending(state_db, _clip_id_rows(clips))
+    if config.triage.enabled:
+        reconsider_skipped(state_db, config)
+    resumable = get_resumable_clips(state_db)
+    # Clips of duplicate videos are not processed; they get alias records once
+    # their canonical clip is done.
+    aliases = _alias_clips(clips, videos)
+    alias_rows: List[Dict[str, Any]] = []
+    if aliases:
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        pending_aliases = pa.array([c for c in resumable if c in aliases], pa.string())
+        alias_rows = clips.filter(pc.is_in(clips.column("clip_id"), value_set=pending_aliases)).select(
+            ["clip_id", "video_id", "start_s", "end_s", "frame_start", "frame_end"]
+        ).to_pylist()
+        resumable = [c for c in resumable if c not in aliases]
+    clip_tasks = ClipTasks.from_manifests(clips, videos, resumable).sort_by_duration()
+    del clips
 
     run_manifest = config.to_run_manifest()
     run_manifest["config_path"] = config_path
     run_manifest["created_at"] = datetime.utcnow().isoformat() + "Z"
     run_root = run_dir(config.paths.output_root, run_id)
-    run_root.mkdir(parents=True, exist_ok=True)
-    write_run_manifest(str(run_root / "run_manifest.json"), run_manifest)
+    filesystem_for(run_root).makedirs(run_root)
+    write_run_manifest(join_path(run_root, "run_manifest.json"), run_manifest)
 
     try:
         import ray  # type: ignore
@@ -300,142 +903,229 @@ def run_pipeline(
     ray.init(ignore_reinit_error=True)
 
     config_dict = asdict(config)
-    writer = ray.remote(WriterActor).options(num_cpus=1).remote(config_dict)
-    gpu_actors = [
-        ray.remote(Sam2Actor).options(num_gpus=1).remote(config_dict)
-        for _ in range(config.num_gpus)
-    ]
+    # In co-located mode GPU actors write their own outputs and return receipts.
+    colocated = config.writer.mode == "colocated"
+    writers = []
+    if not colocated:
+        writers = [
+            ray.remote(WriterActor).options(num_cpus=config.writer.num_cpus_per_writer).remote(config_dict)
+            for _ in range(config.writer.num_writers)
+        ]
+    gpu_options: Dict[str, Any] = {"num_gpus": 1}
+    if colocated:
+        gpu_options["concurrency_groups"] = {WRITE_GROUP: 1}
+    gpu_actors = [ray.remote(Sam2Actor).options(**gpu_options).remote(config_dict) for _ in range(config.num_gpus)]
+
+    video_mode = config.execution.mode == "video"
+    if video_mode:
+        jobs: Iterable[List[ClipTask]] = _group_tasks_by_video(list(clip_tasks))
+    else:
+        jobs = ([task] for task in clip_tasks)
+    # Triage streams alongside submission; flagged clips are dropped or queued last.
+    triage = TriageOutcome()
+    if config.triage.enabled:
+        jobs = triaged_jobs(state_db, jobs, config, triage)
 
     pending_gpu: List[Any] = []
     pending_write: List[Any] = []
-    ref_to_meta: Dict[Any, Tuple[ClipTask, int]] = {}
-    write_ref_to_meta: Dict[Any, Tuple[Dict[str, Any], int]] = {}
+    ref_to_meta: Dict[Any, Tuple[List[ClipTask], int, int]] = {}
+    write_ref_to_meta: Dict[Any, Tuple[Dict[str, Any], int, int, float, Optional[int], Optional[ClipTask]]] = {}
+    write_queue = DEFAULT_METRICS.queue_length.labels(stage="write")
     actor_index = 0
+    summary = RunSummary(
+        run_id=run_id,
+        mode=config.execution.mode,
+        clips_total=len(clip_tasks) + len(alias_rows),
+        writer_mode=config.writer.mode,
+        num_writers=len(writers),
+    )
+    run_start = time.time()
 
-    def submit_clip(task: ClipTask, attempt: int) -> None:
+    def submit_job(tasks: List[ClipTask], attempt: int) -> None:
         nonlocal actor_index
-        upsert_clip_status(state_db, task.clip_id, task.video_id, "Running", "", attempt)
-        clip_payload = _clip_to_dict(task)
-        actor = gpu_actors[actor_index % len(gpu_actors)]
+        for task in tasks:
+            upsert_clip_status(state_db, task.clip_id, task.video_id, "Running", "", attempt)
+        gpu_index = actor_index % len(gpu_actors)
+        actor = gpu_actors[gpu_index]
         actor_index += 1
-        ref = actor.process.remote(clip_payload)
+        if video_mode:
+            ref = actor.process_video.remote(_video_payload(tasks))
+        else:
+            ref = actor.process.remote(_clip_to_dict(tasks[0]))
         pending_gpu.append(ref)
-        ref_to_meta[ref] = (task, attempt)
+        ref_to_meta[ref] = (tasks, attempt, gpu_index)
 
-    for task in clip_tasks:
-        submit_clip(task, task.retry_count)
+    def submit_write(
+        result: Dict[str, Any],
+        attempt: int,
+        gpu_index: Optional[int] = None,
+        task: Optional[ClipTask] = None,
+    ) -> None:
+        if gpu_index is not None:
+            # Co-located: the GPU actor writes the result it holds, on its write thread.
+            shard = gpu_index
+            write_held = gpu_actors[gpu_index].write_held.options(concurrency_group=WRITE_GROUP)
+            write_ref = write_held.remote(result["clip"]["clip_id"])
+        else:
+            # Sharding by video keeps every clip of a video on one writer, in order.
+            shard = writer_shard(result["clip"]["video_id"], len(writers))
+            write_ref = writers[shard].write.remote(result)
+        pending_write.append(write_ref)
+        write_ref_to_meta[write_ref] = (result, attempt, shard, time.time(), gpu_index, task)
+        write_queue.set(len(pending_write))
+        summary.write_queue_max = max(summary.write_queue_max, len(pending_write))
 
-        done_refs, pending_gpu = enforce_in_flight(
-            pending_gpu, config.backpressure.max_in_flight_gpu
-        )
+    def handle_gpu_done(done_refs: List[Any]) -> None:
         for done_ref in done_refs:
-            task, attempt = ref_to_meta.pop(done_ref)
+            tasks, attempt, gpu_index = ref_to_meta.pop(done_ref)
+            tasks_by_id = {task.clip_id: task for task in tasks}
             try:
-                result = ray.get(done_ref)
-                upsert_clip_status(state_db, task.clip_id, task.video_id, "Writing", "", attempt)
-                write_ref = writer.write.remote(result)
-                pending_write.append(write_ref)
-                write_ref_to_meta[write_ref] = (result, 0)
+                output = ray.get(done_ref)
+                results = output if isinstance(output, list) else [output]
+                for result in results:
+                    clip = result["clip"]
+                    masks = result.get("masks", {})
+                    summary.frames_processed += int(masks.get("frames_processed", 0))
+                    if float(masks.get("gpu_s", 0.0)) > 0:
+                        summary.gpu_s_total += float(masks["gpu_s"])
+                        summary.gpu_video_s += float(clip["end_s"]) - float(clip["start_s"])
+                    if masks.get("cache_hit") is True:
+                        summary.cache_hits += 1
+                    elif masks.get("cache_hit") is False:
+                        summary.cache_misses += 1
+                    upsert_clip_status(state_db, clip["clip_id"], clip["video_id"], "Writing", "", attempt)
+                    if result.get("status") == "held":
+                        submit_write(result, 0, gpu_index, tasks_by_id.get(clip["clip_id"]))
+                    else:
+                        summary.driver_result_bytes += _result_nbytes(result)
+                        submit_write(result, 0)
             except Exception as exc:
                 classification = classify_error(exc)
-                if classification.retryable and attempt < config.retry.max_retries:
+                if len(tasks) > 1:
+                    # One bad segment fails the whole session; retry each clip
+                    # on its own so only the clips that fail again are failed.
+                    logger.warning(
+                        "video %s failed (%s); retrying its %d clips one by one", tasks[0].video_id, exc, len(tasks)
+                    )
+                    for task in tasks:
+                        submit_job([task], attempt)
+                elif classification.retryable and attempt < config.retry.max_retries:
                     delay = config.retry.next_delay(attempt + 1)
                     time.sleep(delay)
-                    task.retry_count = attempt + 1
-                    submit_clip(task, task.retry_count)
+                    for task in tasks:
+                        task.retry_count = attempt + 1
+                    submit_job(tasks, attempt + 1)
                 else:
-                    upsert_clip_status(
-                        state_db,
-                        task.clip_id,
-                        task.video_id,
-                        "Failed",
-                        str(exc),
-                        attempt,
-                    )
-                    mark_dead_letter(state_db, task.clip_id, task.video_id, str(exc))
+                    summary.clips_failed += len(tasks)
+                    for task in tasks:
+                        upsert_clip_status(
+                            state_db,
+                            task.clip_id,
+                            task.video_id,
+                            "Failed",
+                            str(exc),
+                            attempt,
+                        )
+                        mark_dead_letter(state_db, task.clip_id, task.video_id, str(exc))
 
-        done_write, pending_write = enforce_in_flight(
-            pending_write, config.backpressure.max_in_flight_write
+    def complete_write(clip: Dict[str, Any], receipt: Dict[str, Any], attempt: int) -> None:
+        summary.write_s_total += float(receipt.get("write_s", 0.0))
+        for info in receipt.get("files", []):
+            if info.get("skipped"):
+                summary.files_skipped += 1
+                summary.bytes_skipped += int(info.get("bytes", 0))
+        upsert_clip_status(state_db, clip["clip_id"], clip["video_id"], "Done", "", attempt)
+        record_clip_output(
+            state_db,
+            clip["clip_id"],
+            run_id,
+            clip_dir(config.paths.output_root, run_id, clip["video_id"], clip["clip_id"]),
         )
+        summary.clips_done += 1
+
+    def handle_write_done(done_write: List[Any]) -> None:
         for write_ref in done_write:
-            result, attempt = write_ref_to_meta.pop(write_ref)
+            result, attempt, shard, submitted, gpu_index, task = write_ref_to_meta.pop(write_ref)
             clip = result["clip"]
             try:
-                ray.get(write_ref)
-                upsert_clip_status(state_db, clip["clip_id"], clip["video_id"], "Done", "", attempt)
+                receipt = ray.get(write_ref)
+                latency = time.time() - submitted
+                DEFAULT_METRICS.write_latency.labels(writer=str(shard)).observe(latency)
+                summary.write_latency_s_max = max(summary.write_latency_s_max, latency)
+                complete_write(clip, receipt, attempt)
             except Exception as exc:
                 classification = classify_error(exc)
-                if classification.retryable and attempt < config.retry.max_retries:
+                if isinstance(exc, HeldResultLost) and task is not None:
+                    # The actor lost the result (restart): recompute it as a GPU retry.
+                    if task.retry_count < config.retry.max_retries:
+                        logger.warning("clip %s: %s; resubmitting the GPU job", clip["clip_id"], exc)
+                        task.retry_count += 1
+                        submit_job([task], task.retry_count)
+                        continue
+                elif classification.retryable and attempt < config.retry.max_retries:
                     delay = config.retry.next_delay(attempt + 1)
                     time.sleep(delay)
-                    retry_ref = writer.write.remote(result)
-                    pending_write.append(retry_ref)
-                    write_ref_to_meta[retry_ref] = (result, attempt + 1)
-                else:
-                    upsert_clip_status(
-                        state_db,
-                        clip["clip_id"],
-                        clip["video_id"],
-                        "Failed",
-                        str(exc),
-                        attempt,
-                    )
-                    mark_dead_letter(state_db, clip["clip_id"], clip["video_id"], str(exc))
+                    submit_write(result, attempt + 1, gpu_index, task)
+                    continue
+                if gpu_index is not None:
+                    gpu_actors[gpu_index].discard_held.remote(clip["clip_id"])
+                summary.clips_failed += 1
+                upsert_clip_status(
+                    state_db,
+                    clip["clip_id"],
+                    clip["video_id"],
+                    "Failed",
+                    str(exc),
+                    attempt,
+                )
+                mark_dead_letter(state_db, clip["clip_id"], clip["video_id"], str(exc))
 
-    # Drain remaining
-    while pending_gpu:
-        done_refs, pending_gpu = enforce_in_flight(pending_gpu, 1)
-        for done_ref in done_refs:
-            task, attempt = ref_to_meta.pop(done_ref)
-            try:
-                result = ray.get(done_ref)
-                upsert_clip_status(state_db, task.clip_id, task.video_id, "Writing", "", attempt)
-                write_ref = writer.write.remote(result)
-                pending_write.append(write_ref)
-                write_ref_to_meta[write_ref] = (result, 0)
-            except Exception as exc:
-                classification = classify_error(exc)
-                if classification.retryable and attempt < config.retry.max_retries:
-                    delay = config.retry.next_delay(attempt + 1)
-                    time.sleep(delay)
-                    task.retry_count = attempt + 1
-                    submit_clip(task, task.retry_count)
-                else:
-                    upsert_clip_status(
-                        state_db,
-                        task.clip_id,
-                        task.video_id,
-                        "Failed",
-                        str(exc),
-                        attempt,
-                    )
-                    mark_dead_letter(state_db, task.clip_id, task.video_id, str(exc))
+    for job in jobs:
+        submit_job(job, job[0].retry_count)
 
-    while pending_write:
-        done_write, pending_write = enforce_in_flight(pending_write, 1)
-        for write_ref in done_write:
-            result, attempt = write_ref_to_meta.pop(write_ref)
-            clip = result["clip"]
-            try:
-                ray.get(write_ref)
-                upsert_clip_status(state_db, clip["clip_id"], clip["video_id"], "Done", "", attempt)
-            except Exception as exc:
-                classification = classify_error(exc)
-                if classification.retryable and attempt < config.retry.max_retries:
-                    delay = config.retry.next_delay(attempt + 1)
-                    time.sleep(delay)
-                    retry_ref = writer.write.remote(result)
-                    pending_write.append(retry_ref)
-                    write_ref_to_meta[retry_ref] = (result, attempt + 1)
-                else:
-                    upsert_clip_status(
-                        state_db,
-                        clip["clip_id"],
-                        clip["video_id"],
-                        "Failed",
-                        str(exc),
-                        attempt,
-                    )
-                    mark_dead_letter(state_db, clip["clip_id"], clip["video_id"], str(exc))
+        done_refs, pending_gpu = enforce_in_flight(
+            pending_gpu, config.backpressure.max_in_flight_gpu
+        )
+        handle_gpu_done(done_refs)
+
+        done_write, pending_write = enforce_in_flight(
+            pending_write, config.backpressure.max_in_flight_write
+        )
+        handle_write_done(done_write)
+
+    # Drain remaining; a lost held result sends its clip back to the GPU queue.
+    while pending_gpu or pending_write:
+        while pending_gpu:
+            done_refs, pending_gpu = enforce_in_flight(pending_gpu, 1)
+            handle_gpu_done(done_refs)
+
+        while pending_write:
+            done_write, pending_write = enforce_in_flight(pending_write, 1)
+            handle_write_done(done_write)
+    write_queue.set(0)
+    # Publish the catalog rows each writer process still buffers.
+    if colocated:
+        ray.get([actor.flush_catalog.options(concurrency_group=WRITE_GROUP).remote() for actor in gpu_actors])
+    else:
+        ray.get([actor.flush_catalog.remote() for actor in writers])
+
+    if alias_rows:
+        alias_writer = ClipWriter(config_dict)
+        alias_writer.catalog.sync()
+        write_aliases(state_db, alias_writer, alias_rows, aliases, summary)
+        alias_writer.catalog.flush()
+    skipped = config.triage.action == "skip"
+    summary.clips_skipped = len(triage.flagged) if skipped else 0
+    summary.clips_deprioritized = 0 if skipped else len(triage.flagged)
+    summary.clips_triage_reused = triage.reused
+    summary.triage_s = triage.seconds
+    if skipped and summary.gpu_video_s > 0:
+        # Estimated like gpu_hours_saved: skipped video seconds at this run's GPU cost.
+        skipped_video_s = sum(result.duration_s for result in triage.flagged)
+        summary.triage_gpu_s_saved = skipped_video_s * summary.gpu_s_total / summary.gpu_video_s
 
+    summary.wall_time_s = time.time() - run_start
+    summary.driver_peak_rss_bytes = peak_rss_bytes()
+    write_json(join_path(run_root, "run_summary.json"), summary.to_dict())
+    logger.info("run summary %s", json.dumps(summary.to_dict(), ensure_ascii=True))
     ray.shutdown()
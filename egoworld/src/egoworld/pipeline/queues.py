@@ -3,7 +3,12 @@
 from __future__ import annotations
 
 import asyncio
-from typing import Iterable, List, Tuple
+import queue
+import threading
+from typing import Iterable, Iterator, List, Tuple, TypeVar
+
+T = TypeVar("T")
+_DONE = object()
 
 
 def enforce_in_flight(
@@ -28,6 +33,37 @@ def enforce_in_flight(
     return list(done), list(remaining)
 
 
+class _Raised:
+    def __init__(self, exc: BaseException):
+        self.exc = exc
+
+
+def prefetch(items: Iterable[T], depth: int) -> Iterator[T]:
+    """Produce ``items`` in a background thread, up to ``depth`` ahead of the consumer.
+
+    Exceptions raised by the producer are re-raised in the consumer.
+    """
+    buffer: queue.Queue = queue.Queue(maxsize=max(1, depth))
+
+    def produce() -> None:
+        try:
+            for item in items:
+                buffer.put(item)
+        except BaseException as exc:  # handed to the consumer
+            buffer.put(_Raised(exc))
+        finally:
+            buffer.put(_DONE)
+
+    threading.Thread(target=produce, name="egoworld-prefetch", daemon=True).start()
+    while True:
+        item = buffer.get()
+        if item is _DONE:
+            return
+        if isinstance(item, _Raised):
+            raise item.exc
+        yield item
+
+
 class BoundedAsyncQueue:
     def __init__(self, max_size: int):
         self._queue: asyncio.Queue = asyncio.Queue(max_size)
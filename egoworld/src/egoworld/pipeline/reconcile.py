@@ -0,0 +1,107 @@
+"""Reconcile clip_status against a run's output catalog without walking outputs."""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List
+import hashlib
+
+from egoworld.io.catalog import OutputCatalog
+from egoworld.io.fs import filesystem_for
+from egoworld.io.paths import catalog_dir, catalog_path
+from egoworld.pipeline.state_store import bulk_set_status, get_clip_outputs, get_status_times
+
+
+# The file each kind of clip write appends last; without it the write is incomplete.
+_COMPLETE_MARKERS = ("meta.json", "alias.json")
+
+
+def run_catalog(state_db_path: str, output_root: str, run_id: str) -> OutputCatalog:
+    """The run's catalog: the local index with every node's shared segments imported."""
+    return OutputCatalog(str(catalog_path(state_db_path, run_id)), shared_dir=catalog_dir(output_root, run_id)).sync()
+
+
+def verify_entry(entry: Dict[str, Any]) -> str:
+    """Read one cataloged file back; returns why it differs from the catalog, or "" when it matches."""
+    path = entry["path"]
+    try:
+        data = filesystem_for(path).read_bytes(path)
+    except FileNotFoundError:
+        return f"{entry['file']}: missing"
+    if len(data) != int(entry["bytes"]):
+        return f"{entry['file']}: {len(data)} bytes, catalog {entry['bytes']}"
+    if hashlib.sha256(data).hexdigest() != entry["sha256"]:
+        return f"{entry['file']}: sha256 differs from catalog"
+    if path.endswith(".parquet"):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        rows = pq.ParquetFile(pa.BufferReader(data)).metadata.num_rows
+        if rows != int(entry["rows"]):
+            return f"{entry['file']}: {rows} rows, catalog {entry['rows']}"
+    return ""
+
+
+def check_write(files: List[Dict[str, Any]], verify: bool = False) -> str:
+    """Why a clip's latest cataloged write cannot be trusted, or "" when it can."""
+    if not any(entry["file"] in _COMPLETE_MARKERS for entry in files):
+        return "incomplete write in catalog"
+    if verify:
+        for entry in files:
+            reason = verify_entry(entry)
+            if reason:
+                return reason
+    return ""
+
+
+def reconcile(
+    state_db_path: str,
+    output_root: str,
+    run_id: str,
+    dry_run: bool = False,
+    verify: bool = False,
+) -> Dict[str, List[str]]:
+    """Diff clip_status against one run's catalog (every node's segments).
+
+    - Done clips whose latest write is missing or incomplete are requeued as
+      Pending. With ``verify`` each cataloged file is also read back and its
+      size, sha256 and Parquet row count compared with the catalog.
+    - The state DB is shared across runs. Clips whose latest outputs were
+      recorded by another run (``clip_output``) are not judged against this
+      run's catalog; they are left alone and reported as ``unverified``, as
+      are Done clips without a recorded owner that were last updated before
+      the run's first cataloged write.
+    - Running/Writing clips with a trusted cataloged write (the run died after
+      the write) are marked Done.
+    """
+    statuses = get_status_times(state_db_path)
+    owners = get_clip_outputs(state_db_path)
+    catalog = run_catalog(state_db_path, output_root, run_id)
+    writes = catalog.latest_writes()
+    started_at = catalog.started_at()
+
+    requeue: Dict[str, str] = {}
+    unverified: List[str] = []
+    promote: List[str] = []
+    for clip_id, (status, updated_at) in sorted(statuses.items()):
+        owner = owners.get(clip_id)
+        if owner is not None and owner[0] != run_id:
+            if status == "Done":
+                unverified.append(clip_id)
+            continue
+        if status == "Done":
+            if clip_id not in writes:
+                if owner is None and (started_at is None or updated_at < started_at):
+                    unverified.append(clip_id)
+                else:
+                    requeue[clip_id] = "outputs missing from catalog"
+                continue
+            reason = check_write(writes[clip_id], verify)
+            if reason:
+                requeue[clip_id] = reason
+        elif status in ("Running", "Writing") and clip_id in writes and not check_write(writes[clip_id], verify):
+            promote.append(clip_id)
+    if not dry_run:
+        for reason in sorted(set(requeue.values())):
+            bulk_set_status(state_db_path, [c for c, r in requeue.items() if r == reason], "Pending", reason)
+        bulk_set_status(state_db_path, promote, "Done")
+    return {"requeued": sorted(requeue), "marked_done": promote, "unverified": unverified}
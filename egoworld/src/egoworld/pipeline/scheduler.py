@@ -2,8 +2,39 @@
 
 from __future__ import annotations
 
-from typing import Iterable, List
+from typing import Iterable, List, Tuple
+import zlib
 
 
 def sort_clips_by_duration(clips: Iterable[dict]) -> List[dict]:
     return sorted(clips, key=lambda c: (c.get("end_s", 0) - c.get("start_s", 0)), reverse=True)
+
+
+def writer_shard(video_id: str, num_writers: int) -> int:
+    """Stable writer index for a video so all of its clips go to one writer."""
+    return zlib.crc32(video_id.encode("utf-8")) % max(1, num_writers)
+
+
+def plan_video_segments(clips: Iterable[dict]) -> List[Tuple[int, int]]:
+    """Split the frame span of one video's clips into non-overlapping segments.
+
+    Clips and segments are half-open [frame_start, frame_end) ranges, like
+    ``end_s = frame_end / fps``. Consecutive clips overlap symmetrically
+    around a scene cut, so the cut is taken as the midpoint of the overlap.
+    """
+    ordered = sorted(clips, key=lambda c: (int(c["frame_start"]), int(c["frame_end"])))
+    if not ordered:
+        return []
+    segments: List[Tuple[int, int]] = []
+    start = int(ordered[0]["frame_start"])
+    for cur, nxt in zip(ordered, ordered[1:]):
+        cur_end = int(cur["frame_end"])
+        nxt_start = int(nxt["frame_start"])
+        cut = (nxt_start + cur_end) // 2 if nxt_start < cur_end else cur_end
+        if cut > start:
+            segments.append((start, cut))
+        start = max(start, cut, nxt_start)
+    end = max(int(c["frame_end"]) for c in ordered)
+    if end > start:
+        segments.append((start, end))
+    return segments
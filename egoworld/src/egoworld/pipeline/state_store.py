@@ -4,7 +4,7 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Iterable, List, Optional, Sequence
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 import sqlite3
 import time
 
@@ -44,6 +44,31 @@ def init_db(path: str) -> None:
             )
             """
         )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS clip_output (
+                clip_id TEXT PRIMARY KEY,
+                run_id TEXT,
+                path TEXT,
+                updated_at REAL
+            )
+            """
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS clip_triage (
+                clip_id TEXT PRIMARY KEY,
+                measure TEXT,
+                thresholds TEXT,
+                brightness REAL,
+                sharpness REAL,
+                motion REAL,
+                source TEXT,
+                reason TEXT,
+                updated_at REAL
+            )
+            """
+        )
         conn.commit()
 
 
@@ -81,6 +106,86 @@ def mark_dead_letter(path: str, clip_id: str, video_id: str, error: str) -> None
         conn.commit()
 
 
+def record_clip_output(path: str, clip_id: str, run_id: str, output_dir: str) -> None:
+    """Remember where a clip's latest complete outputs live, across runs."""
+    with sqlite3.connect(path) as conn:
+        conn.execute(
+            """
+            INSERT INTO clip_output (clip_id, run_id, path, updated_at) VALUES (?, ?, ?, ?)
+            ON CONFLICT(clip_id) DO UPDATE SET
+                run_id=excluded.run_id, path=excluded.path, updated_at=excluded.updated_at
+            """,
+            (clip_id, run_id, output_dir, time.time()),
+        )
+        conn.commit()
+
+
+def get_clip_output(path: str, clip_id: str) -> Optional[Tuple[str, str]]:
+    """(run_id, output_dir) of a clip's latest complete outputs, or None."""
+    with sqlite3.connect(path) as conn:
+        row = conn.execute("SELECT run_id, path FROM clip_output WHERE clip_id=?", (clip_id,)).fetchone()
+    return (row[0], row[1]) if row else None
+
+
+def get_clip_outputs(path: str) -> Dict[str, Tuple[str, str]]:
+    """clip_id -> (run_id, output_dir) for every clip with recorded outputs."""
+    with sqlite3.connect(path) as conn:
+        rows = conn.execute("SELECT clip_id, run_id, path FROM clip_output").fetchall()
+    return {clip_id: (owner, output_dir) for clip_id, owner, output_dir in rows}
+
+
+def mark_skipped(path: str, reasons: Dict[str, str]) -> None:
+    """Set clips to Skipped with their reason in ``last_error``; Skipped clips are not resumed."""
+    now = time.time()
+    with sqlite3.connect(path) as conn:
+        conn.executemany(
+            "UPDATE clip_status SET status='Skipped', last_error=?, updated_at=? WHERE clip_id=?",
+            [(reason, now, clip_id) for clip_id, reason in reasons.items()],
+        )
+        conn.commit()
+
+
+# clip_id, measure, thresholds, brightness, sharpness, motion, source, reason
+TriageRow = Tuple[str, str, str, float, float, float, str, str]
+
+
+def save_triage(path: str, rows: Iterable[TriageRow]) -> None:
+    """Store triage statistics and verdicts with the settings they were computed under."""
+    now = time.time()
+    with sqlite3.connect(path) as conn:
+        conn.executemany(
+            """
+            INSERT INTO clip_triage
+            (clip_id, measure, thresholds, brightness, sharpness, motion, source, reason, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(clip_id) DO UPDATE SET
+                measure=excluded.measure,
+                thresholds=excluded.thresholds,
+                brightness=excluded.brightness,
+                sharpness=excluded.sharpness,
+                motion=excluded.motion,
+                source=excluded.source,
+                reason=excluded.reason,
+                updated_at=excluded.updated_at
+            """,
+            [row + (now,) for row in rows],
+        )
+        conn.commit()
+
+
+def load_triage(path: str, status: Optional[str] = None) -> Dict[str, TriageRow]:
+    """Stored triage rows by clip_id, optionally only for clips in ``status``."""
+    query = "SELECT t.clip_id, t.measure, t.thresholds, t.brightness, t.sharpness, t.motion, t.source, t.reason"
+    query += " FROM clip_triage t"
+    params: Tuple[str, ...] = ()
+    if status is not None:
+        query += " JOIN clip_status s ON s.clip_id = t.clip_id WHERE s.status=?"
+        params = (status,)
+    with sqlite3.connect(path) as conn:
+        rows = conn.execute(query, params).fetchall()
+    return {row[0]: tuple(row) for row in rows}  # type: ignore[misc]
+
+
 def get_resumable_clips(path: str, statuses: Optional[Sequence[str]] = None) -> List[str]:
     statuses = statuses or ("Pending", "Failed", "Writing", "Running")
     placeholders = ",".join(["?"] * len(statuses))
@@ -112,3 +217,26 @@ def bulk_insert_pending(path: str, clips: Iterable[dict]) -> None:
             [(clip["clip_id"], clip["video_id"], time.time()) for clip in clips],
         )
         conn.commit()
+
+
+def get_status_map(path: str) -> Dict[str, str]:
+    with sqlite3.connect(path) as conn:
+        rows = conn.execute("SELECT clip_id, status FROM clip_status").fetchall()
+    return {row[0]: row[1] for row in rows}
+
+
+def get_status_times(path: str) -> Dict[str, Tuple[str, float]]:
+    """clip_id -> (status, updated_at)."""
+    with sqlite3.connect(path) as conn:
+        rows = conn.execute("SELECT clip_id, status, updated_at FROM clip_status").fetchall()
+    return {row[0]: (row[1], float(row[2] or 0.0)) for row in rows}
+
+
+def bulk_set_status(path: str, clip_ids: Iterable[str], status: str, last_error: str = "") -> None:
+    now = time.time()
+    with sqlite3.connect(path) as conn:
+        conn.executemany(
+            "UPDATE clip_status SET status=?, last_error=?, updated_at=? WHERE clip_id=?",
+            [(status, last_error, now, clip_id) for clip_id in clip_ids],
+        )
+        conn.commit()
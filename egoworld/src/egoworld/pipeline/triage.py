@@ -0,0 +1,191 @@
+"""CPU triage of clips before GPU work: brightness, sharpness and motion on a few small frames."""
+
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from egoworld.config import TriageConfig
+from egoworld.io.sidecar import Sidecar, SidecarStore
+
+
+Stats = Tuple[float, float, float]  # brightness, sharpness, motion
+
+
+@dataclass
+class ClipTriage:
+    clip_id: str
+    video_id: str
+    duration_s: float
+    brightness: float = 0.0
+    sharpness: float = 0.0
+    motion: float = 0.0
+    source: str = "none"  # sidecar | decode | none (unreadable, kept)
+    reason: str = ""  # empty = keep
+
+
+def sample_frames(frame_start: int, frame_end: int, samples: int) -> List[int]:
+    """Evenly spaced frames in [frame_start, frame_end), each leaving room for its next frame."""
+    last = max(frame_start, frame_end - 2)
+    count = max(1, min(int(samples), last - frame_start + 1))
+    return sorted({int(round(f)) for f in np.linspace(frame_start, last, count)})
+
+
+def _small(frame_bgr: np.ndarray, width: int) -> np.ndarray:
+    import cv2
+
+    h, w = frame_bgr.shape[:2]
+    if width > 0 and w > width:
+        frame_bgr = cv2.resize(frame_bgr, (width, max(1, round(h * width / w))), interpolation=cv2.INTER_AREA)
+    return frame_bgr
+
+
+def _sharpness(frame_bgr: np.ndarray) -> float:
+    import cv2
+
+    return float(cv2.Laplacian(cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2GRAY), cv2.CV_64F).var())
+
+
+def _value(frame_bgr: np.ndarray) -> np.ndarray:
+    import cv2
+
+    return cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2HSV)[..., 2].astype(np.int16)
+
+
+def decode_stats(video_path: str, frame_start: int, frame_end: int, config: TriageConfig) -> Optional[Stats]:
+    """Largest brightness, sharpness and motion over ``config.samples`` frame pairs.
+
+    Each sample seeks to a frame and reads it and the next one, downscaled to
+    ``config.width``: brightness is the mean HSV V, sharpness the Laplacian
+    variance, motion the mean absolute V difference of the pair. Returns None
+    when no frame can be read.
+    """
+    import cv2
+
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        return None
+    found: List[Stats] = []
+    try:
+        for frame_idx in sample_frames(frame_start, frame_end, config.samples):
+            cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
+            ok, first = cap.read()
+            if not ok:
+                continue
+            first = _small(first, config.width)
+            value = _value(first)
+            ok, second = cap.read()
+            motion = float(np.abs(_value(_small(second, config.width)) - value).mean()) if ok else 0.0
+            found.append((float(value.mean()), _sharpness(first), motion))
+    finally:
+        cap.release()
+    if not found:
+        return None
+    return tuple(float(v) for v in np.max(np.asarray(found), axis=0))  # type: ignore[return-value]
+
+
+def sidecar_stats(sidecar: Sidecar, frame_start: int, frame_end: int, config: TriageConfig) -> Optional[Stats]:
+    """Triage statistics from a manifest sidecar, without decoding.
+
+    Brightness and motion are the largest per-frame values in the clip;
+    sharpness comes from up to ``config.samples`` thumbnails resized to
+    ``config.width`` and is not checked (inf) when none falls in the clip.
+    """
+    stats = sidecar.stats(frame_start, frame_end)
+    if not stats:
+        return None
+    thumbs = sidecar.prompt_frames(frame_start, frame_end, 1 << 30)
+    if len(thumbs) > config.samples:
+        thumbs = [thumbs[int(i)] for i in np.linspace(0, len(thumbs) - 1, config.samples)]
+    sharpness = max(
+        (_sharpness(_small(np.ascontiguousarray(rgb[..., ::-1]), config.width)) for _, rgb in thumbs),
+        default=float("inf"),
+    )
+    return stats["brightness_max"], sharpness, stats["motion_max"]
+
+
+def measure_key(config: TriageConfig) -> str:
+    """Settings the statistics depend on; stored statistics are reused only under the same key."""
+    return f"samples={config.samples},width={config.width}"
+
+
+def thresholds_key(config: TriageConfig) -> str:
+    """Settings the verdict depends on, stored next to it."""
+    return f"brightness={config.min_brightness:g},sharpness={config.min_sharpness:g},motion={config.min_motion:g}"
+
+
+def triage_reason(stats: Stats, config: TriageConfig) -> str:
+    """Why a clip is content-free, or "" to keep it; a zero threshold disables its check."""
+    brightness, sharpness, motion = stats
+    if config.min_brightness > 0 and brightness < config.min_brightness:
+        return f"triage: dark (brightness {brightness:.1f} < {config.min_brightness:g})"
+    if config.min_sharpness > 0 and sharpness < config.min_sharpness:
+        return f"triage: blurry (sharpness {sharpness:.1f} < {config.min_sharpness:g})"
+    if config.min_motion > 0 and motion < config.min_motion:
+        return f"triage: static (motion {motion:.2f} < {config.min_motion:g})"
+    return ""
+
+
+@lru_cache(maxsize=4)
+def _open_sidecar(sidecar_dir: str, checksum: str, prompt_interval_s: float) -> Optional[Sidecar]:
+    return SidecarStore(sidecar_dir).open(checksum, prompt_interval_s)
+
+
+def triage_clip(
+    task: Any,
+    config: TriageConfig,
+    sidecar_dir: str = "",
+    prompt_interval_s: float = 2.0,
+) -> ClipTriage:
+    """Triage one ``ClipTask``: from the sidecar when one exists, else a few decoded frames."""
+    result = ClipTriage(task.clip_id, task.video_id, float(task.end_s) - float(task.start_s))
+    stats: Optional[Stats] = None
+    sidecar = _open_sidecar(sidecar_dir, task.checksum, prompt_interval_s) if sidecar_dir and task.checksum else None
+    if sidecar is not None:
+        stats = sidecar_stats(sidecar, task.frame_start, task.frame_end, config)
+        result.source = "sidecar"
+    if stats is None:
+        # Proxies keep the source frame rate, so frame indices carry over.
+        stats = decode_stats(task.proxy_path or task.video_path, task.frame_start, task.frame_end, config)
+        result.source = "decode"
+    if stats is None:
+        result.source = "none"
+        return result
+    result.brightness, result.sharpness, result.motion = stats
+    result.reason = triage_reason(stats, config)
+    return result
+
+
+def triage_clips(
+    tasks: Iterable[Any],
+    config: TriageConfig,
+    sidecar_dir: str = "",
+    prompt_interval_s: float = 2.0,
+) -> Iterator[ClipTriage]:
+    """Triage ``tasks`` in order, in ``config.workers`` processes.
+
+    Tasks in manifest order keep each video's clips together, so sidecars
+    and page cache are reused between neighbouring clips.
+    """
+    if config.workers <= 1:
+        for task in tasks:
+            yield triage_clip(task, config, sidecar_dir, prompt_interval_s)
+        return
+    # Executor.map submits its whole input, so tasks go in bounded batches.
+    with ProcessPoolExecutor(max_workers=config.workers) as pool:
+        batch: List[Tuple[Any, TriageConfig, str, float]] = []
+        for task in tasks:
+            batch.append((task, config, sidecar_dir, prompt_interval_s))
+            if len(batch) >= 4096:
+                yield from pool.map(_triage_args, batch, chunksize=64)
+                batch = []
+        if batch:
+            yield from pool.map(_triage_args, batch, chunksize=64)
+
+
+def _triage_args(args: Tuple[Any, TriageConfig, str, float]) -> ClipTriage:
+    return triage_clip(*args)
@@ -17,6 +17,10 @@ class OOMError(RetryableError):
     pass
 
 
+class HeldResultLost(RetryableError):
+    """A co-located write found no held result (the GPU actor restarted); the clip must be recomputed."""
+
+
 class DecodeError(Exception):
     pass
 
@@ -2,19 +2,82 @@
 
 from __future__ import annotations
 
+from typing import Any, List
 import hashlib
+import os
 
 
-def sha256_file(path: str, chunk_size: int = 1024 * 1024) -> str:
-    digest = hashlib.sha256()
-    with open(path, "rb") as handle:
+CHECKSUM_MODES: List[str] = ["sha256", "xxh3", "sampled"]
+
+READ_BUFFER = 8 * 1024 * 1024
+
+
+def _digest_file(digest: Any, path: str, chunk_size: int) -> Any:
+    buffer = bytearray(chunk_size)
+    view = memoryview(buffer)
+    with open(path, "rb", buffering=0) as handle:
         while True:
-            chunk = handle.read(chunk_size)
-            if not chunk:
+            n = handle.readinto(buffer)
+            if not n:
                 break
-            digest.update(chunk)
+            digest.update(view[:n])
+    return digest
+
+
+def sha256_file(path: str, chunk_size: int = READ_BUFFER) -> str:
+    return _digest_file(hashlib.sha256(), path, chunk_size).hexdigest()
+
+
+def xxh3_file(path: str, chunk_size: int = READ_BUFFER) -> str:
+    try:
+        import xxhash  # type: ignore
+    except Exception as exc:  # pragma: no cover - optional dependency
+        raise RuntimeError("checksum mode 'xxh3' requires the xxhash package") from exc
+    return _digest_file(xxhash.xxh3_128(), path, chunk_size).hexdigest()
+
+
+def sample_offsets(size: int, blocks: int, block_size: int) -> List[int]:
+    """Offsets of the head block, ``blocks`` evenly spaced blocks and the tail block.
+
+    Empty when the samples would cover the whole file; the file is then hashed
+    in full.
+    """
+    if size <= (blocks + 2) * block_size:
+        return []
+    last = size - block_size
+    return [(i * last) // (blocks + 1) for i in range(blocks + 2)]
+
+
+def sampled_file(path: str, blocks: int = 16, block_size: int = 4 * 1024 * 1024) -> str:
+    """BLAKE2b of the file size plus head, tail and ``blocks`` evenly spaced blocks.
+
+    Reads ``(blocks + 2) * block_size`` bytes regardless of file size. Edits
+    that fall between samples and keep the size unchanged are not detected.
+    """
+    size = os.path.getsize(path)
+    digest = hashlib.blake2b(digest_size=32)
+    digest.update(f"sampled:{size}:{blocks}:{block_size}".encode("ascii"))
+    offsets = sample_offsets(size, blocks, block_size)
+    if not offsets:
+        return _digest_file(digest, path, READ_BUFFER).hexdigest()
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        for offset in offsets:
+            digest.update(os.pread(fd, block_size, offset))
+    finally:
+        os.close(fd)
     return digest.hexdigest()
 
 
+def checksum_file(path: str, mode: str = "sha256", blocks: int = 16, block_size: int = 4 * 1024 * 1024) -> str:
+    if mode == "sha256":
+        return sha256_file(path)
+    if mode == "xxh3":
+        return xxh3_file(path)
+    if mode == "sampled":
+        return sampled_file(path, blocks, block_size)
+    raise ValueError(f"unknown checksum mode: {mode} (expected one of {CHECKSUM_MODES})")
+
+
 def sha256_text(text: str) -> str:
     return hashlib.sha256(text.encode("utf-8")).hexdigest()
@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from typing import Any, Dict
+from typing import Any, Dict, List, Union
 import json
 
 import numpy as np
@@ -35,3 +35,62 @@ def _simple_rle(mask: np.ndarray) -> Dict[str, Any]:
             prev = val
     counts.append(run)
     return {"size": [h, w], "counts": counts}
+
+
+def _coco_counts_from_string(text: str) -> List[int]:
+    """Decode COCO's compressed RLE counts string (pycocotools ``rleFrString``)."""
+    counts: List[int] = []
+    pos = 0
+    while pos < len(text):
+        value = 0
+        shift = 0
+        more = True
+        while more:
+            c = ord(text[pos]) - 48
+            value |= (c & 0x1F) << (5 * shift)
+            more = bool(c & 0x20)
+            pos += 1
+            shift += 1
+            if not more and (c & 0x10):
+                value |= -1 << (5 * shift)
+        if len(counts) > 2:
+            value += counts[-2]
+        counts.append(value)
+    return counts
+
+
+def _coco_string_from_counts(counts: List[int]) -> str:
+    """Encode run counts as a COCO compressed string (pycocotools ``rleToString``)."""
+    chars: List[str] = []
+    for i, count in enumerate(counts):
+        value = int(count) - (int(counts[i - 2]) if i > 2 else 0)
+        more = True
+        while more:
+            c = value & 0x1F
+            value >>= 5
+            more = value != -1 if c & 0x10 else value != 0
+            if more:
+                c |= 0x20
+            chars.append(chr(c + 48))
+    return "".join(chars)
+
+
+def rle_counts(rle: Dict[str, Any]) -> List[int]:
+    counts = rle["counts"]
+    if isinstance(counts, (bytes, str)):
+        return _coco_counts_from_string(counts.decode("ascii") if isinstance(counts, bytes) else counts)
+    return [int(c) for c in counts]
+
+
+def decode_mask_rle(rle: Union[str, Dict[str, Any]]) -> np.ndarray:
+    """Decode an RLE (JSON string or dict, list or COCO string counts) to an (H, W) uint8 mask."""
+    if isinstance(rle, str):
+        rle = json.loads(rle)
+    h, w = (int(v) for v in rle["size"])
+    counts = rle_counts(rle)
+    values = np.zeros(len(counts), dtype=np.uint8)
+    values[1::2] = 1
+    flat = np.repeat(values, counts)
+    if flat.size != h * w:
+        raise ValueError(f"RLE counts cover {flat.size} pixels, expected {h * w}")
+    return flat.reshape((h, w), order="F")
@@ -0,0 +1,414 @@
+"""Mask algebra on run-length encodings, without decoding to pixels.
+
+Runs follow the COCO convention: column-major (Fortran) order, alternating
+background/foreground, starting with a (possibly empty) background run.
+Single-mask operations take an ``Rle`` (height, width, counts); batch
+helpers take sequences of encoded masks and work on concatenated runs.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, NamedTuple, Sequence, Tuple, Union
+import json
+
+import numpy as np
+
+from egoworld.utils.mask import _coco_string_from_counts, rle_counts
+
+
+class Rle(NamedTuple):
+    height: int
+    width: int
+    counts: np.ndarray
+
+
+EncodedMask = Union[str, Dict[str, Any], Rle, None]
+
+
+def parse_rle(rle: EncodedMask) -> Rle:
+    """Rle from a JSON string or dict with list or COCO string counts.
+
+    Empty encodings (None, "", "{}") parse as an empty 0x0 mask.
+    """
+    if isinstance(rle, Rle):
+        return rle
+    if isinstance(rle, str):
+        rle = json.loads(rle) if rle else None
+    if not rle:
+        return Rle(0, 0, np.zeros(0, dtype=np.int64))
+    h, w = (int(v) for v in rle["size"])
+    return Rle(h, w, np.asarray(rle_counts(rle), dtype=np.int64))
+
+
+def to_dict(rle: Rle) -> Dict[str, Any]:
+    return {"size": [rle.height, rle.width], "counts": [int(c) for c in rle.counts]}
+
+
+def area(rle: EncodedMask) -> int:
+    return int(parse_rle(rle).counts[1::2].sum())
+
+
+def bbox(rle: EncodedMask) -> Tuple[int, int, int, int]:
+    """COCO-style [x, y, w, h] of the foreground, zeros when empty."""
+    rle = parse_rle(rle)
+    return tuple(int(v) for v in _bboxes([rle])[0])  # type: ignore[return-value]
+
+
+def _merge(a: Rle, b: Rle, op) -> Rle:
+    if (a.height, a.width) != (b.height, b.width):
+        raise ValueError(f"mask sizes differ: {(a.height, a.width)} vs {(b.height, b.width)}")
+    ends_a = np.cumsum(a.counts)
+    ends_b = np.cumsum(b.counts)
+    bounds = np.union1d(ends_a, ends_b)
+    bounds = bounds[bounds > 0]
+    if bounds.size == 0:
+        return Rle(a.height, a.width, np.zeros(1, dtype=np.int64))
+    starts = np.concatenate([[0], bounds[:-1]])
+    # Run index containing each segment start; odd runs are foreground.
+    fg_a = np.searchsorted(ends_a, starts, side="right") % 2 == 1
+    fg_b = np.searchsorted(ends_b, starts, side="right") % 2 == 1
+    values = op(fg_a, fg_b)
+    lengths = bounds - starts
+    return Rle(a.height, a.width, _runs(values, lengths))
+
+
+def _runs(values: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """Collapse per-segment foreground flags into alternating run counts."""
+    if values.size == 0:
+        return np.zeros(1, dtype=np.int64)
+    change = np.flatnonzero(values[1:] != values[:-1]) + 1
+    group_starts = np.concatenate([[0], change])
+    counts = np.add.reduceat(lengths, group_starts)
+    if values[0]:
+        counts = np.concatenate([[0], counts])
+    return counts.astype(np.int64)
+
+
+def union(a: EncodedMask, b: EncodedMask) -> Rle:
+    return _merge(parse_rle(a), parse_rle(b), np.logical_or)
+
+
+def intersection(a: EncodedMask, b: EncodedMask) -> Rle:
+    return _merge(parse_rle(a), parse_rle(b), np.logical_and)
+
+
+def xor(a: EncodedMask, b: EncodedMask) -> Rle:
+    return _merge(parse_rle(a), parse_rle(b), np.logical_xor)
+
+
+def union_all(rles: Sequence[EncodedMask]) -> Rle:
+    parsed = [parse_rle(r) for r in rles]
+    if not parsed:
+        raise ValueError("union_all needs at least one mask")
+    out = parsed[0]
+    for rle in parsed[1:]:
+        out = _merge(out, rle, np.logical_or)
+    return out
+
+
+def iou(a: EncodedMask, b: EncodedMask) -> float:
+    a, b = parse_rle(a), parse_rle(b)
+    inter = area(intersection(a, b))
+    total = area(a) + area(b) - inter
+    return float(inter / total) if total else 0.0
+
+
+def _concat(rles: Sequence[Rle]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Concatenated runs with their frame id, start offset within the frame, and fg flag."""
+    if not rles:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, empty, empty.astype(bool)
+    counts = np.concatenate([r.counts for r in rles])
+    sizes = np.array([len(r.counts) for r in rles], dtype=np.int64)
+    frame = np.repeat(np.arange(len(rles)), sizes)
+    first = np.cumsum(sizes) - sizes
+    local = np.arange(len(counts)) - first[frame]
+    totals = np.array([int(r.counts.sum()) for r in rles], dtype=np.int64)
+    starts = np.cumsum(counts) - counts - (np.cumsum(totals) - totals)[frame]
+    fg = (local % 2 == 1) & (counts > 0)
+    return counts, frame, starts, fg
+
+
+def areas(rles: Sequence[EncodedMask]) -> np.ndarray:
+    """Foreground pixel count per mask."""
+    parsed = [parse_rle(r) for r in rles]
+    counts, frame, _, fg = _concat(parsed)
+    return np.bincount(frame[fg], weights=counts[fg], minlength=len(parsed)).astype(np.int64)
+
+
+def _bboxes(parsed: Sequence[Rle]) -> np.ndarray:
+    n = len(parsed)
+    out = np.zeros((n, 4), dtype=np.int64)
+    if n == 0:
+        return out
+    counts, frame, starts, fg = _concat(parsed)
+    heights = np.array([r.height for r in parsed], dtype=np.int64)[frame[fg]]
+    s, e, f = starts[fg], starts[fg] + counts[fg] - 1, frame[fg]
+    x0, x1 = s // heights, e // heights
+    same_col = x0 == x1
+    # Runs spanning a column boundary cover the full height.
+    y0 = np.where(same_col, s % heights, 0)
+    y1 = np.where(same_col, e % heights, heights - 1)
+    big = np.iinfo(np.int64).max
+    xmin = np.full(n, big)
+    ymin = np.full(n, big)
+    xmax = np.full(n, -1)
+    ymax = np.full(n, -1)
+    np.minimum.at(xmin, f, x0)
+    np.minimum.at(ymin, f, y0)
+    np.maximum.at(xmax, f, x1)
+    np.maximum.at(ymax, f, y1)
+    has = xmax >= 0
+    out[has] = np.stack([xmin, ymin, xmax - xmin + 1, ymax - ymin + 1], axis=1)[has]
+    return out
+
+
+def bboxes(rles: Sequence[EncodedMask]) -> np.ndarray:
+    """(N, 4) COCO-style [x, y, w, h] per mask; zeros for empty masks."""
+    return _bboxes([parse_rle(r) for r in rles])
+
+
+def mask_stats(rles: Sequence[EncodedMask]) -> Tuple[np.ndarray, np.ndarray]:
+    """(areas, bboxes) for a batch, parsing each mask once."""
+    parsed = [parse_rle(r) for r in rles]
+    return areas(parsed), _bboxes(parsed)
+
+
+def _segments(a: Sequence[Rle], b: Sequence[Rle]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Common segments of mask pairs ``(a[i], b[i])`` over concatenated runs.
+
+    Returns per-segment (fg in a, fg in b, length, pair index), computed for
+    the whole batch with one merge of the run ends.
+    """
+    if len(a) != len(b):
+        raise ValueError(f"batch sizes differ: {len(a)} vs {len(b)}")
+    for i, (ra, rb) in enumerate(zip(a, b)):
+        if (ra.height, ra.width) != (rb.height, rb.width):
+            raise ValueError(f"mask sizes differ at {i}: {(ra.height, ra.width)} vs {(rb.height, rb.width)}")
+    counts_a, _, _, runs_fg_a = _concat(a)
+    counts_b, _, _, runs_fg_b = _concat(b)
+    ends_a = np.cumsum(counts_a)
+    ends_b = np.cumsum(counts_b)
+    # Both inputs are sorted: a stable sort plus dedupe beats union1d's hashing here.
+    bounds = np.sort(np.concatenate([ends_a, ends_b]), kind="stable")
+    bounds = bounds[(bounds > 0) & np.concatenate([[True], bounds[1:] != bounds[:-1]])]
+    if bounds.size == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty.astype(bool), empty.astype(bool), empty, empty
+    starts = np.concatenate([[0], bounds[:-1]]).astype(np.int64)
+    fg_a = runs_fg_a[np.searchsorted(ends_a, starts, side="right")]
+    fg_b = runs_fg_b[np.searchsorted(ends_b, starts, side="right")]
+    pair_ends = np.cumsum([r.height * r.width for r in a], dtype=np.int64)
+    pair = np.searchsorted(pair_ends, starts, side="right")
+    return fg_a, fg_b, bounds - starts, pair
+
+
+def _merge_batch(a: Sequence[EncodedMask], b: Sequence[EncodedMask], op) -> List[Rle]:
+    a, b = [parse_rle(r) for r in a], [parse_rle(r) for r in b]
+    fg_a, fg_b, lengths, pair = _segments(a, b)
+    values = op(fg_a, fg_b)
+    n = len(a)
+    if values.size == 0:
+        return [Rle(r.height, r.width, np.zeros(1, dtype=np.int64)) for r in a]
+    # Collapse like _runs, but never across a pair boundary.
+    change = np.flatnonzero((values[1:] != values[:-1]) | (pair[1:] != pair[:-1])) + 1
+    group_starts = np.concatenate([[0], change])
+    counts = np.add.reduceat(lengths, group_starts).astype(np.int64)
+    group_fg = values[group_starts]
+    bounds = np.searchsorted(pair[group_starts], np.arange(n + 1))
+    out = []
+    for i, r in enumerate(a):
+        lo, hi = bounds[i], bounds[i + 1]
+        if lo == hi:
+            runs = np.zeros(1, dtype=np.int64)
+        elif group_fg[lo]:
+            runs = np.concatenate([[0], counts[lo:hi]])
+        else:
+            runs = counts[lo:hi]
+        out.append(Rle(r.height, r.width, runs))
+    return out
+
+
+def unions(a: Sequence[EncodedMask], b: Sequence[EncodedMask]) -> List[Rle]:
+    """Element-wise ``union(a[i], b[i])`` computed over the whole batch at once."""
+    return _merge_batch(a, b, np.logical_or)
+
+
+def intersections(a: Sequence[EncodedMask], b: Sequence[EncodedMask]) -> List[Rle]:
+    """Element-wise ``intersection(a[i], b[i])`` computed over the whole batch at once."""
+    return _merge_batch(a, b, np.logical_and)
+
+
+def xors(a: Sequence[EncodedMask], b: Sequence[EncodedMask]) -> List[Rle]:
+    """Element-wise ``xor(a[i], b[i])`` computed over the whole batch at once."""
+    return _merge_batch(a, b, np.logical_xor)
+
+
+def _intersection_areas(a: Sequence[Rle], b: Sequence[Rle]) -> np.ndarray:
+    fg_a, fg_b, lengths, pair = _segments(a, b)
+    both = fg_a & fg_b
+    return np.bincount(pair[both], weights=lengths[both], minlength=len(a)).astype(np.int64)
+
+
+def _iou(inter: np.ndarray, total: np.ndarray) -> np.ndarray:
+    return np.divide(inter, total, out=np.zeros(inter.shape, dtype=np.float64), where=total > 0)
+
+
+def ious(a: Sequence[EncodedMask], b: Sequence[EncodedMask]) -> np.ndarray:
+    """Element-wise ``iou(a[i], b[i])``; no mask pair is decoded or merged on its own."""
+    a, b = [parse_rle(r) for r in a], [parse_rle(r) for r in b]
+    inter = _intersection_areas(a, b)
+    return _iou(inter, areas(a) + areas(b) - inter)
+
+
+def iou_matrix(a: Sequence[EncodedMask], b: Sequence[EncodedMask]) -> np.ndarray:
+    """(N, M) IoU of every mask in ``a`` against every mask in ``b``.
+
+    All N * M pairs are merged in one pass over concatenated runs, so cost
+    grows with the total run count rather than with Python calls per pair.
+    """
+    a, b = [parse_rle(r) for r in a], [parse_rle(r) for r in b]
+    n, m = len(a), len(b)
+    if n == 0 or m == 0:
+        return np.zeros((n, m), dtype=np.float64)
+    rows, cols = np.repeat(np.arange(n), m), np.tile(np.arange(m), n)
+    inter = _intersection_areas([a[i] for i in rows], [b[j] for j in cols]).reshape(n, m)
+    return _iou(inter, areas(a)[:, None] + areas(b)[None, :] - inter)
+
+
+def to_json(rle: Rle, compressed: bool = False) -> str:
+    """JSON RLE; ``compressed`` writes COCO string counts instead of a list."""
+    payload = to_dict(rle)
+    if compressed:
+        payload["counts"] = _coco_string_from_counts(payload["counts"])
+    return json.dumps(payload, ensure_ascii=True)
+
+
+def to_mask(rle: EncodedMask) -> np.ndarray:
+    """Decode to an (H, W) uint8 mask."""
+    rle = parse_rle(rle)
+    values = np.zeros(len(rle.counts), dtype=np.uint8)
+    values[1::2] = 1
+    flat = np.repeat(values, rle.counts)
+    if flat.size != rle.height * rle.width:
+        raise ValueError(f"RLE counts cover {flat.size} pixels, expected {rle.height * rle.width}")
+    return flat.reshape((rle.height, rle.width), order="F")
+
+
+def encode_crops(masks: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, List[str]]:
+    """Bbox-cropped RLEs for a stack of (N, H, W) object masks.
+
+    Bboxes and areas are computed for all objects at once and the runs of all
+    crops are found in one pass over their concatenated column-major pixels.
+    Returns (indices of non-empty masks, [x, y, w, h] boxes, areas, crop RLE
+    JSON strings with COCO string counts); empty masks are dropped.
+    """
+    masks = np.asarray(masks).astype(bool, copy=False)
+    if masks.ndim == 2:
+        masks = masks[None]
+    n, h, w = masks.shape
+    rows = masks.any(axis=2)
+    cols = masks.any(axis=1)
+    keep = np.flatnonzero(rows.any(axis=1))
+    if keep.size == 0:
+        return keep, np.zeros((0, 4), dtype=np.int64), np.zeros(0, dtype=np.int64), []
+    rows, cols = rows[keep], cols[keep]
+    y0 = rows.argmax(axis=1)
+    y1 = h - 1 - rows[:, ::-1].argmax(axis=1)
+    x0 = cols.argmax(axis=1)
+    x1 = w - 1 - cols[:, ::-1].argmax(axis=1)
+    boxes = np.stack([x0, y0, x1 - x0 + 1, y1 - y0 + 1], axis=1).astype(np.int64)
+    areas = masks[keep].sum(axis=(1, 2), dtype=np.int64)
+
+    crops = [masks[k, y0[i] : y1[i] + 1, x0[i] : x1[i] + 1].ravel(order="F") for i, k in enumerate(keep)]
+    sizes = boxes[:, 2] * boxes[:, 3]
+    offsets = np.cumsum(sizes) - sizes
+    pixels = np.concatenate(crops)
+    change = np.flatnonzero(pixels[1:] != pixels[:-1]) + 1
+    bounds = np.union1d(np.concatenate([change, offsets]), [pixels.size])
+    starts = bounds[:-1]
+    lengths = np.diff(bounds)
+    owner = np.searchsorted(offsets, starts, side="right") - 1
+    first_runs = np.searchsorted(owner, np.arange(len(keep)))
+    encoded: List[str] = []
+    for i, run_counts in enumerate(np.split(lengths, first_runs[1:])):
+        counts = run_counts.tolist()
+        if pixels[starts[first_runs[i]]]:
+            counts.insert(0, 0)
+        size = [int(boxes[i, 3]), int(boxes[i, 2])]
+        encoded.append(json.dumps({"size": size, "counts": _coco_string_from_counts(counts)}, ensure_ascii=True))
+    return keep, boxes, areas, encoded
+
+
+def paste(crop: EncodedMask, bbox: Sequence[int], height: int, width: int) -> np.ndarray:
+    """Full-frame (height, width) uint8 mask from a bbox-cropped RLE."""
+    out = np.zeros((int(height), int(width)), dtype=np.uint8)
+    x, y, w, h = (int(v) for v in bbox)
+    if w and h:
+        out[y : y + h, x : x + w] = to_mask(crop)
+    return out
+
+
+def delta_encode(rles: Sequence[EncodedMask], keyframe_interval: int) -> Tuple[List[str], List[bool]]:
+    """Keyframe/XOR-delta encoding of consecutive masks of one clip.
+
+    Every ``keyframe_interval``-th mask (and any mask whose size differs from
+    the previous one) is kept as is; the others are stored as the XOR with the
+    previous mask. Returns the encoded JSON strings and the keyframe flags.
+    """
+    interval = max(1, int(keyframe_interval))
+    encoded: List[str] = []
+    keys: List[bool] = []
+    previous = None
+    for i, raw in enumerate(rles):
+        current = parse_rle(raw)
+        same_size = previous is not None and (previous.height, previous.width) == (current.height, current.width)
+        if i % interval == 0 or not same_size:
+            encoded.append(raw if isinstance(raw, str) else to_json(current, compressed=True))
+            keys.append(True)
+        else:
+            encoded.append(to_json(_merge(previous, current, np.logical_xor), compressed=True))
+            keys.append(False)
+        previous = current
+    return encoded, keys
+
+
+def delta_decode(encoded: Sequence[EncodedMask], keys: Sequence[bool]) -> List[Rle]:
+    """Inverse of ``delta_encode``; the first row must be a keyframe."""
+    out: List[Rle] = []
+    for raw, is_key in zip(encoded, keys):
+        rle = parse_rle(raw)
+        if not is_key:
+            if not out:
+                raise ValueError("delta-encoded masks must start with a keyframe")
+            rle = _merge(out[-1], rle, np.logical_xor)
+        out.append(rle)
+    return out
+
+
+__all__: List[str] = [
+    "Rle",
+    "parse_rle",
+    "to_dict",
+    "to_json",
+    "to_mask",
+    "encode_crops",
+    "paste",
+    "delta_encode",
+    "delta_decode",
+    "area",
+    "bbox",
+    "areas",
+    "bboxes",
+    "mask_stats",
+    "union",
+    "union_all",
+    "intersection",
+    "xor",
+    "iou",
+    "unions",
+    "intersections",
+    "xors",
+    "ious",
+    "iou_matrix",
+]
@@ -3,7 +3,10 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from pathlib import Path
 from typing import Generator, Tuple
+import os
+import subprocess
 
 
 @dataclass
@@ -33,6 +36,70 @@ def validate_time_alignment(start_s: float, end_s: float, frame_start: int, fram
     )
 
 
+def proxy_dimensions(width: int, height: int, max_side: int) -> Tuple[int, int]:
+    """Return even (width, height) scaled so the longer side is at most max_side."""
+    longest = max(width, height)
+    if longest <= 0 or max_side <= 0 or longest <= max_side:
+        return width, height
+    scale = float(max_side) / float(longest)
+    scaled_w = max(2, int(round(width * scale / 2.0)) * 2)
+    scaled_h = max(2, int(round(height * scale / 2.0)) * 2)
+    return scaled_w, scaled_h
+
+
+def transcode_proxy(
+    src_path: str,
+    dst_path: str,
+    width: int,
+    height: int,
+    gop: int = 1,
+    codec: str = "libx264",
+    crf: int = 18,
+    preset: str = "veryfast",
+) -> None:
+    """Transcode a downscaled, short-GOP proxy that keeps source timestamps.
+
+    gop=1 produces an all-intra proxy so clip cuts and seeks are frame-exact.
+    """
+    Path(dst_path).parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = f"{dst_path}.tmp.mp4"
+    gop = max(1, int(gop))
+    cmd = [
+        "ffmpeg",
+        "-y",
+        "-i",
+        src_path,
+        "-map",
+        "0:v:0",
+        "-an",
+        "-vf",
+        f"scale={width}:{height}",
+        "-fps_mode",
+        "passthrough",
+        "-c:v",
+        codec,
+        "-preset",
+        preset,
+        "-crf",
+        str(crf),
+        "-g",
+        str(gop),
+        "-keyint_min",
+        str(gop),
+        "-sc_threshold",
+        "0",
+        "-pix_fmt",
+        "yuv420p",
+        tmp_path,
+    ]
+    try:
+        subprocess.run(cmd, check=True, capture_output=True)
+        os.replace(tmp_path, dst_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
 def get_video_info(path: str) -> VideoInfo:
     import cv2
 
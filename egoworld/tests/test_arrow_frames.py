@@ -0,0 +1,57 @@
+import pickle
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+
+from egoworld.io.frames import MaskFrameBuilder, frame_indices, num_frames, slice_frames, to_table
+from egoworld.io.writers import write_parquet_table
+from egoworld.manifests.schema import mask_schema
+from egoworld.pipeline.driver import _split_session_result
+
+
+def _batch(indices):
+    builder = MaskFrameBuilder()
+    for i in indices:
+        builder.append(i, i / 30.0, '{"size": [4, 4], "counts": [16]}')
+    return builder.to_batch()
+
+
+def test_mask_builder_matches_schema_and_pickles_out_of_band() -> None:
+    batch = _batch(range(5))
+    assert batch.schema.equals(mask_schema())
+    assert num_frames(batch) == 5
+    assert frame_indices(slice_frames(batch, 1, 3)) == [1, 2]
+
+    buffers = []
+    payload = pickle.dumps(batch, protocol=5, buffer_callback=buffers.append)
+    assert buffers, "Arrow buffers should be serialized out-of-band"
+    restored = pickle.loads(payload, buffers=buffers)
+    assert restored.equals(batch)
+
+
+def test_to_table_keeps_arrow_and_fills_empty_schema() -> None:
+    batch = _batch([0, 1])
+    assert to_table(batch, schema=mask_schema()).num_rows == 2
+    empty = to_table([], schema=mask_schema())
+    assert empty.num_rows == 0 and empty.schema.equals(mask_schema())
+
+
+def test_write_parquet_accepts_record_batch(tmp_path) -> None:
+    import pyarrow.parquet as pq
+
+    path = str(tmp_path / "masks.parquet")
+    info = write_parquet_table(path, _batch(range(4)), schema=mask_schema())
+    assert info["rows"] == 4
+    assert pq.read_table(path).column("frame_index").to_pylist() == [0, 1, 2, 3]
+
+
+def test_split_session_result_slices_arrow_frames() -> None:
+    clips = [
+        {"frame_start": 0, "frame_end": 10, "start_s": 0.0, "end_s": 10 / 30.0, "video_path": "/tmp/v.mp4"},
+        {"frame_start": 8, "frame_end": 20, "start_s": 8 / 30.0, "end_s": 20 / 30.0, "video_path": "/tmp/v.mp4"},
+    ]
+    session = {"frames": _batch(range(21)), "tracked_frames": list(range(21)), "empty_frames": []}
+    first, second = _split_session_result(session, clips)
+    assert frame_indices(first["frames"]) == list(range(0, 10))
+    assert frame_indices(second["frames"]) == list(range(8, 20))
@@ -0,0 +1,132 @@
+import os
+import time
+
+import pytest
+
+from egoworld.io.catalog import OutputCatalog
+from egoworld.io.paths import catalog_dir, catalog_path
+from egoworld.pipeline.reconcile import reconcile
+from egoworld.pipeline.state_store import (
+    bulk_insert_pending,
+    get_clip_state,
+    init_db,
+    record_clip_output,
+    upsert_clip_status,
+)
+
+
+def test_clip_writer_appends_catalog(tmp_path) -> None:
+    pytest.importorskip("pyarrow")
+    from egoworld.pipeline.driver import ClipWriter
+
+    state_db = str(tmp_path / "state" / "pipeline.db")
+    config = {
+        "run_id": "r1",
+        "paths": {"output_root": str(tmp_path / "out"), "state_db_path": state_db},
+        "coordinates": {"mask_encoding": "rle", "time_base": "seconds"},
+    }
+    ClipWriter(config).write({"clip": {"clip_id": "c1", "video_id": "v1"}})
+    entries = OutputCatalog(str(catalog_path(state_db, "r1"))).lookup("c1")
+    assert set(entries) == {
+        "masks.parquet",
+        "hand_pose.parquet",
+        "object_pose.parquet",
+        "mapping.parquet",
+        "meta.json",
+    }
+    assert all(os.path.getsize(e["path"]) == e["bytes"] for e in entries.values())
+
+
+def _meta(path: str) -> dict:
+    return {"path": path, "rows": 0, "bytes": 2, "sha256": "m"}
+
+
+def test_reconcile_requeues_done_without_outputs(tmp_path) -> None:
+    state_db = str(tmp_path / "pipeline.db")
+    output_root = str(tmp_path / "out")
+    init_db(state_db)
+    bulk_insert_pending(state_db, [{"clip_id": c, "video_id": "v1"} for c in ("c0", "c1", "c2", "c3", "c4")])
+    upsert_clip_status(state_db, "c0", "v1", "Done")  # finished before the catalog existed
+    time.sleep(0.01)
+    catalog = OutputCatalog(str(catalog_path(state_db, "r1")), shared_dir=catalog_dir(output_root, "r1"))
+    for clip_id, complete in (("c1", True), ("c3", True), ("c4", False)):
+        files = [{"path": f"/out/{clip_id}/masks.parquet", "rows": 3, "bytes": 10, "sha256": clip_id}]
+        catalog.append(clip_id, "v1", files + ([_meta(f"/out/{clip_id}/meta.json")] if complete else []))
+    catalog.flush()
+    for clip_id in ("c1", "c2", "c4"):
+        upsert_clip_status(state_db, clip_id, "v1", "Done")
+    upsert_clip_status(state_db, "c3", "v1", "Writing")
+
+    expected = {"requeued": ["c2", "c4"], "marked_done": ["c3"], "unverified": ["c0"]}
+    assert reconcile(state_db, output_root, "r1", dry_run=True) == expected
+    assert get_clip_state(state_db, "c2").status == "Done"
+
+    reconcile(state_db, output_root, "r1")
+    assert [get_clip_state(state_db, c).status for c in ("c0", "c1", "c2", "c3", "c4")] == [
+        "Done", "Done", "Pending", "Done", "Pending",
+    ]
+    assert get_clip_state(state_db, "c4").last_error == "incomplete write in catalog"
+    # Another run's catalog does not vouch for this run's clips.
+    assert reconcile(state_db, output_root, "r2", dry_run=True)["requeued"] == []
+
+
+def test_reconcile_sees_other_nodes_and_verifies_outputs(tmp_path) -> None:
+    pytest.importorskip("pyarrow")
+    from egoworld.pipeline.driver import ClipWriter
+
+    output_root = str(tmp_path / "shared" / "out")
+    driver_db = str(tmp_path / "driver" / "pipeline.db")
+    init_db(driver_db)
+    bulk_insert_pending(driver_db, [{"clip_id": c, "video_id": "v1"} for c in ("c1", "c2")])
+
+    # Written on a worker node whose state directory the driver never sees.
+    config = {
+        "run_id": "r1",
+        "paths": {"output_root": output_root, "state_db_path": str(tmp_path / "node2" / "pipeline.db")},
+        "coordinates": {"mask_encoding": "rle", "time_base": "seconds"},
+    }
+    writer = ClipWriter(config)
+    for clip_id in ("c1", "c2"):
+        writer.write({"clip": {"clip_id": clip_id, "video_id": "v1"}})
+    writer.catalog.flush()
+    for clip_id in ("c1", "c2"):
+        upsert_clip_status(driver_db, clip_id, "v1", "Done")
+
+    assert reconcile(driver_db, output_root, "r1", dry_run=True, verify=True)["requeued"] == []
+
+    masks = writer.catalog.lookup("c2")["masks.parquet"]["path"]
+    with open(masks, "r+b") as handle:
+        handle.seek(8)
+        handle.write(b"\0")
+    assert reconcile(driver_db, output_root, "r1", dry_run=True)["requeued"] == []
+    assert reconcile(driver_db, output_root, "r1", verify=True)["requeued"] == ["c2"]
+    assert get_clip_state(driver_db, "c2").last_error == "masks.parquet: sha256 differs from catalog"
+
+
+def test_reconcile_leaves_clips_owned_by_other_runs(tmp_path) -> None:
+    state_db = str(tmp_path / "pipeline.db")
+    output_root = str(tmp_path / "out")
+    init_db(state_db)
+    bulk_insert_pending(state_db, [{"clip_id": c, "video_id": "v1"} for c in ("c1", "c2", "c3")])
+
+    def write(run_id: str, clip_ids) -> None:
+        catalog = OutputCatalog(str(catalog_path(state_db, run_id)), shared_dir=catalog_dir(output_root, run_id))
+        for clip_id in clip_ids:
+            out_dir = f"/out/run_id={run_id}/{clip_id}"
+            catalog.append(clip_id, "v1", [_meta(f"{out_dir}/meta.json")])
+            upsert_clip_status(state_db, clip_id, "v1", "Done")
+            record_clip_output(state_db, clip_id, run_id, out_dir)
+        catalog.flush()
+
+    write("r1", ["c1", "c2"])
+    time.sleep(0.01)
+    write("r2", ["c1", "c3"])  # a later run rewrites c1 and finishes c3
+
+    assert reconcile(state_db, output_root, "r1", dry_run=True) == {
+        "requeued": [], "marked_done": [], "unverified": ["c1", "c3"],
+    }
+    assert reconcile(state_db, output_root, "r2", dry_run=True) == {
+        "requeued": [], "marked_done": [], "unverified": ["c2"],
+    }
+    reconcile(state_db, output_root, "r1")
+    assert [get_clip_state(state_db, c).status for c in ("c1", "c2", "c3")] == ["Done"] * 3
@@ -0,0 +1,86 @@
+import hashlib
+import os
+
+import pytest
+
+from egoworld.config import ChecksumConfig
+from egoworld.manifests import build_manifest as bm
+from egoworld.utils import hashing
+
+
+def _write(path, data: bytes, mtime_ns: int = 1_000_000_000) -> str:
+    path.write_bytes(data)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+    return str(path)
+
+
+def test_sha256_file_matches_hashlib(tmp_path) -> None:
+    data = os.urandom(3 * 1024 + 7)
+    path = _write(tmp_path / "a.bin", data)
+    assert hashing.sha256_file(path, chunk_size=1024) == hashlib.sha256(data).hexdigest()
+    assert hashing.checksum_file(path) == hashlib.sha256(data).hexdigest()
+
+
+def test_sample_offsets_cover_head_and_tail() -> None:
+    offsets = hashing.sample_offsets(size=1000, blocks=3, block_size=10)
+    assert offsets[0] == 0 and offsets[-1] == 990
+    assert len(offsets) == 5 and offsets == sorted(offsets)
+    assert hashing.sample_offsets(size=50, blocks=3, block_size=10) == []
+
+
+def test_sampled_checksum_sees_sampled_bytes_and_size(tmp_path) -> None:
+    data = bytearray(os.urandom(64 * 1024))
+    path = _write(tmp_path / "a.bin", bytes(data))
+    base = hashing.sampled_file(path, blocks=2, block_size=1024)
+    assert hashing.sampled_file(path, blocks=2, block_size=1024) == base
+    assert hashing.sampled_file(path, blocks=3, block_size=1024) != base
+
+    data[-1] ^= 0xFF  # tail block
+    _write(tmp_path / "a.bin", bytes(data))
+    assert hashing.sampled_file(path, blocks=2, block_size=1024) != base
+
+    data[-1] ^= 0xFF
+    _write(tmp_path / "a.bin", bytes(data) + b"x")
+    assert hashing.sampled_file(path, blocks=2, block_size=1024) != base
+
+
+def test_unknown_checksum_mode_raises(tmp_path) -> None:
+    path = _write(tmp_path / "a.bin", b"abc")
+    with pytest.raises(ValueError):
+        hashing.checksum_file(path, mode="md5")
+
+
+def test_video_checksum_uses_cache_keyed_by_file_identity(monkeypatch: pytest.MonkeyPatch, tmp_path) -> None:
+    calls = []
+    real = bm.checksum_file
+
+    def _counting(path, mode, blocks, block_size):
+        calls.append(mode)
+        return real(path, mode, blocks, block_size)
+
+    monkeypatch.setattr(bm, "checksum_file", _counting)
+    path = _write(tmp_path / "a.mp4", b"a" * 100)
+    config = ChecksumConfig(cache_path=str(tmp_path / "cache" / "checksums.db"))
+
+    first = bm.video_checksum(path, config)
+    assert bm.video_checksum(path, config) == first
+    assert calls == ["sha256"]
+
+    sampled = ChecksumConfig(mode="sampled", sample_blocks=2, block_size=8, cache_path=config.cache_path)
+    assert bm.video_checksum(path, sampled) != first
+    assert calls == ["sha256", "sampled"]
+
+    _write(tmp_path / "a.mp4", b"b" * 100, mtime_ns=2_000_000_000)
+    assert bm.video_checksum(path, config) == hashlib.sha256(b"b" * 100).hexdigest()
+    assert calls == ["sha256", "sampled", "sha256"]
+
+
+def test_dataset_hash_is_order_independent_and_mode_aware() -> None:
+    rows = [
+        {"video_id": "a", "checksum": "1", "checksum_mode": "sha256"},
+        {"video_id": "b", "checksum": "2", "checksum_mode": "sha256"},
+    ]
+    assert bm.dataset_hash(rows) == bm.dataset_hash(rows[::-1])
+    resampled = [dict(row, checksum_mode="sampled:16x4194304") for row in rows]
+    assert bm.dataset_hash(resampled) != bm.dataset_hash(rows)
+    assert bm.dataset_hash([{"video_id": "a", "checksum": "1"}]) == bm.dataset_hash(rows[:1])
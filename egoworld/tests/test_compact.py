@@ -0,0 +1,70 @@
+import os
+
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from egoworld.io.catalog import OutputCatalog
+from egoworld.io.paths import catalog_path, run_dir
+from egoworld.pipeline.compact import compact_run
+from egoworld.pipeline.driver import ClipWriter
+
+
+def _write_run(tmp_path):
+    state_db = str(tmp_path / "state" / "pipeline.db")
+    config = {
+        "run_id": "r1",
+        "paths": {"output_root": str(tmp_path / "out"), "state_db_path": state_db},
+        "coordinates": {"mask_encoding": "rle", "time_base": "seconds"},
+    }
+    writer = ClipWriter(config)
+    for video_id, clip_ids in (("v1", ["c1", "c2"]), ("v2", ["c3"])):
+        for n, clip_id in enumerate(clip_ids, start=1):
+            frames = [{"frame_index": i, "timestamp_s": i / 30.0, "mask_rle": "{}"} for i in range(n * 3)]
+            writer.write({"clip": {"clip_id": clip_id, "video_id": video_id}, "masks": {"frames": frames}})
+    return run_dir(config["paths"]["output_root"], "r1"), OutputCatalog(str(catalog_path(state_db, "r1")))
+
+
+def test_compact_run_merges_per_video(tmp_path) -> None:
+    import pyarrow.parquet as pq
+
+    run_root, catalog = _write_run(tmp_path)
+    report = compact_run(run_root, catalog, workers=2)
+    assert report["videos"] == 2
+    assert report["clips"] == 3
+    assert report["files_after"] < report["files_before"]
+    assert "scan_before_s" in report and "scan_after_s" in report
+
+    masks = pq.read_table(os.path.join(run_root, "compacted", "video_id=v1", "masks.parquet"))
+    assert masks.num_rows == 9
+    assert sorted(set(masks.column("clip_id").to_pylist())) == ["c1", "c2"]
+    assert not any(name.endswith(".tmp") for name in os.listdir(run_root))
+
+
+def test_compact_run_rejects_row_count_mismatch(tmp_path) -> None:
+    run_root, catalog = _write_run(tmp_path)
+    entry = catalog.lookup("c1")["masks.parquet"]
+    catalog.append("c1", "v1", [dict(entry, rows=entry["rows"] + 1)])
+    with pytest.raises(ValueError):
+        compact_run(run_root, catalog, workers=1, measure_scan=False)
+    assert not os.path.exists(os.path.join(run_root, "compacted"))
+    assert not [name for name in os.listdir(run_root) if name.startswith(".compacted")]
+
+
+def test_compact_run_swaps_versions_through_a_symlink(tmp_path) -> None:
+    run_root, catalog = _write_run(tmp_path)
+    target = os.path.join(run_root, "compacted")
+    # Layout of the former rename-based swap, including a leftover from an interrupted one.
+    os.makedirs(os.path.join(target, "video_id=old"))
+    os.makedirs(os.path.join(run_root, "compacted.old"))
+
+    compact_run(run_root, catalog, workers=1, measure_scan=False)
+    assert os.path.islink(target)
+    first = os.readlink(target)
+    assert not os.path.isabs(first) and os.path.exists(os.path.join(target, "_compact.json"))
+    assert sorted(os.listdir(target)) == ["_compact.json", "video_id=v1", "video_id=v2"]
+
+    compact_run(run_root, catalog, workers=1, measure_scan=False)
+    second = os.readlink(target)
+    assert second != first
+    assert sorted(name for name in os.listdir(run_root) if "compacted" in name) == [second, "compacted"]
@@ -0,0 +1,144 @@
+import json
+
+import pytest
+
+from egoworld.config import SceneDetectConfig
+from egoworld.manifests import build_manifest as bm
+
+
+def _meta(path: str, split: str = "train", checksum=None) -> bm.VideoMeta:
+    return bm.VideoMeta(
+        video_id=bm.make_video_id(path),
+        path=path,
+        duration_s=10.0,
+        fps=30.0,
+        width=640,
+        height=480,
+        audio=False,
+        checksum="same" if "copy" in path or "orig" in path else path,
+        split=split,
+    )
+
+
+def _scenes(path: str, duration_s: float, config: SceneDetectConfig, checksum: str = ""):
+    return [(0.0, 4.0), (4.0, 10.0)], False
+
+
+@pytest.fixture
+def fake_probe(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(bm, "parse_video_meta", _meta)
+    monkeypatch.setattr(bm, "detect_scenes", _scenes)
+
+
+def test_duplicates_point_at_first_video_in_build_order(fake_probe) -> None:
+    paths = ["/v/orig.mp4", "/v/other.mp4", "/v/x_copy.mp4"]
+    videos, _ = bm.build_manifests(paths, scenedetect=SceneDetectConfig())
+    by_path = {row["path"]: row for row in videos}
+    orig = by_path["/v/orig.mp4"]["video_id"]
+    assert by_path["/v/orig.mp4"]["canonical_video_id"] == orig
+    assert by_path["/v/x_copy.mp4"]["canonical_video_id"] == orig
+    assert by_path["/v/other.mp4"]["canonical_video_id"] == by_path["/v/other.mp4"]["video_id"]
+
+    results = list(bm.iter_video_results(paths[::-1], scenedetect=SceneDetectConfig(), workers=2))
+    assert [r.video["canonical_video_id"] for r in results] == [v["canonical_video_id"] for v in videos]
+
+
+def test_canonical_video_id_separates_checksum_modes() -> None:
+    seen: dict = {}
+    assert bm.canonical_video_id({"video_id": "a", "checksum": "1"}, seen) == "a"
+    assert bm.canonical_video_id({"video_id": "b", "checksum": "1", "checksum_mode": "sampled"}, seen) == "b"
+    assert bm.canonical_video_id({"video_id": "c", "checksum": "1", "checksum_mode": "sha256"}, seen) == "a"
+    assert bm.canonical_video_id({"video_id": "d", "checksum": ""}, seen) == "d"
+
+
+def test_alias_clips_and_alias_records(fake_probe, tmp_path) -> None:
+    pa = pytest.importorskip("pyarrow")
+    from egoworld.io.catalog import OutputCatalog
+    from egoworld.io.paths import catalog_path
+    from egoworld.pipeline.driver import ClipWriter, _alias_clips
+
+    videos, clips = bm.build_manifests(["/v/orig.mp4", "/v/x_copy.mp4"], scenedetect=SceneDetectConfig())
+    orig, copy = videos[0]["video_id"], videos[1]["video_id"]
+    # The copy has one extra scene with no counterpart in the canonical video.
+    clips = [c for c in clips if not (c["video_id"] == orig and c["frame_start"] > 0)]
+    aliases = _alias_clips(pa.Table.from_pylist(clips), pa.Table.from_pylist(videos))
+
+    copy_clips = [c for c in clips if c["video_id"] == copy]
+    assert len(copy_clips) == 2 and len(aliases) == 1
+    alias_id, (canonical_video, canonical_clip) = next(iter(aliases.items()))
+    assert canonical_video == orig
+    assert canonical_clip == next(c["clip_id"] for c in clips if c["video_id"] == orig)
+
+    config = {
+        "run_id": "r1",
+        "paths": {"output_root": str(tmp_path / "out"), "state_db_path": str(tmp_path / "state" / "pipeline.db")},
+        "coordinates": {"mask_encoding": "rle", "time_base": "seconds"},
+    }
+    writer = ClipWriter(config)
+    writer.write({"clip": {"clip_id": canonical_clip, "video_id": orig}})
+    clip = next(c for c in copy_clips if c["clip_id"] == alias_id)
+    info = writer.write_alias(clip, canonical_video, canonical_clip)
+
+    record = json.loads(open(info["path"]).read())
+    assert record["alias_of"]["clip_id"] == canonical_clip
+    assert record["alias_of"]["path"].endswith(f"clip_id={canonical_clip}")
+    catalog = OutputCatalog(catalog_path(config["paths"]["state_db_path"], "r1"))
+    assert set(catalog.lookup(alias_id)) == {"alias.json"}
+    assert writer.write_alias(clip, canonical_video, canonical_clip)["skipped"] is True
+
+
+def test_sampled_checksum_matches_are_confirmed_with_a_full_hash(tmp_path) -> None:
+    paths = {}
+    for name, data in (("a", b"same" * 100), ("b", b"diff" * 100), ("c", b"same" * 100)):
+        paths[name] = tmp_path / f"{name}.mp4"
+        paths[name].write_bytes(data)
+    seen: dict = {}
+    # All three share a sampled checksum; only a and c have the same content.
+    rows = [
+        {"video_id": name, "path": str(path), "checksum": "s", "checksum_mode": "sampled:1x4"}
+        for name, path in paths.items()
+    ]
+    assert [bm.canonical_video_id(row, seen) for row in rows] == ["a", "b", "a"]
+
+
+def test_aliases_follow_terminal_canonical_status_and_earlier_runs(tmp_path) -> None:
+    pytest.importorskip("pyarrow")
+    from egoworld.observability.summary import RunSummary
+    from egoworld.pipeline.driver import ClipWriter, write_aliases
+    from egoworld.pipeline.state_store import (
+        bulk_insert_pending,
+        get_clip_state,
+        init_db,
+        mark_skipped,
+        record_clip_output,
+        upsert_clip_status,
+    )
+
+    state_db = str(tmp_path / "state" / "pipeline.db")
+    init_db(state_db)
+    clip_ids = ("done", "failed", "skipped", "a1", "a2", "a3")
+    bulk_insert_pending(state_db, [{"clip_id": c, "video_id": "v"} for c in clip_ids])
+    upsert_clip_status(state_db, "done", "v", "Done")
+    record_clip_output(state_db, "done", "r0", "/out/run_id=r0/video_id=v/clip_id=done")
+    upsert_clip_status(state_db, "failed", "v", "Failed", "cuda oom", 3)
+    mark_skipped(state_db, {"skipped": "triage: dark"})
+
+    config = {
+        "run_id": "r1",
+        "paths": {"output_root": str(tmp_path / "out"), "state_db_path": state_db},
+        "coordinates": {"mask_encoding": "rle", "time_base": "seconds"},
+    }
+    rows = [{"clip_id": c, "video_id": "copy", "start_s": 0.0, "end_s": 1.0} for c in ("a1", "a2", "a3")]
+    aliases = {"a1": ("v", "done"), "a2": ("v", "failed"), "a3": ("v", "skipped")}
+    summary = RunSummary(run_id="r1")
+    write_aliases(state_db, ClipWriter(config), rows, aliases, summary)
+
+    assert get_clip_state(state_db, "a1").status == "Done"
+    record = json.loads((tmp_path / "out" / "run_id=r1" / "video_id=copy" / "clip_id=a1" / "alias.json").read_text())
+    assert record["alias_of"]["run_id"] == "r0"
+    assert record["alias_of"]["path"] == "/out/run_id=r0/video_id=v/clip_id=done"
+    failed = get_clip_state(state_db, "a2")
+    assert failed.status == "Failed" and "cuda oom" in failed.last_error
+    skipped = get_clip_state(state_db, "a3")
+    assert skipped.status == "Skipped" and "triage: dark" in skipped.last_error
+    assert summary.clips_aliased == 1 and summary.clips_failed == 1
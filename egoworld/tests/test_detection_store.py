@@ -0,0 +1,105 @@
+import numpy as np
+
+from egoworld.io.detection_store import DetectionStore
+from egoworld.operators.groundingdino_op import Detection
+from egoworld.operators.sam2_op import PromptConfig, _PromptTracker, checkpoint_id
+
+
+class _CountingGD:
+    def __init__(self):
+        self.calls = 0
+
+    def predict(self, image_rgb, prompt, box_threshold, text_threshold, max_boxes):
+        self.calls += 1
+        dets = [
+            Detection((0.0, 0.0, 40.0, 40.0), 0.9, "hand"),
+            Detection((50.0, 50.0, 90.0, 90.0), 0.4, "hand"),
+            Detection((100.0, 0.0, 140.0, 40.0), 0.15, "hand"),
+        ]
+        return [d for d in dets if d.score > box_threshold][:max_boxes]
+
+
+def test_detection_store_roundtrip(tmp_path) -> None:
+    store = DetectionStore(str(tmp_path / "gd.sqlite"))
+    assert store.get("abc", 3, "64x48", "cap", "ckpt", 0.1, 0.25) is None
+    store.put("abc", 3, "64x48", "cap", "ckpt", 0.1, 0.25, ([[0.0, 0.0, 1.0, 1.0]], [0.5], ["hand"]))
+    assert store.get("abc", 3, "64x48", "cap", "ckpt", 0.1, 0.25) == ([[0.0, 0.0, 1.0, 1.0]], [0.5], ["hand"])
+    assert store.get("abc", 3, "64x48", "cap", "ckpt", 0.2, 0.25) is None
+    assert store.get("abc", 3, "160x120", "cap", "ckpt", 0.1, 0.25) is None
+
+
+def test_thumbnail_and_full_frame_detections_are_stored_apart(tmp_path) -> None:
+    gd = _CountingGD()
+    cfg = PromptConfig(detection_store=str(tmp_path / "gd.sqlite"))
+    full = np.zeros((160, 160, 3), dtype=np.uint8)
+    thumb = np.zeros((64, 64, 3), dtype=np.uint8)
+    boxes = []
+    for frame, scale in ((thumb, 2.5), (full, 1.0), (full, 1.0)):
+        prompts = _PromptTracker(gd, cfg, checksum="abc").detect(0, frame, scale=scale)
+        boxes.append(min(p.box for p in prompts))
+    # The full frame is not served the thumbnail's (scaled) rows.
+    assert gd.calls == 2
+    assert boxes == [(0.0, 0.0, 100.0, 100.0), (0.0, 0.0, 40.0, 40.0), (0.0, 0.0, 40.0, 40.0)]
+
+
+def test_threshold_sweep_reuses_stored_detections(tmp_path) -> None:
+    gd = _CountingGD()
+    frame = np.zeros((160, 160, 3), dtype=np.uint8)
+    store_path = str(tmp_path / "gd.sqlite")
+    counts = []
+    for threshold in (0.35, 0.1, 0.5):
+        cfg = PromptConfig(detection_store=store_path, box_threshold=threshold, raw_box_threshold=0.1)
+        tracker = _PromptTracker(gd, cfg, checksum="abc", frame_offset=100)
+        counts.append(len(tracker.detect(0, frame)))
+    assert gd.calls == 1
+    assert counts == [2, 3, 1]
+
+    # A threshold below the stored floor cannot be served from the store.
+    cfg = PromptConfig(detection_store=store_path, box_threshold=0.05, raw_box_threshold=0.1)
+    _PromptTracker(gd, cfg, checksum="abc", frame_offset=100).detect(0, frame)
+    assert gd.calls == 2
+
+
+def test_same_named_checkpoints_do_not_share_detections(tmp_path) -> None:
+    gd = _CountingGD()
+    frame = np.zeros((160, 160, 3), dtype=np.uint8)
+    store_path = str(tmp_path / "gd.sqlite")
+    for name, content in (("a", b"weights-1"), ("b", b"weights-2"), ("c", b"weights-1")):
+        ckpt = tmp_path / name / "groundingdino_swint_ogc.pth"
+        ckpt.parent.mkdir()
+        ckpt.write_bytes(content)
+        cfg = PromptConfig(detection_store=store_path, gd_checkpoint=str(ckpt))
+        _PromptTracker(gd, cfg, checksum="abc").detect(0, frame)
+    # b has other weights; c is a copy of a and reuses its rows.
+    assert gd.calls == 2
+    assert checkpoint_id(str(tmp_path / "missing.pth")) == str(tmp_path / "missing.pth")
+
+
+def test_store_without_current_key_is_reset(tmp_path) -> None:
+    import sqlite3
+
+    path = str(tmp_path / "gd.sqlite")
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE detections (video_checksum TEXT, frame_index INTEGER, boxes TEXT)")
+        conn.execute("INSERT INTO detections VALUES ('abc', 3, '[]')")
+    store = DetectionStore(path)
+    store.put("abc", 3, "64x48", "cap", "ckpt", 0.1, 0.25, ([], [], []))
+    assert store.get("abc", 3, "64x48", "cap", "ckpt", 0.1, 0.25) == ([], [], [])
+
+
+def test_text_threshold_keys_or_bypasses_the_store(tmp_path, caplog) -> None:
+    gd = _CountingGD()
+    frame = np.zeros((160, 160, 3), dtype=np.uint8)
+    store_path = str(tmp_path / "gd.sqlite")
+    for raw_text in (0.25, 0.3, 0.25):
+        cfg = PromptConfig(detection_store=store_path, text_threshold=raw_text, raw_text_threshold=raw_text)
+        _PromptTracker(gd, cfg, checksum="abc").detect(0, frame)
+    # Phrases from another raw_text_threshold are not served.
+    assert gd.calls == 2
+
+    cfg = PromptConfig(detection_store=store_path, text_threshold=0.4, raw_text_threshold=0.25)
+    with caplog.at_level("WARNING"):
+        tracker = _PromptTracker(gd, cfg, checksum="abc")
+    tracker.detect(0, frame)
+    assert tracker.store is None and gd.calls == 3
+    assert "text_threshold 0.4 differs from raw_text_threshold 0.25" in caplog.text
@@ -0,0 +1,137 @@
+import os
+
+import pytest
+
+from egoworld.io.fs import (
+    FileSystem,
+    InMemoryObjectStore,
+    ObjectStoreFileSystem,
+    configure_storage,
+    filesystem_for,
+    join_path,
+    reset_storage,
+)
+from egoworld.io.writers import write_json, write_json_lines
+
+
+@pytest.fixture
+def store():
+    client = InMemoryObjectStore()
+    configure_storage(client=client, part_size=5 * 1024 * 1024, max_concurrency=4)
+    yield client
+    reset_storage()
+
+
+def test_join_path_keeps_url_scheme() -> None:
+    assert join_path("s3://bucket/out", "run_id=r1", "meta.json") == "s3://bucket/out/run_id=r1/meta.json"
+    assert join_path("/tmp/out", "a") == os.path.join("/tmp/out", "a")
+
+
+def test_multipart_upload_roundtrip() -> None:
+    client = InMemoryObjectStore()
+    fs = ObjectStoreFileSystem(client, part_size=5 * 1024 * 1024, max_concurrency=4)
+    data = os.urandom(11 * 1024 * 1024)
+    fs.write_bytes("s3://bucket/big.bin", data)
+    assert client.requests["upload_part"] == 3
+    assert "put_object" not in client.requests
+    assert fs.read_bytes("s3://bucket/big.bin") == data
+    assert fs.size("s3://bucket/missing.bin") is None
+
+
+def test_writers_and_manifest_reader_on_object_store(store) -> None:
+    from egoworld.pipeline.driver import load_manifest
+
+    write_json_lines("s3://bucket/manifests/clips.jsonl", [{"clip_id": "c1"}, {"clip_id": "c2"}])
+    assert [row["clip_id"] for row in load_manifest("s3://bucket/manifests/clips.jsonl")] == ["c1", "c2"]
+
+    first = write_json("s3://bucket/out/meta.json", {"a": 1})
+    second = write_json("s3://bucket/out/meta.json", {"a": 1}, expected_sha256=first["sha256"])
+    assert second["skipped"] is True
+    assert store.requests["put_object"] == 2
+
+
+def test_clip_writer_to_object_store(store, tmp_path) -> None:
+    pytest.importorskip("pyarrow")
+    from egoworld.pipeline.driver import ClipWriter
+
+    config = {
+        "run_id": "r1",
+        "paths": {"output_root": "s3://bucket/output", "state_db_path": str(tmp_path / "pipeline.db")},
+        "coordinates": {"mask_encoding": "rle", "time_base": "seconds"},
+        "writer": {"stream_threads": 4},
+    }
+    ClipWriter(config).write({"clip": {"clip_id": "c1", "video_id": "v1"}})
+    keys = {key for _, key in store.objects}
+    assert "output/run_id=r1/video_id=v1/clip_id=c1/masks.parquet" in keys
+    assert "output/run_id=r1/video_id=v1/clip_id=c1/meta.json" in keys
+
+
+def test_storage_and_writers_share_one_pool_per_process(store, tmp_path) -> None:
+    import threading
+
+    from egoworld.pipeline.driver import ClipWriter
+
+    with pytest.raises(TypeError):
+        FileSystem()
+    fs = filesystem_for("s3://bucket/x")
+    configure_storage(part_size=5 * 1024 * 1024, max_concurrency=4)
+    assert filesystem_for("s3://bucket/x") is fs
+    config = {
+        "run_id": "r1",
+        "paths": {"output_root": "s3://bucket/output", "state_db_path": str(tmp_path / "pipeline.db")},
+        "coordinates": {"mask_encoding": "rle", "time_base": "seconds"},
+        "storage": {"part_size": 5 * 1024 * 1024, "max_concurrency": 4},
+        "writer": {"stream_threads": 2},
+    }
+    before = threading.active_count()
+    writers = [ClipWriter(config) for _ in range(5)]
+    assert len({id(writer.pool) for writer in writers}) == 1
+    assert filesystem_for("s3://bucket/x") is fs
+    for i, writer in enumerate(writers):
+        writer.write({"clip": {"clip_id": f"c{i}", "video_id": "v1"}})
+    # Threads are bounded by the shared pools, not by the number of writers.
+    assert threading.active_count() - before <= 2 + 4
+
+
+def test_small_objects_are_put_as_one_concurrent_batch(store) -> None:
+    import threading
+
+    fs = filesystem_for("s3://bucket/x")
+    # Every PUT waits for a second one to start; one PUT after another would time out.
+    barrier = threading.Barrier(2, timeout=5)
+    put_object = store.put_object
+
+    def _overlapping_put(**kwargs):
+        barrier.wait()
+        return put_object(**kwargs)
+
+    store.put_object = _overlapping_put
+    big = os.urandom(6 * 1024 * 1024)
+    fs.write_many([(f"s3://bucket/batch/{i}.bin", b"x" * i) for i in range(4)] + [("s3://bucket/batch/big.bin", big)])
+    assert not barrier.broken
+    assert store.requests["put_object"] == 4 and store.requests["upload_part"] == 2
+    assert fs.read_bytes("s3://bucket/batch/3.bin") == b"xxx"
+    assert fs.read_bytes("s3://bucket/batch/big.bin") == big
+
+
+def test_catalog_segments_on_object_store(store, tmp_path) -> None:
+    from egoworld.io.catalog import OutputCatalog
+
+    fs = ObjectStoreFileSystem(store)
+    for i in range(3):
+        fs.write_bytes(f"s3://bucket/listing/{i}.txt", b"x")
+    fs.write_bytes("s3://bucket/listing/sub/deeper.txt", b"x")
+    store_list = store.list_objects_v2
+    store.list_objects_v2 = lambda **kw: store_list(**kw, MaxKeys=2)
+    assert fs.list_dir("s3://bucket/listing") == [f"s3://bucket/listing/{i}.txt" for i in range(3)]
+    store.list_objects_v2 = store_list
+
+    shared = "s3://bucket/output/run_id=r1/_catalog"
+    node = OutputCatalog(str(tmp_path / "node" / "catalog.db"), shared_dir=shared, flush_every=2)
+    for clip_id in ("c1", "c2", "c3"):
+        node.append(clip_id, "v1", [{"path": f"s3://bucket/output/{clip_id}/meta.json", "sha256": clip_id}])
+    driver = OutputCatalog(str(tmp_path / "driver" / "catalog.db"), shared_dir=shared)
+    assert sorted(driver.sync().clip_ids()) == ["c1", "c2"]
+    node.flush()
+    assert sorted(driver.sync().clip_ids()) == ["c1", "c2", "c3"]
+    assert len(driver.sync().latest()) == 3
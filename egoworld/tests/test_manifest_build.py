@@ -1,11 +1,14 @@
+from dataclasses import replace
+from pathlib import Path
+
 import pytest
 
-from egoworld.config import SceneDetectConfig
+from egoworld.config import ProxyConfig, SceneDetectConfig
 from egoworld.manifests import build_manifest as bm
-from egoworld.utils.video import seconds_from_frames
+from egoworld.utils.video import proxy_dimensions, seconds_from_frames
 
 
-def _fake_meta(path: str, split: str = "train") -> bm.VideoMeta:
+def _fake_meta(path: str, split: str = "train", checksum=None) -> bm.VideoMeta:
     return bm.VideoMeta(
         video_id="video-abc",
         path=path,
@@ -19,7 +22,7 @@ def _fake_meta(path: str, split: str = "train") -> bm.VideoMeta:
     )
 
 
-def _fake_scenes(path: str, duration_s: float, config: SceneDetectConfig):
+def _fake_scenes(path: str, duration_s: float, config: SceneDetectConfig, checksum: str = ""):
     return [(0.5, 2.0), (8.9, 9.8)], False
 
 
@@ -71,3 +74,220 @@ def test_parse_video_meta_rejects_invalid_fps(monkeypatch: pytest.MonkeyPatch) -
     monkeypatch.setattr(bm, "run_ffprobe", _fake_ffprobe)
     with pytest.raises(ValueError):
         bm.parse_video_meta("/tmp/a.mp4")
+
+
+def test_build_manifests_records_proxy(monkeypatch: pytest.MonkeyPatch, tmp_path) -> None:
+    calls = []
+
+    def _fake_transcode(src, dst, width, height, **kwargs):
+        calls.append((src, dst, width, height, kwargs["gop"]))
+
+    monkeypatch.setattr(bm, "parse_video_meta", _fake_meta)
+    monkeypatch.setattr(bm, "detect_scenes", _fake_scenes)
+    monkeypatch.setattr(bm, "transcode_proxy", _fake_transcode)
+
+    proxy = ProxyConfig(enabled=True, max_side=1024, gop=1, output_dir=str(tmp_path))
+    videos, _ = bm.build_manifests(["/tmp/a.mp4"], scenedetect=SceneDetectConfig(), proxy=proxy)
+
+    assert len(calls) == 1
+    assert calls[0][2:] == (1024, 576, 1)
+    row = videos[0]
+    assert row["proxy_path"] == calls[0][1]
+    assert Path(row["proxy_path"]).parent == tmp_path and Path(row["proxy_path"]).name.startswith("video-abc-")
+    assert (row["proxy_width"], row["proxy_height"]) == (1024, 576)
+    assert row["proxy_scale"] == row["proxy_scale_x"] == pytest.approx(1024 / 1920)
+    assert row["proxy_scale_y"] == pytest.approx(576 / 1080)
+
+    # Changed content under the same video_id gets a new proxy, not the stale one.
+    Path(row["proxy_path"]).touch()
+    monkeypatch.setattr(bm, "parse_video_meta", lambda *a: replace(_fake_meta(*a), checksum="cafef00d"))
+    videos, _ = bm.build_manifests(["/tmp/a.mp4"], scenedetect=SceneDetectConfig(), proxy=proxy)
+    assert len(calls) == 2 and videos[0]["proxy_path"] == calls[1][1] != row["proxy_path"]
+
+
+def test_proxy_records_per_axis_scales(monkeypatch: pytest.MonkeyPatch, tmp_path) -> None:
+    monkeypatch.setattr(bm, "transcode_proxy", lambda *a, **k: None)
+    meta = replace(_fake_meta("/tmp/a.mp4"), width=1000, height=563)
+    meta = bm.build_proxy(meta, ProxyConfig(enabled=True, max_side=500, output_dir=str(tmp_path)))
+    # Each side is rounded to an even size on its own: 563 * 0.5 becomes 282, not 281.5.
+    assert (meta.proxy_width, meta.proxy_height) == (500, 282)
+    assert meta.proxy_scale_x == pytest.approx(0.5)
+    assert meta.proxy_scale_y == pytest.approx(282 / 563) != meta.proxy_scale_x
+
+
+def test_proxy_dimensions_keep_small_videos() -> None:
+    assert proxy_dimensions(640, 480, 1024) == (640, 480)
+    assert proxy_dimensions(3840, 2160, 1024) == (1024, 576)
+
+
+def _meta_or_fail(path: str, split: str = "train", checksum=None) -> bm.VideoMeta:
+    if "broken" in path:
+        raise ValueError(f"no video stream found: {path}")
+    meta = _fake_meta(path, split)
+    meta.video_id = bm.make_video_id(path)
+    return meta
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_iter_video_results_ordered_with_error_rows(monkeypatch: pytest.MonkeyPatch, workers: int) -> None:
+    monkeypatch.setattr(bm, "parse_video_meta", _meta_or_fail)
+    monkeypatch.setattr(bm, "detect_scenes", _fake_scenes)
+    paths = ["/tmp/c.mp4", "/tmp/broken.mp4", "/tmp/a.mp4", "/tmp/b.mp4"]
+
+    results = list(bm.iter_video_results(paths, scenedetect=SceneDetectConfig(), workers=workers))
+
+    assert [r.path for r in results] == sorted(paths)
+    failed = [r for r in results if r.error is not None]
+    assert [r.path for r in failed] == ["/tmp/broken.mp4"]
+    assert failed[0].error["error_type"] == "ValueError" and failed[0].video is None
+    _, sequential_clips = bm.build_manifests(["/tmp/a.mp4"], scenedetect=SceneDetectConfig())
+    assert results[0].clips == sequential_clips
+
+
+def test_json_lines_writer_is_atomic(tmp_path) -> None:
+    from egoworld.io.writers import JsonLinesWriter
+
+    path = tmp_path / "rows.jsonl"
+    with pytest.raises(RuntimeError):
+        with JsonLinesWriter(str(path)) as writer:
+            writer.write({"a": 1})
+            raise RuntimeError("boom")
+    assert not path.exists() and not (tmp_path / "rows.jsonl.tmp").exists()
+    with JsonLinesWriter(str(path)) as writer:
+        writer.write({"a": 1})
+        writer.write({"a": 2})
+    assert path.read_text().splitlines() == ['{"a": 1}', '{"a": 2}']
+
+
+def test_incremental_make_manifest_reuses_unchanged_videos(monkeypatch: pytest.MonkeyPatch, tmp_path) -> None:
+    import argparse
+    import json
+    import os
+
+    from egoworld import cli
+
+    probed = []
+
+    def _probe(path: str, split: str = "train", checksum=None) -> bm.VideoMeta:
+        probed.append(os.path.basename(path))
+        return _meta_or_fail(path, split)
+
+    monkeypatch.setattr(bm, "parse_video_meta", _probe)
+    monkeypatch.setattr(bm, "detect_scenes", _fake_scenes)
+    videos_dir = tmp_path / "videos"
+    videos_dir.mkdir()
+    for name in ("a.mp4", "b.mp4"):
+        (videos_dir / name).write_bytes(b"x" * 10)
+    out = tmp_path / "manifests"
+    config = os.path.join(os.path.dirname(__file__), "..", "configs", "example.json")
+    args = argparse.Namespace(
+        config=config,
+        input_dir=str(videos_dir),
+        glob="*.mp4",
+        output_dir=str(out),
+        split="train",
+        proxy=False,
+        workers=1,
+        incremental=True,
+        format="jsonl",
+    )
+
+    cli.make_manifest(args)
+    first_clips = (out / "clip_manifest.jsonl").read_text().splitlines()
+    assert sorted(probed) == ["a.mp4", "b.mp4"]
+
+    probed.clear()
+    (videos_dir / "b.mp4").write_bytes(b"y" * 20)
+    (videos_dir / "c.mp4").write_bytes(b"z" * 10)
+    cli.make_manifest(args)
+    assert sorted(probed) == ["b.mp4", "c.mp4"]
+
+    videos = [json.loads(line) for line in (out / "video_manifest.jsonl").read_text().splitlines()]
+    assert [os.path.basename(v["path"]) for v in videos] == ["a.mp4", "b.mp4", "c.mp4"]
+    assert videos[1]["file_size"] == 20
+    clips = (out / "clip_manifest.jsonl").read_text().splitlines()
+    a_id = videos[0]["video_id"]
+    assert [c for c in clips if a_id in c] == [c for c in first_clips if a_id in c]
+
+    probed.clear()
+    cli.make_manifest(args)
+    assert probed == []
+
+    # A different scene threshold changes every video's clip rows.
+    data = json.loads(Path(config).read_text())
+    data["scenedetect"]["threshold"] = 30.0
+    (tmp_path / "config.json").write_text(json.dumps(data))
+    args.config = str(tmp_path / "config.json")
+    cli.make_manifest(args)
+    assert sorted(probed) == ["a.mp4", "b.mp4", "c.mp4"]
+
+
+def test_manifest_config_hash_covers_clip_shaping_settings() -> None:
+    base = bm.manifest_config_hash(SceneDetectConfig())
+    fast = bm.manifest_config_hash(SceneDetectConfig(method="fast"))
+    assert bm.manifest_config_hash(SceneDetectConfig(method="fast", score_cache_dir="/cache", sidecar_dir="/sc")) == fast
+    for changed in (
+        SceneDetectConfig(threshold=30.0),
+        SceneDetectConfig(max_clip_len_s=60.0),
+        SceneDetectConfig(overlap_s=0.5),
+    ):
+        assert bm.manifest_config_hash(changed) != base
+    assert bm.manifest_config_hash(SceneDetectConfig(), ProxyConfig(enabled=False)) == base
+    assert bm.manifest_config_hash(SceneDetectConfig(), ProxyConfig(enabled=True)) != base
+
+
+def test_split_scene_balanced_and_frame_aligned() -> None:
+    fps = 30000 / 1001
+    chunks = bm.split_scene(0.0, 610.0, fps, max_len_s=120.0, target_len_s=100.0)
+    assert len(chunks) == 6
+    assert chunks[0][0] == 0.0 and chunks[-1][1] == 610.0
+    lengths = [end - start for start, end in chunks]
+    assert max(lengths) - min(lengths) < 2 / fps
+    for (_, end), (start, _) in zip(chunks, chunks[1:]):
+        assert end == start
+        assert start == seconds_from_frames(round(start * fps), fps)
+    assert bm.split_scene(0.0, 60.0, fps, max_len_s=120.0) == [(0.0, 60.0)]
+    assert len(bm.split_scene(0.0, 610.0, fps, max_len_s=120.0)) == 6
+
+
+def test_build_manifests_caps_clip_length(monkeypatch: pytest.MonkeyPatch) -> None:
+    def _long_meta(path: str, split: str = "train", checksum=None) -> bm.VideoMeta:
+        meta = _fake_meta(path, split)
+        meta.duration_s = 600.0
+        return meta
+
+    def _one_long_scene(path, duration_s, config, checksum=""):
+        return [(0.0, 5.0), (5.0, duration_s)], False
+
+    monkeypatch.setattr(bm, "parse_video_meta", _long_meta)
+    monkeypatch.setattr(bm, "detect_scenes", _one_long_scene)
+    uncapped = SceneDetectConfig(overlap_s=1.0)
+    capped = SceneDetectConfig(overlap_s=1.0, max_clip_len_s=120.0, target_clip_len_s=60.0)
+    _, plain = bm.build_manifests(["/tmp/a.mp4"], scenedetect=uncapped)
+    _, clips = bm.build_manifests(["/tmp/a.mp4"], scenedetect=capped)
+
+    assert len(plain) == 2
+    assert clips[0]["clip_id"] == plain[0]["clip_id"]
+    assert len(clips) == 1 + 10
+    for clip in clips:
+        assert clip["start_s"] == seconds_from_frames(clip["frame_start"], 30.0)
+        assert clip["end_s"] - clip["start_s"] <= 120.0
+    for prev, nxt in zip(clips[1:], clips[2:]):
+        assert prev["end_s"] - nxt["start_s"] == pytest.approx(2 * capped.overlap_s)
+    assert clips[-1]["frame_end"] == plain[-1]["frame_end"]
+
+
+def test_clip_cap_includes_overlap(monkeypatch: pytest.MonkeyPatch) -> None:
+    def _ntsc_meta(path: str, split: str = "train", checksum=None) -> bm.VideoMeta:
+        meta = _fake_meta(path, split)
+        meta.duration_s, meta.fps = 600.0, 30000 / 1001
+        return meta
+
+    monkeypatch.setattr(bm, "parse_video_meta", _ntsc_meta)
+    monkeypatch.setattr(bm, "detect_scenes", lambda path, duration_s, config, checksum="": ([(0.0, duration_s)], False))
+    config = SceneDetectConfig(overlap_s=2.5, max_clip_len_s=30.0)
+    _, clips = bm.build_manifests(["/tmp/a.mp4"], scenedetect=config)
+    assert max(c["frame_end"] - c["frame_start"] for c in clips) <= int(30.0 * 30000 / 1001)
+    assert clips[-1]["end_s"] == pytest.approx(600.0, abs=0.05)
+    with pytest.raises(ValueError, match="overlap_s"):
+        SceneDetectConfig(overlap_s=1.0, max_clip_len_s=2.0)
@@ -0,0 +1,128 @@
+import json
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+
+from egoworld.io.writers import ParquetRowsWriter
+from egoworld.manifests.build_manifest import write_manifest_parquet
+from egoworld.manifests.schema import clip_manifest_schema, video_manifest_schema
+from egoworld.manifests.table import read_clip_manifest, read_video_manifest
+from egoworld.pipeline.driver import ClipTask, ClipTasks, load_manifest
+
+
+def _videos():
+    return [
+        {"video_id": "v1", "path": "/data/v1.mp4", "duration_s": 10, "fps": 30.0, "width": 1920, "height": 1080,
+         "audio": False, "checksum": "c1", "split": "train", "proxy_path": "/p/v1.mp4", "proxy_scale": 0.5},
+        {"video_id": "v2", "path": "/data/v2.mp4", "duration_s": 5.0, "fps": 25.0, "width": 640, "height": 480,
+         "audio": True, "checksum": "c2", "split": "train"},
+    ]
+
+
+def _clips():
+    rows = []
+    for i, (video_id, start, end) in enumerate([("v1", 0.0, 2.0), ("v1", 2.0, 7.0), ("v2", 0, 2), ("v2", 2.0, 5.0)]):
+        rows.append({"clip_id": f"k{i}", "video_id": video_id, "start_s": start, "end_s": end,
+                     "frame_start": int(start * 30), "frame_end": int(end * 30), "overlap_s": 1.0,
+                     "scenedetect_failed": False, "status": "Pending", "last_error": "", "retry_count": 0})
+    return rows
+
+
+def _write_jsonl(path, rows):
+    path.write_text("".join(json.dumps(row) + "\n" for row in rows))
+    return str(path)
+
+
+def test_jsonl_manifest_reads_typed_with_missing_fields_as_nulls(tmp_path) -> None:
+    table = read_video_manifest(_write_jsonl(tmp_path / "videos.jsonl", _videos()))
+    assert table.schema.names == video_manifest_schema().names
+    assert table.schema.field("width").type == pa.int32()
+    assert table.column("duration_s").to_pylist() == [10.0, 5.0]
+    assert table.column("checksum_mode").null_count == 2
+    assert table.column("proxy_path").to_pylist() == ["/p/v1.mp4", None]
+
+    empty = tmp_path / "empty.jsonl"
+    empty.write_text("")
+    assert read_clip_manifest(str(empty)).num_rows == 0
+
+
+def test_parquet_manifest_roundtrip(tmp_path) -> None:
+    jsonl = read_clip_manifest(_write_jsonl(tmp_path / "clips.jsonl", _clips()))
+    path = str(tmp_path / "clips.parquet")
+    with ParquetRowsWriter(path, clip_manifest_schema(), batch_rows=3) as writer:
+        for row in _clips():
+            writer.write(row)
+    assert writer.rows == 4
+    assert read_clip_manifest(path).equals(jsonl)
+    assert load_manifest(path) == jsonl.to_pylist()
+
+    write_manifest_parquet(str(tmp_path / "videos.parquet"), _videos(), video_manifest_schema())
+    assert load_manifest(str(tmp_path / "videos.parquet"))[0]["proxy_scale"] == 0.5
+
+
+def test_parquet_rows_writer_abort_leaves_no_file(tmp_path) -> None:
+    path = tmp_path / "clips.parquet"
+    with pytest.raises(RuntimeError):
+        with ParquetRowsWriter(str(path), clip_manifest_schema()) as writer:
+            writer.write(_clips()[0])
+            raise RuntimeError("boom")
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_clip_tasks_join_filter_and_sort(tmp_path) -> None:
+    videos = read_video_manifest(_write_jsonl(tmp_path / "videos.jsonl", _videos()))
+    clips = read_clip_manifest(_write_jsonl(tmp_path / "clips.jsonl", _clips()))
+
+    tasks = ClipTasks.from_manifests(clips, videos, clip_ids=["k0", "k1", "k2"]).sort_by_duration()
+    assert len(tasks) == 3
+    listed = list(tasks)
+    assert [t.clip_id for t in listed] == ["k1", "k0", "k2"]  # ties keep manifest order
+    # A row without per-axis scales uses proxy_scale for both axes.
+    assert listed[0] == ClipTask(
+        clip_id="k1", video_id="v1", video_path="/data/v1.mp4", start_s=2.0, end_s=7.0, frame_start=60,
+        frame_end=210, scenedetect_failed=False, retry_count=0, proxy_path="/p/v1.mp4", proxy_scale=0.5,
+        proxy_scale_x=0.5, proxy_scale_y=0.5, checksum="c1",
+    )
+    assert (listed[2].proxy_path, listed[2].proxy_scale) == ("", 1.0)
+
+
+def test_clip_tasks_reject_missing_or_pathless_videos(tmp_path) -> None:
+    videos = read_video_manifest(_write_jsonl(tmp_path / "videos.jsonl", _videos()[:1]))
+    clips = read_clip_manifest(_write_jsonl(tmp_path / "clips.jsonl", _clips()))
+    with pytest.raises(RuntimeError, match="missing video_id: v2"):
+        ClipTasks.from_manifests(clips, videos)
+    assert len(ClipTasks.from_manifests(clips, videos, clip_ids=["k0"])) == 1
+
+    pathless = [dict(_videos()[0], path="")]
+    videos = read_video_manifest(_write_jsonl(tmp_path / "pathless.jsonl", pathless))
+    with pytest.raises(RuntimeError, match="empty path for video_id: v1"):
+        ClipTasks.from_manifests(clips, videos, clip_ids=["k0"])
+
+
+def test_make_manifest_writes_parquet(monkeypatch: pytest.MonkeyPatch, tmp_path) -> None:
+    import argparse
+    import os
+
+    from egoworld import cli
+    from egoworld.manifests import build_manifest as bm
+
+    def _meta(path, split="train", checksum=None):
+        return bm.VideoMeta(video_id=bm.make_video_id(path), path=path, duration_s=10.0, fps=30.0, width=64,
+                            height=48, audio=False, checksum="abc", split=split)
+
+    monkeypatch.setattr(bm, "parse_video_meta", _meta)
+    monkeypatch.setattr(bm, "detect_scenes", lambda path, duration_s, config, checksum="": ([(0.0, 4.0), (4.0, 10.0)], False))
+    (tmp_path / "in").mkdir()
+    (tmp_path / "in" / "a.mp4").write_bytes(b"x")
+    args = argparse.Namespace(
+        config=os.path.join(os.path.dirname(__file__), "..", "configs", "example.json"),
+        input_dir=str(tmp_path / "in"), glob="*.mp4", output_dir=str(tmp_path / "out"), split="train",
+        proxy=False, workers=1, incremental=False, format="parquet",
+    )
+    cli.make_manifest(args)
+    videos = read_video_manifest(str(tmp_path / "out" / "video_manifest.parquet"))
+    clips = read_clip_manifest(str(tmp_path / "out" / "clip_manifest.parquet"))
+    assert videos.num_rows == 1 and clips.num_rows == 2
+    assert videos.schema.field("file_size").type == pa.int64()
+    assert len(ClipTasks.from_manifests(clips, videos)) == 2
@@ -0,0 +1,102 @@
+import json
+
+import numpy as np
+import pytest
+
+from egoworld.utils import rle as rle_ops
+from egoworld.utils.mask import _coco_string_from_counts, decode_mask_rle, encode_mask_rle, rle_counts
+
+
+def _track(n, h=12, w=16):
+    masks = []
+    for i in range(n):
+        mask = np.zeros((h, w), dtype=np.uint8)
+        mask[2 + i % 3 : 8 + i % 3, 1 + i % 7 : 6 + i % 7] = 1
+        masks.append(mask)
+    return masks
+
+
+def test_coco_string_counts_roundtrip() -> None:
+    counts = [0, 5, 300, 2, 1, 40000, 7]
+    assert rle_counts({"counts": _coco_string_from_counts(counts)}) == counts
+
+
+@pytest.mark.parametrize("interval", [1, 4, 100])
+def test_delta_encode_roundtrip(interval) -> None:
+    masks = _track(11)
+    encoded, keys = rle_ops.delta_encode([encode_mask_rle(m) for m in masks], interval)
+    assert keys == [i % interval == 0 for i in range(11)]
+    for mask, rle in zip(masks, rle_ops.delta_decode(encoded, keys)):
+        np.testing.assert_array_equal(rle_ops.to_mask(rle), mask)
+    # Deltas are plain COCO RLEs of the XOR with the previous frame.
+    if not keys[1]:
+        np.testing.assert_array_equal(decode_mask_rle(encoded[1]), masks[0] ^ masks[1])
+
+
+def test_size_change_forces_keyframe() -> None:
+    small = np.ones((4, 4), dtype=np.uint8)
+    encoded, keys = rle_ops.delta_encode(
+        [encode_mask_rle(small), encode_mask_rle(small), encode_mask_rle(np.ones((5, 5), dtype=np.uint8))], 10
+    )
+    assert keys == [True, False, True]
+    with pytest.raises(ValueError):
+        rle_ops.delta_decode(encoded[1:], keys[1:])
+
+
+def test_delta_run_reads_match_plain(tmp_path) -> None:
+    pytest.importorskip("pyarrow")
+    import pyarrow.parquet as pq
+
+    from egoworld.io.catalog import OutputCatalog
+    from egoworld.io.paths import catalog_path, run_dir
+    from egoworld.io.reader import open_run
+    from egoworld.pipeline.compact import compact_run
+    from egoworld.pipeline.driver import ClipWriter
+
+    masks = _track(25)
+    frames = [
+        {"frame_index": 100 + i, "timestamp_s": (100 + i) / 30.0, "mask_rle": encode_mask_rle(m)}
+        for i, m in enumerate(masks)
+    ]
+    state_db = str(tmp_path / "state" / "pipeline.db")
+    config = {
+        "run_id": "r1",
+        "paths": {"output_root": str(tmp_path / "out"), "state_db_path": state_db},
+        "coordinates": {"mask_encoding": "rle_delta", "mask_keyframe_interval": 8, "time_base": "seconds"},
+    }
+    receipt = ClipWriter(config).write({"clip": {"clip_id": "c1", "video_id": "v1"}, "masks": {"frames": frames}})
+    paths = {info["path"].rsplit("/", 1)[-1]: info["path"] for info in receipt["files"]}
+    table = pq.read_table(paths["masks.parquet"])
+    assert table.column("mask_key_frame").to_pylist()[:10] == [100] * 8 + [108, 108]
+    assert table.column("mask_area").to_pylist() == [int(m.sum()) for m in masks]
+    meta = json.loads(open(paths["meta.json"]).read())
+    assert meta["mask_encoding"] == "rle_delta" and meta["mask_keyframe_interval"] == 8
+
+    catalog = OutputCatalog(str(catalog_path(state_db, "r1")))
+    compact_run(run_dir(str(tmp_path / "out"), "r1"), catalog, workers=1, measure_scan=False)
+    reader = open_run(str(tmp_path / "out"), "r1")
+    for i in (0, 7, 8, 13, 24):
+        np.testing.assert_array_equal(reader.mask("v1", "c1", 100 + i), masks[i])
+    seq = reader.masks(video_ids=["v1"], frame_range=(110, 121))
+    assert seq.frame_index.tolist() == list(range(110, 121))
+    np.testing.assert_array_equal(seq.stack(), np.stack(masks[10:21]))
+    np.testing.assert_array_equal(seq[3], masks[13])
+
+
+def test_unknown_mask_encoding_rejected() -> None:
+    pytest.importorskip("pyarrow")
+    from egoworld.io.frames import encode_mask_frames
+
+    with pytest.raises(ValueError):
+        encode_mask_frames([], "png")
+
+
+def test_unknown_mask_encoding_rejected_at_config_load(tmp_path) -> None:
+    from egoworld.config import CoordinateSpec, load_config
+
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps({"coordinates": {"mask_encoding": "delta"}}))
+    with pytest.raises(ValueError, match="mask_encoding"):
+        load_config(str(path))
+    with pytest.raises(ValueError, match="mask_keyframe_interval"):
+        CoordinateSpec(mask_encoding="rle_delta", mask_keyframe_interval=0)
@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+
+from egoworld.operators.groundingdino_op import Detection
+from egoworld.operators.sam2_op import PromptConfig, _PromptTracker, _track_origins
+from egoworld.utils import rle as rle_ops
+
+
+def _objects(h=24, w=32):
+    masks = np.zeros((3, h, w), dtype=bool)
+    masks[0, 2:6, 3:10] = True
+    masks[0, 4, 12] = True
+    masks[2, 10:24, 20:32] = True
+    return masks
+
+
+def test_encode_crops_matches_dense_masks() -> None:
+    masks = _objects()
+    keep, boxes, areas, crops = rle_ops.encode_crops(masks)
+    assert keep.tolist() == [0, 2]
+    assert boxes.tolist() == [[3, 2, 10, 4], [20, 10, 12, 14]]
+    assert areas.tolist() == [int(masks[0].sum()), int(masks[2].sum())]
+    for i, k in enumerate(keep):
+        np.testing.assert_array_equal(rle_ops.paste(crops[i], boxes[i], 24, 32), masks[k])
+    empty = rle_ops.encode_crops(np.zeros((2, 5, 5), dtype=bool))
+    assert empty[0].size == 0 and empty[3] == []
+
+
+class _PhraseGD:
+    def predict(self, image_rgb, prompt, box_threshold, text_threshold, max_boxes):
+        return [
+            Detection((0.0, 0.0, 50.0, 50.0), 0.9, "left hand"),
+            Detection((60.0, 60.0, 100.0, 100.0), 0.6, "cup"),
+        ]
+
+
+def test_tracker_records_phrase_and_score_of_track_origin() -> None:
+    tracker = _PromptTracker(_PhraseGD(), PromptConfig())
+    frame = np.zeros((128, 128, 3), dtype=np.uint8)
+    prompts = tracker.detect(0, frame) + tracker.detect(10, frame)
+    assert [p.obj_id for p in prompts] == [1, 2, 1, 2]
+    assert tracker.origins == {1: ("left hand", 0.9), 2: ("cup", 0.6)}
+    assert _track_origins(prompts) == tracker.origins
+
+
+def test_object_rows_written_and_read_back(tmp_path) -> None:
+    pytest.importorskip("pyarrow")
+    from egoworld.io.frames import ObjectFrameBuilder
+    from egoworld.io.reader import open_run
+    from egoworld.io.result_cache import ResultCache
+    from egoworld.pipeline.driver import ClipWriter, _split_session_result
+
+    masks = _objects()
+    builder = ObjectFrameBuilder()
+    origins = {7: ("left hand", 0.9), 9: ("cup", 0.5)}
+    for frame_index in range(10, 16):
+        assert builder.append(frame_index, frame_index / 30.0, [7, 8, 9], masks, origins) == 2
+    session = {"objects": builder.to_batch(), "tracked_frames": list(range(10, 16)), "empty_frames": []}
+    clips = [
+        {"frame_start": 10, "frame_end": 13, "start_s": 0.0, "end_s": 0.1, "video_path": "v.mp4"},
+        {"frame_start": 13, "frame_end": 16, "start_s": 0.1, "end_s": 0.2, "video_path": "v.mp4"},
+    ]
+    first, second = _split_session_result(session, clips)
+    assert "frames" not in first and first["objects"].num_rows == 6 and second["objects"].num_rows == 6
+
+    cache = ResultCache(str(tmp_path / "cache"), max_bytes=1 << 30)
+    cache.put("k", dict(first))
+    cached = cache.get("k")
+    assert "frames" not in cached and cached["objects"].to_pylist() == first["objects"].to_pylist()
+
+    config = {
+        "run_id": "r1",
+        "paths": {"output_root": str(tmp_path / "out"), "state_db_path": str(tmp_path / "state" / "db")},
+        "coordinates": {"mask_encoding": "rle", "time_base": "seconds"},
+    }
+    receipt = ClipWriter(config).write({"clip": {"clip_id": "c2", "video_id": "v1"}, "masks": second})
+    names = sorted(info["path"].rsplit("/", 1)[-1] for info in receipt["files"])
+    assert "objects.parquet" in names and "masks.parquet" not in names
+
+    reader = open_run(str(tmp_path / "out"), "r1")
+    table = reader.objects(video_ids=["v1"], obj_ids=[9])
+    assert table.column("frame_index").to_pylist() == [13, 14, 15]
+    assert set(table.column("phrase").to_pylist()) == {"cup"}
+    np.testing.assert_array_equal(reader.object_mask("v1", "c2", 14, 7), masks[0].astype(np.uint8))
+    assert reader.object_mask("v1", "c2", 14, 8) is None
+
+
+def test_empty_result_uses_configured_mask_streams() -> None:
+    from egoworld.operators.sam2_op import _empty_result, _mask_streams
+
+    # No prompts: the result carries the same streams a tracked clip would.
+    assert _mask_streams({}) == (True, True)
+    assert set(_empty_result("v.mp4", 0.0, 1.0, {})) >= {"frames", "objects"}
+    result = _empty_result("v.mp4", 0.0, 1.0, {"union_masks": False, "object_masks": True})
+    assert "objects" in result and "frames" not in result
+    assert "objects" not in _empty_result("v.mp4", 0.0, 1.0, {"object_masks": False})
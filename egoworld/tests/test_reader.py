@@ -0,0 +1,103 @@
+import json
+
+import numpy as np
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from egoworld.io.catalog import OutputCatalog
+from egoworld.io.paths import catalog_path, run_dir
+from egoworld.io.reader import open_run
+from egoworld.pipeline.compact import compact_run
+from egoworld.pipeline.driver import ClipWriter
+from egoworld.utils.mask import decode_mask_rle, encode_mask_rle
+
+
+def _coco_string(counts):
+    # Port of pycocotools rleToString, used to build a COCO-style fixture.
+    out = []
+    for i, value in enumerate(counts):
+        x = value - counts[i - 2] if i > 2 else value
+        more = True
+        while more:
+            c = x & 0x1F
+            x >>= 5
+            more = (x != -1) if (c & 0x10) else (x != 0)
+            if more:
+                c |= 0x20
+            out.append(chr(c + 48))
+    return "".join(out)
+
+
+def _mask(i: int) -> np.ndarray:
+    mask = np.zeros((6, 8), dtype=np.uint8)
+    mask[i % 6, : (i % 8) + 1] = 1
+    return mask
+
+
+def test_decode_mask_rle_list_and_coco_string() -> None:
+    mask = _mask(3)
+    assert np.array_equal(decode_mask_rle(encode_mask_rle(mask)), mask)
+    counts = json.loads(encode_mask_rle(mask))["counts"]
+    if isinstance(counts, list):
+        coco = {"size": [6, 8], "counts": _coco_string(counts)}
+        assert np.array_equal(decode_mask_rle(coco), mask)
+
+
+def _write_run(tmp_path):
+    state_db = str(tmp_path / "state" / "pipeline.db")
+    output_root = str(tmp_path / "out")
+    config = {
+        "run_id": "r1",
+        "paths": {"output_root": output_root, "state_db_path": state_db},
+        "coordinates": {"mask_encoding": "rle", "time_base": "seconds"},
+    }
+    writer = ClipWriter(config)
+    for video_id, clip_id, start in (("v1", "c1", 0), ("v1", "c2", 10), ("v2", "c3", 0)):
+        frames = [
+            {"frame_index": start + i, "timestamp_s": (start + i) / 30.0, "mask_rle": encode_mask_rle(_mask(start + i))}
+            for i in range(10)
+        ]
+        writer.write({"clip": {"clip_id": clip_id, "video_id": video_id}, "masks": {"frames": frames}})
+    return output_root, OutputCatalog(str(catalog_path(state_db, "r1")))
+
+
+@pytest.mark.parametrize("compacted", [False, True])
+def test_run_reader_filters_and_decodes(tmp_path, compacted) -> None:
+    output_root, catalog = _write_run(tmp_path)
+    if compacted:
+        compact_run(run_dir(output_root, "r1"), catalog, workers=1, measure_scan=False)
+    reader = open_run(output_root, "r1")
+    assert reader.compacted is compacted
+
+    seq = reader.masks(video_ids=["v1"], clip_ids=["c2"], frame_range=(12, 16))
+    assert seq.frame_index.tolist() == [12, 13, 14, 15]
+    # Half-open like clip frame ranges: the end frame is excluded.
+    assert reader.read(clip_ids=["c2"], frame_range=(12, 15)).column("frame_index").to_pylist() == [12, 13, 14]
+    stack = seq.stack()
+    assert stack.shape == (4, 6, 8)
+    assert np.array_equal(stack[1], _mask(13))
+
+    assert np.array_equal(reader.mask("v2", "c3", 4), _mask(4))
+    assert reader.mask("v2", "c3", 99) is None
+    assert reader.read(columns=["frame_index"]).num_rows == 30
+
+
+def test_run_reader_reads_url_roots(tmp_path) -> None:
+    output_root, catalog = _write_run(tmp_path)
+    reader = open_run(f"file://{output_root}", "r1", catalog=catalog)
+    seq = reader.masks(video_ids=["v1"], clip_ids=["c1"], frame_range=(2, 5))
+    assert seq.frame_index.tolist() == [2, 3, 4]
+    assert np.array_equal(seq[1], _mask(3))
+
+
+def test_arrow_filesystem_for_object_store(monkeypatch) -> None:
+    import pyarrow.fs as pafs
+
+    from egoworld.io import fs
+
+    monkeypatch.setattr(fs, "_STORAGE_OPTIONS", {"endpoint_url": "http://localhost:9000", "region": "eu-west-1"})
+    s3 = fs.arrow_filesystem("s3://bucket/out/run_id=r1")
+    assert isinstance(s3, pafs.S3FileSystem) and s3.region == "eu-west-1"
+    assert fs.arrow_path("s3://bucket/out/run_id=r1/masks.parquet") == "bucket/out/run_id=r1/masks.parquet"
+    assert fs.arrow_path("/data/out/masks.parquet") == "/data/out/masks.parquet"
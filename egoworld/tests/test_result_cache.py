@@ -0,0 +1,71 @@
+import os
+
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from egoworld.io.result_cache import ResultCache, result_cache_key
+
+
+def _result(n: int) -> dict:
+    return {
+        "frames": [
+            {"frame_index": i, "timestamp_s": i / 30.0, "mask_rle": '{"size": [4, 4], "counts": [16]}'}
+            for i in range(n)
+        ],
+        "mask_encoding": "rle",
+        "empty_mask_rate": 0.25,
+    }
+
+
+def test_result_cache_roundtrip(tmp_path) -> None:
+    cache = ResultCache(str(tmp_path), max_bytes=1 << 30)
+    key = result_cache_key("abc", 0, 30, "sam2", "sam2.1_small", {"precision": "bf16"})
+    assert cache.get(key) is None
+
+    cache.put(key, _result(3))
+    cached = cache.get(key)
+    assert cached is not None
+    assert cached["frames"].to_pylist() == _result(3)["frames"]
+    assert cached["empty_mask_rate"] == 0.25
+
+
+def test_result_cache_key_depends_on_params_and_version() -> None:
+    base = result_cache_key("abc", 0, 30, "sam2", "v1", {"precision": "bf16"})
+    assert base == result_cache_key("abc", 0, 30, "sam2", "v1", {"precision": "bf16"})
+    assert base != result_cache_key("abc", 0, 30, "sam2", "v2", {"precision": "bf16"})
+    assert base != result_cache_key("abc", 0, 30, "sam2", "v1", {"precision": "fp16"})
+    assert base != result_cache_key("abc", 0, 31, "sam2", "v1", {"precision": "bf16"})
+
+
+def test_result_cache_evicts_least_recently_used(tmp_path) -> None:
+    cache = ResultCache(str(tmp_path), max_bytes=1 << 30)
+    keys = [result_cache_key("abc", i, i + 30, "sam2", "v1", {}) for i in range(3)]
+    for i, key in enumerate(keys):
+        cache.put(key, _result(50))
+        path = cache._path(key)
+        os.utime(path, (1000 + i, 1000 + i))
+    entry_size = cache._path(keys[0]).stat().st_size
+
+    cache.get(keys[0])
+    cache.max_bytes = 2 * entry_size
+    assert cache.evict() == 1
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) is not None
+    assert cache.get(keys[2]) is not None
+
+
+def test_result_cache_stores_extra_tables_once(tmp_path) -> None:
+    import pyarrow as pa
+
+    objects = pa.table({"obj_id": list(range(64)), "mask_rle": [os.urandom(16384) for _ in range(64)]})
+    payload = objects.nbytes
+    cache = ResultCache(str(tmp_path), max_bytes=1 << 30)
+    cache.put("k", dict(_result(3), objects=objects))
+
+    assert cache._path("k").stat().st_size < 1.2 * payload
+    cached = cache.get("k")
+    assert cached["objects"].equals(objects)
+    assert cached["objects"].schema.metadata is None
+    assert cached["frames"].to_pylist() == _result(3)["frames"]
+    assert cached["empty_mask_rate"] == 0.25
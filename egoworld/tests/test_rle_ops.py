@@ -0,0 +1,113 @@
+import json
+
+import numpy as np
+import pytest
+
+from egoworld.observability.qc import mask_area_stats
+from egoworld.utils import rle as rle_ops
+from egoworld.utils.mask import decode_mask_rle, encode_mask_rle
+
+
+def _random_masks(n, h=23, w=31, seed=0):
+    rng = np.random.default_rng(seed)
+    masks = []
+    for i in range(n):
+        mask = np.zeros((h, w), dtype=np.uint8)
+        if i % 4 != 0:
+            y0, x0 = rng.integers(0, h - 2), rng.integers(0, w - 2)
+            y1, x1 = rng.integers(y0 + 1, h + 1), rng.integers(x0 + 1, w + 1)
+            mask[y0:y1, x0:x1] = 1
+            mask &= (rng.random((h, w)) > 0.2).astype(np.uint8)
+        masks.append(mask)
+    return masks
+
+
+def _dense_bbox(mask):
+    ys, xs = np.nonzero(mask)
+    if not len(xs):
+        return (0, 0, 0, 0)
+    return (xs.min(), ys.min(), xs.max() - xs.min() + 1, ys.max() - ys.min() + 1)
+
+
+def test_area_and_bbox_match_decoded_masks() -> None:
+    masks = _random_masks(12) + [np.ones((23, 31), dtype=np.uint8)]
+    encoded = [encode_mask_rle(m) for m in masks]
+    areas, boxes = rle_ops.mask_stats(encoded)
+    for mask, rle, a, box in zip(masks, encoded, areas, boxes):
+        assert a == int(mask.sum()) == rle_ops.area(rle)
+        assert tuple(box) == _dense_bbox(mask) == rle_ops.bbox(rle)
+
+
+def test_set_operations_match_numpy() -> None:
+    masks = _random_masks(8, seed=3)
+    encoded = [encode_mask_rle(m) for m in masks]
+    for a, b, ra, rb in zip(masks, masks[1:], encoded, encoded[1:]):
+        np.testing.assert_array_equal(decode_mask_rle(rle_ops.to_dict(rle_ops.union(ra, rb))), a | b)
+        np.testing.assert_array_equal(decode_mask_rle(rle_ops.to_dict(rle_ops.intersection(ra, rb))), a & b)
+        np.testing.assert_array_equal(decode_mask_rle(rle_ops.to_dict(rle_ops.xor(ra, rb))), a ^ b)
+        union = int((a | b).sum())
+        expected = (int((a & b).sum()) / union) if union else 0.0
+        assert rle_ops.iou(ra, rb) == pytest.approx(expected)
+    merged = rle_ops.union_all(encoded)
+    np.testing.assert_array_equal(decode_mask_rle(json.loads(rle_ops.to_json(merged))), np.bitwise_or.reduce(masks))
+
+
+def test_batched_set_operations_match_numpy() -> None:
+    masks = _random_masks(9, seed=5) + [np.ones((23, 31), dtype=np.uint8)]
+    encoded = [encode_mask_rle(m) for m in masks]
+    left, right = encoded[:-1], encoded[1:]
+    for op, dense, batch in (
+        (np.bitwise_or, rle_ops.union, rle_ops.unions),
+        (np.bitwise_and, rle_ops.intersection, rle_ops.intersections),
+        (np.bitwise_xor, rle_ops.xor, rle_ops.xors),
+    ):
+        for a, b, ra, rb, merged in zip(masks, masks[1:], left, right, batch(left, right)):
+            np.testing.assert_array_equal(rle_ops.to_mask(merged), op(a, b))
+            np.testing.assert_array_equal(merged.counts, dense(ra, rb).counts)
+    expected = [rle_ops.iou(ra, rb) for ra, rb in zip(left, right)]
+    np.testing.assert_allclose(rle_ops.ious(left, right), expected)
+    matrix = rle_ops.iou_matrix(encoded[:4], encoded)
+    assert matrix.shape == (4, len(encoded))
+    for i, ra in enumerate(encoded[:4]):
+        for j, rb in enumerate(encoded):
+            assert matrix[i, j] == pytest.approx(rle_ops.iou(ra, rb))
+    assert rle_ops.iou_matrix([], encoded).shape == (0, len(encoded))
+    assert rle_ops.unions([], []) == []
+    with pytest.raises(ValueError):
+        rle_ops.ious(left, right[:-1])
+
+
+def test_size_mismatch_and_empty_batches() -> None:
+    a = encode_mask_rle(np.zeros((4, 4), dtype=np.uint8))
+    b = encode_mask_rle(np.zeros((4, 5), dtype=np.uint8))
+    with pytest.raises(ValueError):
+        rle_ops.union(a, b)
+    assert rle_ops.areas([]).shape == (0,)
+    assert rle_ops.bboxes([]).shape == (0, 4)
+    assert mask_area_stats([a, a])["empty_rate"] == 1.0
+
+
+def test_writer_adds_mask_stats_columns(tmp_path) -> None:
+    pytest.importorskip("pyarrow")
+    import pyarrow.parquet as pq
+
+    from egoworld.io.frames import MaskFrameBuilder, with_mask_stats
+    from egoworld.io.writers import write_parquet_table
+    from egoworld.manifests.schema import mask_output_schema
+
+    masks = _random_masks(5, seed=7)
+    builder = MaskFrameBuilder()
+    for i, mask in enumerate(masks):
+        builder.append(i, i / 30.0, encode_mask_rle(mask))
+    path = tmp_path / "masks.parquet"
+    write_parquet_table(str(path), with_mask_stats(builder.to_batch()), schema=mask_output_schema())
+    table = pq.read_table(path)
+    assert table.column("mask_area").to_pylist() == [int(m.sum()) for m in masks]
+    assert [tuple(b) for b in table.column("mask_bbox").to_pylist()] == [_dense_bbox(m) for m in masks]
+    assert with_mask_stats([]).schema.equals(mask_output_schema())
+
+
+def test_placeholder_masks_count_as_empty() -> None:
+    areas, boxes = rle_ops.mask_stats(["{}", "", None])
+    assert areas.tolist() == [0, 0, 0]
+    assert boxes.tolist() == [[0, 0, 0, 0]] * 3
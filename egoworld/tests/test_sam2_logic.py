@@ -1,5 +1,6 @@
 import numpy as np
 
+from egoworld.operators import sam2_op
 from egoworld.operators.sam2_op import _filter_boxes, _load_prompt_config, _union_masks
 
 
@@ -26,3 +27,70 @@ def test_union_masks() -> None:
     assert union is not None
     assert union[0, 0] == 1
     assert union[1, 1] == 1
+
+
+class _FakePredictor:
+    def __init__(self, window_sizes):
+        self.window_sizes = window_sizes
+        self.mask_prompts = []
+        self.init_kwargs = []
+
+    def init_state(self, video_path=None, **kwargs):
+        self.init_kwargs.append(kwargs)
+        return {"dir": video_path, "objs": set(), "first": None}
+
+    def add_new_mask(self, state, frame_idx, obj_id, mask):
+        self.mask_prompts.append((state["dir"], frame_idx, obj_id))
+        self._prompt(state, frame_idx, obj_id)
+
+    def add_new_points_or_box(self, state, frame_idx, obj_id, box):
+        self._prompt(state, frame_idx, obj_id)
+
+    def _prompt(self, state, frame_idx, obj_id):
+        state["objs"].add(obj_id)
+        if state["first"] is None or frame_idx < state["first"]:
+            state["first"] = frame_idx
+
+    def propagate_in_video(self, state):
+        obj_ids = sorted(state["objs"])
+        for idx in range(state["first"], self.window_sizes[state["dir"]]):
+            yield idx, obj_ids, np.ones((len(obj_ids), 1, 4, 4), dtype=np.float32)
+
+
+def test_propagate_windowed_emits_each_frame_once() -> None:
+    windows = [(0, "w0", 10, 0, []), (8, "w1", 10, 2, []), (16, "w2", 9, 2, [])]
+    predictor = _FakePredictor({name: count for _, name, count, _, _ in windows})
+
+    cfg = sam2_op._load_window_config({"window_frames": 10, "overlap_frames": 2, "offload_video_to_cpu": True})
+    prompts = [sam2_op.BoxPrompt(frame_idx=0, obj_id=1, box=(0.0, 0.0, 2.0, 2.0))]
+    stats = []
+    propagation = sam2_op._propagate_windowed(
+        predictor, iter(windows), sam2_op._prompts_in_range(prompts), cfg, stats
+    )
+    emitted = [idx for idx, _, _ in propagation]
+
+    assert emitted == list(range(25))
+    assert predictor.mask_prompts == [("w1", 0, 1), ("w2", 0, 1)]
+    assert all(kwargs == {"offload_video_to_cpu": True} for kwargs in predictor.init_kwargs)
+    assert [s["start_frame"] for s in stats] == [0, 8, 16]
+
+
+def test_propagate_windowed_counts_skipped_windows_as_empty() -> None:
+    # Nothing is carried out of w1 (the fake predictor yields no objects there), so w2 is skipped.
+    windows = [(0, "w0", 10, 0, []), (8, "w1", 10, 2, []), (16, "w2", 9, 2, [])]
+
+    class _DyingPredictor(_FakePredictor):
+        def propagate_in_video(self, state):
+            for idx, obj_ids, masks in super().propagate_in_video(state):
+                yield idx, obj_ids, masks * (state["dir"] == "w0")
+
+    predictor = _DyingPredictor({name: count for _, name, count, _, _ in windows})
+    cfg = sam2_op._load_window_config({"window_frames": 10, "overlap_frames": 2})
+    prompts = [sam2_op.BoxPrompt(frame_idx=2, obj_id=1, box=(0.0, 0.0, 2.0, 2.0))]
+    stats = []
+    emitted = list(sam2_op._propagate_windowed(predictor, iter(windows), sam2_op._prompts_in_range(prompts), cfg, stats))
+
+    assert [idx for idx, _, _ in emitted] == list(range(2, 25))
+    assert [idx for idx, ids, _ in emitted if not ids] == list(range(18, 25))
+    assert all(_union_masks(masks) is None for _, ids, masks in emitted if not ids)
+    assert [s.get("skipped", False) for s in stats] == [False, False, True]
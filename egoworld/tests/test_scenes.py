@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+
+from egoworld.config import SceneDetectConfig
+from egoworld.manifests import build_manifest as bm
+from egoworld.manifests import scenes
+
+
+CUTS = (30, 75)
+
+
+def _write_video(path, frames: int = 120, fps: float = 30.0) -> str:
+    rng = np.random.default_rng(0)
+    colors = [(20, 20, 20), (60, 220, 220), (220, 60, 20)]
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), fps, (160, 120))
+    for i in range(frames):
+        scene = sum(i >= c for c in CUTS)
+        frame = np.full((120, 160, 3), colors[scene], dtype=np.uint8)
+        frame[:, (i * 2) % 160 :][:20] = 255  # small motion within a scene
+        frame = np.clip(frame + rng.integers(0, 4, frame.shape), 0, 255).astype(np.uint8)
+        writer.write(frame)
+    writer.release()
+    return str(path)
+
+
+def test_content_scores_find_cuts_at_native_and_fast_settings(tmp_path) -> None:
+    video = _write_video(tmp_path / "a.avi")
+    frame_index, scores, fps = scenes.content_scores(video, width=0, frame_skip=0)
+    assert fps == pytest.approx(30.0)
+    assert len(frame_index) == 120
+    reference = scenes.scenes_from_scores(frame_index, scores, fps, 4.0, 27.0, 0.5)
+    assert [round(start * fps) for start, _ in reference] == [0, *CUTS]
+
+    frame_index, scores, fps = scenes.content_scores(video, width=32, frame_skip=1)
+    assert frame_index.tolist() == list(range(0, 120, 2))
+    fast = scenes.scenes_from_scores(frame_index, scores, fps, 4.0, 27.0, 0.5)
+    agreement = scenes.boundary_agreement(reference, fast, tolerance_s=2 / fps)
+    assert agreement["precision"] == 1.0 and agreement["recall"] == 1.0
+
+
+def test_scenes_from_scores_respects_min_scene_len() -> None:
+    frame_index = np.arange(10)
+    scores = np.array([0, 0, 50, 50, 0, 0, 0, 50, 0, 0], dtype=np.float32)
+    assert scenes.scenes_from_scores(frame_index, scores, 1.0, 10.0, 27.0, 2.0) == [
+        (0.0, 2.0),
+        (2.0, 7.0),
+        (7.0, 10.0),
+    ]
+    assert scenes.scenes_from_scores(frame_index, scores, 1.0, 10.0, 60.0, 2.0) == [(0.0, 10.0)]
+
+
+def test_boundary_agreement_counts_matches_within_tolerance() -> None:
+    reference = [(0.0, 1.0), (1.0, 3.0), (3.0, 5.0)]
+    candidate = [(0.0, 1.1), (1.1, 4.0), (4.0, 5.0)]
+    result = scenes.boundary_agreement(reference, candidate, tolerance_s=0.2)
+    assert result["precision"] == 0.5 and result["recall"] == 0.5
+
+
+def test_detect_scenes_fast_reuses_cached_scores(monkeypatch: pytest.MonkeyPatch, tmp_path) -> None:
+    video = _write_video(tmp_path / "a.avi")
+    config = SceneDetectConfig(method="fast", min_scene_len_s=0.5, score_cache_dir=str(tmp_path / "scores"))
+    first, used_fallback = bm.detect_scenes(video, 4.0, config, checksum="abc")
+    assert used_fallback is False
+    assert len(first) == 3
+
+    def _no_decode(*args, **kwargs):
+        raise AssertionError("scores should come from the cache")
+
+    monkeypatch.setattr(scenes, "content_scores", _no_decode)
+    again, _ = bm.detect_scenes(video, 4.0, config, checksum="abc")
+    assert again == first
+    fewer, _ = bm.detect_scenes(video, 4.0, SceneDetectConfig(**{**config.__dict__, "min_scene_len_s": 2.0}), "abc")
+    assert len(fewer) == 2
@@ -0,0 +1,103 @@
+import numpy as np
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+
+from egoworld.config import SceneDetectConfig
+from egoworld.io.sidecar import SidecarStore
+from egoworld.manifests import build_manifest as bm
+from egoworld.manifests import scenes
+from egoworld.operators.groundingdino_op import Detection
+from egoworld.operators.sam2_op import PromptConfig, _detect_prompts, _sidecar_prompt_frames
+
+
+def _write_video(path, frames: int = 90, fps: float = 30.0) -> str:
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), fps, (160, 120))
+    for i in range(frames):
+        frame = np.full((120, 160, 3), 40 if i < 45 else 200, dtype=np.uint8)
+        frame[:20, (i * 2) % 160 :] = 255
+        writer.write(frame)
+    writer.release()
+    return str(path)
+
+
+def test_decode_pass_fills_sidecar_without_changing_scores(tmp_path) -> None:
+    video = _write_video(tmp_path / "a.avi")
+    store = SidecarStore(str(tmp_path / "sidecars"))
+    writer = store.writer("abc", prompt_interval_s=1.0, thumb_width=64)
+
+    frames, scores, fps = scenes.content_scores(video, width=80, frame_skip=1, sidecar=writer)
+    plain = scenes.content_scores(video, width=80, frame_skip=1)
+    assert np.array_equal(frames, plain[0]) and np.allclose(scores, plain[1])
+    assert store.writer("abc", 1.0, 64) is None
+
+    sidecar = store.open("abc", 1.0)
+    assert list(sidecar.thumb_frame) == [0, 30, 60] and sidecar.thumbs.shape == (3, 48, 64, 3)
+    assert [f for f, _ in sidecar.prompt_frames(25, 90, max_frames=1)] == [30]
+    assert np.array_equal(sidecar.frame_index, frames)
+    dark, bright = sidecar.stats(0, 44), sidecar.stats(46, 90)
+    assert dark["brightness_mean"] < bright["brightness_mean"]
+    assert 0 < dark["motion_mean"] < 10 and sidecar.stats(200, 300) == {}
+
+
+def test_detect_scenes_writes_sidecar_from_fast_decode(tmp_path) -> None:
+    video = _write_video(tmp_path / "a.avi")
+    config = SceneDetectConfig(method="fast", sidecar_dir=str(tmp_path / "fast"), prompt_interval_s=1.0)
+    bm.detect_scenes(video, 3.0, config, checksum="abc")
+    assert len(SidecarStore(config.sidecar_dir).open("abc", 1.0).thumb_frame) == 3
+    bm.detect_scenes(video, 3.0, SceneDetectConfig(method="fast", sidecar_dir=str(tmp_path / "none")))
+    assert not (tmp_path / "none").exists()
+    # PySceneDetect decodes on its own, so a sidecar would cost a second decode.
+    with pytest.raises(ValueError):
+        SceneDetectConfig(method="scenedetect", sidecar_dir=str(tmp_path / "sd"))
+
+
+def test_sam2_prompt_frames_from_sidecar(tmp_path) -> None:
+    video = _write_video(tmp_path / "a.avi")
+    writer = SidecarStore(str(tmp_path / "sc")).writer("abc", 1.0, 64)
+    scenes.content_scores(video, width=80, frame_skip=1, sidecar=writer)
+    cfg = PromptConfig(prompt_interval_s=1.0, sidecar_dir=str(tmp_path / "sc"))
+
+    # Clip starting at frame 10 is off the grid: without a stored start the clip is decoded.
+    assert _sidecar_prompt_frames(cfg, "abc", 10 / 30.0, 3.0, 30.0) is None
+    sidecar = SidecarStore(str(tmp_path / "sc")).open("abc", 1.0)
+    assert sidecar.add_clip_starts(video, [0, 10, 30]) == 1
+    assert sidecar.add_clip_starts(video, [10]) == 0
+
+    frames = _sidecar_prompt_frames(cfg, "abc", 10 / 30.0, 3.0, 30.0)
+    assert [f for f, _, _ in frames] == [0, 20, 50]
+    assert [rgb.shape for _, _, rgb in frames] == [(48, 64, 3)] * 3
+    cap = cv2.VideoCapture(video)
+    for _ in range(11):
+        _, frame = cap.read()
+    cap.release()
+    expected = cv2.cvtColor(cv2.resize(frame, (64, 48), interpolation=cv2.INTER_AREA), cv2.COLOR_BGR2RGB)
+    np.testing.assert_array_equal(frames[0][2], expected)
+    assert _sidecar_prompt_frames(cfg, "other", 0.0, 3.0, 30.0) is None
+    assert _sidecar_prompt_frames(cfg, "abc", 0.0, 3.0, 25.0) is None
+
+
+class _BoxGD:
+    def predict(self, image_rgb, prompt, box_threshold, text_threshold, max_boxes):
+        w = image_rgb.shape[1]
+        return [Detection((0.0, 0.0, w / 4, w / 4), 0.9, "hand")]
+
+
+def test_thumbnail_boxes_are_scaled_to_clip_pixels() -> None:
+    frames = [(0, 0.0, np.zeros((120, 160, 3), np.uint8)), (20, 0.66, np.zeros((48, 64, 3), np.uint8))]
+    prompts = _detect_prompts(_BoxGD(), frames, PromptConfig(min_box_area=0.0), frame_width=160)
+    assert [p.box for p in prompts] == [(0.0, 0.0, 40.0, 40.0), (0.0, 0.0, 40.0, 40.0)]
+    assert prompts[0].obj_id == prompts[1].obj_id
+
+
+def test_thumbnail_array_grows_past_reported_frame_count(tmp_path) -> None:
+    store = SidecarStore(str(tmp_path))
+    writer = store.writer("abc", 1.0, 0)
+    writer.begin(fps=2.0, frame_count=0)
+    for i in range(0, 10, 2):
+        writer.add_thumb(i, np.full((4, 6, 3), i, np.uint8))
+    writer.commit()
+    sidecar = store.open("abc", 1.0)
+    assert sidecar.thumbs.shape == (5, 4, 6, 3)
+    assert [int(rgb[0, 0, 0]) for _, rgb in sidecar.prompt_frames(0, 10, 10)] == [0, 2, 4, 6, 8]
+    assert not list((tmp_path / "abc-p1000").glob("thumbs.*.npy"))
@@ -0,0 +1,162 @@
+import numpy as np
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+
+from egoworld.config import PipelineConfig, SceneDetectConfig, TriageConfig
+from egoworld.io.sidecar import SidecarStore
+from egoworld.manifests import scenes
+from egoworld.pipeline import triage
+from egoworld.pipeline.driver import ClipTask
+from egoworld.pipeline.state_store import bulk_insert_pending, get_clip_state, get_resumable_clips, init_db
+
+# Frames 0-29 near black, 30-59 a still textured scene, 60-89 the same scene moving.
+SEGMENTS = {"dark": (0, 30), "still": (30, 60), "moving": (60, 90)}
+
+
+def _write_video(path) -> str:
+    rng = np.random.default_rng(0)
+    texture = rng.integers(60, 200, (120, 160, 3), dtype=np.uint8)
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), 30.0, (160, 120))
+    for i in range(90):
+        if i < 30:
+            frame = np.full((120, 160, 3), 3, dtype=np.uint8)
+        else:
+            frame = np.roll(texture, 4 * max(0, i - 60), axis=1)
+        writer.write(frame)
+    writer.release()
+    return str(path)
+
+
+def _tasks(video: str, checksum: str = "") -> list:
+    return [
+        ClipTask(
+            clip_id=name,
+            video_id="v1",
+            video_path=video,
+            start_s=start / 30.0,
+            end_s=end / 30.0,
+            frame_start=start,
+            frame_end=end,
+            scenedetect_failed=False,
+            checksum=checksum,
+        )
+        for name, (start, end) in SEGMENTS.items()
+    ]
+
+
+CONFIG = TriageConfig(enabled=True, min_brightness=10.0, min_motion=1.0, min_sharpness=5.0)
+
+
+def test_decode_triage_flags_dark_and_static_clips(tmp_path) -> None:
+    results = {r.clip_id: r for r in triage.triage_clips(_tasks(_write_video(tmp_path / "a.avi")), CONFIG)}
+    assert results["dark"].reason.startswith("triage: dark")
+    assert results["still"].reason.startswith("triage: static")
+    assert results["moving"].reason == ""
+    assert {r.source for r in results.values()} == {"decode"}
+
+
+def test_sidecar_triage_matches_decode_without_decoding(tmp_path, monkeypatch: pytest.MonkeyPatch) -> None:
+    video = _write_video(tmp_path / "a.avi")
+    writer = SidecarStore(str(tmp_path / "sc")).writer("abc", 0.5, 160)
+    scenes.content_scores(video, width=160, frame_skip=0, sidecar=writer)
+    monkeypatch.setattr(triage, "decode_stats", lambda *args: pytest.fail("decoded"))
+
+    results = [triage.triage_clip(t, CONFIG, str(tmp_path / "sc"), 0.5) for t in _tasks(video, "abc")]
+    assert [r.reason.split(" (")[0] for r in results] == ["triage: dark", "triage: static", ""]
+    assert {r.source for r in results} == {"sidecar"}
+
+
+def test_triage_reason_thresholds() -> None:
+    assert triage.triage_reason((50.0, 2.0, 5.0), CONFIG).startswith("triage: blurry")
+    assert triage.triage_reason((50.0, 2.0, 5.0), TriageConfig()) == ""
+    assert triage.sample_frames(10, 11, 4) == [10]
+    assert triage.sample_frames(0, 100, 3) == [0, 49, 98]
+
+
+def _manifests(video: str):
+    pa = pytest.importorskip("pyarrow")
+    clips = pa.Table.from_pylist(
+        [
+            {
+                "clip_id": t.clip_id, "video_id": "v1", "start_s": t.start_s, "end_s": t.end_s,
+                "frame_start": t.frame_start, "frame_end": t.frame_end, "scenedetect_failed": False, "retry_count": 0,
+            }
+            for t in _tasks(video)
+        ]
+    )
+    videos = pa.Table.from_pylist([{"video_id": "v1", "path": video, "proxy_path": "", "proxy_scale": 1.0, "checksum": ""}])
+    return clips, videos
+
+
+def test_triaged_jobs_skip_or_deprioritize(tmp_path, monkeypatch: pytest.MonkeyPatch) -> None:
+    from egoworld.pipeline.driver import ClipTasks, TriageOutcome, _group_tasks_by_video, triaged_jobs
+
+    clips, videos = _manifests(_write_video(tmp_path / "a.avi"))
+    state_db = str(tmp_path / "state.db")
+    init_db(state_db)
+    bulk_insert_pending(state_db, clips.select(["clip_id", "video_id"]).to_pylist())
+
+    config = PipelineConfig(triage=TriageConfig(**dict(vars(CONFIG), action="deprioritize", workers=2)))
+    outcome = TriageOutcome()
+    jobs = list(triaged_jobs(state_db, ([t] for t in ClipTasks.from_manifests(clips, videos)), config, outcome))
+    assert [r.clip_id for r in outcome.flagged] == ["dark", "still"]
+    assert [job[0].clip_id for job in jobs] == ["moving", "dark", "still"]
+    assert sorted(get_resumable_clips(state_db)) == ["dark", "moving", "still"]
+
+    # Video mode keeps the order too: the flagged clips of a video become a job after the others.
+    monkeypatch.setattr(triage, "decode_stats", lambda *args: pytest.fail("decoded"))
+    groups = _group_tasks_by_video(list(ClipTasks.from_manifests(clips, videos)))
+    outcome = TriageOutcome()
+    jobs = list(triaged_jobs(state_db, groups, config, outcome))
+    assert [[t.clip_id for t in job] for job in jobs] == [["moving"], ["dark", "still"]]
+    assert outcome.reused == 3
+
+    # Stored statistics are judged again under new thresholds without decoding.
+    config = PipelineConfig(triage=TriageConfig(**dict(vars(CONFIG), min_motion=0.0)), scenedetect=SceneDetectConfig())
+    outcome = TriageOutcome()
+    jobs = list(triaged_jobs(state_db, ([t] for t in ClipTasks.from_manifests(clips, videos)), config, outcome))
+    assert [job[0].clip_id for job in jobs] == ["still", "moving"]
+    state = get_clip_state(state_db, "dark")
+    assert state.status == "Skipped" and state.last_error.startswith("triage: dark")
+    assert sorted(get_resumable_clips(state_db)) == ["moving", "still"]
+
+
+def test_skipped_clips_reconsidered_when_thresholds_change(tmp_path, monkeypatch: pytest.MonkeyPatch) -> None:
+    from egoworld.pipeline.driver import ClipTasks, TriageOutcome, reconsider_skipped, triaged_jobs
+
+    clips, videos = _manifests(_write_video(tmp_path / "a.avi"))
+    state_db = str(tmp_path / "state.db")
+    init_db(state_db)
+    bulk_insert_pending(state_db, clips.select(["clip_id", "video_id"]).to_pylist())
+    config = PipelineConfig(triage=CONFIG)
+    list(triaged_jobs(state_db, ([t] for t in ClipTasks.from_manifests(clips, videos)), config, TriageOutcome()))
+    assert get_resumable_clips(state_db) == ["moving"]
+
+    monkeypatch.setattr(triage, "decode_stats", lambda *args: pytest.fail("decoded"))
+    assert reconsider_skipped(state_db, config) == []
+    relaxed = PipelineConfig(triage=TriageConfig(**dict(vars(CONFIG), min_motion=0.0)))
+    assert reconsider_skipped(state_db, relaxed) == ["still"]
+    assert sorted(get_resumable_clips(state_db)) == ["moving", "still"]
+    assert get_clip_state(state_db, "dark").status == "Skipped"
+
+
+def test_clip_statuses_include_skipped() -> None:
+    from egoworld.manifests.schema import CLIP_STATUSES
+
+    assert "Skipped" in CLIP_STATUSES
+
+
+def test_prefetch_runs_ahead_and_reraises() -> None:
+    from egoworld.pipeline.queues import prefetch
+
+    def _items():
+        yield 1
+        yield 2
+        raise RuntimeError("boom")
+
+    seen = []
+    with pytest.raises(RuntimeError, match="boom"):
+        for item in prefetch(_items(), depth=4):
+            seen.append(item)
+    assert seen == [1, 2]
@@ -0,0 +1,71 @@
+from egoworld.pipeline.driver import _sam2_params, _split_session_result
+from egoworld.pipeline.scheduler import plan_video_segments
+
+
+def _clip(clip_id: str, frame_start: int, frame_end: int) -> dict:
+    return {
+        "clip_id": clip_id,
+        "video_id": "v1",
+        "video_path": "/tmp/v1.mp4",
+        "frame_start": frame_start,
+        "frame_end": frame_end,
+        "start_s": frame_start / 30.0,
+        "end_s": frame_end / 30.0,
+    }
+
+
+def test_plan_video_segments_cuts_at_overlap_midpoint() -> None:
+    clips = [_clip("b", 270, 600), _clip("a", 0, 330)]
+    assert plan_video_segments(clips) == [(0, 300), (300, 600)]
+
+
+def test_plan_video_segments_keeps_gaps() -> None:
+    clips = [_clip("a", 0, 100), _clip("b", 200, 300)]
+    assert plan_video_segments(clips) == [(0, 100), (200, 300)]
+
+
+def test_split_session_result_matches_clip_ranges() -> None:
+    clips = [_clip("a", 0, 330), _clip("b", 270, 600)]
+    tracked = list(range(0, 600))
+    empty = [5, 400]
+    rows = [
+        {"frame_index": idx, "timestamp_s": idx / 30.0, "mask_rle": "{}"}
+        for idx in tracked
+        if idx not in empty
+    ]
+    session = {"frames": rows, "tracked_frames": tracked, "empty_frames": empty, "video_path": "/tmp/p.mp4"}
+
+    first, second = _split_session_result(session, clips)
+
+    assert [r["frame_index"] for r in first["frames"]] == [i for i in range(0, 330) if i != 5]
+    assert [r["frame_index"] for r in second["frames"]] == [i for i in range(270, 600) if i != 400]
+    assert first["frames_processed"] + second["frames_processed"] == len(tracked)
+    assert first["empty_mask_rate"] == 1 / 330
+    assert second["video_path"] == "/tmp/p.mp4"
+
+
+def test_adjacent_scenes_get_exact_frame_ranges() -> None:
+    # Scene cuts at frames 90 and 150 with no overlap: clips are half-open and share no frames.
+    clips = [_clip("a", 0, 90), _clip("b", 90, 150), _clip("c", 150, 240)]
+    segments = plan_video_segments(clips)
+    assert segments == [(0, 90), (90, 150), (150, 240)]
+
+    tracked = [f for lo, hi in segments for f in range(lo, hi)]
+    rows = [{"frame_index": idx, "timestamp_s": idx / 30.0, "mask_rle": "{}"} for idx in tracked]
+    split = _split_session_result({"frames": rows, "tracked_frames": tracked, "empty_frames": []}, clips)
+
+    for clip, result in zip(clips, split):
+        indices = [r["frame_index"] for r in result["frames"]]
+        assert indices == list(range(clip["frame_start"], clip["frame_end"]))
+        assert result["frames_processed"] == clip["frame_end"] - clip["frame_start"]
+
+
+def test_sam2_params_scale_min_box_area_on_proxy() -> None:
+    params = {"prompting": {"min_box_area": 400.0}, "points_per_side": 8}
+    assert _sam2_params(params, {"proxy_path": "", "proxy_scale": 0.5}) is params
+    scaled = _sam2_params(params, {"proxy_path": "/p.mp4", "proxy_scale": 0.5})
+    assert scaled["prompting"]["min_box_area"] == 100.0 and scaled["points_per_side"] == 8
+    assert params["prompting"]["min_box_area"] == 400.0
+    assert _sam2_params({}, {"proxy_path": "/p.mp4", "proxy_scale": 0.5})["prompting"]["min_box_area"] == 64.0
+    per_axis = _sam2_params(params, {"proxy_path": "/p.mp4", "proxy_scale": 0.5, "proxy_scale_x": 0.5, "proxy_scale_y": 0.25})
+    assert per_axis["prompting"]["min_box_area"] == 50.0
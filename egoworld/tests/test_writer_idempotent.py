@@ -4,6 +4,7 @@ import tempfile
 import pytest
 
 from egoworld.io.writers import write_json
+from egoworld.utils.hashing import sha256_file
 
 
 def test_write_json_idempotent():
@@ -22,5 +23,150 @@ def test_parquet_write_if_available():
 
     with tempfile.TemporaryDirectory() as tmp:
         path = os.path.join(tmp, "data.parquet")
-        write_parquet_table(path, [{"x": 1}], schema=pyarrow.schema([("x", pyarrow.int64())]))
+        info = write_parquet_table(path, [{"x": 1}], schema=pyarrow.schema([("x", pyarrow.int64())]))
         assert os.path.exists(path)
+        assert info["rows"] == 1
+        assert info["bytes"] == os.path.getsize(path)
+        assert info["sha256"] == sha256_file(path)
+
+
+def test_writer_shard_is_stable_per_video():
+    from egoworld.pipeline.scheduler import writer_shard
+
+    shards = {writer_shard(f"video-{i}", 4) for i in range(64)}
+    assert shards == {0, 1, 2, 3}
+    assert writer_shard("video-7", 4) == writer_shard("video-7", 4)
+    assert writer_shard("video-7", 1) == 0
+
+
+def test_clip_writer_returns_receipt_without_frames():
+    pytest.importorskip("pyarrow")
+    from egoworld.pipeline.driver import ClipWriter
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config = {
+            "run_id": "run-1",
+            "paths": {"output_root": tmp, "state_db_path": os.path.join(tmp, "state", "pipeline.db")},
+            "coordinates": {"mask_encoding": "rle", "time_base": "seconds"},
+        }
+        result = {
+            "clip": {"clip_id": "c1", "video_id": "v1"},
+            "masks": {
+                "frames": [{"frame_index": 0, "timestamp_s": 0.0, "mask_rle": "{}"}],
+                "frames_processed": 1,
+                "cache_hit": False,
+            },
+        }
+        receipt = ClipWriter(config).write(result)
+        assert receipt["status"] == "written"
+        assert receipt["masks"] == {"frames_processed": 1, "cache_hit": False}
+        files = {os.path.basename(info["path"]): info for info in receipt["files"]}
+        assert files["masks.parquet"]["rows"] == 1
+        assert files["masks.parquet"]["sha256"] == sha256_file(files["masks.parquet"]["path"])
+
+
+def test_writer_actor_writes_streams_concurrently(monkeypatch):
+    pytest.importorskip("pyarrow")
+    import threading
+
+    from egoworld.io.writers import encode_parquet
+    from egoworld.pipeline import driver
+    from egoworld.pipeline.driver import WriterActor
+
+    # Each stream encode waits for a second one to start; serial encodes would time out.
+    barrier = threading.Barrier(2, timeout=5)
+    active = []
+    lock = threading.Lock()
+
+    def _overlapping_encode(rows, **kwargs):
+        with lock:
+            active.append(kwargs["schema"])
+        barrier.wait()
+        return encode_parquet(rows, **kwargs)
+
+    monkeypatch.setattr(driver, "encode_parquet", _overlapping_encode)
+    with tempfile.TemporaryDirectory() as tmp:
+        config = {
+            "run_id": "run-1",
+            "paths": {"output_root": tmp, "state_db_path": os.path.join(tmp, "state", "pipeline.db")},
+            "coordinates": {"mask_encoding": "rle", "time_base": "seconds"},
+            "writer": {"stream_threads": 4},
+        }
+        receipt = WriterActor(config).write({"clip": {"clip_id": "c1", "video_id": "v1"}})
+        assert receipt["status"] == "written"
+        out_dir = os.path.join(tmp, "run_id=run-1", "video_id=v1", "clip_id=c1")
+        for name in ("meta.json", "masks.parquet", "hand_pose.parquet", "object_pose.parquet", "mapping.parquet"):
+            assert os.path.exists(os.path.join(out_dir, name))
+        assert not any(name.endswith(".tmp") for name in os.listdir(out_dir))
+        assert len(active) == 4 and not barrier.broken
+
+
+def test_write_in_flight_follows_writer_pool():
+    from egoworld.config import BackpressureConfig, PipelineConfig, WriterConfig
+
+    def in_flight(**kwargs):
+        return PipelineConfig(num_gpus=2, **kwargs).resolved().backpressure.max_in_flight_write
+
+    assert in_flight() == 4
+    assert in_flight(writer=WriterConfig(num_writers=16)) == 32
+    # An explicit cap below the pool size is raised to one write per writer.
+    assert in_flight(backpressure=BackpressureConfig(max_in_flight_write=8), writer=WriterConfig(num_writers=16)) == 16
+
+
+def test_clip_writer_skips_unchanged_outputs():
+    pytest.importorskip("pyarrow")
+    from egoworld.pipeline.driver import ClipWriter
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config = {
+            "run_id": "run-1",
+            "paths": {"output_root": tmp, "state_db_path": os.path.join(tmp, "state", "pipeline.db")},
+            "coordinates": {"mask_encoding": "rle", "time_base": "seconds"},
+        }
+        frames = [{"frame_index": 0, "timestamp_s": 0.0, "mask_rle": "{}"}]
+        result = {"clip": {"clip_id": "c1", "video_id": "v1"}, "masks": {"frames": frames}}
+        writer = ClipWriter(config)
+        first = writer.write(result)
+        assert not any(info["skipped"] for info in first["files"])
+
+        second = writer.write(result)
+        assert all(info["skipped"] for info in second["files"])
+
+        changed = {"clip": result["clip"], "masks": {"frames": frames * 2}}
+        third = {os.path.basename(i["path"]): i["skipped"] for i in writer.write(changed)["files"]}
+        assert third["masks.parquet"] is False
+        assert third["meta.json"] is False
+        assert third["hand_pose.parquet"] is True
+
+
+def test_colocated_actor_holds_result_until_write_succeeds(monkeypatch):
+    pytest.importorskip("pyarrow")
+    from egoworld.pipeline.driver import ClipWriter, Sam2Actor
+    from egoworld.utils.errors import HeldResultLost, classify_error
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config = {
+            "run_id": "run-1",
+            "paths": {"output_root": tmp, "state_db_path": os.path.join(tmp, "state", "pipeline.db")},
+            "coordinates": {"mask_encoding": "rle", "time_base": "seconds"},
+            "writer": {"mode": "colocated"},
+            "operators": {"sam2": {"enabled": False}},
+        }
+        actor = Sam2Actor(config)
+        clip = {"clip_id": "c1", "video_id": "v1", "video_path": "/tmp/v1.mp4", "start_s": 0.0, "end_s": 1.0}
+        summary = actor.process(clip)
+        assert summary["status"] == "held" and not os.path.exists(os.path.join(tmp, "run_id=run-1"))
+
+        # A failed write keeps the result, so the retry writes without re-running the GPU job.
+        write = ClipWriter.write
+        monkeypatch.setattr(ClipWriter, "write", lambda self, result: (_ for _ in ()).throw(OSError("disk full")))
+        with pytest.raises(OSError):
+            actor.write_held("c1")
+        monkeypatch.setattr(ClipWriter, "write", write)
+        assert actor.write_held("c1")["status"] == "written"
+        assert actor.held == {}
+
+        # After a restart the held result is gone: a retryable error, so the driver recomputes the clip.
+        with pytest.raises(HeldResultLost) as lost:
+            actor.write_held("c1")
+        assert classify_error(lost.value).retryable